@@ -68,10 +68,34 @@ sourceSets {
             srcDirs(srcDirs, generatedJavaPath)
         }
     }
+
+    // HTTP load generator (src/loadtest); reuses the main classes for config, DB access and histograms.
+    create("loadtest") {
+        compileClasspath += sourceSets.main.get().output + configurations.runtimeClasspath.get()
+        runtimeClasspath += output + compileClasspath
+    }
 }
 
+// Benchmarks are tagged "benchmark": they print timings and load the shared test database, so they stay out of
+// `test` (and CI) and run on demand with `./gradlew benchmark`.
 tasks.test {
-    useJUnitPlatform()
+    useJUnitPlatform {
+        excludeTags("benchmark")
+    }
+}
+
+tasks.register<Test>("benchmark") {
+    group = "verification"
+    description = "Runs the report-only benchmarks tagged \"benchmark\" against the test database."
+    testClassesDirs = sourceSets.test.get().output.classesDirs
+    classpath = sourceSets.test.get().runtimeClasspath
+    useJUnitPlatform {
+        includeTags("benchmark")
+    }
+    testLogging {
+        showStandardStreams = true
+    }
+    shouldRunAfter(tasks.test)
 }
 
 tasks.register<Jar>("kotlinJar") {
@@ -113,6 +137,15 @@ tasks.register<JavaExec>("runJar") {
     dependsOn(tasks["kotlinJar"])
 }
 
+tasks.register<JavaExec>("loadTest") {
+    group = "verification"
+    description = "Run the HTTP load test against a running server; see docs/LOAD_TESTING.md"
+
+    classpath = sourceSets["loadtest"].runtimeClasspath
+    mainClass.set("com.literp.loadtest.LoadTestKt")
+    workingDir = projectDir
+}
+
 tasks.register<JavaCompile>("annotationProcessing") {
     group = "build"
     description = "Generate vertx codegen"
@@ -0,0 +1,169 @@
+"""05. Materialized inventory balance per product and location
+
+Revision ID: 3c7e2a9f5d10
+Revises: e6d9a7c1b2f4
+Create Date: 2026-10-18 00:00:00.000000
+
+Schema migration for stock read performance.
+Adds an inventory_balance table holding on-hand and reserved quantities per
+(product, location), backfills it from the movement ledger and active
+reservations, and installs triggers so every inventory_movement and
+inventory_reservation write updates the balance in the same transaction.
+"""
+import os
+import sys
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+sys.path.insert(0, os.getenv('ROOT_DIR'))
+from python.database.migration.alembic.resources import (  # noqa: E402
+    create_table_if_not_exists,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7e2a9f5d10'
+down_revision: Union[str, Sequence[str], None] = 'e6d9a7c1b2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - add inventory_balance and keep it in sync with the ledger."""
+
+    create_table_if_not_exists(
+        'inventory_balance',
+        sa.Column('product_id', sa.String(36), sa.ForeignKey('product.product_id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('location_id', sa.String(36), sa.ForeignKey('location.location_id', ondelete='CASCADE'), primary_key=True, nullable=False),
+        sa.Column('on_hand_quantity', sa.Numeric(14, 3), server_default='0', nullable=False),
+        sa.Column('reserved_quantity', sa.Numeric(14, 3), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION inventory_balance_adjust(
+            p_product_id VARCHAR,
+            p_location_id VARCHAR,
+            p_on_hand_delta NUMERIC,
+            p_reserved_delta NUMERIC
+        ) RETURNS void AS $$
+        BEGIN
+            IF p_location_id IS NULL OR (p_on_hand_delta = 0 AND p_reserved_delta = 0) THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO inventory_balance (product_id, location_id, on_hand_quantity, reserved_quantity, updated_at)
+            VALUES (p_product_id, p_location_id, p_on_hand_delta, p_reserved_delta, NOW())
+            ON CONFLICT (product_id, location_id) DO UPDATE
+            SET on_hand_quantity = inventory_balance.on_hand_quantity + EXCLUDED.on_hand_quantity,
+                reserved_quantity = inventory_balance.reserved_quantity + EXCLUDED.reserved_quantity,
+                updated_at = NOW();
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION inventory_balance_apply_movement() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                IF OLD.movement_type IN ('IN', 'ADJUSTMENT', 'TRANSFER') THEN
+                    PERFORM inventory_balance_adjust(OLD.product_id, OLD.to_location_id, -OLD.quantity, 0);
+                END IF;
+                IF OLD.movement_type IN ('TRANSFER', 'OUT') THEN
+                    PERFORM inventory_balance_adjust(OLD.product_id, OLD.from_location_id, OLD.quantity, 0);
+                END IF;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                IF NEW.movement_type IN ('IN', 'ADJUSTMENT', 'TRANSFER') THEN
+                    PERFORM inventory_balance_adjust(NEW.product_id, NEW.to_location_id, NEW.quantity, 0);
+                END IF;
+                IF NEW.movement_type IN ('TRANSFER', 'OUT') THEN
+                    PERFORM inventory_balance_adjust(NEW.product_id, NEW.from_location_id, -NEW.quantity, 0);
+                END IF;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION inventory_balance_apply_reservation() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'RESERVED' THEN
+                PERFORM inventory_balance_adjust(OLD.product_id, OLD.location_id, 0, -OLD.quantity);
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'RESERVED' THEN
+                PERFORM inventory_balance_adjust(NEW.product_id, NEW.location_id, 0, NEW.quantity);
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        INSERT INTO inventory_balance (product_id, location_id, on_hand_quantity, reserved_quantity, updated_at)
+        SELECT ledger.product_id, ledger.location_id, SUM(ledger.on_hand_quantity), SUM(ledger.reserved_quantity), NOW()
+        FROM (
+            SELECT product_id, to_location_id AS location_id, quantity AS on_hand_quantity, 0 AS reserved_quantity
+            FROM inventory_movement
+            WHERE movement_type IN ('IN', 'ADJUSTMENT', 'TRANSFER') AND to_location_id IS NOT NULL
+            UNION ALL
+            SELECT product_id, from_location_id, -quantity, 0
+            FROM inventory_movement
+            WHERE movement_type IN ('TRANSFER', 'OUT') AND from_location_id IS NOT NULL
+            UNION ALL
+            SELECT product_id, location_id, 0, quantity
+            FROM inventory_reservation
+            WHERE status = 'RESERVED'
+        ) ledger
+        GROUP BY ledger.product_id, ledger.location_id
+        ON CONFLICT (product_id, location_id) DO UPDATE
+        SET on_hand_quantity = EXCLUDED.on_hand_quantity,
+            reserved_quantity = EXCLUDED.reserved_quantity,
+            updated_at = NOW()
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        DROP TRIGGER IF EXISTS trg_inventory_balance_movement ON inventory_movement;
+        CREATE TRIGGER trg_inventory_balance_movement
+        AFTER INSERT OR UPDATE OR DELETE ON inventory_movement
+        FOR EACH ROW
+        EXECUTE FUNCTION inventory_balance_apply_movement();
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        DROP TRIGGER IF EXISTS trg_inventory_balance_reservation ON inventory_reservation;
+        CREATE TRIGGER trg_inventory_balance_reservation
+        AFTER INSERT OR UPDATE OR DELETE ON inventory_reservation
+        FOR EACH ROW
+        EXECUTE FUNCTION inventory_balance_apply_reservation();
+        """
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove inventory_balance and its maintenance triggers."""
+
+    op.execute(sa.text("DROP TRIGGER IF EXISTS trg_inventory_balance_reservation ON inventory_reservation"))
+    op.execute(sa.text("DROP TRIGGER IF EXISTS trg_inventory_balance_movement ON inventory_movement"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS inventory_balance_apply_reservation()"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS inventory_balance_apply_movement()"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS inventory_balance_adjust(VARCHAR, VARCHAR, NUMERIC, NUMERIC)"))
+    op.drop_table('inventory_balance')
@@ -0,0 +1,64 @@
+"""09. Covering indexes for the per-location inventory movement ledger
+
+Revision ID: 5b2e9d7f1a63
+Revises: c4e8a1f7b3d5
+Create Date: 2026-10-18 00:00:00.000000
+
+Schema migration for stock ledger read performance.
+A location's ledger is the movements arriving at it (to_location_id) plus the
+ones leaving it (from_location_id). The initial
+idx_inventory_movement_product_location_date only covered arrivals, so the
+outgoing side was a sequential scan. This adds one index per side ordered by
+(created_at, movement_id), with movement_type and quantity included, so the
+running-balance window can be computed from index-only scans. The old arrival
+index is a prefix of the new one and is dropped.
+"""
+import os
+import sys
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+sys.path.insert(0, os.getenv('ROOT_DIR'))
+from python.database.migration.alembic.resources import (  # noqa: E402
+    create_index_if_not_exists,
+    delete_index_if_exists,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9d7f1a63'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f7b3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEDGER_INDEXES = [
+    ('idx_inventory_movement_to_ledger', 'to_location_id'),
+    ('idx_inventory_movement_from_ledger', 'from_location_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - add covering ledger indexes for both movement directions."""
+
+    for index_name, location_column in LEDGER_INDEXES:
+        op.execute(sa.text(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON inventory_movement "
+            f"(product_id, {location_column}, created_at, movement_id) INCLUDE (movement_type, quantity)"
+        ))
+
+    delete_index_if_exists('idx_inventory_movement_product_location_date', 'inventory_movement')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore the arrival-only index and remove the ledger indexes."""
+
+    create_index_if_not_exists(
+        'idx_inventory_movement_product_location_date',
+        'inventory_movement',
+        ['product_id', 'to_location_id', 'created_at'],
+    )
+
+    for index_name, _ in reversed(LEDGER_INDEXES):
+        delete_index_if_exists(index_name, 'inventory_movement')
@@ -0,0 +1,52 @@
+"""06. Composite indexes for keyset pagination on list endpoints
+
+Revision ID: 7a1d4e8b9c26
+Revises: 3c7e2a9f5d10
+Create Date: 2026-10-18 00:00:00.000000
+
+Schema-only migration for list read performance.
+Adds (sort column, primary key) indexes so cursor-paged list queries can seek
+straight to the next page instead of scanning and discarding an OFFSET.
+"""
+import os
+import sys
+from typing import Sequence, Union
+
+sys.path.insert(0, os.getenv('ROOT_DIR'))
+from python.database.migration.alembic.resources import (  # noqa: E402
+    create_index_if_not_exists,
+    delete_index_if_exists,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1d4e8b9c26'
+down_revision: Union[str, Sequence[str], None] = '3c7e2a9f5d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYSET_INDEXES = [
+    ('idx_sales_order_order_date_id', 'sales_order', ['order_date', 'sales_order_id']),
+    ('idx_sales_order_created_at_id', 'sales_order', ['created_at', 'sales_order_id']),
+    ('idx_sales_order_location_order_date_id', 'sales_order', ['location_id', 'order_date', 'sales_order_id']),
+    ('idx_sales_order_status_order_date_id', 'sales_order', ['status', 'order_date', 'sales_order_id']),
+    ('idx_product_sku_id', 'product', ['sku', 'product_id']),
+    ('idx_product_name_id', 'product', ['name', 'product_id']),
+    ('idx_product_created_at_id', 'product', ['created_at', 'product_id']),
+    ('idx_location_code_id', 'location', ['code', 'location_id']),
+    ('idx_location_name_id', 'location', ['name', 'location_id']),
+    ('idx_product_variant_product_sku_id', 'product_variant', ['product_id', 'sku', 'variant_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - add composite indexes backing keyset pagination."""
+
+    for index_name, table_name, columns in KEYSET_INDEXES:
+        create_index_if_not_exists(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove keyset pagination indexes."""
+
+    for index_name, table_name, _ in reversed(KEYSET_INDEXES):
+        delete_index_if_exists(index_name, table_name)
@@ -0,0 +1,97 @@
+"""07. Tombstones and updated_at indexes for catalog delta sync
+
+Revision ID: 9d3f6b2a4c81
+Revises: 7a1d4e8b9c26
+Create Date: 2026-10-18 00:00:00.000000
+
+Schema migration for POS catalog sync.
+Adds a catalog_tombstone table filled by AFTER DELETE triggers on the four
+master-data tables (cascaded variant deletes included), and (updated_at, id)
+indexes so "changed since" reads only touch the rows that changed.
+"""
+import os
+import sys
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+sys.path.insert(0, os.getenv('ROOT_DIR'))
+from python.database.migration.alembic.resources import (  # noqa: E402
+    create_index_if_not_exists,
+    create_table_if_not_exists,
+    delete_index_if_exists,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6b2a4c81'
+down_revision: Union[str, Sequence[str], None] = '7a1d4e8b9c26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, primary key column) pairs that record a tombstone on delete.
+SYNCED_TABLES = [
+    ('unit_of_measure', 'uom_id'),
+    ('product', 'product_id'),
+    ('product_variant', 'variant_id'),
+    ('location', 'location_id'),
+]
+
+UPDATED_AT_INDEXES = [
+    (f'idx_{table_name}_updated_at_id', table_name, ['updated_at', id_column])
+    for table_name, id_column in SYNCED_TABLES
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - add catalog tombstones and updated_at indexes."""
+
+    create_table_if_not_exists(
+        'catalog_tombstone',
+        sa.Column('tombstone_id', sa.BigInteger, primary_key=True, autoincrement=True, nullable=False),
+        sa.Column('entity_type', sa.String(32), nullable=False),
+        sa.Column('entity_id', sa.String(36), nullable=False),
+        sa.Column('deleted_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+    create_index_if_not_exists('idx_catalog_tombstone_deleted_at_id', 'catalog_tombstone', ['deleted_at', 'tombstone_id'])
+
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION catalog_tombstone_record() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO catalog_tombstone (entity_type, entity_id, deleted_at)
+            VALUES (TG_TABLE_NAME, to_jsonb(OLD) ->> TG_ARGV[0], NOW());
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    ))
+
+    for table_name, id_column in SYNCED_TABLES:
+        op.execute(sa.text(
+            f"""
+            DROP TRIGGER IF EXISTS trg_catalog_tombstone_{table_name} ON {table_name};
+            CREATE TRIGGER trg_catalog_tombstone_{table_name}
+            AFTER DELETE ON {table_name}
+            FOR EACH ROW
+            EXECUTE FUNCTION catalog_tombstone_record('{id_column}');
+            """
+        ))
+
+    for index_name, table_name, columns in UPDATED_AT_INDEXES:
+        create_index_if_not_exists(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove catalog tombstones and updated_at indexes."""
+
+    for index_name, table_name, _ in reversed(UPDATED_AT_INDEXES):
+        delete_index_if_exists(index_name, table_name)
+
+    for table_name, _ in reversed(SYNCED_TABLES):
+        op.execute(sa.text(f"DROP TRIGGER IF EXISTS trg_catalog_tombstone_{table_name} ON {table_name}"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS catalog_tombstone_record()"))
+
+    delete_index_if_exists('idx_catalog_tombstone_deleted_at_id', 'catalog_tombstone')
+    op.drop_table('catalog_tombstone')
@@ -0,0 +1,59 @@
+"""08. pg_trgm GIN indexes for product, variant and location search
+
+Revision ID: c4e8a1f7b3d5
+Revises: 9d3f6b2a4c81
+Create Date: 2026-10-18 00:00:00.000000
+
+Schema migration for search read performance.
+Enables pg_trgm and adds GIN trigram indexes on the searchable text columns, so
+ILIKE '%term%' filters and the q= relevance search use an index instead of a
+sequential scan.
+"""
+import os
+import sys
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+sys.path.insert(0, os.getenv('ROOT_DIR'))
+from python.database.migration.alembic.resources import (  # noqa: E402
+    delete_index_if_exists,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f7b3d5'
+down_revision: Union[str, Sequence[str], None] = '9d3f6b2a4c81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('idx_product_sku_trgm', 'product', 'sku'),
+    ('idx_product_name_trgm', 'product', 'name'),
+    ('idx_product_variant_sku_trgm', 'product_variant', 'sku'),
+    ('idx_product_variant_name_trgm', 'product_variant', 'name'),
+    ('idx_location_code_trgm', 'location', 'code'),
+    ('idx_location_name_trgm', 'location', 'name'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema - enable pg_trgm and add trigram search indexes."""
+
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    for index_name, table_name, column in TRIGRAM_INDEXES:
+        op.execute(sa.text(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING gin ({column} gin_trgm_ops)"
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove trigram search indexes.
+
+    The pg_trgm extension is left installed; other objects may depend on it.
+    """
+
+    for index_name, table_name, _ in reversed(TRIGRAM_INDEXES):
+        delete_index_if_exists(index_name, table_name)
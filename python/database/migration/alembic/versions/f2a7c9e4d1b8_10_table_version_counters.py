@@ -0,0 +1,78 @@
+"""10. Per-table version counters for list ETags
+
+Revision ID: f2a7c9e4d1b8
+Revises: 5b2e9d7f1a63
+Create Date: 2026-10-18 00:00:00.000000
+
+Schema migration for conditional list reads.
+List ETags were derived from COUNT(*) and MAX(updated_at), a full scan per
+lookup that also missed a write whose updated_at (its transaction start time)
+was older than one already seen when it committed. This adds a table_version
+row per master-data table, bumped by a statement-level trigger on every
+INSERT, UPDATE, DELETE or TRUNCATE, so the version is one primary-key read and
+changes with every commit that wrote the table.
+"""
+import os
+import sys
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+sys.path.insert(0, os.getenv('ROOT_DIR'))
+from python.database.migration.alembic.resources import (  # noqa: E402
+    create_table_if_not_exists,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7c9e4d1b8'
+down_revision: Union[str, Sequence[str], None] = '5b2e9d7f1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ['unit_of_measure', 'product', 'product_variant', 'location']
+
+
+def upgrade() -> None:
+    """Upgrade schema - add table_version and the triggers that bump it."""
+
+    create_table_if_not_exists(
+        'table_version',
+        sa.Column('table_name', sa.String(64), primary_key=True, nullable=False),
+        sa.Column('version', sa.BigInteger, server_default='0', nullable=False),
+    )
+
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION table_version_bump() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_version SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    ))
+
+    for table_name in VERSIONED_TABLES:
+        op.execute(sa.text(
+            f"""
+            INSERT INTO table_version (table_name, version) VALUES ('{table_name}', 0)
+            ON CONFLICT (table_name) DO NOTHING;
+            DROP TRIGGER IF EXISTS trg_table_version_{table_name} ON {table_name};
+            CREATE TRIGGER trg_table_version_{table_name}
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION table_version_bump();
+            """
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema - remove the version triggers and table_version."""
+
+    for table_name in reversed(VERSIONED_TABLES):
+        op.execute(sa.text(f"DROP TRIGGER IF EXISTS trg_table_version_{table_name} ON {table_name}"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS table_version_bump()"))
+
+    op.drop_table('table_version')
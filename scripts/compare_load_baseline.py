@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Final
+
+SECTIONS: Final[tuple[str, ...]] = ("flows", "operations")
+LATENCY_KEYS: Final[tuple[str, ...]] = ("p50Millis", "p99Millis")
+DEFAULT_BASELINE: Final[str] = "build/loadtest/baseline.json"
+
+
+class LoadBaselineError(Exception):
+    pass
+
+
+def resolve_root_dir() -> Path:
+    if root_dir := os.environ.get("ROOT_DIR"):
+        return Path(root_dir).resolve()
+
+    return Path(__file__).resolve().parents[1]
+
+
+def parse_args(root_dir: Path) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare a load-test result (./gradlew loadTest) against a baseline run recorded on the same machine."
+    )
+    parser.add_argument("result", type=Path, help="result JSON written by the load test")
+    parser.add_argument("--baseline", type=Path, default=root_dir / DEFAULT_BASELINE)
+    parser.add_argument(
+        "--latency-tolerance",
+        type=float,
+        default=0.20,
+        help="allowed relative increase of p50 and p99 latency (default 0.20)",
+    )
+    parser.add_argument(
+        "--latency-floor-ms",
+        type=float,
+        default=1.0,
+        help="latency increases smaller than this many milliseconds are noise (default 1.0)",
+    )
+    parser.add_argument(
+        "--throughput-tolerance",
+        type=float,
+        default=0.15,
+        help="allowed relative drop in throughput (default 0.15)",
+    )
+    parser.add_argument(
+        "--error-rate-tolerance",
+        type=float,
+        default=0.01,
+        help="allowed absolute increase in error rate (default 0.01)",
+    )
+    return parser.parse_args()
+
+
+def load_result(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        raise LoadBaselineError(f"File not found: {path}")
+
+    try:
+        document = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as error:
+        raise LoadBaselineError(f"Invalid JSON in {path}: {error}") from error
+
+    if not isinstance(document, dict):
+        raise LoadBaselineError(f"Expected a JSON object in {path}")
+    return document
+
+
+def compare_entry(name: str, baseline: dict[str, Any], current: dict[str, Any], args: argparse.Namespace) -> list[str]:
+    regressions: list[str] = []
+
+    baseline_throughput = float(baseline.get("throughputPerSecond", 0.0))
+    current_throughput = float(current.get("throughputPerSecond", 0.0))
+    if baseline_throughput > 0 and current_throughput < baseline_throughput * (1 - args.throughput_tolerance):
+        regressions.append(
+            f"{name}: throughput {current_throughput:.1f}/s is below baseline {baseline_throughput:.1f}/s"
+        )
+
+    for key in LATENCY_KEYS:
+        baseline_latency = float(baseline.get(key, 0.0))
+        current_latency = float(current.get(key, 0.0))
+        increase = current_latency - baseline_latency
+        if increase > args.latency_floor_ms and current_latency > baseline_latency * (1 + args.latency_tolerance):
+            regressions.append(f"{name}: {key} {current_latency:.2f} ms is above baseline {baseline_latency:.2f} ms")
+
+    baseline_errors = float(baseline.get("errorRate", 0.0))
+    current_errors = float(current.get("errorRate", 0.0))
+    if current_errors - baseline_errors > args.error_rate_tolerance:
+        regressions.append(f"{name}: error rate {current_errors:.3f} is above baseline {baseline_errors:.3f}")
+
+    return regressions
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], args: argparse.Namespace) -> list[str]:
+    if baseline.get("config") != current.get("config"):
+        print(
+            f"Warning: run config {current.get('config')} differs from baseline config {baseline.get('config')}; "
+            "the comparison may not be meaningful",
+            file=sys.stderr,
+        )
+
+    regressions: list[str] = []
+    for section in SECTIONS:
+        baseline_entries = baseline.get(section) or {}
+        current_entries = current.get(section) or {}
+        for name in sorted(baseline_entries):
+            if name not in current_entries:
+                regressions.append(f"{name}: present in the baseline but missing from the result")
+                continue
+            entry_regressions = compare_entry(name, baseline_entries[name], current_entries[name], args)
+            status = "REGRESSED" if entry_regressions else "ok"
+            print(
+                f"{status:9} {name:24} "
+                f"{current_entries[name].get('throughputPerSecond', 0.0):9.1f}/s "
+                f"(baseline {baseline_entries[name].get('throughputPerSecond', 0.0):.1f}/s) "
+                f"p99 {current_entries[name].get('p99Millis', 0.0):.2f} ms "
+                f"(baseline {baseline_entries[name].get('p99Millis', 0.0):.2f} ms)"
+            )
+            regressions.extend(entry_regressions)
+
+    return regressions
+
+
+def main() -> int:
+    root_dir = resolve_root_dir()
+    args = parse_args(root_dir)
+
+    if not args.baseline.exists():
+        print(
+            f"Baseline {args.baseline} not found; record it from the base revision with "
+            f"./gradlew loadTest --args=\"--output {DEFAULT_BASELINE}\"",
+            file=sys.stderr,
+        )
+        return 1
+
+    try:
+        baseline = load_result(args.baseline)
+        current = load_result(args.result)
+    except LoadBaselineError as error:
+        print(f"Load baseline comparison failed: {error}", file=sys.stderr)
+        return 1
+
+    if not any(baseline.get(section) for section in SECTIONS):
+        print(f"Baseline {args.baseline} has no recorded results, so nothing can be compared", file=sys.stderr)
+        return 1
+
+    regressions = compare(baseline, current, args)
+    if regressions:
+        print("\nRegressions against the baseline:", file=sys.stderr)
+        for regression in regressions:
+            print(f"- {regression}", file=sys.stderr)
+        return 1
+
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+package com.literp.loadtest
+
+import io.vertx.core.json.JsonObject
+import java.net.URI
+import java.net.http.HttpClient
+import java.net.http.HttpRequest
+import java.net.http.HttpResponse
+import java.time.Duration
+import java.util.UUID
+
+// Blocking calls against the real HTTP API, each timed into the current phase's Recorder under its
+// operationId. A call succeeds when the server answers with the expected status; anything else, including
+// connection errors and timeouts, counts as an error for that operation and returns null.
+class ApiClient(private val baseUrl: String) {
+    private val client: HttpClient = HttpClient.newBuilder()
+        .version(HttpClient.Version.HTTP_1_1)
+        .connectTimeout(CONNECT_TIMEOUT)
+        .build()
+
+    @Volatile
+    var recorder = Recorder()
+
+    fun get(operation: String, path: String): JsonObject? {
+        return call(operation, "GET", path, null, idempotent = false, expectedStatus = 200)
+    }
+
+    fun post(operation: String, path: String, body: JsonObject, expectedStatus: Int, idempotent: Boolean = false): JsonObject? {
+        return call(operation, "POST", path, body, idempotent, expectedStatus)
+    }
+
+    private fun call(
+        operation: String,
+        method: String,
+        path: String,
+        body: JsonObject?,
+        idempotent: Boolean,
+        expectedStatus: Int
+    ): JsonObject? {
+        val request = HttpRequest.newBuilder(URI.create("$baseUrl/api/v1$path"))
+            .timeout(REQUEST_TIMEOUT)
+            .header("Accept", "application/json")
+        if (body != null) {
+            request.header("Content-Type", "application/json")
+                .method(method, HttpRequest.BodyPublishers.ofString(body.encode()))
+        } else {
+            request.method(method, HttpRequest.BodyPublishers.noBody())
+        }
+        if (idempotent) {
+            request.header("Idempotency-Key", UUID.randomUUID().toString())
+        }
+
+        val startedAt = System.nanoTime()
+        val response = try {
+            client.send(request.build(), HttpResponse.BodyHandlers.ofString())
+        } catch (error: InterruptedException) {
+            Thread.currentThread().interrupt()
+            null
+        } catch (error: Exception) {
+            null
+        }
+        val elapsedNanos = System.nanoTime() - startedAt
+        val succeeded = response?.statusCode() == expectedStatus
+        recorder.operation(operation, elapsedNanos, succeeded)
+
+        return if (succeeded) JsonObject(response!!.body()) else null
+    }
+
+    private companion object {
+        val CONNECT_TIMEOUT: Duration = Duration.ofSeconds(5)
+        val REQUEST_TIMEOUT: Duration = Duration.ofSeconds(30)
+    }
+}
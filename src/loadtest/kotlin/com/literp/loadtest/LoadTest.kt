@@ -0,0 +1,113 @@
+package com.literp.loadtest
+
+import io.vertx.core.json.JsonObject
+import java.io.File
+import java.time.Instant
+import java.util.concurrent.Callable
+import java.util.concurrent.Executors
+import kotlin.system.exitProcess
+
+// Drives a running server through its HTTP API: order workers repeat the POS sale flow, read workers run
+// the read mix, both for a warm-up phase and then a measured phase. The measured phase is printed and
+// written as JSON for scripts/compare_load_baseline.py.
+fun main(args: Array<String>) {
+    val options = try {
+        LoadTestOptions.parse(args)
+    } catch (error: IllegalArgumentException) {
+        System.err.println(error.message)
+        exitProcess(2)
+    }
+
+    if (options.replenish && options.orderWorkers > 0) {
+        println("Replenishing stock at ${options.locationId} for ${options.productIds.size} products")
+        StockReplenisher.replenish(options.locationId, options.productIds)
+    }
+
+    val api = ApiClient(options.baseUrl)
+    val recentOrders = RecentOrders()
+    val orderFlow = OrderFlowScenario(api, options, recentOrders)
+    val readMix = ReadMixScenario(api, options, recentOrders)
+
+    if (options.warmupSeconds > 0) {
+        println("Warming up for ${options.warmupSeconds}s")
+        runPhase(api, options, options.warmupSeconds, orderFlow, readMix)
+    }
+
+    println(
+        "Measuring for ${options.durationSeconds}s with ${options.orderWorkers} order workers " +
+            "and ${options.readWorkers} read workers against ${options.baseUrl}"
+    )
+    val elapsedNanos = runPhase(api, options, options.durationSeconds, orderFlow, readMix)
+
+    val result = JsonObject()
+        .put("recordedAt", Instant.now().toString())
+        .put("baseUrl", options.baseUrl)
+        .put(
+            "config",
+            JsonObject()
+                .put("orderWorkers", options.orderWorkers)
+                .put("readWorkers", options.readWorkers)
+                .put("warmupSeconds", options.warmupSeconds)
+                .put("durationSeconds", options.durationSeconds)
+                .put("linesPerOrder", options.linesPerOrder)
+        )
+        .mergeIn(api.recorder.toJson(elapsedNanos))
+
+    printReport(result)
+    val output = File(options.output)
+    output.absoluteFile.parentFile.mkdirs()
+    output.writeText(result.encodePrettily() + "\n")
+    println("Wrote ${output.path}")
+}
+
+// Runs both scenarios on their own worker threads until the phase ends and returns its length; each phase
+// records into a fresh Recorder, so warm-up calls never reach the report.
+private fun runPhase(
+    api: ApiClient,
+    options: LoadTestOptions,
+    seconds: Int,
+    orderFlow: OrderFlowScenario,
+    readMix: ReadMixScenario
+): Long {
+    api.recorder = Recorder()
+    val workers = options.orderWorkers + options.readWorkers
+    val executor = Executors.newFixedThreadPool(workers)
+    val startedAt = System.nanoTime()
+    val deadline = startedAt + seconds * 1_000_000_000L
+    try {
+        val tasks = (0 until workers).map { worker ->
+            Callable {
+                while (System.nanoTime() < deadline) {
+                    if (worker < options.orderWorkers) orderFlow.runOnce() else readMix.runOnce()
+                }
+            }
+        }
+        executor.invokeAll(tasks).forEach { it.get() }
+    } finally {
+        executor.shutdownNow()
+    }
+    return System.nanoTime() - startedAt
+}
+
+private fun printReport(result: JsonObject) {
+    val header = "%-24s %9s %7s %9s %9s %9s %9s %9s".format("operation", "count", "errors", "req/s", "p50 ms", "p90 ms", "p99 ms", "max ms")
+    println(header)
+    listOf("flows", "operations").forEach { section ->
+        val entries = result.getJsonObject(section)
+        entries.fieldNames().sorted().forEach { name ->
+            val stats = entries.getJsonObject(name)
+            println(
+                "%-24s %9d %7d %9.1f %9.2f %9.2f %9.2f %9.2f".format(
+                    name,
+                    stats.getLong("count"),
+                    stats.getLong("errors"),
+                    stats.getDouble("throughputPerSecond"),
+                    stats.getDouble("p50Millis"),
+                    stats.getDouble("p90Millis"),
+                    stats.getDouble("p99Millis"),
+                    stats.getDouble("maxMillis")
+                )
+            )
+        }
+    }
+}
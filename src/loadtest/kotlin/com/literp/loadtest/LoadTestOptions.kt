@@ -0,0 +1,72 @@
+package com.literp.loadtest
+
+// Command-line settings for a load-test run. Defaults target the local server and the seeded store location,
+// selling the two products stocked there.
+data class LoadTestOptions(
+    val baseUrl: String = "http://localhost:8010",
+    val orderWorkers: Int = 8,
+    val readWorkers: Int = 8,
+    val warmupSeconds: Int = 10,
+    val durationSeconds: Int = 60,
+    val linesPerOrder: Int = 2,
+    val locationId: String = SEED_STORE_LOCATION_ID,
+    val productIds: List<String> = SEED_STORE_PRODUCT_IDS,
+    val replenish: Boolean = true,
+    val output: String = "build/loadtest/result.json"
+) {
+    companion object {
+        const val SEED_STORE_LOCATION_ID = "5e5965f0-3bd2-4da5-8831-b8387d08b64f"
+        val SEED_STORE_PRODUCT_IDS = listOf(
+            "0b2578e9-b0be-42a8-9ff5-a51fce4d9779",
+            "ec848de5-e34f-4819-a345-0541f47a1230"
+        )
+
+        const val USAGE = "Usage: ./gradlew loadTest --args=\"[--base-url URL] [--order-workers N] [--read-workers N] " +
+            "[--warmup SECONDS] [--duration SECONDS] [--lines N] [--location ID] [--products ID,ID] " +
+            "[--no-replenish] [--output FILE]\""
+
+        fun parse(args: Array<String>): LoadTestOptions {
+            var options = LoadTestOptions()
+            var index = 0
+            while (index < args.size) {
+                val name = args[index]
+                if (name == "--no-replenish") {
+                    options = options.copy(replenish = false)
+                    index++
+                    continue
+                }
+
+                val value = args.getOrNull(index + 1) ?: throw IllegalArgumentException("$name requires a value. $USAGE")
+                options = when (name) {
+                    "--base-url" -> options.copy(baseUrl = value.trimEnd('/'))
+                    "--order-workers" -> options.copy(orderWorkers = count(name, value, minimum = 0))
+                    "--read-workers" -> options.copy(readWorkers = count(name, value, minimum = 0))
+                    "--warmup" -> options.copy(warmupSeconds = count(name, value, minimum = 0))
+                    "--duration" -> options.copy(durationSeconds = count(name, value, minimum = 1))
+                    "--lines" -> options.copy(linesPerOrder = count(name, value, minimum = 1))
+                    "--location" -> options.copy(locationId = value)
+                    "--products" -> options.copy(productIds = value.split(",").map { it.trim() }.filter { it.isNotEmpty() })
+                    "--output" -> options.copy(output = value)
+                    else -> throw IllegalArgumentException("Unknown option $name. $USAGE")
+                }
+                index += 2
+            }
+
+            if (options.orderWorkers + options.readWorkers == 0) {
+                throw IllegalArgumentException("At least one of --order-workers and --read-workers must be positive")
+            }
+            if (options.productIds.isEmpty()) {
+                throw IllegalArgumentException("--products must name at least one product")
+            }
+            return options
+        }
+
+        private fun count(name: String, value: String, minimum: Int): Int {
+            val parsed = value.toIntOrNull()
+            if (parsed == null || parsed < minimum) {
+                throw IllegalArgumentException("$name must be an integer of at least $minimum, got '$value'")
+            }
+            return parsed
+        }
+    }
+}
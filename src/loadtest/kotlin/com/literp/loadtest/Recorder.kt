@@ -0,0 +1,69 @@
+package com.literp.loadtest
+
+import com.literp.observability.LatencyHistogram
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.atomic.LongAdder
+
+// Latency and outcome counts for one phase of a run, per API operation (named by OpenAPI operationId) and per
+// end-to-end flow. Only successful calls are timed; failures are counted separately.
+class Recorder {
+    private val operations = ConcurrentHashMap<String, Stats>()
+    private val flows = ConcurrentHashMap<String, Stats>()
+
+    fun operation(name: String, durationNanos: Long, succeeded: Boolean) {
+        operations.computeIfAbsent(name) { Stats() }.record(durationNanos, succeeded)
+    }
+
+    fun flow(name: String, durationNanos: Long, succeeded: Boolean) {
+        flows.computeIfAbsent(name) { Stats() }.record(durationNanos, succeeded)
+    }
+
+    // Latencies in milliseconds; throughput is successful calls per second of the phase.
+    fun toJson(elapsedNanos: Long): JsonObject {
+        val seconds = elapsedNanos / 1_000_000_000.0
+        val operationJson = JsonObject()
+        operations.entries.sortedBy { it.key }.forEach { (name, stats) -> operationJson.put(name, stats.toJson(seconds)) }
+        val flowJson = JsonObject()
+        flows.entries.sortedBy { it.key }.forEach { (name, stats) -> flowJson.put(name, stats.toJson(seconds)) }
+        return JsonObject()
+            .put("operations", operationJson)
+            .put("flows", flowJson)
+    }
+
+    private class Stats {
+        val latency = LatencyHistogram()
+        val errors = LongAdder()
+
+        fun record(durationNanos: Long, succeeded: Boolean) {
+            if (succeeded) {
+                latency.record(durationNanos)
+            } else {
+                errors.increment()
+            }
+        }
+
+        fun toJson(seconds: Double): JsonObject {
+            val snapshot = latency.snapshot()
+            val errorCount = errors.sum()
+            val json = JsonObject()
+                .put("count", snapshot.count)
+                .put("errors", errorCount)
+                .put("errorRate", rounded(if (snapshot.count + errorCount == 0L) 0.0 else errorCount.toDouble() / (snapshot.count + errorCount)))
+                .put("throughputPerSecond", rounded(snapshot.count / seconds))
+                .put("meanMillis", millis(snapshot.meanNanos))
+            LatencyHistogram.PERCENTILES.forEachIndexed { index, percentile ->
+                json.put(PERCENTILE_KEYS.getValue(percentile), millis(snapshot.percentileNanos[index]))
+            }
+            return json.put("maxMillis", millis(snapshot.maxNanos))
+        }
+    }
+
+    private companion object {
+        val PERCENTILE_KEYS = mapOf(50.0 to "p50Millis", 90.0 to "p90Millis", 99.0 to "p99Millis", 99.9 to "p999Millis")
+
+        fun millis(nanos: Long): Double = rounded(nanos / 1_000_000.0)
+
+        fun rounded(value: Double): Double = Math.round(value * 1000.0) / 1000.0
+    }
+}
@@ -0,0 +1,124 @@
+package com.literp.loadtest
+
+import io.vertx.core.json.JsonObject
+import java.math.BigDecimal
+import java.util.concurrent.ThreadLocalRandom
+import java.util.concurrent.atomic.AtomicLong
+import java.util.concurrent.atomic.AtomicReferenceArray
+
+// The POS sale, start to finish: draft, lines, confirm (reserves stock), capture the full amount, fulfill
+// (writes the OUT movements). A step that fails ends the flow, which then counts as failed.
+class OrderFlowScenario(
+    private val api: ApiClient,
+    private val options: LoadTestOptions,
+    private val recentOrders: RecentOrders
+) {
+    fun runOnce() {
+        val startedAt = System.nanoTime()
+        val completed = sell()
+        api.recorder.flow(ORDER_FLOW, System.nanoTime() - startedAt, completed)
+    }
+
+    private fun sell(): Boolean {
+        val draft = api.post(
+            "createSalesOrderDraft",
+            "/orders",
+            JsonObject()
+                .put("salesChannel", "POS")
+                .put("locationId", options.locationId)
+                .put("notes", "load test"),
+            expectedStatus = 201
+        ) ?: return false
+        val orderId = draft.getJsonObject("data")?.getString("salesOrderId") ?: return false
+
+        var total = BigDecimal.ZERO
+        repeat(options.linesPerOrder) { line ->
+            val productId = options.productIds[line % options.productIds.size]
+            api.post(
+                "addSalesOrderLine",
+                "/orders/$orderId/lines",
+                JsonObject()
+                    .put("productId", productId)
+                    .put("quantityOrdered", 1)
+                    .put("unitPrice", UNIT_PRICE),
+                expectedStatus = 201
+            ) ?: return false
+            total = total.add(UNIT_PRICE)
+        }
+
+        api.post("confirmSalesOrder", "/orders/$orderId/confirm", JsonObject(), expectedStatus = 200, idempotent = true)
+            ?: return false
+        api.post(
+            "capturePayment",
+            "/orders/$orderId/payments",
+            JsonObject()
+                .put("paymentMethod", "CARD")
+                .put("amount", total),
+            expectedStatus = 201,
+            idempotent = true
+        ) ?: return false
+        api.post(
+            "fulfillSalesOrder",
+            "/orders/$orderId/fulfill",
+            JsonObject().put("createdBy", "loadtest"),
+            expectedStatus = 200,
+            idempotent = true
+        ) ?: return false
+
+        recentOrders.add(orderId)
+        return true
+    }
+
+    companion object {
+        const val ORDER_FLOW = "orderFlow"
+        private val UNIT_PRICE = BigDecimal("4.50")
+    }
+}
+
+// What POS terminals and back-office screens read while selling: order lookups, stock checks and catalog
+// lists, picked at random with the weights below.
+class ReadMixScenario(
+    private val api: ApiClient,
+    private val options: LoadTestOptions,
+    private val recentOrders: RecentOrders
+) {
+    fun runOnce() {
+        val random = ThreadLocalRandom.current()
+        val productId = options.productIds[random.nextInt(options.productIds.size)]
+        val stockQuery = "productId=$productId&locationId=${options.locationId}"
+        when (random.nextInt(TOTAL_WEIGHT)) {
+            in 0 until 30 -> {
+                val orderId = recentOrders.pick() ?: SEED_ORDER_ID
+                api.get("getSalesOrder", "/orders/$orderId")
+            }
+            in 30 until 45 -> api.get("getCurrentStock", "/stock/current?$stockQuery")
+            in 45 until 60 -> api.get("getAvailableStock", "/stock/available?$stockQuery")
+            in 60 until 80 -> api.get("listProducts", "/products?page=0&size=20")
+            in 80 until 90 -> api.get("listLocations", "/locations?page=0&size=20")
+            else -> api.get("listUnitOfMeasures", "/uom?page=0&size=20")
+        }
+    }
+
+    private companion object {
+        const val TOTAL_WEIGHT = 100
+        const val SEED_ORDER_ID = "56689f0a-346b-4fdd-a3eb-cf7beaf4fe5f"
+    }
+}
+
+// Orders completed during the run, so order lookups hit fresh rows rather than one seeded order.
+class RecentOrders(private val capacity: Int = 1024) {
+    private val orders = AtomicReferenceArray<String>(capacity)
+    private val next = AtomicLong()
+
+    fun add(orderId: String) {
+        orders.set((next.getAndIncrement() % capacity).toInt(), orderId)
+    }
+
+    fun pick(): String? {
+        val filled = next.get().coerceAtMost(capacity.toLong()).toInt()
+        if (filled == 0) {
+            return null
+        }
+        return orders.get(ThreadLocalRandom.current().nextInt(filled))
+    }
+}
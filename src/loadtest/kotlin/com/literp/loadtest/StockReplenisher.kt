@@ -0,0 +1,45 @@
+package com.literp.loadtest
+
+import com.literp.config.Config
+import com.literp.db.DatabaseConnection
+import io.reactivex.rxjava3.core.Flowable
+import io.vertx.rxjava3.core.Vertx
+import io.vertx.rxjava3.sqlclient.Tuple
+import java.util.UUID
+
+// The API has no way to receive stock, and the seed only stocks a few hundred units at the store, so a run
+// tops up every product it sells with one IN movement, reference type ADJUSTMENT, before it starts. The
+// movement trigger keeps inventory_balance in step. It reads the same cfg.properties as the server, so run it
+// from the project root.
+object StockReplenisher {
+    private const val QUANTITY = "100000"
+
+    fun replenish(locationId: String, productIds: List<String>) {
+        val vertx = Vertx.vertx()
+        val pool = DatabaseConnection.createPool(vertx, Config())
+        try {
+            Flowable.fromIterable(productIds)
+                .concatMapCompletable { productId ->
+                    pool.preparedQuery(
+                        """
+                        INSERT INTO inventory_movement (movement_id, product_id, sku, movement_type, from_location_id, to_location_id, quantity, reference_type, reference_id, notes, created_by, created_at)
+                        SELECT $1, product_id, sku, 'IN', NULL, $2, $3::numeric, 'ADJUSTMENT', 'LOADTEST', 'Load test stock', 'loadtest', NOW()
+                        FROM product
+                        WHERE product_id = $4
+                        """.trimIndent()
+                    )
+                        .rxExecute(Tuple.of(UUID.randomUUID().toString(), locationId, QUANTITY, productId))
+                        .doOnSuccess { result ->
+                            if (result.rowCount() == 0) {
+                                throw IllegalArgumentException("Product $productId not found; pass seeded ids with --products")
+                            }
+                        }
+                        .ignoreElement()
+                }
+                .blockingAwait()
+        } finally {
+            pool.rxClose().onErrorComplete().blockingAwait()
+            vertx.rxClose().onErrorComplete().blockingAwait()
+        }
+    }
+}
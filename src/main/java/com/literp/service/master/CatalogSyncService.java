@@ -0,0 +1,24 @@
+package com.literp.service.master;
+
+import io.vertx.codegen.annotations.ProxyGen;
+import io.vertx.codegen.annotations.VertxGen;
+import io.vertx.core.Future;
+import io.vertx.core.Vertx;
+import io.vertx.core.json.JsonObject;
+import io.vertx.serviceproxy.ServiceBinder;
+
+@ProxyGen
+@VertxGen
+public interface CatalogSyncService {
+    String ADDRESS = "service.master.sync";
+
+    Future<JsonObject> syncCatalog(String since);
+
+    static CatalogSyncService createProxy(Vertx vertx) {
+        return new CatalogSyncServiceVertxEBProxy(vertx, ADDRESS);
+    }
+
+    static void register(Vertx vertx, CatalogSyncService service) {
+        new ServiceBinder(vertx).setAddress(ADDRESS).register(CatalogSyncService.class, service);
+    }
+}
@@ -19,19 +19,25 @@ public interface LocationService {
         String code,
         String name,
         String locationType,
-        boolean activeOnly
+        String q,
+        boolean activeOnly,
+        String cursor,
+        String totalMode,
+        boolean readPrimary
     );
 
     Future<JsonObject> createLocation(String code, String name, String locationType, boolean isActive, JsonObject address);
 
-    Future<JsonObject> getLocation(String locationId);
+    Future<JsonObject> getLocation(String locationId, boolean readPrimary);
 
-    Future<JsonObject> getLocationByCode(String code);
+    Future<JsonObject> getLocationByCode(String code, boolean readPrimary);
 
     Future<JsonObject> updateLocation(String locationId, String name, String locationType, Boolean isActive, JsonObject address);
 
     Future<Void> deleteLocation(String locationId);
 
+    Future<String> getLocationListVersion(boolean readPrimary);
+
     Future<Boolean> checkCodeExists(String code);
 
     static LocationService createProxy(Vertx vertx) {
@@ -4,6 +4,7 @@ import io.vertx.codegen.annotations.ProxyGen;
 import io.vertx.codegen.annotations.VertxGen;
 import io.vertx.core.Future;
 import io.vertx.core.Vertx;
+import io.vertx.core.json.JsonArray;
 import io.vertx.core.json.JsonObject;
 import io.vertx.serviceproxy.ServiceBinder;
 
@@ -12,16 +13,33 @@ import io.vertx.serviceproxy.ServiceBinder;
 public interface ProductService {
     String ADDRESS = "service.master.product";
 
-    Future<JsonObject> listProducts(int page, int size, String sort, String sku, String productType, boolean activeOnly);
+    Future<JsonObject> listProducts(
+        int page,
+        int size,
+        String sort,
+        String sku,
+        String productType,
+        String q,
+        boolean activeOnly,
+        String cursor,
+        String totalMode,
+        boolean readPrimary
+    );
 
     Future<JsonObject> createProduct(String sku, String name, String productType, String baseUom, boolean active, JsonObject metadata);
 
-    Future<JsonObject> getProduct(String productId, boolean includeVariants);
+    Future<JsonObject> getProduct(String productId, boolean includeVariants, boolean readPrimary);
+
+    Future<JsonObject> getProductBySku(String sku);
 
     Future<JsonObject> updateProduct(String productId, String name, String productType, String baseUom, Boolean active, JsonObject metadata);
 
     Future<Void> deleteProduct(String productId);
 
+    Future<JsonObject> bulkUpsertProducts(JsonArray rows);
+
+    Future<String> getProductListVersion(boolean readPrimary);
+
     Future<Boolean> checkSkuExists(String sku);
 
     static ProductService createProxy(Vertx vertx) {
@@ -12,16 +12,27 @@ import io.vertx.serviceproxy.ServiceBinder;
 public interface ProductVariantService {
     String ADDRESS = "service.master.productVariant";
 
-    Future<JsonObject> listProductVariants(String productId, int page, int size, String sort, boolean activeOnly);
+    Future<JsonObject> listProductVariants(
+        String productId,
+        int page,
+        int size,
+        String sort,
+        boolean activeOnly,
+        String cursor,
+        String totalMode,
+        boolean readPrimary
+    );
 
     Future<JsonObject> createProductVariant(String productId, String sku, String name, boolean active, JsonObject attributes);
 
-    Future<JsonObject> getProductVariant(String productId, String variantId);
+    Future<JsonObject> getProductVariant(String productId, String variantId, boolean readPrimary);
 
     Future<JsonObject> updateProductVariant(String productId, String variantId, String name, Boolean active, JsonObject attributes);
 
     Future<Void> deleteProductVariant(String productId, String variantId);
 
+    Future<String> getProductVariantListVersion(boolean readPrimary);
+
     Future<Boolean> checkSkuExists(String sku);
 
     static ProductVariantService createProxy(Vertx vertx) {
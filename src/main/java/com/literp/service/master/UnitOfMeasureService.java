@@ -12,16 +12,18 @@ import io.vertx.serviceproxy.ServiceBinder;
 public interface UnitOfMeasureService {
     String ADDRESS = "service.master.uom";
 
-    Future<JsonObject> listUnitOfMeasures(int page, int size, String sort);
+    Future<JsonObject> listUnitOfMeasures(int page, int size, String sort, String totalMode, boolean readPrimary);
 
     Future<JsonObject> createUnitOfMeasure(String code, String name, String baseUnit);
 
-    Future<JsonObject> getUnitOfMeasure(String uomId);
+    Future<JsonObject> getUnitOfMeasure(String uomId, boolean readPrimary);
 
     Future<JsonObject> updateUnitOfMeasure(String uomId, String name, String baseUnit);
 
     Future<Void> deleteUnitOfMeasure(String uomId);
 
+    Future<String> getUnitOfMeasureListVersion(boolean readPrimary);
+
     Future<Boolean> checkCodeExists(String code);
 
     static UnitOfMeasureService createProxy(Vertx vertx) {
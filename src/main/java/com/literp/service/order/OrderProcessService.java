@@ -12,17 +12,37 @@ import io.vertx.serviceproxy.ServiceBinder;
 public interface OrderProcessService {
     String ADDRESS = "service.order.process";
 
-    Future<JsonObject> listSalesOrders(int page, int size, String sort, String status, String salesChannel, String locationId);
+    Future<JsonObject> listSalesOrders(
+        int page,
+        int size,
+        String sort,
+        String status,
+        String salesChannel,
+        String locationId,
+        String cursor,
+        String totalMode,
+        boolean readPrimary
+    );
 
     Future<JsonObject> createSalesOrderDraft(String salesChannel, String locationId, String customerId, String currency, String notes);
 
-    Future<JsonObject> getSalesOrder(String salesOrderId);
+    Future<JsonObject> getSalesOrder(String salesOrderId, boolean readPrimary);
 
     Future<JsonObject> addSalesOrderLine(String salesOrderId, String productId, String sku, String quantityOrdered, String unitPrice);
 
-    Future<JsonObject> getCurrentStock(String productId, String locationId);
+    Future<JsonObject> getCurrentStock(String productId, String locationId, boolean readPrimary);
 
-    Future<JsonObject> getAvailableStock(String productId, String locationId);
+    Future<JsonObject> getAvailableStock(String productId, String locationId, boolean readPrimary);
+
+    Future<JsonObject> listInventoryMovements(
+        String productId,
+        String locationId,
+        String from,
+        String to,
+        int size,
+        String cursor,
+        boolean readPrimary
+    );
 
     Future<JsonObject> confirmSalesOrder(String salesOrderId, String idempotencyKey);
 
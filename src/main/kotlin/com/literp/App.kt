@@ -1,12 +1,15 @@
 package com.literp
 
+import com.literp.config.Config
 import com.literp.verticle.MainVerticle
 import io.vertx.core.Vertx
+import io.vertx.core.VertxOptions
 import io.vertx.core.internal.logging.LoggerFactory
 
 fun main() {
     val logger = LoggerFactory.getLogger("main")
-    val vertx = Vertx.vertx()
+    val config = Config()
+    val vertx = Vertx.vertx(VertxOptions().setEventLoopPoolSize(config.eventLoopSize))
 
     vertx.deployVerticle(MainVerticle())
         .onSuccess { id ->
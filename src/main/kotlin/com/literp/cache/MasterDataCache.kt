@@ -0,0 +1,172 @@
+package com.literp.cache
+
+import io.reactivex.rxjava3.core.Single
+import io.vertx.core.Vertx
+import io.vertx.core.eventbus.EventBus
+import io.vertx.core.json.JsonObject
+import java.util.UUID
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.CopyOnWriteArrayList
+import java.util.concurrent.atomic.AtomicLong
+
+// Read-through cache for master-data reads, shared by every service implementation in the process.
+// Entries are bounded by an access-ordered LRU and a TTL. Writes invalidate a whole region (product,
+// variant, uom, location) locally and publish the same invalidation so other processes drop theirs.
+class MasterDataCache(
+    private val maxEntries: Int,
+    private val ttlMillis: Long,
+    private val clock: () -> Long = System::currentTimeMillis
+) {
+    private class Entry(val value: JsonObject, val expiresAt: Long)
+
+    private val entries = object : LinkedHashMap<String, Entry>(16, 0.75f, true) {
+        override fun removeEldestEntry(eldest: MutableMap.MutableEntry<String, Entry>): Boolean {
+            if (size > maxEntries) {
+                evictions.incrementAndGet()
+                return true
+            }
+            return false
+        }
+    }
+
+    // Bumped on every invalidation so a load that started before a write never caches the old row.
+    private val generations = ConcurrentHashMap<String, AtomicLong>()
+    private val instanceId = UUID.randomUUID().toString()
+    private val listeners = CopyOnWriteArrayList<(String) -> Unit>()
+    private val hits = AtomicLong()
+    private val misses = AtomicLong()
+    private val evictions = AtomicLong()
+    private val expirations = AtomicLong()
+    private val invalidations = AtomicLong()
+
+    @Volatile
+    private var eventBus: EventBus? = null
+
+    val enabled: Boolean
+        get() = maxEntries > 0 && ttlMillis > 0
+
+    fun bind(vertx: Vertx) {
+        eventBus = vertx.eventBus()
+        vertx.eventBus().consumer<JsonObject>(INVALIDATION_ADDRESS) { message ->
+            val body = message.body()
+            if (body.getString("origin") != instanceId) {
+                invalidateLocal(body.getString("region"))
+            }
+        }
+    }
+
+    // readPrimary callers skip the lookup but still refresh the entry with what the primary returned.
+    // Misses always load from the primary: a miss right after a write could otherwise read a lagging
+    // replica and keep its pre-write row for the whole TTL rather than for the replica lag.
+    fun getOrLoad(
+        region: String,
+        key: String,
+        readPrimary: Boolean,
+        loader: (readPrimary: Boolean) -> Single<JsonObject>
+    ): Single<JsonObject> {
+        if (!enabled) {
+            return loader(readPrimary)
+        }
+
+        val cacheKey = "$region|$key"
+        if (!readPrimary) {
+            val cached = lookup(cacheKey)
+            if (cached != null) {
+                return Single.just(cached)
+            }
+        }
+
+        val generation = generation(region).get()
+        return loader(true).doOnSuccess { value -> store(region, cacheKey, generation, value) }
+    }
+
+    fun invalidate(vararg regions: String) {
+        regions.forEach { region ->
+            invalidateLocal(region)
+            eventBus?.publish(INVALIDATION_ADDRESS, JsonObject().put("region", region).put("origin", instanceId))
+        }
+    }
+
+    // Called with the region on every invalidation, local or received from another process, even when the
+    // cache itself is disabled. Other in-memory views of master data use it to stay current.
+    fun onInvalidate(listener: (String) -> Unit) {
+        listeners += listener
+    }
+
+    fun snapshot(): JsonObject {
+        val size = synchronized(entries) { entries.size }
+        return JsonObject()
+            .put("enabled", enabled)
+            .put("size", size)
+            .put("maxEntries", maxEntries)
+            .put("ttlMillis", ttlMillis)
+            .put("hits", hits.get())
+            .put("misses", misses.get())
+            .put("evictions", evictions.get())
+            .put("expirations", expirations.get())
+            .put("invalidations", invalidations.get())
+    }
+
+    private fun lookup(cacheKey: String): JsonObject? {
+        val now = clock()
+        val value = synchronized(entries) {
+            val entry = entries[cacheKey]
+            when {
+                entry == null -> null
+                entry.expiresAt <= now -> {
+                    entries.remove(cacheKey)
+                    expirations.incrementAndGet()
+                    null
+                }
+                else -> entry.value
+            }
+        }
+
+        if (value == null) {
+            misses.incrementAndGet()
+            return null
+        }
+        hits.incrementAndGet()
+        // Callers may mutate what they get back, so the cached object never leaves this class.
+        return value.copy()
+    }
+
+    private fun store(region: String, cacheKey: String, generation: Long, value: JsonObject) {
+        val entry = Entry(value.copy(), clock() + ttlMillis)
+        synchronized(entries) {
+            if (generation(region).get() == generation) {
+                entries[cacheKey] = entry
+            }
+        }
+    }
+
+    private fun invalidateLocal(region: String?) {
+        if (region == null) {
+            return
+        }
+
+        val prefix = "$region|"
+        synchronized(entries) {
+            generation(region).incrementAndGet()
+            entries.keys.removeIf { it.startsWith(prefix) }
+        }
+        invalidations.incrementAndGet()
+        listeners.forEach { listener -> listener(region) }
+    }
+
+    private fun generation(region: String): AtomicLong {
+        return generations.computeIfAbsent(region) { AtomicLong() }
+    }
+
+    companion object {
+        const val INVALIDATION_ADDRESS = "cache.master.invalidate"
+
+        const val PRODUCT = "product"
+        const val VARIANT = "variant"
+        const val UOM = "uom"
+        const val LOCATION = "location"
+
+        // Used when no cache is configured, e.g. by tests that build service implementations directly.
+        fun disabled(): MasterDataCache = MasterDataCache(maxEntries = 0, ttlMillis = 0)
+    }
+}
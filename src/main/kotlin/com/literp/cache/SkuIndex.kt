@@ -0,0 +1,138 @@
+package com.literp.cache
+
+import com.literp.common.ErrorCodes
+import io.reactivex.rxjava3.core.Single
+import io.vertx.core.internal.logging.LoggerFactory
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import java.time.LocalDateTime
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.atomic.AtomicBoolean
+import java.util.concurrent.atomic.AtomicLong
+
+// In-memory SKU -> product/variant index for barcode lookups at the register. Loaded in full on the first
+// refresh, then kept current by re-reading the rows changed since the last load whenever the product or
+// variant region of the master-data cache is invalidated, locally or by another process.
+// The loader is ProductRepository.findSkuEntries: (changedAfter, sku) -> { entries, loadedAt }.
+class SkuIndex(
+    private val loader: (LocalDateTime?, String?) -> Single<JsonObject>
+) {
+    private val logger = LoggerFactory.getLogger(SkuIndex::class.java)
+    private val entries = ConcurrentHashMap<String, JsonObject>()
+
+    // changes counts invalidations, applied is the count the entries reflect. Until they match, lookups go to
+    // the database so a write is never hidden behind an entry read before it.
+    private val changes = AtomicLong(1)
+    private val applied = AtomicLong(0)
+    private val refreshing = AtomicBoolean(false)
+    private val hits = AtomicLong()
+    private val fallbacks = AtomicLong()
+    private val refreshes = AtomicLong()
+    private val refreshFailures = AtomicLong()
+
+    @Volatile
+    private var loadedAt: LocalDateTime? = null
+
+    val ready: Boolean
+        get() = applied.get() == changes.get()
+
+    fun bind(cache: MasterDataCache) {
+        cache.onInvalidate { region ->
+            if (region == MasterDataCache.PRODUCT || region == MasterDataCache.VARIANT) {
+                changes.incrementAndGet()
+                refresh()
+            }
+        }
+    }
+
+    // Runs one load at a time; a load that finishes behind newer invalidations starts another.
+    // A failed load leaves the index on the database fallback until the next invalidation retries it.
+    fun refresh() {
+        if (!refreshing.compareAndSet(false, true)) {
+            return
+        }
+
+        val target = changes.get()
+        // Writes stamp updated_at with their transaction start, so re-read a short window before the last load.
+        val changedAfter = loadedAt?.minusSeconds(OVERLAP_SECONDS)
+        loader(changedAfter, null).subscribe(
+            { result ->
+                apply(result.getJsonArray("entries"))
+                loadedAt = LocalDateTime.parse(result.getString("loadedAt"))
+                refreshes.incrementAndGet()
+                applied.set(target)
+                refreshing.set(false)
+                if (changes.get() != target) {
+                    refresh()
+                }
+            },
+            { error ->
+                refreshFailures.incrementAndGet()
+                refreshing.set(false)
+                logger.error("Failed to refresh the SKU index", error)
+            }
+        )
+    }
+
+    fun lookup(sku: String): Single<JsonObject> {
+        val indexed = ready
+        if (indexed) {
+            val entry = entries[sku]
+            if (entry != null) {
+                hits.incrementAndGet()
+                return Single.just(entry.copy())
+            }
+        }
+
+        fallbacks.incrementAndGet()
+        val target = changes.get()
+        return loader(null, sku).flatMap { result ->
+            val rows = result.getJsonArray("entries")
+            // Only fill the index from a read that no invalidation or refresh raced with.
+            if (indexed && applied.get() == target && changes.get() == target) {
+                apply(rows)
+            }
+            val match = rows.filterIsInstance<JsonObject>().lastOrNull { it.getBoolean("active") }
+            if (match == null) {
+                Single.error(Exception(ErrorCodes.fromStatus(404)))
+            } else {
+                Single.just(publicEntry(match))
+            }
+        }
+    }
+
+    fun snapshot(): JsonObject {
+        return JsonObject()
+            .put("ready", ready)
+            .put("size", entries.size)
+            .put("hits", hits.get())
+            .put("fallbacks", fallbacks.get())
+            .put("refreshes", refreshes.get())
+            .put("refreshFailures", refreshFailures.get())
+    }
+
+    private fun apply(rows: JsonArray) {
+        rows.filterIsInstance<JsonObject>().forEach { row ->
+            val sku = row.getString("sku")
+            if (row.getBoolean("active")) {
+                entries[sku] = publicEntry(row)
+            } else {
+                entries.computeIfPresent(sku) { _, current -> if (sameEntity(current, row)) null else current }
+            }
+        }
+    }
+
+    private fun sameEntity(current: JsonObject, row: JsonObject): Boolean {
+        val idPath = if (row.getJsonObject("variant") != null) "variant" to "variantId" else "product" to "productId"
+        return current.getString("matchType") == row.getString("matchType") &&
+            current.getJsonObject(idPath.first)?.getString(idPath.second) == row.getJsonObject(idPath.first).getString(idPath.second)
+    }
+
+    private fun publicEntry(row: JsonObject): JsonObject {
+        return row.copy().apply { remove("active") }
+    }
+
+    private companion object {
+        const val OVERLAP_SECONDS = 30L
+    }
+}
@@ -7,11 +7,36 @@ import java.util.*
 class Config {
 
     val httpPort: Int
+    val httpInstances: Int
+    val serviceMode: String
     val pgHost: String
     val pgPort: Int
     val pgUser: String
     val pgPassword: String
     val pgDatabase: String
+    val pgPoolSize: Int
+    val pgPoolWaitQueueSize: Int
+    val pgPoolConnectionTimeoutMs: Int
+    val pgPoolIdleTimeoutSeconds: Int
+    val pgPoolMaxLifetimeSeconds: Int
+    val pgPipeliningLimit: Int
+    val pgPreparedStatementCacheSize: Int
+    val pgPreparedStatementCacheSqlLimit: Int
+    val eventLoopSize: Int
+    val pgReplicaHost: String?
+    val pgReplicaPort: Int
+    val pgReplicaUser: String
+    val pgReplicaPassword: String
+    val pgReplicaDatabase: String
+    val pgReplicaPoolSize: Int
+    val masterDataCacheMaxEntries: Int
+    val masterDataCacheTtlSeconds: Int
+    val dbSlowQueryThresholdMs: Int
+    val tracingSampleRate: Double
+    val tracingExporter: String
+    val tracingBufferSize: Int
+    val accessLogSampleRate: Double
+    val accessLogQueueSize: Int
 
     init {
         val props = Properties()
@@ -35,6 +60,47 @@ class Config {
         pgUser = values.getValue(PG_USER)!!
         pgPassword = values.getValue(PG_PASSWORD)!!
         pgDatabase = values.getValue(PG_DATABASE)!!
+
+        httpInstances = optionalInt(props, HTTP_INSTANCES, DEFAULT_HTTP_INSTANCES, minimum = 1)
+        serviceMode = optionalChoice(props, SERVICE_MODE, SERVICE_MODE_LOCAL, listOf(SERVICE_MODE_LOCAL, SERVICE_MODE_PROXY))
+        pgPoolSize = optionalInt(props, PG_POOL_SIZE, DEFAULT_PG_POOL_SIZE, minimum = 1)
+        pgPoolWaitQueueSize = optionalInt(props, PG_POOL_WAIT_QUEUE_SIZE, DEFAULT_PG_POOL_WAIT_QUEUE_SIZE, minimum = -1)
+        pgPoolConnectionTimeoutMs = optionalInt(props, PG_POOL_CONNECTION_TIMEOUT_MS, DEFAULT_PG_POOL_CONNECTION_TIMEOUT_MS, minimum = 1)
+        pgPoolIdleTimeoutSeconds = optionalInt(props, PG_POOL_IDLE_TIMEOUT_SECONDS, DEFAULT_PG_POOL_IDLE_TIMEOUT_SECONDS, minimum = 0)
+        pgPoolMaxLifetimeSeconds = optionalInt(props, PG_POOL_MAX_LIFETIME_SECONDS, DEFAULT_PG_POOL_MAX_LIFETIME_SECONDS, minimum = 0)
+        pgPipeliningLimit = optionalInt(props, PG_PIPELINING_LIMIT, DEFAULT_PG_PIPELINING_LIMIT, minimum = 1)
+        pgPreparedStatementCacheSize = optionalInt(props, PG_PREPARED_CACHE_SIZE, DEFAULT_PG_PREPARED_CACHE_SIZE, minimum = 1)
+        pgPreparedStatementCacheSqlLimit = optionalInt(props, PG_PREPARED_CACHE_SQL_LIMIT, DEFAULT_PG_PREPARED_CACHE_SQL_LIMIT, minimum = 1)
+        eventLoopSize = optionalInt(props, EVENT_LOOP_SIZE, DEFAULT_EVENT_LOOP_SIZE, minimum = 1)
+
+        // The replica is optional; unset connection values fall back to the primary's.
+        pgReplicaHost = resolveValue(props, PG_REPLICA_HOST)
+        pgReplicaPort = optionalInt(props, PG_REPLICA_PORT, pgPort, minimum = 1)
+        pgReplicaUser = resolveValue(props, PG_REPLICA_USER) ?: pgUser
+        pgReplicaPassword = resolveValue(props, PG_REPLICA_PASSWORD) ?: pgPassword
+        pgReplicaDatabase = resolveValue(props, PG_REPLICA_DATABASE) ?: pgDatabase
+        pgReplicaPoolSize = optionalInt(props, PG_REPLICA_POOL_SIZE, pgPoolSize, minimum = 1)
+
+        // Zero for either value turns the master-data cache off.
+        masterDataCacheMaxEntries = optionalInt(props, CACHE_MASTER_MAX_ENTRIES, DEFAULT_CACHE_MASTER_MAX_ENTRIES, minimum = 0)
+        masterDataCacheTtlSeconds = optionalInt(props, CACHE_MASTER_TTL_SECONDS, DEFAULT_CACHE_MASTER_TTL_SECONDS, minimum = 0)
+
+        // Queries at or above this duration are logged at WARN; zero turns the slow-query log off.
+        dbSlowQueryThresholdMs = optionalInt(props, DB_SLOW_QUERY_THRESHOLD_MS, DEFAULT_DB_SLOW_QUERY_THRESHOLD_MS, minimum = 0)
+
+        // Fraction of requests traced; zero (the default) turns tracing off.
+        tracingSampleRate = optionalFraction(props, TRACING_SAMPLE_RATE, DEFAULT_TRACING_SAMPLE_RATE)
+        tracingExporter = optionalChoice(
+            props,
+            TRACING_EXPORTER,
+            TRACING_EXPORTER_RING,
+            listOf(TRACING_EXPORTER_RING, TRACING_EXPORTER_LOG, TRACING_EXPORTER_NONE)
+        )
+        tracingBufferSize = optionalInt(props, TRACING_BUFFER_SIZE, DEFAULT_TRACING_BUFFER_SIZE, minimum = 1)
+
+        // Fraction of successful requests written to the access log; errors are always written.
+        accessLogSampleRate = optionalFraction(props, ACCESS_LOG_SAMPLE_RATE, DEFAULT_ACCESS_LOG_SAMPLE_RATE)
+        accessLogQueueSize = optionalInt(props, ACCESS_LOG_QUEUE_SIZE, DEFAULT_ACCESS_LOG_QUEUE_SIZE, minimum = 1)
     }
 
     private fun resolveValue(props: Properties, spec: ConfigSpec): String? {
@@ -56,6 +122,44 @@ class Config {
             )
     }
 
+    private fun optionalInt(props: Properties, spec: ConfigSpec, defaultValue: Int, minimum: Int): Int {
+        val value = resolveValue(props, spec) ?: return defaultValue
+        val parsed = parseInt(spec, value)
+
+        if (parsed < minimum) {
+            throw IllegalStateException(
+                "Invalid config '${spec.propertyName}' with value '$value'. " +
+                    "Expected a value of at least $minimum in $CONFIG_FILE or one of: ${spec.envNames.joinToString(", ")}"
+            )
+        }
+        return parsed
+    }
+
+    private fun optionalFraction(props: Properties, spec: ConfigSpec, defaultValue: Double): Double {
+        val value = resolveValue(props, spec) ?: return defaultValue
+        val parsed = value.toDoubleOrNull()
+
+        if (parsed == null || parsed < 0.0 || parsed > 1.0) {
+            throw IllegalStateException(
+                "Invalid config '${spec.propertyName}' with value '$value'. " +
+                    "Expected a number from 0 to 1 in $CONFIG_FILE or one of: ${spec.envNames.joinToString(", ")}"
+            )
+        }
+        return parsed
+    }
+
+    private fun optionalChoice(props: Properties, spec: ConfigSpec, defaultValue: String, choices: List<String>): String {
+        val value = resolveValue(props, spec)?.lowercase() ?: return defaultValue
+
+        if (value !in choices) {
+            throw IllegalStateException(
+                "Invalid config '${spec.propertyName}' with value '$value'. " +
+                    "Expected one of ${choices.joinToString(", ")} in $CONFIG_FILE or one of: ${spec.envNames.joinToString(", ")}"
+            )
+        }
+        return value
+    }
+
     private fun missingConfigMessage(fileLoaded: Boolean, missing: Set<ConfigSpec>): String {
         val fileState = if (fileLoaded) {
             "$CONFIG_FILE is present but incomplete"
@@ -69,6 +173,15 @@ class Config {
     }
 
     companion object {
+        // local binds handlers straight to the service implementations; proxy goes through the event bus.
+        const val SERVICE_MODE_LOCAL = "local"
+        const val SERVICE_MODE_PROXY = "proxy"
+
+        // ring keeps recent spans for GET /debug/traces; log writes each span to the application log.
+        const val TRACING_EXPORTER_RING = "ring"
+        const val TRACING_EXPORTER_LOG = "log"
+        const val TRACING_EXPORTER_NONE = "none"
+
         private const val CONFIG_FILE = "cfg.properties"
 
         private val HTTP_PORT = ConfigSpec("http.port", listOf("LITERP_HTTP_PORT", "HTTP_PORT"))
@@ -78,6 +191,51 @@ class Config {
         private val PG_PASSWORD = ConfigSpec("pg.password", listOf("LITERP_PG_PASSWORD", "PG_PASSWORD", "DB_PASSWORD"))
         private val PG_DATABASE = ConfigSpec("pg.database", listOf("LITERP_PG_DATABASE", "PG_DATABASE", "DB_NAME"))
 
+        // Optional tuning; defaults apply when neither the property nor an env override is set.
+        private val HTTP_INSTANCES = ConfigSpec("http.instances", listOf("LITERP_HTTP_INSTANCES"))
+        private val SERVICE_MODE = ConfigSpec("service.mode", listOf("LITERP_SERVICE_MODE"))
+        private val PG_POOL_SIZE = ConfigSpec("pg.pool.size", listOf("LITERP_PG_POOL_SIZE"))
+        private val PG_POOL_WAIT_QUEUE_SIZE = ConfigSpec("pg.pool.wait.queue.size", listOf("LITERP_PG_POOL_WAIT_QUEUE_SIZE"))
+        private val PG_POOL_CONNECTION_TIMEOUT_MS = ConfigSpec("pg.pool.connection.timeout.ms", listOf("LITERP_PG_POOL_CONNECTION_TIMEOUT_MS"))
+        private val PG_POOL_IDLE_TIMEOUT_SECONDS = ConfigSpec("pg.pool.idle.timeout.seconds", listOf("LITERP_PG_POOL_IDLE_TIMEOUT_SECONDS"))
+        private val PG_POOL_MAX_LIFETIME_SECONDS = ConfigSpec("pg.pool.max.lifetime.seconds", listOf("LITERP_PG_POOL_MAX_LIFETIME_SECONDS"))
+        private val PG_PIPELINING_LIMIT = ConfigSpec("pg.pipelining.limit", listOf("LITERP_PG_PIPELINING_LIMIT"))
+        private val PG_PREPARED_CACHE_SIZE = ConfigSpec("pg.prepared.cache.size", listOf("LITERP_PG_PREPARED_CACHE_SIZE"))
+        private val PG_PREPARED_CACHE_SQL_LIMIT = ConfigSpec("pg.prepared.cache.sql.limit", listOf("LITERP_PG_PREPARED_CACHE_SQL_LIMIT"))
+        private val EVENT_LOOP_SIZE = ConfigSpec("vertx.event.loop.size", listOf("LITERP_EVENT_LOOP_SIZE"))
+        private val PG_REPLICA_HOST = ConfigSpec("pg.replica.host", listOf("LITERP_PG_REPLICA_HOST"))
+        private val PG_REPLICA_PORT = ConfigSpec("pg.replica.port", listOf("LITERP_PG_REPLICA_PORT"))
+        private val PG_REPLICA_USER = ConfigSpec("pg.replica.user", listOf("LITERP_PG_REPLICA_USER"))
+        private val PG_REPLICA_PASSWORD = ConfigSpec("pg.replica.password", listOf("LITERP_PG_REPLICA_PASSWORD"))
+        private val PG_REPLICA_DATABASE = ConfigSpec("pg.replica.database", listOf("LITERP_PG_REPLICA_DATABASE"))
+        private val PG_REPLICA_POOL_SIZE = ConfigSpec("pg.replica.pool.size", listOf("LITERP_PG_REPLICA_POOL_SIZE"))
+        private val CACHE_MASTER_MAX_ENTRIES = ConfigSpec("cache.master.max.entries", listOf("LITERP_CACHE_MASTER_MAX_ENTRIES"))
+        private val CACHE_MASTER_TTL_SECONDS = ConfigSpec("cache.master.ttl.seconds", listOf("LITERP_CACHE_MASTER_TTL_SECONDS"))
+        private val DB_SLOW_QUERY_THRESHOLD_MS = ConfigSpec("db.slow.query.threshold.ms", listOf("LITERP_DB_SLOW_QUERY_THRESHOLD_MS"))
+        private val TRACING_SAMPLE_RATE = ConfigSpec("tracing.sample.rate", listOf("LITERP_TRACING_SAMPLE_RATE"))
+        private val TRACING_EXPORTER = ConfigSpec("tracing.exporter", listOf("LITERP_TRACING_EXPORTER"))
+        private val TRACING_BUFFER_SIZE = ConfigSpec("tracing.buffer.size", listOf("LITERP_TRACING_BUFFER_SIZE"))
+        private val ACCESS_LOG_SAMPLE_RATE = ConfigSpec("access.log.sample.rate", listOf("LITERP_ACCESS_LOG_SAMPLE_RATE"))
+        private val ACCESS_LOG_QUEUE_SIZE = ConfigSpec("access.log.queue.size", listOf("LITERP_ACCESS_LOG_QUEUE_SIZE"))
+
+        private val DEFAULT_HTTP_INSTANCES = Runtime.getRuntime().availableProcessors()
+        private const val DEFAULT_PG_POOL_SIZE = 16
+        private const val DEFAULT_PG_POOL_WAIT_QUEUE_SIZE = 1024
+        private const val DEFAULT_PG_POOL_CONNECTION_TIMEOUT_MS = 5000
+        private const val DEFAULT_PG_POOL_IDLE_TIMEOUT_SECONDS = 300
+        private const val DEFAULT_PG_POOL_MAX_LIFETIME_SECONDS = 1800
+        private const val DEFAULT_PG_PIPELINING_LIMIT = 256
+        private const val DEFAULT_PG_PREPARED_CACHE_SIZE = 512
+        private const val DEFAULT_PG_PREPARED_CACHE_SQL_LIMIT = 4096
+        private val DEFAULT_EVENT_LOOP_SIZE = 2 * Runtime.getRuntime().availableProcessors()
+        private const val DEFAULT_CACHE_MASTER_MAX_ENTRIES = 10000
+        private const val DEFAULT_CACHE_MASTER_TTL_SECONDS = 300
+        private const val DEFAULT_DB_SLOW_QUERY_THRESHOLD_MS = 500
+        private const val DEFAULT_TRACING_SAMPLE_RATE = 0.0
+        private const val DEFAULT_TRACING_BUFFER_SIZE = 4096
+        private const val DEFAULT_ACCESS_LOG_SAMPLE_RATE = 1.0
+        private const val DEFAULT_ACCESS_LOG_QUEUE_SIZE = 8192
+
         private val REQUIRED_CONFIG = listOf(
             HTTP_PORT,
             PG_HOST,
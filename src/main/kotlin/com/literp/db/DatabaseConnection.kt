@@ -7,28 +7,64 @@ import io.vertx.rxjava3.core.Vertx
 import io.vertx.rxjava3.sqlclient.Pool as RxPool
 import io.vertx.sqlclient.Pool
 import io.vertx.sqlclient.PoolOptions
+import java.util.concurrent.TimeUnit
 
 object DatabaseConnection {
 
     private val logger = LoggerFactory.getLogger(this.javaClass)
 
-    fun createPool(vertx: Vertx): RxPool {
+    fun createPool(vertx: Vertx, config: Config = Config()): RxPool {
         logger.info("Initializing database pool")
-        val config = Config()
 
-        val connectOptions = PgConnectOptions()
+        val connectOptions = connectOptions(config)
             .setPort(config.pgPort)
             .setHost(config.pgHost)
             .setDatabase(config.pgDatabase)
             .setUser(config.pgUser)
             .setPassword(config.pgPassword)
 
-        val poolOptions = PoolOptions()
-            .setMaxSize(4)
-            .setConnectionTimeout(5000)
+        val pool = Pool.pool(vertx.delegate,connectOptions, poolOptions(config, config.pgPoolSize))
+        logger.info(
+            "Database pool created: size=${config.pgPoolSize} waitQueue=${config.pgPoolWaitQueueSize} " +
+                "pipeliningLimit=${config.pgPipeliningLimit} preparedCacheSize=${config.pgPreparedStatementCacheSize}"
+        )
+        return RxPool.newInstance(pool)
+    }
+
+    // Returns null when no replica is configured; callers then read from the primary pool.
+    fun createReplicaPool(vertx: Vertx, config: Config = Config()): RxPool? {
+        val replicaHost = config.pgReplicaHost ?: return null
+        logger.info("Initializing replica database pool")
+
+        val connectOptions = connectOptions(config)
+            .setPort(config.pgReplicaPort)
+            .setHost(replicaHost)
+            .setDatabase(config.pgReplicaDatabase)
+            .setUser(config.pgReplicaUser)
+            .setPassword(config.pgReplicaPassword)
 
-        val pool = Pool.pool(vertx.delegate,connectOptions, poolOptions)
-        logger.info("Database pool created")
+        val pool = Pool.pool(vertx.delegate, connectOptions, poolOptions(config, config.pgReplicaPoolSize))
+        logger.info("Replica database pool created: host=$replicaHost size=${config.pgReplicaPoolSize}")
         return RxPool.newInstance(pool)
     }
+
+    private fun connectOptions(config: Config): PgConnectOptions {
+        return PgConnectOptions()
+            .setPipeliningLimit(config.pgPipeliningLimit)
+            .setCachePreparedStatements(true)
+            .setPreparedStatementCacheMaxSize(config.pgPreparedStatementCacheSize)
+            .setPreparedStatementCacheSqlLimit(config.pgPreparedStatementCacheSqlLimit)
+    }
+
+    private fun poolOptions(config: Config, maxSize: Int): PoolOptions {
+        return PoolOptions()
+            .setMaxSize(maxSize)
+            .setMaxWaitQueueSize(config.pgPoolWaitQueueSize)
+            .setConnectionTimeout(config.pgPoolConnectionTimeoutMs)
+            .setConnectionTimeoutUnit(TimeUnit.MILLISECONDS)
+            .setIdleTimeout(config.pgPoolIdleTimeoutSeconds)
+            .setIdleTimeoutUnit(TimeUnit.SECONDS)
+            .setMaxLifetime(config.pgPoolMaxLifetimeSeconds)
+            .setMaxLifetimeUnit(TimeUnit.SECONDS)
+    }
 }
@@ -0,0 +1,37 @@
+package com.literp.db
+
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.atomic.AtomicLong
+
+// SQL text per statement shape (query name, sort and filter shape). Values are always bound, so
+// each key maps to exactly one statement the pg client can keep prepared on every connection.
+// The counters only cover building the text: textReuses and textBuilds say nothing about whether the pg
+// client's prepared-statement cache hit, which it does not expose.
+object StatementCatalog {
+    private val statements = ConcurrentHashMap<String, String>()
+    private val textReuses = AtomicLong()
+    private val textBuilds = AtomicLong()
+
+    fun sql(key: String, build: () -> String): String {
+        var built = false
+        val sql = statements.computeIfAbsent(key) {
+            built = true
+            build()
+        }
+
+        if (built) {
+            textBuilds.incrementAndGet()
+        } else {
+            textReuses.incrementAndGet()
+        }
+        return sql
+    }
+
+    fun snapshot(): JsonObject {
+        return JsonObject()
+            .put("statements", statements.size)
+            .put("textReuses", textReuses.get())
+            .put("textBuilds", textBuilds.get())
+    }
+}
@@ -0,0 +1,150 @@
+package com.literp.observability
+
+import io.vertx.core.internal.logging.LoggerFactory
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.ArrayBlockingQueue
+import java.util.concurrent.ThreadLocalRandom
+import java.util.concurrent.atomic.LongAdder
+
+// One structured line per finished request, written by a background thread so the event loop only samples
+// and enqueues. Successful requests (below 400) are kept at successSampleRate; errors are always kept. The
+// queue is bounded: when the writer falls behind, new entries are dropped and counted instead of blocking
+// the request. Lines are key=value pairs in a fixed order, formatted on the writer thread.
+class AccessLog(
+    val successSampleRate: Double,
+    private val queueCapacity: Int,
+    private val sink: Sink = loggingSink()
+) {
+    private val queue = ArrayBlockingQueue<Entry>(queueCapacity)
+    private val written = LongAdder()
+    private val dropped = LongAdder()
+
+    @Volatile
+    private var closed = false
+
+    private val writer = Thread(::drain, "literp-access-log").apply {
+        isDaemon = true
+        start()
+    }
+
+    fun interface Sink {
+        fun write(statusCode: Int, line: String)
+    }
+
+    // Error fields a handler leaves on the request for its access-log entry.
+    class ErrorDetail(val errorId: String, val errorCode: String, val message: String?)
+
+    class Entry(
+        val method: String,
+        val path: String,
+        val route: String,
+        val statusCode: Int,
+        val durationNanos: Long,
+        val requestId: String,
+        val error: ErrorDetail? = null
+    )
+
+    // Decide before building the entry, so unsampled requests allocate nothing.
+    fun sampled(statusCode: Int): Boolean {
+        if (statusCode >= 400) {
+            return true
+        }
+        return successSampleRate > 0.0 &&
+            (successSampleRate >= 1.0 || ThreadLocalRandom.current().nextDouble() < successSampleRate)
+    }
+
+    fun record(entry: Entry) {
+        if (!queue.offer(entry)) {
+            dropped.increment()
+        }
+    }
+
+    fun snapshot(): JsonObject {
+        return JsonObject()
+            .put("successSampleRate", successSampleRate)
+            .put("queueCapacity", queueCapacity)
+            .put("queued", queue.size)
+            .put("written", written.sum())
+            .put("dropped", dropped.sum())
+    }
+
+    fun prometheus(): String {
+        val text = StringBuilder()
+        PrometheusFormat.counter(text, "literp_access_log_written_total", "Access-log lines written.", written.sum())
+        PrometheusFormat.counter(text, "literp_access_log_dropped_total", "Access-log entries dropped because the queue was full.", dropped.sum())
+        return text.toString()
+    }
+
+    // Stops the writer once the queued entries are written; later entries are still queued but never written.
+    fun close() {
+        closed = true
+        writer.interrupt()
+    }
+
+    private fun drain() {
+        val batch = ArrayList<Entry>(DRAIN_BATCH_SIZE)
+        val line = StringBuilder(256)
+        while (true) {
+            try {
+                if (queue.drainTo(batch, DRAIN_BATCH_SIZE) == 0) {
+                    if (closed) {
+                        return
+                    }
+                    batch.add(queue.take())
+                }
+            } catch (interrupted: InterruptedException) {
+                if (queue.isEmpty()) {
+                    return
+                }
+                continue
+            }
+
+            batch.forEach { entry ->
+                try {
+                    line.setLength(0)
+                    sink.write(entry.statusCode, format(entry, line))
+                    written.increment()
+                } catch (error: Throwable) {
+                    logger.warn("Failed to write access log entry: ${error.message}")
+                }
+            }
+            batch.clear()
+        }
+    }
+
+    private fun format(entry: Entry, line: StringBuilder): String {
+        line.append("status=").append(entry.statusCode)
+            .append(" method=").append(entry.method)
+            .append(" path=").append(entry.path)
+            .append(" route=").append(entry.route)
+            .append(" durationMicros=").append(entry.durationNanos / 1_000)
+            .append(" requestId=").append(entry.requestId)
+        val error = entry.error
+        if (error != null) {
+            line.append(" errorId=").append(error.errorId)
+                .append(" errorCode=").append(error.errorCode)
+                .append(" message=\"").append(escape(error.message.orEmpty())).append('"')
+        }
+        return line.toString()
+    }
+
+    private fun escape(message: String): String {
+        return message.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    }
+
+    companion object {
+        // RoutingContext key for the ErrorDetail of an error response.
+        const val ERROR_CONTEXT_KEY = "accessLogError"
+
+        private const val DRAIN_BATCH_SIZE = 256
+        private val logger = LoggerFactory.getLogger(AccessLog::class.java)
+
+        // INFO for successful requests, WARN for errors, under the com.literp.access logger.
+        fun loggingSink(): Sink {
+            val accessLogger = LoggerFactory.getLogger("com.literp.access")
+            return Sink { statusCode, line ->
+                if (statusCode >= 400) accessLogger.warn(line) else accessLogger.info(line)
+            }
+        }
+    }
+}
@@ -0,0 +1,190 @@
+package com.literp.observability
+
+import io.vertx.core.internal.logging.LoggerFactory
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.atomic.AtomicLong
+import java.util.concurrent.atomic.LongAdder
+
+// Per-query timings and connection-pool usage for the repositories. Queries are keyed by a stable name
+// (repository.operation.statement); the names are literals in the repositories, so the set is bounded without
+// a cap. Pools are keyed by role (primary, replica). A slowQueryThresholdMillis of zero turns the slow-query
+// log off; the timings are recorded either way.
+class DatabaseMetrics(private val slowQueryThresholdMillis: Int = 0) {
+    private val logger = LoggerFactory.getLogger(DatabaseMetrics::class.java)
+    private val slowQueryThresholdNanos = slowQueryThresholdMillis * 1_000_000L
+    private val queries = ConcurrentHashMap<String, QueryStats>()
+    private val pools = ConcurrentHashMap<String, PoolStats>()
+    private val slowQueryCount = AtomicLong()
+
+    fun recordQuery(name: String, durationNanos: Long, rows: Long, failed: Boolean) {
+        val duration = durationNanos.coerceAtLeast(0L)
+        queries.computeIfAbsent(name) { QueryStats() }.record(duration, rows, failed)
+
+        if (slowQueryThresholdNanos > 0 && duration >= slowQueryThresholdNanos) {
+            slowQueryCount.incrementAndGet()
+            logger.warn(
+                "Slow query $name took ${duration / 1_000_000} ms (threshold $slowQueryThresholdMillis ms), " +
+                    "rows=$rows failed=$failed"
+            )
+        }
+    }
+
+    // maxSize is the configured pool size; currentSize probes how many connections are open right now.
+    fun registerPool(name: String, maxSize: Int, currentSize: () -> Int) {
+        pool(name).describe(maxSize, currentSize)
+    }
+
+    fun pool(name: String): PoolStats = pools.computeIfAbsent(name) { PoolStats() }
+
+    fun snapshot(): JsonObject {
+        val querySnapshots = JsonObject()
+        queries.entries.sortedBy { it.key }.forEach { (name, stats) -> querySnapshots.put(name, stats.toJson()) }
+        val poolSnapshots = JsonObject()
+        pools.entries.sortedBy { it.key }.forEach { (name, stats) -> poolSnapshots.put(name, stats.toJson()) }
+
+        return JsonObject()
+            .put("slowQueryThresholdMillis", slowQueryThresholdMillis)
+            .put("slowQueryCount", slowQueryCount.get())
+            .put("pools", poolSnapshots)
+            .put("queries", querySnapshots)
+    }
+
+    fun prometheus(): String {
+        val text = StringBuilder()
+        val queryEntries = queries.entries.sortedBy { it.key }.map { (name, stats) -> PrometheusFormat.label("query", name) to stats }
+        val poolEntries = pools.entries.sortedBy { it.key }.map { (name, stats) -> PrometheusFormat.label("pool", name) to stats }
+
+        PrometheusFormat.summary(text, "literp_db_query_duration_seconds", "Database query execution time by query name.",
+            queryEntries.map { (labels, stats) -> labels to stats.latency.snapshot() })
+        PrometheusFormat.series(text, "literp_db_query_rows_total", "Rows returned or affected by query name.", "counter",
+            queryEntries.map { (labels, stats) -> labels to stats.rows.sum() })
+        PrometheusFormat.series(text, "literp_db_query_errors_total", "Failed queries by query name.", "counter",
+            queryEntries.map { (labels, stats) -> labels to stats.errors.sum() })
+        PrometheusFormat.counter(text, "literp_db_slow_queries_total", "Queries slower than the slow-query threshold.", slowQueryCount.get())
+
+        PrometheusFormat.series(text, "literp_db_pool_connections", "Pool connections by state.", "gauge",
+            poolEntries.flatMap { (labels, stats) ->
+                listOf("$labels,state=\"in_use\"" to stats.inUse.toLong(), "$labels,state=\"idle\"" to stats.idle.toLong())
+            })
+        PrometheusFormat.series(text, "literp_db_pool_max_connections", "Configured pool size.", "gauge",
+            poolEntries.map { (labels, stats) -> labels to stats.maxSize.toLong() })
+        PrometheusFormat.series(text, "literp_db_pool_waiting", "Callers waiting for a pool connection.", "gauge",
+            poolEntries.map { (labels, stats) -> labels to stats.waiting.toLong() })
+        PrometheusFormat.series(text, "literp_db_pool_acquire_failures_total", "Connection acquisitions that failed or timed out.", "counter",
+            poolEntries.map { (labels, stats) -> labels to stats.acquireFailures.sum() })
+        PrometheusFormat.summary(text, "literp_db_pool_acquire_seconds", "Time spent waiting for a pool connection.",
+            poolEntries.map { (labels, stats) -> labels to stats.acquireWait.snapshot() })
+        return text.toString()
+    }
+
+    private class QueryStats {
+        val latency = LatencyHistogram()
+        val rows = LongAdder()
+        val errors = LongAdder()
+
+        fun record(durationNanos: Long, rowCount: Long, failed: Boolean) {
+            latency.record(durationNanos)
+            rows.add(rowCount)
+            if (failed) {
+                errors.increment()
+            }
+        }
+
+        fun toJson(): JsonObject {
+            return latency.snapshot().toJson()
+                .put("rows", rows.sum())
+                .put("errorCount", errors.sum())
+        }
+    }
+
+    // Connection accounting for one pool. Every acquisition goes through a Lease: it is waiting from lease() until
+    // acquired() or failed(), and in use from acquired() until release(). The repositories lease a connection for
+    // single statements too (BaseRepository.execute), so the counts cover all of their traffic.
+    class PoolStats internal constructor() {
+        private val inUseCount = AtomicInteger()
+        private val waitingCount = AtomicInteger()
+        internal val acquireWait = LatencyHistogram()
+        internal val acquireFailures = LongAdder()
+
+        @Volatile
+        internal var maxSize = 0
+            private set
+
+        @Volatile
+        private var currentSize: () -> Int = { 0 }
+
+        val inUse: Int
+            get() = inUseCount.get()
+
+        val waiting: Int
+            get() = waitingCount.get()
+
+        // Open connections not leased; only a statement sent to the pool outside the repositories, such as the
+        // health check, can be running on one.
+        val idle: Int
+            get() = (currentSize() - inUseCount.get()).coerceAtLeast(0)
+
+        fun lease(): Lease {
+            waitingCount.incrementAndGet()
+            return Lease(this)
+        }
+
+        internal fun describe(maxSize: Int, currentSize: () -> Int) {
+            this.maxSize = maxSize
+            this.currentSize = currentSize
+        }
+
+        internal fun toJson(): JsonObject {
+            return JsonObject()
+                .put("maxSize", maxSize)
+                .put("size", currentSize())
+                .put("inUse", inUse)
+                .put("idle", idle)
+                .put("waiting", waiting)
+                .put("acquireFailures", acquireFailures.sum())
+                .put("acquireWait", acquireWait.snapshot().toJson())
+        }
+
+        class Lease internal constructor(private val stats: PoolStats) {
+            private val startedAt = System.nanoTime()
+            private var state = WAITING
+
+            fun acquired() {
+                if (state == WAITING) {
+                    state = IN_USE
+                    stats.waitingCount.decrementAndGet()
+                    stats.inUseCount.incrementAndGet()
+                    stats.acquireWait.record(System.nanoTime() - startedAt)
+                }
+            }
+
+            fun failed() {
+                if (state == WAITING) {
+                    stats.acquireFailures.increment()
+                }
+            }
+
+            // Safe to call more than once, and before acquired() when the caller gave up waiting.
+            fun release() {
+                when (state) {
+                    WAITING -> stats.waitingCount.decrementAndGet()
+                    IN_USE -> stats.inUseCount.decrementAndGet()
+                }
+                state = RELEASED
+            }
+
+            private companion object {
+                const val WAITING = 0
+                const val IN_USE = 1
+                const val RELEASED = 2
+            }
+        }
+    }
+
+    companion object {
+        const val PRIMARY_POOL = "primary"
+        const val REPLICA_POOL = "replica"
+    }
+}
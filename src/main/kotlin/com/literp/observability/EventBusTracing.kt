@@ -0,0 +1,62 @@
+package com.literp.observability
+
+import io.vertx.core.Future
+import io.vertx.core.eventbus.DeliveryOptions
+import io.vertx.core.eventbus.EventBus
+import io.vertx.core.eventbus.Message
+import io.vertx.core.json.JsonObject
+import io.vertx.serviceproxy.ServiceInterceptor
+
+// Carries a sampled trace across the event bus in proxy mode. The sender copies the current span into two
+// message headers; the service side continues the trace with a span that covers the call until it replies,
+// so repository spans on the service side nest under the HTTP request that caused them.
+object EventBusTracing {
+    const val TRACE_ID_HEADER = "X-Request-ID"
+    const val PARENT_SPAN_HEADER = "X-Parent-Span-ID"
+
+    fun installOutbound(eventBus: EventBus) {
+        eventBus.addOutboundInterceptor<Any> { delivery ->
+            val span = Tracer.current()
+            if (span != null) {
+                delivery.message().headers()
+                    .set(TRACE_ID_HEADER, span.traceId)
+                    .set(PARENT_SPAN_HEADER, span.spanId)
+            }
+            delivery.next()
+        }
+    }
+
+    fun serviceInterceptor(tracer: Tracer): ServiceInterceptor {
+        return ServiceInterceptor { _, _, message ->
+            val traceId = message.headers().get(TRACE_ID_HEADER)
+            val parentSpanId = message.headers().get(PARENT_SPAN_HEADER)
+            if (traceId == null || parentSpanId == null) {
+                Future.succeededFuture(message)
+            } else {
+                val span = tracer.continueTrace(traceId, parentSpanId, "${message.address()} ${message.headers().get("action")}")
+                Future.succeededFuture(TracedMessage(message, span))
+            }
+        }
+    }
+
+    // Ends the service span when the proxy handler answers, whichever way it answers.
+    private class TracedMessage(
+        private val delegate: Message<JsonObject>,
+        private val span: Span
+    ) : Message<JsonObject> by delegate {
+        override fun reply(message: Any?) {
+            span.end(message as? Throwable)
+            delegate.reply(message)
+        }
+
+        override fun reply(message: Any?, options: DeliveryOptions) {
+            span.end(message as? Throwable)
+            delegate.reply(message, options)
+        }
+
+        override fun fail(failureCode: Int, message: String?) {
+            span.end(IllegalStateException(message ?: "failed with code $failureCode"))
+            delegate.fail(failureCode, message)
+        }
+    }
+}
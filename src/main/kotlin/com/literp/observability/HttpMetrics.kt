@@ -1,20 +1,32 @@
 package com.literp.observability
 
 import io.vertx.core.json.JsonObject
+import java.util.concurrent.ConcurrentHashMap
 import java.util.concurrent.atomic.AtomicLong
+import java.util.concurrent.atomic.AtomicReferenceArray
 
+// Request counters plus one latency histogram per route (the OpenAPI operationId, or the route path for
+// plain routes) and status class. Histograms are created on a route's first request in that class; after
+// that, recording looks up existing objects only and does not allocate. The route set is bounded by the
+// router, and capped at MAX_ROUTES in case a caller passes unbounded names.
 class HttpMetrics {
+    private val startedAtNanos = System.nanoTime()
     private val requestCount = AtomicLong()
     private val errorCount = AtomicLong()
     private val databaseFailureCount = AtomicLong()
     private val totalLatencyNanos = AtomicLong()
+    private val overall = LatencyHistogram()
+    private val routes = ConcurrentHashMap<String, RouteHistograms>()
 
-    fun recordRequest(statusCode: Int, durationNanos: Long) {
+    fun recordRequest(route: String, statusCode: Int, durationNanos: Long) {
+        val duration = durationNanos.coerceAtLeast(0L)
         requestCount.incrementAndGet()
-        totalLatencyNanos.addAndGet(durationNanos.coerceAtLeast(0L))
+        totalLatencyNanos.addAndGet(duration)
         if (statusCode >= 400) {
             errorCount.incrementAndGet()
         }
+        overall.record(duration)
+        routeHistograms(route).forStatus(statusCode).record(duration)
     }
 
     fun recordDatabaseFailure() {
@@ -24,11 +36,79 @@ class HttpMetrics {
     fun snapshot(): JsonObject {
         val requests = requestCount.get()
         val latency = totalLatencyNanos.get()
+        val elapsedSeconds = elapsedSeconds()
+        val routeSnapshots = JsonObject()
+        routes.entries.sortedBy { it.key }.forEach { (route, histograms) ->
+            val classes = JsonObject()
+            histograms.snapshots().forEach { (statusClass, snapshot) -> classes.put(statusClass, latencyJson(snapshot, elapsedSeconds)) }
+            routeSnapshots.put(route, classes)
+        }
+
         return JsonObject()
             .put("requestCount", requests)
             .put("errorCount", errorCount.get())
             .put("databaseFailureCount", databaseFailureCount.get())
             .put("totalLatencyNanos", latency)
             .put("averageLatencyNanos", if (requests == 0L) 0L else latency / requests)
+            .put("latency", latencyJson(overall.snapshot(), elapsedSeconds))
+            .put("routes", routeSnapshots)
+    }
+
+    // Prometheus text exposition format 0.0.4. Latency is a summary per route and status class, in seconds.
+    fun prometheus(): String {
+        val text = StringBuilder()
+        PrometheusFormat.counter(text, "literp_http_requests_total", "HTTP requests served.", requestCount.get())
+        PrometheusFormat.counter(text, "literp_http_request_errors_total", "HTTP requests answered with status 400 or above.", errorCount.get())
+        PrometheusFormat.counter(text, "literp_database_failures_total", "Failed database health checks.", databaseFailureCount.get())
+
+        val snapshots = routes.entries.sortedBy { it.key }.flatMap { (route, histograms) ->
+            histograms.snapshots().map { (statusClass, snapshot) ->
+                "${PrometheusFormat.label("route", route)},${PrometheusFormat.label("status", statusClass)}" to snapshot
+            }
+        }
+        PrometheusFormat.summary(text, DURATION_METRIC, "HTTP request latency by route and status class.", snapshots)
+        return text.toString()
+    }
+
+    private fun routeHistograms(route: String): RouteHistograms {
+        routes[route]?.let { return it }
+        val name = if (routes.size >= MAX_ROUTES) OTHER_ROUTE else route
+        return routes.computeIfAbsent(name) { RouteHistograms() }
+    }
+
+    private fun latencyJson(snapshot: LatencyHistogram.Snapshot, elapsedSeconds: Double): JsonObject {
+        return snapshot.toJson().put("averageRequestsPerSecond", rate(snapshot.count, elapsedSeconds))
+    }
+
+    // Averaged since the registry was created, i.e. since startup; use rate() on the Prometheus counters for a
+    // current rate.
+    private fun elapsedSeconds(): Double = (System.nanoTime() - startedAtNanos).coerceAtLeast(1L) / 1_000_000_000.0
+
+    private fun rate(count: Long, elapsedSeconds: Double): Double = Math.round(count / elapsedSeconds * 100) / 100.0
+
+    // One slot per status class (1xx to 5xx, anything else is counted as 5xx), filled on first use.
+    private class RouteHistograms {
+        private val byClass = AtomicReferenceArray<LatencyHistogram>(STATUS_CLASSES.size)
+
+        fun forStatus(statusCode: Int): LatencyHistogram {
+            val slot = (statusCode / 100 - 1).coerceIn(0, STATUS_CLASSES.lastIndex)
+            byClass.get(slot)?.let { return it }
+            byClass.compareAndSet(slot, null, LatencyHistogram())
+            return byClass.get(slot)
+        }
+
+        fun snapshots(): List<Pair<String, LatencyHistogram.Snapshot>> {
+            return STATUS_CLASSES.indices.mapNotNull { slot -> byClass.get(slot)?.let { STATUS_CLASSES[slot] to it.snapshot() } }
+        }
+    }
+
+    companion object {
+        const val PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+        const val UNMATCHED_ROUTE = "unmatched"
+        const val OTHER_ROUTE = "other"
+        const val MAX_ROUTES = 256
+
+        private const val DURATION_METRIC = "literp_http_request_duration_seconds"
+        private val STATUS_CLASSES = listOf("1xx", "2xx", "3xx", "4xx", "5xx")
     }
 }
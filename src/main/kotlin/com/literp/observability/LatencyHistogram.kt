@@ -0,0 +1,106 @@
+package com.literp.observability
+
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.atomic.AtomicLongArray
+import java.util.concurrent.atomic.LongAccumulator
+import java.util.concurrent.atomic.LongAdder
+
+// Lock-free log-linear latency histogram in the style of HdrHistogram. Each power of two is split into
+// SUB_BUCKET_COUNT linear sub-buckets, so any recorded value is reported within about 3% of its true value,
+// and the whole range up to MAX_TRACKABLE_NANOS fits in a fixed array of BUCKET_COUNT counters. Recording is
+// a handful of atomic increments and never allocates; snapshots copy the counters and may be a few records
+// behind concurrent writers.
+class LatencyHistogram {
+    private val buckets = AtomicLongArray(BUCKET_COUNT)
+    private val count = LongAdder()
+    private val sum = LongAdder()
+    private val max = LongAccumulator(Math::max, 0L)
+
+    fun record(valueNanos: Long) {
+        val value = valueNanos.coerceIn(0L, MAX_TRACKABLE_NANOS)
+        buckets.incrementAndGet(bucketIndex(value))
+        count.increment()
+        sum.add(value)
+        max.accumulate(value)
+    }
+
+    fun snapshot(): Snapshot {
+        val counts = LongArray(BUCKET_COUNT) { index -> buckets.get(index) }
+        val total = counts.sum()
+        val maxNanos = max.get()
+        return Snapshot(
+            count = total,
+            sumNanos = sum.sum(),
+            maxNanos = maxNanos,
+            percentileNanos = PERCENTILES.map { percentile -> valueAtPercentile(counts, total, percentile).coerceAtMost(maxNanos) }
+        )
+    }
+
+    // percentileNanos follows the order of PERCENTILES.
+    class Snapshot(
+        val count: Long,
+        val sumNanos: Long,
+        val maxNanos: Long,
+        val percentileNanos: List<Long>
+    ) {
+        val meanNanos: Long
+            get() = if (count == 0L) 0L else sumNanos / count
+
+        fun toJson(): JsonObject {
+            val json = JsonObject()
+                .put("count", count)
+                .put("meanNanos", meanNanos)
+            PERCENTILES.forEachIndexed { index, percentile -> json.put(PERCENTILE_KEYS.getValue(percentile), percentileNanos[index]) }
+            return json.put("maxNanos", maxNanos)
+        }
+    }
+
+    companion object {
+        val PERCENTILES = listOf(50.0, 90.0, 99.0, 99.9)
+
+        private val PERCENTILE_KEYS = mapOf(50.0 to "p50Nanos", 90.0 to "p90Nanos", 99.0 to "p99Nanos", 99.9 to "p999Nanos")
+
+        private const val SUB_BUCKET_BITS = 5
+        private const val SUB_BUCKET_COUNT = 1 shl SUB_BUCKET_BITS
+        private const val MAX_VALUE_BITS = 40
+
+        // About 18 minutes; anything slower is recorded at this value.
+        const val MAX_TRACKABLE_NANOS = (1L shl MAX_VALUE_BITS) - 1
+        const val BUCKET_COUNT = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKET_COUNT
+
+        // Values below SUB_BUCKET_COUNT get a bucket each; above that, a bucket is the top SUB_BUCKET_BITS + 1
+        // bits of the value within its power of two.
+        internal fun bucketIndex(value: Long): Int {
+            if (value < SUB_BUCKET_COUNT) {
+                return value.toInt()
+            }
+            val shift = (63 - java.lang.Long.numberOfLeadingZeros(value)) - SUB_BUCKET_BITS
+            return (shift + 1) * SUB_BUCKET_COUNT + ((value ushr shift).toInt() - SUB_BUCKET_COUNT)
+        }
+
+        // The largest value that lands in the bucket, as HdrHistogram's highestEquivalentValue.
+        internal fun highestValueInBucket(index: Int): Long {
+            if (index < SUB_BUCKET_COUNT) {
+                return index.toLong()
+            }
+            val shift = index / SUB_BUCKET_COUNT - 1
+            val top = (index % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT).toLong()
+            return ((top + 1) shl shift) - 1
+        }
+
+        private fun valueAtPercentile(counts: LongArray, total: Long, percentile: Double): Long {
+            if (total == 0L) {
+                return 0L
+            }
+            val rank = kotlin.math.ceil(percentile / 100.0 * total).toLong().coerceIn(1L, total)
+            var seen = 0L
+            for (index in counts.indices) {
+                seen += counts[index]
+                if (seen >= rank) {
+                    return highestValueInBucket(index)
+                }
+            }
+            return highestValueInBucket(counts.lastIndex)
+        }
+    }
+}
@@ -0,0 +1,50 @@
+package com.literp.observability
+
+import java.util.Locale
+
+// Helpers for the Prometheus text exposition format 0.0.4 shared by the metric registries. Durations are
+// exported in seconds, as Prometheus conventions expect.
+internal object PrometheusFormat {
+
+    fun counter(text: StringBuilder, name: String, help: String, value: Long) {
+        header(text, name, help, "counter")
+        text.append("$name $value\n")
+    }
+
+    // type is counter or gauge; each sample is a rendered label set and its value.
+    fun series(text: StringBuilder, name: String, help: String, type: String, samples: List<Pair<String, Long>>) {
+        header(text, name, help, type)
+        samples.forEach { (labels, value) -> text.append("$name{$labels} $value\n") }
+    }
+
+    // One summary series per label set, followed by a _max gauge, since summaries carry no maximum.
+    fun summary(text: StringBuilder, name: String, help: String, snapshots: List<Pair<String, LatencyHistogram.Snapshot>>) {
+        header(text, name, help, "summary")
+        snapshots.forEach { (labels, snapshot) ->
+            LatencyHistogram.PERCENTILES.forEachIndexed { index, percentile ->
+                val quantile = QUANTILE_LABELS.getValue(percentile)
+                text.append("$name{$labels,quantile=\"$quantile\"} ${seconds(snapshot.percentileNanos[index])}\n")
+            }
+            text.append("${name}_sum{$labels} ${seconds(snapshot.sumNanos)}\n")
+            text.append("${name}_count{$labels} ${snapshot.count}\n")
+        }
+        header(text, "${name}_max", "Slowest observation of $name.", "gauge")
+        snapshots.forEach { (labels, snapshot) ->
+            text.append("${name}_max{$labels} ${seconds(snapshot.maxNanos)}\n")
+        }
+    }
+
+    fun label(name: String, value: String): String {
+        return "$name=\"${value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")}\""
+    }
+
+    private fun header(text: StringBuilder, name: String, help: String, type: String) {
+        text.append("# HELP $name $help\n")
+        text.append("# TYPE $name $type\n")
+    }
+
+    private fun seconds(nanos: Long): String = String.format(Locale.ROOT, "%.9f", nanos / 1_000_000_000.0)
+
+    // Fixed strings rather than percentile / 100, which renders 99.9 as 0.9990000000000001.
+    private val QUANTILE_LABELS = mapOf(50.0 to "0.5", 90.0 to "0.9", 99.0 to "0.99", 99.9 to "0.999")
+}
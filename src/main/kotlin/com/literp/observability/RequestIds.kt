@@ -0,0 +1,19 @@
+package com.literp.observability
+
+import java.util.UUID
+import java.util.concurrent.ThreadLocalRandom
+
+// Version-4 UUIDs drawn from ThreadLocalRandom. UUID.randomUUID() goes through one shared SecureRandom, which
+// is slower and contended across event loops; request and error ids only need to be unique, not unguessable.
+object RequestIds {
+    fun next(): String {
+        val random = ThreadLocalRandom.current()
+        val mostSignificant = (random.nextLong() and VERSION_MASK) or VERSION_4
+        val leastSignificant = (random.nextLong() and VARIANT_MASK) or Long.MIN_VALUE
+        return UUID(mostSignificant, leastSignificant).toString()
+    }
+
+    private const val VERSION_MASK = -0xf001L
+    private const val VERSION_4 = 0x4000L
+    private const val VARIANT_MASK = 0x3fffffffffffffffL
+}
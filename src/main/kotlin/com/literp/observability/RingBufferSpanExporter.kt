@@ -0,0 +1,54 @@
+package com.literp.observability
+
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.atomic.AtomicLong
+import java.util.concurrent.atomic.AtomicReferenceArray
+
+// Keeps the most recent `capacity` spans in memory for GET /debug/traces. Writers claim a slot with one
+// atomic increment and overwrite whatever was there, so exporting never allocates or blocks; readers copy
+// the slots and group them by trace. A trace whose early spans were overwritten shows up partially.
+class RingBufferSpanExporter(val capacity: Int) : SpanExporter {
+    private val slots = AtomicReferenceArray<Span>(capacity)
+    private val next = AtomicLong()
+
+    init {
+        require(capacity > 0) { "capacity must be positive" }
+    }
+
+    override fun export(span: Span) {
+        slots.set((next.getAndIncrement() % capacity).toInt(), span)
+    }
+
+    // Newest traces first (by their latest span to end), each with its spans in start order. traceId narrows
+    // the result to one trace.
+    fun traces(traceId: String? = null, limit: Int = 20): JsonArray {
+        val byTrace = LinkedHashMap<String, MutableList<Span>>()
+        val end = next.get()
+        var index = end - 1
+        while (index >= 0 && index >= end - capacity) {
+            val span = slots.get((index % capacity).toInt())
+            if (span != null && (traceId == null || span.traceId == traceId)) {
+                byTrace.computeIfAbsent(span.traceId) { mutableListOf() }.add(span)
+            }
+            index--
+        }
+
+        val result = JsonArray()
+        byTrace.entries.take(limit)
+            .forEach { (id, spans) -> result.add(traceJson(id, spans.sortedBy { it.startNanos })) }
+        return result
+    }
+
+    private fun traceJson(traceId: String, spans: List<Span>): JsonObject {
+        val root = spans.firstOrNull { it.parentSpanId == null }
+        val spanArray = JsonArray()
+        spans.forEach { spanArray.add(it.toJson()) }
+        return JsonObject()
+            .put("traceId", traceId)
+            .put("name", root?.name)
+            .put("durationNanos", root?.durationNanos)
+            .put("spanCount", spans.size)
+            .put("spans", spanArray)
+    }
+}
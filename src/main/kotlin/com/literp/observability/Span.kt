@@ -0,0 +1,96 @@
+package com.literp.observability
+
+import io.vertx.core.Vertx
+import io.vertx.core.json.JsonObject
+import java.time.Instant
+
+// One timed step of a traced request. The trace id is the request's X-Request-ID, so a trace can be looked
+// up by the id a client already has. Spans only exist for sampled requests; untraced code paths see a null
+// span and skip the work. A span is exported once, when it ends.
+class Span internal constructor(
+    private val exporter: SpanExporter,
+    val traceId: String,
+    val parentSpanId: String?,
+    name: String
+) {
+    val spanId: String = Tracer.newSpanId()
+    private val startedAt = Instant.now()
+    internal val startNanos = System.nanoTime()
+    private var attributes: JsonObject? = null
+    private var previous: Span? = null
+    private var activated = false
+
+    var name: String = name
+        private set
+
+    var durationNanos: Long = -1
+        private set
+
+    var error: String? = null
+        private set
+
+    val ended: Boolean
+        get() = durationNanos >= 0
+
+    fun child(name: String): Span = Span(exporter, traceId, spanId, name)
+
+    fun rename(name: String): Span {
+        this.name = name
+        return this
+    }
+
+    fun attribute(key: String, value: Any?): Span {
+        val values = attributes ?: JsonObject().also { attributes = it }
+        values.put(key, value)
+        return this
+    }
+
+    // Makes this the current span of the calling Vert.x context until it ends, so spans started by code
+    // further down the same request (repositories, statements) become its children.
+    fun activate(): Span {
+        val context = Vertx.currentContext() ?: return this
+        previous = context.getLocal(Tracer.CURRENT_SPAN_KEY)
+        context.putLocal(Tracer.CURRENT_SPAN_KEY, this)
+        activated = true
+        return this
+    }
+
+    // Later calls are ignored, so every exit path of an async step can end its span.
+    fun end(failure: Throwable? = null) {
+        if (ended) {
+            return
+        }
+        durationNanos = System.nanoTime() - startNanos
+        if (failure != null) {
+            error = failure.message ?: failure.javaClass.simpleName
+        }
+        if (activated) {
+            restorePrevious()
+        }
+        exporter.export(this)
+    }
+
+    fun toJson(): JsonObject {
+        return JsonObject()
+            .put("spanId", spanId)
+            .put("parentSpanId", parentSpanId)
+            .put("name", name)
+            .put("startedAt", startedAt.toString())
+            .put("durationNanos", durationNanos)
+            .put("error", error)
+            .put("attributes", attributes ?: JsonObject())
+    }
+
+    private fun restorePrevious() {
+        val context = Vertx.currentContext() ?: return
+        if (context.getLocal<Span>(Tracer.CURRENT_SPAN_KEY) !== this) {
+            return
+        }
+        val parent = previous
+        if (parent == null || parent.ended) {
+            context.removeLocal(Tracer.CURRENT_SPAN_KEY)
+        } else {
+            context.putLocal(Tracer.CURRENT_SPAN_KEY, parent)
+        }
+    }
+}
@@ -0,0 +1,18 @@
+package com.literp.observability
+
+import io.vertx.core.internal.logging.LoggerFactory
+
+// Receives every span as it ends. Implementations run on the request's event loop and must not block.
+fun interface SpanExporter {
+    fun export(span: Span)
+
+    companion object {
+        val NONE = SpanExporter { }
+
+        // One INFO line per span, for shipping traces with the application log.
+        fun logging(): SpanExporter {
+            val logger = LoggerFactory.getLogger("com.literp.tracing")
+            return SpanExporter { span -> logger.info("trace=${span.traceId} ${span.toJson().encode()}") }
+        }
+    }
+}
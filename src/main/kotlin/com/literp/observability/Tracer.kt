@@ -0,0 +1,40 @@
+package com.literp.observability
+
+import io.vertx.core.Vertx
+import java.util.concurrent.ThreadLocalRandom
+
+// Head-based sampling for request traces. startTrace decides once per request; everything below it only
+// looks up the current span on its Vert.x context, which is per request (HTTP requests and event-bus
+// deliveries each run on their own duplicated context), and does nothing when there is none. With a
+// sampleRate of 0 the cost per request is one comparison.
+class Tracer(val exporter: SpanExporter, val sampleRate: Double) {
+
+    fun sampled(): Boolean {
+        return sampleRate > 0.0 && (sampleRate >= 1.0 || ThreadLocalRandom.current().nextDouble() < sampleRate)
+    }
+
+    // Root span of a sampled request, made current on the calling context. Call only after sampled().
+    fun startTrace(traceId: String, name: String): Span {
+        return Span(exporter, traceId, null, name).activate()
+    }
+
+    // Continues a trace that a caller sampled, for example on the far side of the event bus.
+    fun continueTrace(traceId: String, parentSpanId: String, name: String): Span {
+        return Span(exporter, traceId, parentSpanId, name).activate()
+    }
+
+    companion object {
+        internal const val CURRENT_SPAN_KEY = "literp.tracing.currentSpan"
+
+        fun disabled(): Tracer = Tracer(SpanExporter.NONE, 0.0)
+
+        fun current(): Span? {
+            return Vertx.currentContext()?.getLocal(CURRENT_SPAN_KEY)
+        }
+
+        // A child of the current span, or null when the current request is not traced.
+        fun startSpan(name: String): Span? = current()?.child(name)
+
+        internal fun newSpanId(): String = java.lang.Long.toHexString(ThreadLocalRandom.current().nextLong())
+    }
+}
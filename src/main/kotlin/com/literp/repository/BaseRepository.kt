@@ -1,13 +1,32 @@
 package com.literp.repository
 
+import com.literp.db.StatementCatalog
+import com.literp.observability.DatabaseMetrics
+import com.literp.observability.Tracer
+import io.reactivex.rxjava3.core.Flowable
 import io.reactivex.rxjava3.core.Single
+import io.reactivex.rxjava3.core.SingleTransformer
 import io.vertx.core.internal.logging.LoggerFactory
+import io.vertx.core.json.JsonArray
 import io.vertx.core.json.JsonObject
 import io.vertx.pgclient.PgException
 import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Row
+import io.vertx.rxjava3.sqlclient.RowSet
 import io.vertx.rxjava3.sqlclient.SqlConnection
+import io.vertx.rxjava3.sqlclient.Tuple
 
-abstract class BaseRepository(protected val pool: Pool, clazz: Class<*>) {
+// pool is the primary; replicaPool serves read-only queries unless the caller asks for the primary.
+// Every statement is timed under a stable name through timedQuery, and every connection (single statements through
+// execute, transactions, connection scopes, streams) is leased through databaseMetrics so pool wait and saturation
+// are visible.
+// In a sampled request the same points open trace spans: one per statement, pool wait and transaction.
+abstract class BaseRepository(
+    protected val pool: Pool,
+    clazz: Class<*>,
+    private val replicaPool: Pool = pool,
+    private val databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) {
     protected val logger = LoggerFactory.getLogger(clazz)!!
 
     init {
@@ -22,10 +41,202 @@ abstract class BaseRepository(protected val pool: Pool, clazz: Class<*>) {
             )
     }
 
+    // Begins on a leased connection rather than through rxWithTransaction, so the lease measures only the pool
+    // wait and not the BEGIN round trip. A failed commit is rolled back like a failed statement.
     protected fun <T : Any> inTransaction(work: (SqlConnection) -> Single<T>): Single<T> {
-        return pool.rxWithTransaction { connection ->
-            work(connection).toMaybe()
-        }.toSingle()
+        return Single.defer {
+            val span = Tracer.startSpan("db.transaction")?.activate()
+            withConnection(pool) { connection ->
+                connection.rxBegin().flatMap { transaction ->
+                    work(connection)
+                        .flatMap { result -> transaction.rxCommit().toSingleDefault(result) }
+                        .onErrorResumeNext { error -> transaction.rxRollback().onErrorComplete().andThen(Single.error(error)) }
+                }
+            }
+                .doOnSuccess { span?.end() }
+                .doOnError { error -> span?.end(error) }
+                .doOnDispose { span?.end() }
+        }
+    }
+
+    protected fun readPool(readPrimary: Boolean): Pool {
+        return if (readPrimary) pool else replicaPool
+    }
+
+    protected fun <T : Any> withConnection(source: Pool = pool, work: (SqlConnection) -> Single<T>): Single<T> {
+        return Single.defer {
+            val lease = poolStats(source).lease()
+            val acquireSpan = Tracer.startSpan("db.acquire")
+            source.rxWithConnection { connection ->
+                lease.acquired()
+                acquireSpan?.end()
+                work(connection).toMaybe()
+            }.toSingle()
+                .doOnError { error ->
+                    lease.failed()
+                    acquireSpan?.end(error)
+                }
+                .doOnTerminate { lease.release() }
+                .doOnDispose { lease.release() }
+        }
+    }
+
+    // Runs one statement on a connection leased from source, so its pool wait is recorded as acquire time and the
+    // connection counts as in use while it runs, instead of both hiding inside the statement's timing.
+    protected fun execute(source: Pool, name: String, sql: String, params: Tuple = Tuple.tuple()): Single<RowSet<Row>> {
+        return withConnection(source) { connection ->
+            connection.preparedQuery(sql).rxExecute(params).compose(timedQuery(name))
+        }
+    }
+
+    // Times a statement from subscription to result under name, e.g. order.confirm.insertReservations, and
+    // counts the rows it returned or changed across every result of a batch. Compose it onto rxExecute or
+    // rxExecuteBatch; names are built from literals (at most a table name) so the metric set stays bounded.
+    // The same name labels the statement's span when the request is traced.
+    protected fun timedQuery(name: String): SingleTransformer<RowSet<Row>, RowSet<Row>> {
+        return SingleTransformer { execution ->
+            Single.defer {
+                val startedAt = System.nanoTime()
+                val span = Tracer.startSpan(name)
+                execution
+                    .doOnSuccess { result ->
+                        val rows = rowCount(result)
+                        databaseMetrics.recordQuery(name, System.nanoTime() - startedAt, rows, failed = false)
+                        span?.attribute("rows", rows)?.end()
+                    }
+                    .doOnError { error ->
+                        databaseMetrics.recordQuery(name, System.nanoTime() - startedAt, 0L, failed = true)
+                        span?.end(error)
+                    }
+            }
+        }
+    }
+
+    // Streams a long read through a server-side cursor in a read-only transaction, fetching STREAM_FETCH_SIZE rows
+    // at a time as the subscriber requests them, so memory stays flat however many rows match. Cancelling the
+    // subscription closes the connection, which rolls the transaction back and drops the cursor.
+    // Streams are not timed as queries, since their duration is set by how fast the client reads; the export
+    // routes' HTTP latency covers them.
+    protected fun streamRows(query: String, params: Tuple, source: Pool = pool): Flowable<Row> {
+        return Flowable.defer {
+            val lease = poolStats(source).lease()
+            source.rxGetConnection()
+                .doOnSuccess { lease.acquired() }
+                .doOnError { lease.failed() }
+                .flatMapPublisher { connection -> streamOnConnection(connection, query, params) }
+                .doOnTerminate { lease.release() }
+                .doOnCancel { lease.release() }
+        }
+    }
+
+    private fun streamOnConnection(connection: SqlConnection, query: String, params: Tuple): Flowable<Row> {
+        return connection.rxBegin()
+            .flatMap { transaction ->
+                connection.query("SET TRANSACTION READ ONLY").rxExecute()
+                    .flatMap { connection.rxPrepare(query) }
+                    .map { statement -> transaction to statement }
+            }
+            .flatMapPublisher { (transaction, statement) ->
+                statement.createStream(STREAM_FETCH_SIZE, params).toFlowable()
+                    .concatWith(transaction.rxCommit())
+            }
+            .doFinally {
+                connection.rxClose().subscribe({}, { error -> logger.warn("Failed to release streaming connection: ${error.message}") })
+            }
+    }
+
+    // totalMode: exact COUNT(*), the planner's row estimate for the same filter, or no total at all.
+    protected fun countTotal(
+        table: String,
+        whereClause: String,
+        params: List<Any?>,
+        totalMode: String,
+        source: Pool = pool
+    ): Single<Int> {
+        return when (totalMode) {
+            TOTAL_MODE_NONE -> Single.just(UNKNOWN_TOTAL)
+            TOTAL_MODE_ESTIMATED -> {
+                val query = statement("estimate", table, whereClause) { "EXPLAIN (FORMAT JSON) SELECT 1 FROM $table $whereClause" }
+                execute(source, "$table.estimate", query, Tuple.from(params)).map { result ->
+                    val plan = when (val value = result.first().getValue(0)) {
+                        is JsonArray -> value
+                        else -> JsonArray(value.toString())
+                    }
+                    plan.getJsonObject(0).getJsonObject("Plan").getNumber("Plan Rows").toInt()
+                }
+            }
+            else -> {
+                val query = statement("count", table, whereClause) { "SELECT COUNT(*) AS total FROM $table $whereClause" }
+                execute(source, "$table.count", query, Tuple.from(params)).map { result -> result.first().getInteger("total") }
+            }
+        }
+    }
+
+    // The table's table_version counter, bumped by a statement trigger in every transaction that writes the table,
+    // so it changes on each such commit; list ETags are derived from it.
+    protected fun tableVersion(table: String, source: Pool = pool): Single<JsonObject> {
+        return execute(source, "$table.version", "SELECT version FROM table_version WHERE table_name = $1", Tuple.of(table))
+            .map { result ->
+                val version = if (result.size() == 0) 0L else result.first().getLong("version")
+                JsonObject().put("version", version.toString())
+            }
+    }
+
+    // Catalog lookup for SQL whose text varies with sort or filter shape; shape must cover every such input.
+    protected fun statement(name: String, vararg shape: Any, build: () -> String): String {
+        return StatementCatalog.sql(listOf(name, *shape).joinToString(":"), build)
+    }
+
+    // Relevance for q searches: an exact or prefix hit on the first column ranks first, then the best
+    // trigram similarity across the columns, with the primary key as a stable tie-break.
+    protected fun searchOrderClause(params: MutableList<Any?>, search: String, columns: List<String>, idColumn: String): String {
+        params.add(search)
+        val exact = params.size
+        params.add("$search%")
+        val prefix = params.size
+        val similarity = columns.joinToString(", ") { column -> "similarity($column, $$exact)" }
+        val primary = columns.first()
+        return "CASE WHEN lower($primary) = lower($$exact) THEN 0 WHEN $primary ILIKE $$prefix THEN 1 ELSE 2 END, " +
+            "GREATEST($similarity) DESC, $idColumn"
+    }
+
+    // LIMIT/OFFSET are bound after the filter params so paging never changes the statement text.
+    protected fun pageClause(params: MutableList<Any?>, limit: Int, offset: Int): String {
+        params.add(limit.toLong())
+        params.add(offset.toLong())
+        return "LIMIT $${params.size - 1} OFFSET $${params.size}"
+    }
+
+    protected fun paginationInfo(page: Int, size: Int, total: Int, hasNext: Boolean): JsonObject {
+        val pagination = JsonObject()
+            .put("page", page)
+            .put("size", size)
+
+        return if (total == UNKNOWN_TOTAL) {
+            pagination
+                .putNull("totalElements")
+                .putNull("totalPages")
+                .put("hasNext", hasNext)
+        } else {
+            pagination
+                .put("totalElements", total)
+                .put("totalPages", (total + size - 1) / size)
+        }
+    }
+
+    private fun poolStats(source: Pool): DatabaseMetrics.PoolStats {
+        val name = if (source === replicaPool && replicaPool !== pool) DatabaseMetrics.REPLICA_POOL else DatabaseMetrics.PRIMARY_POOL
+        return databaseMetrics.pool(name)
+    }
+
+    private fun rowCount(result: RowSet<Row>): Long {
+        var rows = 0L
+        var current: RowSet<Row>? = result
+        while (current != null) {
+            rows += current.rowCount()
+            current = current.next()
+        }
+        return rows
     }
 
     protected fun isForeignKeyViolation(error: Throwable): Boolean {
@@ -44,7 +255,13 @@ abstract class BaseRepository(protected val pool: Pool, clazz: Class<*>) {
         return if (value.isNullOrBlank()) JsonObject() else JsonObject(value)
     }
 
-    private companion object {
+    protected companion object {
+        const val TOTAL_MODE_ESTIMATED = "estimated"
+        const val TOTAL_MODE_NONE = "none"
+        const val UNKNOWN_TOTAL = -1
+        const val STREAM_FETCH_SIZE = 500
+        const val SEARCH_CURSOR_MESSAGE = "cursor must be omitted when searching with q; page through results instead"
+
         private const val POSTGRES_FOREIGN_KEY_VIOLATION = "23503"
     }
 }
@@ -0,0 +1,192 @@
+package com.literp.repository
+
+import com.literp.observability.DatabaseMetrics
+import io.reactivex.rxjava3.core.Single
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Row
+import io.vertx.rxjava3.sqlclient.SqlConnection
+import io.vertx.rxjava3.sqlclient.Tuple
+import java.time.LocalDateTime
+import java.util.Base64
+
+// Catalog changes for POS terminals: rows whose updated_at moved past the cursor plus tombstones for deletes.
+// Reads always use the primary, since a lagging replica could hand out a cursor past rows it has not seen yet.
+class CatalogSyncRepository(
+    pool: Pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, CatalogSyncRepository::class.java, databaseMetrics = databaseMetrics) {
+
+    fun syncCatalog(since: String?): Single<JsonObject> {
+        val sinceTimestamp = try {
+            since?.trim()?.takeIf { it.isNotEmpty() }?.let(::decodeCursor)
+        } catch (error: Exception) {
+            return Single.error(error)
+        }
+        // Writes stamp updated_at with their transaction start, so one that commits shortly after a sync can
+        // carry a timestamp below the cursor. Re-reading a short window catches it; terminals upsert by id.
+        val changedAfter = sinceTimestamp?.minusSeconds(OVERLAP_SECONDS)
+
+        return withConnection { connection ->
+            connection.preparedQuery("SELECT LOCALTIMESTAMP AS synced_at")
+                .rxExecute()
+                .compose(timedQuery("catalogSync.sync.snapshotTime"))
+                .flatMap { syncedAt ->
+                    val cursor = encodeCursor(syncedAt.first().getLocalDateTime("synced_at"))
+                    changedRows(connection, "unit_of_measure", "uom_id", UOM_COLUMNS, changedAfter, ::uomJson)
+                        .flatMap { uoms ->
+                            changedRows(connection, "product", "product_id", PRODUCT_COLUMNS, changedAfter, ::productJson)
+                                .map { products -> JsonObject().put("unitOfMeasures", uoms).put("products", products) }
+                        }
+                        .flatMap { result ->
+                            changedRows(connection, "product_variant", "variant_id", VARIANT_COLUMNS, changedAfter, ::variantJson)
+                                .map { variants -> result.put("variants", variants) }
+                        }
+                        .flatMap { result ->
+                            changedRows(connection, "location", "location_id", LOCATION_COLUMNS, changedAfter, ::locationJson)
+                                .map { locations -> result.put("locations", locations) }
+                        }
+                        .flatMap { result ->
+                            deletedIds(connection, changedAfter).map { deleted -> result.put("deleted", deleted) }
+                        }
+                        .map { result ->
+                            result
+                                .put("cursor", cursor)
+                                .put("full", changedAfter == null)
+                        }
+                }
+        }
+    }
+
+    private fun changedRows(
+        connection: SqlConnection,
+        table: String,
+        idColumn: String,
+        columns: String,
+        changedAfter: LocalDateTime?,
+        toJson: (Row) -> JsonObject
+    ): Single<JsonArray> {
+        val query = statement("sync", table, changedAfter != null) {
+            val whereClause = if (changedAfter != null) "WHERE updated_at > $1" else ""
+            "SELECT $columns FROM $table $whereClause ORDER BY updated_at, $idColumn"
+        }
+        val params = if (changedAfter != null) Tuple.of(changedAfter) else Tuple.tuple()
+
+        return connection.preparedQuery(query)
+            .rxExecute(params)
+            .compose(timedQuery("catalogSync.sync.$table"))
+            .map { result -> JsonArray(result.map(toJson)) }
+    }
+
+    // A full sync has nothing to delete on the terminal, so tombstones are only read for a delta.
+    private fun deletedIds(connection: SqlConnection, changedAfter: LocalDateTime?): Single<JsonObject> {
+        val deleted = JsonObject()
+        TOMBSTONE_KEYS.values.forEach { key -> deleted.put(key, JsonArray()) }
+        if (changedAfter == null) {
+            return Single.just(deleted)
+        }
+
+        val query = """
+            SELECT entity_type, entity_id
+            FROM catalog_tombstone
+            WHERE deleted_at > $1
+            ORDER BY deleted_at, tombstone_id
+        """.trimIndent()
+
+        return connection.preparedQuery(query)
+            .rxExecute(Tuple.of(changedAfter))
+            .compose(timedQuery("catalogSync.sync.tombstones"))
+            .map { result ->
+                result.forEach { row ->
+                    val key = TOMBSTONE_KEYS[row.getString("entity_type")]
+                    if (key != null) {
+                        deleted.getJsonArray(key).add(row.getString("entity_id"))
+                    }
+                }
+                deleted
+            }
+    }
+
+    private fun uomJson(row: Row): JsonObject {
+        return JsonObject()
+            .put("uomId", row.getString("uom_id"))
+            .put("code", row.getString("code"))
+            .put("name", row.getString("name"))
+            .put("baseUnit", row.getString("base_unit"))
+            .put("createdAt", row.getLocalDateTime("created_at").toString())
+            .put("updatedAt", row.getLocalDateTime("updated_at").toString())
+    }
+
+    private fun productJson(row: Row): JsonObject {
+        return JsonObject()
+            .put("productId", row.getString("product_id"))
+            .put("sku", row.getString("sku"))
+            .put("name", row.getString("name"))
+            .put("productType", row.getString("product_type"))
+            .put("baseUom", row.getString("base_uom"))
+            .put("active", row.getBoolean("active"))
+            .put("metadata", jsonObjectOrEmpty(row.getString("metadata")))
+            .put("createdAt", row.getLocalDateTime("created_at").toString())
+            .put("updatedAt", row.getLocalDateTime("updated_at").toString())
+    }
+
+    private fun variantJson(row: Row): JsonObject {
+        return JsonObject()
+            .put("variantId", row.getString("variant_id"))
+            .put("productId", row.getString("product_id"))
+            .put("sku", row.getString("sku"))
+            .put("name", row.getString("name"))
+            .put("attributes", jsonObjectOrEmpty(row.getString("attributes")))
+            .put("active", row.getBoolean("active"))
+            .put("createdAt", row.getLocalDateTime("created_at").toString())
+            .put("updatedAt", row.getLocalDateTime("updated_at").toString())
+    }
+
+    private fun locationJson(row: Row): JsonObject {
+        return JsonObject()
+            .put("locationId", row.getString("location_id"))
+            .put("code", row.getString("code"))
+            .put("name", row.getString("name"))
+            .put("locationType", row.getString("location_type"))
+            .put("isActive", row.getBoolean("is_active"))
+            .put("address", jsonObjectOrEmpty(row.getString("address")))
+            .put("createdAt", row.getLocalDateTime("created_at").toString())
+            .put("updatedAt", row.getLocalDateTime("updated_at").toString())
+    }
+
+    private fun encodeCursor(syncedAt: LocalDateTime): String {
+        val payload = JsonArray().add(CURSOR_KIND).add(syncedAt.toString()).encode()
+        return Base64.getUrlEncoder().withoutPadding().encodeToString(payload.toByteArray(Charsets.UTF_8))
+    }
+
+    private fun decodeCursor(cursor: String): LocalDateTime {
+        return try {
+            val parts = JsonArray(String(Base64.getUrlDecoder().decode(cursor), Charsets.UTF_8))
+            require(parts.size() == 2 && parts.getValue(0) == CURSOR_KIND)
+            LocalDateTime.parse(parts.getString(1))
+        } catch (error: Exception) {
+            throw Exception(INVALID_SINCE_MESSAGE)
+        }
+    }
+
+    companion object {
+        const val INVALID_SINCE_MESSAGE = "since must be a cursor returned by a previous catalog sync"
+
+        private const val CURSOR_KIND = "sync"
+        private const val OVERLAP_SECONDS = 30L
+
+        private const val UOM_COLUMNS = "uom_id, code, name, base_unit, created_at, updated_at"
+        private const val PRODUCT_COLUMNS = "product_id, sku, name, product_type, base_uom, active, metadata, created_at, updated_at"
+        private const val VARIANT_COLUMNS = "variant_id, product_id, sku, name, attributes, active, created_at, updated_at"
+        private const val LOCATION_COLUMNS = "location_id, code, name, location_type, is_active, address, created_at, updated_at"
+
+        // Tombstone entity_type is the source table name.
+        private val TOMBSTONE_KEYS = mapOf(
+            "unit_of_measure" to "unitOfMeasures",
+            "product" to "products",
+            "product_variant" to "variants",
+            "location" to "locations"
+        )
+    }
+}
@@ -0,0 +1,96 @@
+package com.literp.repository
+
+import com.literp.observability.DatabaseMetrics
+import io.reactivex.rxjava3.core.Flowable
+import io.vertx.core.json.JsonObject
+import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
+import java.time.LocalDateTime
+
+// Full-table reads for warehouse exports. Rows are streamed through a cursor instead of paged, so an export
+// costs one ordered index scan with no OFFSET and no COUNT. Reads go to the replica unless readPrimary is set.
+class ExportRepository(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, ExportRepository::class.java, replicaPool, databaseMetrics) {
+
+    // from is inclusive and to exclusive, both on order_date.
+    fun streamSalesOrders(from: LocalDateTime?, to: LocalDateTime?, readPrimary: Boolean = false): Flowable<JsonObject> {
+        val params = Tuple.tuple()
+        val conditions = mutableListOf<String>()
+        if (from != null) {
+            params.addValue(from)
+            conditions += "order_date >= $${params.size()}"
+        }
+        if (to != null) {
+            params.addValue(to)
+            conditions += "order_date < $${params.size()}"
+        }
+        val whereClause = if (conditions.isEmpty()) "" else "WHERE ${conditions.joinToString(" AND ")}"
+        val query = statement("export.salesOrders", from != null, to != null) {
+            """
+            SELECT sales_order_id, order_number, order_date, sales_channel, customer_id, location_id, status, total_amount, currency, notes, created_at, updated_at
+            FROM sales_order
+            $whereClause
+            ORDER BY order_date, sales_order_id
+            """.trimIndent()
+        }
+
+        return streamRows(query, params, readPool(readPrimary)).map { row ->
+            JsonObject()
+                .put("salesOrderId", row.getString("sales_order_id"))
+                .put("orderNumber", row.getString("order_number"))
+                .put("orderDate", row.getLocalDateTime("order_date")?.toString())
+                .put("salesChannel", row.getString("sales_channel"))
+                .put("customerId", row.getString("customer_id"))
+                .put("locationId", row.getString("location_id"))
+                .put("status", row.getString("status"))
+                .put("totalAmount", row.getBigDecimal("total_amount"))
+                .put("currency", row.getString("currency"))
+                .put("notes", row.getString("notes"))
+                .put("createdAt", row.getLocalDateTime("created_at")?.toString())
+                .put("updatedAt", row.getLocalDateTime("updated_at")?.toString())
+        }
+    }
+
+    // Inactive (soft-deleted) products are included, with active = false.
+    fun streamProducts(readPrimary: Boolean = false): Flowable<JsonObject> {
+        val query = """
+            SELECT product_id, sku, name, product_type, base_uom, active, metadata, created_at, updated_at
+            FROM product
+            ORDER BY sku, product_id
+        """.trimIndent()
+
+        return streamRows(query, Tuple.tuple(), readPool(readPrimary)).map { row ->
+            JsonObject()
+                .put("productId", row.getString("product_id"))
+                .put("sku", row.getString("sku"))
+                .put("name", row.getString("name"))
+                .put("productType", row.getString("product_type"))
+                .put("baseUom", row.getString("base_uom"))
+                .put("active", row.getBoolean("active"))
+                .put("metadata", jsonObjectOrEmpty(row.getString("metadata")))
+                .put("createdAt", row.getLocalDateTime("created_at").toString())
+                .put("updatedAt", row.getLocalDateTime("updated_at").toString())
+        }
+    }
+
+    companion object {
+        val SALES_ORDER_COLUMNS = listOf(
+            "salesOrderId",
+            "orderNumber",
+            "orderDate",
+            "salesChannel",
+            "customerId",
+            "locationId",
+            "status",
+            "totalAmount",
+            "currency",
+            "notes",
+            "createdAt",
+            "updatedAt"
+        )
+        val PRODUCT_COLUMNS = listOf("productId", "sku", "name", "productType", "baseUom", "active", "metadata", "createdAt", "updatedAt")
+    }
+}
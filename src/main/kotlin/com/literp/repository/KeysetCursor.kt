@@ -0,0 +1,84 @@
+package com.literp.repository
+
+import io.vertx.core.json.JsonArray
+import io.vertx.rxjava3.sqlclient.Row
+import java.math.BigDecimal
+import java.time.LocalDateTime
+import java.util.Base64
+
+// Opaque keyset position: the last returned row's sort value plus primary key, bound to its sort.
+class KeysetCursor private constructor(
+    private val sortField: String,
+    private val sortOrder: String,
+    private val sortValue: Any,
+    private val id: String
+) {
+
+    fun encode(): String {
+        val (type, value) = when (sortValue) {
+            is Boolean -> "b" to sortValue.toString()
+            is LocalDateTime -> "t" to sortValue.toString()
+            is BigDecimal -> "n" to sortValue.toPlainString()
+            else -> "s" to sortValue.toString()
+        }
+        val payload = JsonArray().add(sortField).add(sortOrder).add(type).add(value).add(id).encode()
+        return Base64.getUrlEncoder().withoutPadding().encodeToString(payload.toByteArray(Charsets.UTF_8))
+    }
+
+    fun appendPredicate(idColumn: String, whereClause: String, params: MutableList<Any?>): String {
+        val operator = if (sortOrder == "DESC") "<" else ">"
+        val predicate = " AND ($sortField, $idColumn) $operator ($${params.size + 1}, $${params.size + 2})"
+        params.add(sortValue)
+        params.add(id)
+        return whereClause + predicate
+    }
+
+    companion object {
+        const val INVALID_CURSOR_MESSAGE = "cursor must be a nextCursor value returned for the same sort"
+
+        fun decode(cursor: String, sortField: String, sortOrder: String): KeysetCursor {
+            val parts = try {
+                JsonArray(String(Base64.getUrlDecoder().decode(cursor), Charsets.UTF_8))
+            } catch (error: Exception) {
+                throw Exception(INVALID_CURSOR_MESSAGE)
+            }
+
+            if (parts.size() != 5 || parts.getValue(0) != sortField || parts.getValue(1) != sortOrder) {
+                throw Exception(INVALID_CURSOR_MESSAGE)
+            }
+
+            val rawValue = parts.getValue(3) as? String ?: throw Exception(INVALID_CURSOR_MESSAGE)
+            val id = parts.getValue(4) as? String ?: throw Exception(INVALID_CURSOR_MESSAGE)
+            val value: Any = try {
+                when (parts.getValue(2)) {
+                    "b" -> rawValue.toBooleanStrict()
+                    "t" -> LocalDateTime.parse(rawValue)
+                    "n" -> BigDecimal(rawValue)
+                    "s" -> rawValue
+                    else -> throw IllegalArgumentException(rawValue)
+                }
+            } catch (error: Exception) {
+                throw Exception(INVALID_CURSOR_MESSAGE)
+            }
+
+            return KeysetCursor(sortField, sortOrder, value, id)
+        }
+
+        fun decodeOrNull(cursor: String?, sortField: String, sortOrder: String): KeysetCursor? {
+            return cursor?.trim()?.takeIf { it.isNotEmpty() }?.let { decode(it, sortField, sortOrder) }
+        }
+
+        fun nextCursor(rows: List<Row>, size: Int, sortField: String, sortOrder: String, idColumn: String): String? {
+            // Pages are fetched with one extra row; its presence is what makes a next page exist.
+            return if (rows.size > size) fromRow(rows[size - 1], sortField, sortOrder, idColumn).encode() else null
+        }
+
+        fun fromRow(row: Row, sortField: String, sortOrder: String, idColumn: String): KeysetCursor {
+            val value: Any = when (val rawValue = row.getValue(sortField)) {
+                is Number -> row.getBigDecimal(sortField)
+                else -> rawValue
+            }
+            return KeysetCursor(sortField, sortOrder, value, row.getString(idColumn))
+        }
+    }
+}
@@ -1,13 +1,18 @@
 package com.literp.repository
 
 import com.literp.common.ErrorCodes
+import com.literp.observability.DatabaseMetrics
 import io.reactivex.rxjava3.core.Single
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.sqlclient.Pool
 import io.vertx.rxjava3.sqlclient.Tuple
 import java.util.*
 
-class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::class.java) {
+class LocationRepository(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, LocationRepository::class.java, replicaPool, databaseMetrics) {
 
     fun listLocations(
         page: Int,
@@ -16,9 +21,15 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
         code: String?,
         name: String?,
         locationType: String?,
-        activeOnly: Boolean
+        activeOnly: Boolean,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean = false,
+        q: String? = null
     ): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val offset = page * size
+        val search = q?.trim()?.takeIf { it.isNotEmpty() }
         val parts = sort.split(",")
         val rawField = parts.getOrNull(0)?.trim() ?: "code"
         val rawOrder = parts.getOrNull(1)?.trim()?.uppercase() ?: "ASC"
@@ -36,7 +47,7 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
         val sortOrder = if (rawOrder == "ASC" || rawOrder == "DESC") rawOrder else "ASC"
 
         var whereClause = "WHERE true"
-        var params = mutableListOf<Any?>()
+        val params = mutableListOf<Any?>()
 
         if (!code.isNullOrEmpty()) {
             whereClause += " AND code ILIKE $${params.size + 1}"
@@ -57,26 +68,59 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
             whereClause += " AND is_active = true"
         }
 
-        val countQuery = "SELECT COUNT(*) as total FROM location $whereClause"
-        val dataQuery = """
+        if (search != null) {
+            whereClause += " AND (code ILIKE $${params.size + 1} OR name ILIKE $${params.size + 1})"
+            params.add("%$search%")
+        }
+
+        val keysetCursor = try {
+            if (search != null && !cursor.isNullOrBlank()) {
+                throw Exception(SEARCH_CURSOR_MESSAGE)
+            }
+            KeysetCursor.decodeOrNull(cursor, sortField, sortOrder)
+        } catch (error: Exception) {
+            return Single.error(error)
+        }
+        val dataParams = params.toMutableList()
+        val dataWhereClause = keysetCursor?.appendPredicate("location_id", whereClause, dataParams) ?: whereClause
+        val dataOffset = if (keysetCursor == null) offset else 0
+
+        val orderClause = if (search != null) {
+            searchOrderClause(dataParams, search, listOf("code", "name"), "location_id")
+        } else {
+            "$sortField $sortOrder, location_id $sortOrder"
+        }
+        val pageClause = pageClause(dataParams, size + 1, dataOffset)
+        val dataQuery = statement(
+            "location.list",
+            sortField,
+            sortOrder,
+            !code.isNullOrEmpty(),
+            !name.isNullOrEmpty(),
+            !locationType.isNullOrEmpty(),
+            activeOnly,
+            keysetCursor != null,
+            search != null
+        ) {
+            """
             SELECT location_id, code, name, location_type, is_active, address, created_at, updated_at
             FROM location
-            $whereClause
-            ORDER BY $sortField $sortOrder
-            LIMIT $size OFFSET $offset
-        """.trimIndent()
+            $dataWhereClause
+            ORDER BY $orderClause
+            $pageClause
+            """.trimIndent()
+        }
 
         var total = 0
 
-        return pool.preparedQuery(countQuery)
-            .rxExecute(Tuple.from(params))
-            .flatMap { countResult ->
-                total = countResult.first().getInteger("total")
-                pool.preparedQuery(dataQuery)
-                    .rxExecute(Tuple.from(params))
+        return countTotal("location", whereClause, params, totalMode, source)
+            .flatMap { countedTotal ->
+                total = countedTotal
+                execute(source, "location.list", dataQuery, Tuple.from(dataParams))
             }
             .map { result ->
-                val data = result.map { row ->
+                val rows = result.map { it }
+                val data = rows.take(size).map { row ->
                     val address = jsonObjectOrEmpty(row.getString("address"))
 
                     JsonObject()
@@ -94,11 +138,8 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
                     .put("data", data)
                     .put(
                         "pagination",
-                        JsonObject()
-                            .put("page", page)
-                            .put("size", size)
-                            .put("totalElements", total)
-                            .put("totalPages", (total + size - 1) / size)
+                        paginationInfo(page, size, total, rows.size > size)
+                            .put("nextCursor", if (search != null) null else KeysetCursor.nextCursor(rows, size, sortField, sortOrder, "location_id"))
                     )
             }
     }
@@ -116,8 +157,7 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
             VALUES ($1, $2, $3, $4, $5, $6, NOW(), NOW())
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(locationId, code, name, locationType, isActive, address?.encode()))
+        return execute(pool, "location.create", query, Tuple.of(locationId, code, name, locationType, isActive, address?.encode()))
             .map {
                 JsonObject()
                     .put("locationId", locationId)
@@ -129,15 +169,15 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
             }
     }
 
-    fun getLocation(locationId: String): Single<JsonObject> {
+    fun getLocation(locationId: String, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val query = """
             SELECT location_id, code, name, location_type, is_active, address, created_at, updated_at
             FROM location
             WHERE location_id = $1
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(locationId))
+        return execute(source, "location.get", query, Tuple.of(locationId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -159,15 +199,15 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
             }
     }
 
-    fun getLocationByCode(code: String): Single<JsonObject> {
+    fun getLocationByCode(code: String, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val query = """
             SELECT location_id, code, name, location_type, is_active, address, created_at, updated_at
             FROM location
             WHERE code = $1
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(code))
+        return execute(source, "location.getByCode", query, Tuple.of(code))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -203,8 +243,7 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
             RETURNING location_id, code, name, location_type, is_active, address, created_at, updated_at
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(name, locationType, isActive, address?.encode(), locationId))
+        return execute(pool, "location.update", query, Tuple.of(name, locationType, isActive, address?.encode(), locationId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -229,8 +268,7 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
     fun deleteLocation(locationId: String): Single<Unit> {
         val query = "DELETE FROM location WHERE location_id = $1"
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(locationId))
+        return execute(pool, "location.delete", query, Tuple.of(locationId))
             .flatMap { result ->
                 if (result.rowCount() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -247,11 +285,14 @@ class LocationRepository(pool: Pool) : BaseRepository(pool, LocationRepository::
             }
     }
 
+    fun getListVersion(readPrimary: Boolean = false): Single<JsonObject> {
+        return tableVersion("location", readPool(readPrimary))
+    }
+
     fun checkCodeExists(code: String): Single<Boolean> {
         val query = "SELECT COUNT(*) as cnt FROM location WHERE code = $1"
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(code))
+        return execute(pool, "location.codeExists", query, Tuple.of(code))
             .map { result ->
                 result.first().getInteger("cnt") > 0
             }
@@ -1,18 +1,24 @@
 package com.literp.repository
 
 import com.literp.common.ErrorCodes
-import io.reactivex.rxjava3.core.Observable
+import com.literp.observability.DatabaseMetrics
+import io.reactivex.rxjava3.core.Completable
 import io.reactivex.rxjava3.core.Single
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.sqlclient.Pool
 import io.vertx.rxjava3.sqlclient.Row
+import io.vertx.rxjava3.sqlclient.RowSet
 import io.vertx.rxjava3.sqlclient.SqlConnection
 import io.vertx.rxjava3.sqlclient.Tuple
 import java.math.BigDecimal
 import java.time.LocalDateTime
 import java.util.*
 
-class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepository::class.java) {
+class OrderProcessRepository(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, OrderProcessRepository::class.java, replicaPool, databaseMetrics) {
 
     fun listSalesOrders(
         page: Int,
@@ -20,8 +26,12 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
         sort: String,
         status: String?,
         salesChannel: String?,
-        locationId: String?
+        locationId: String?,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean = false
     ): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val offset = page * size
         val parts = sort.split(",")
         val rawField = parts.getOrNull(0)?.trim() ?: "orderDate"
@@ -55,34 +65,50 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
             params.add(locationId)
         }
 
-        val countQuery = "SELECT COUNT(*) AS total FROM sales_order $whereClause"
-        val dataQuery = """
+        val keysetCursor = try {
+            KeysetCursor.decodeOrNull(cursor, sortField, sortOrder)
+        } catch (error: Exception) {
+            return Single.error(error)
+        }
+        val dataParams = params.toMutableList()
+        val dataWhereClause = keysetCursor?.appendPredicate("sales_order_id", whereClause, dataParams) ?: whereClause
+        val dataOffset = if (keysetCursor == null) offset else 0
+
+        val pageClause = pageClause(dataParams, size + 1, dataOffset)
+        val dataQuery = statement(
+            "salesOrder.list",
+            sortField,
+            sortOrder,
+            !status.isNullOrBlank(),
+            !salesChannel.isNullOrBlank(),
+            !locationId.isNullOrBlank(),
+            keysetCursor != null
+        ) {
+            """
             SELECT sales_order_id, order_number, order_date, sales_channel, customer_id, location_id, status, total_amount, currency, notes, created_at, updated_at
             FROM sales_order
-            $whereClause
-            ORDER BY $sortField $sortOrder
-            LIMIT $size OFFSET $offset
-        """.trimIndent()
+            $dataWhereClause
+            ORDER BY $sortField $sortOrder, sales_order_id $sortOrder
+            $pageClause
+            """.trimIndent()
+        }
 
         var total = 0
 
-        return pool.preparedQuery(countQuery)
-            .rxExecute(Tuple.from(params))
-            .flatMap { countResult ->
-                total = countResult.first().getInteger("total")
-                pool.preparedQuery(dataQuery).rxExecute(Tuple.from(params))
+        return countTotal("sales_order", whereClause, params, totalMode, source)
+            .flatMap { countedTotal ->
+                total = countedTotal
+                execute(source, "order.list", dataQuery, Tuple.from(dataParams))
             }
             .map { result ->
-                val data = result.map { row -> mapSalesOrderRow(row) }
+                val rows = result.map { it }
+                val data = rows.take(size).map { row -> mapSalesOrderRow(row) }
                 JsonObject()
                     .put("data", data)
                     .put(
                         "pagination",
-                        JsonObject()
-                            .put("page", page)
-                            .put("size", size)
-                            .put("totalElements", total)
-                            .put("totalPages", (total + size - 1) / size)
+                        paginationInfo(page, size, total, rows.size > size)
+                            .put("nextCursor", KeysetCursor.nextCursor(rows, size, sortField, sortOrder, "sales_order_id"))
                     )
             }
     }
@@ -102,22 +128,22 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
         """.trimIndent()
 
         return generateOrderNumber().flatMap { orderNumber ->
-            pool.preparedQuery(query)
-                .rxExecute(
-                    Tuple.tuple()
-                        .addString(orderId)
-                        .addString(orderNumber)
-                        .addString(salesChannel.uppercase())
-                        .addValue(customerId)
-                        .addString(locationId)
-                        .addString(currency.uppercase())
-                        .addValue(notes)
-                )
+            execute(pool, "order.createDraft.insertOrder", query,
+                Tuple.tuple()
+                    .addString(orderId)
+                    .addString(orderNumber)
+                    .addString(salesChannel.uppercase())
+                    .addValue(customerId)
+                    .addString(locationId)
+                    .addString(currency.uppercase())
+                    .addValue(notes)
+            )
                 .map { result -> mapSalesOrderRow(result.first()) }
         }
     }
 
-    fun getSalesOrder(orderId: String): Single<JsonObject> {
+    fun getSalesOrder(orderId: String, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val orderQuery = """
             SELECT sales_order_id, order_number, order_date, sales_channel, customer_id, location_id, status, total_amount, currency, notes, created_at, updated_at
             FROM sales_order
@@ -142,90 +168,149 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
             ORDER BY created_at ASC
         """.trimIndent()
 
-        return pool.preparedQuery(orderQuery)
-            .rxExecute(Tuple.of(orderId))
-            .flatMap { orderResult ->
+        // All four queries are written to one connection before any reply is read, so the
+        // client pipelines them and the order is answered in a single database round trip.
+        return withConnection(source) { connection ->
+            Single.zip(
+                connection.preparedQuery(orderQuery).rxExecute(Tuple.of(orderId))
+                    .compose(timedQuery("order.get.order")),
+                connection.preparedQuery(linesQuery).rxExecute(Tuple.of(orderId))
+                    .compose(timedQuery("order.get.lines")),
+                connection.preparedQuery(reservationsQuery).rxExecute(Tuple.of(orderId))
+                    .compose(timedQuery("order.get.reservations")),
+                connection.preparedQuery(paymentsQuery).rxExecute(Tuple.of(orderId))
+                    .compose(timedQuery("order.get.payments"))
+            ) { orderResult, linesResult, reservationResult, paymentResult ->
                 if (orderResult.size() == 0) {
-                    Single.error(Exception(ErrorCodes.fromStatus(404)))
-                } else {
-                    val order = mapSalesOrderRow(orderResult.first())
-                    pool.preparedQuery(linesQuery)
-                        .rxExecute(Tuple.of(orderId))
-                        .flatMap { linesResult ->
-                            val lines = linesResult.map { row -> mapSalesOrderLineRow(row) }
-                            pool.preparedQuery(reservationsQuery)
-                                .rxExecute(Tuple.of(orderId))
-                                .flatMap { reservationResult ->
-                                    val reservations = reservationResult.map { row -> mapReservationRow(row) }
-                                    pool.preparedQuery(paymentsQuery)
-                                        .rxExecute(Tuple.of(orderId))
-                                        .map { paymentResult ->
-                                            val payments = paymentResult.map { row -> mapPaymentRow(row) }
-                                            order
-                                                .put("lines", lines)
-                                                .put("reservations", reservations)
-                                                .put("payments", payments)
-                                        }
-                                }
-                        }
+                    throw Exception(ErrorCodes.fromStatus(404))
                 }
+                mapSalesOrderRow(orderResult.first())
+                    .put("lines", linesResult.map { row -> mapSalesOrderLineRow(row) })
+                    .put("reservations", reservationResult.map { row -> mapReservationRow(row) })
+                    .put("payments", paymentResult.map { row -> mapPaymentRow(row) })
             }
+        }
     }
 
-    fun getCurrentStock(productId: String, locationId: String): Single<JsonObject> {
+    fun getCurrentStock(productId: String, locationId: String, readPrimary: Boolean = false): Single<JsonObject> {
         if (productId.isBlank() || locationId.isBlank()) {
             return Single.error(Exception("productId and locationId are required"))
         }
 
+        val source = readPool(readPrimary)
+
         val query = """
-            SELECT COALESCE(SUM(
-                CASE
-                    WHEN movement_type IN ('IN', 'ADJUSTMENT') AND to_location_id = $2 THEN quantity
-                    WHEN movement_type = 'TRANSFER' AND to_location_id = $2 THEN quantity
-                    WHEN movement_type = 'TRANSFER' AND from_location_id = $2 THEN -quantity
-                    WHEN movement_type = 'OUT' AND from_location_id = $2 THEN -quantity
-                    ELSE 0
-                END
-            ), 0) AS quantity
-            FROM inventory_movement
-            WHERE product_id = $1 AND (to_location_id = $2 OR from_location_id = $2)
+            SELECT on_hand_quantity AS quantity
+            FROM inventory_balance
+            WHERE product_id = $1 AND location_id = $2
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(productId, locationId))
-            .map { result -> stockQuantity(productId, locationId, result.first().getBigDecimal("quantity"), "CURRENT") }
+        return execute(source, "order.stock.current", query, Tuple.of(productId, locationId))
+            .map { result -> stockQuantity(productId, locationId, balanceQuantity(result), "CURRENT") }
     }
 
-    fun getAvailableStock(productId: String, locationId: String): Single<JsonObject> {
+    fun getAvailableStock(productId: String, locationId: String, readPrimary: Boolean = false): Single<JsonObject> {
         if (productId.isBlank() || locationId.isBlank()) {
             return Single.error(Exception("productId and locationId are required"))
         }
 
+        val source = readPool(readPrimary)
+
         val query = """
-            WITH current_stock AS (
-                SELECT COALESCE(SUM(
-                    CASE
-                        WHEN movement_type IN ('IN', 'ADJUSTMENT') AND to_location_id = $2 THEN quantity
-                        WHEN movement_type = 'TRANSFER' AND to_location_id = $2 THEN quantity
-                        WHEN movement_type = 'TRANSFER' AND from_location_id = $2 THEN -quantity
-                        WHEN movement_type = 'OUT' AND from_location_id = $2 THEN -quantity
-                        ELSE 0
-                    END
-                ), 0) AS quantity
-                FROM inventory_movement
-                WHERE product_id = $1 AND (to_location_id = $2 OR from_location_id = $2)
-            ), active_reservations AS (
-                SELECT COALESCE(SUM(quantity), 0) AS quantity
-                FROM inventory_reservation
-                WHERE product_id = $1 AND location_id = $2 AND status = 'RESERVED'
-            )
-            SELECT current_stock.quantity - active_reservations.quantity AS quantity
-            FROM current_stock, active_reservations
+            SELECT on_hand_quantity - reserved_quantity AS quantity
+            FROM inventory_balance
+            WHERE product_id = $1 AND location_id = $2
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(productId, locationId))
-            .map { result -> stockQuantity(productId, locationId, result.first().getBigDecimal("quantity"), "AVAILABLE") }
+        return execute(source, "order.stock.available", query, Tuple.of(productId, locationId))
+            .map { result -> stockQuantity(productId, locationId, balanceQuantity(result), "AVAILABLE") }
+    }
+
+    // The movement ledger for one product at one location, oldest first, with the on-hand balance after each
+    // movement. Signs follow the inventory_balance trigger: IN, ADJUSTMENT and TRANSFER add at to_location_id,
+    // TRANSFER and OUT subtract at from_location_id. The balance is an opening SUM of every movement before the
+    // page start (from or cursor) plus a running sum over the page rows, so no page windows the whole ledger; both
+    // parts use the index-only ledger scans, and only the page rows are joined back for their details.
+    fun listInventoryMovements(
+        productId: String,
+        locationId: String,
+        from: LocalDateTime?,
+        to: LocalDateTime?,
+        size: Int,
+        cursor: String?,
+        readPrimary: Boolean = false
+    ): Single<JsonObject> {
+        if (productId.isBlank() || locationId.isBlank()) {
+            return Single.error(Exception("productId and locationId are required"))
+        }
+
+        val keysetCursor = try {
+            KeysetCursor.decodeOrNull(cursor, "created_at", "ASC")
+        } catch (error: Exception) {
+            return Single.error(error)
+        }
+
+        val params = mutableListOf<Any?>(productId, locationId)
+        var pageBound = ""
+        val openingBounds = mutableListOf<String>()
+        if (to != null) {
+            params.add(to)
+            pageBound += " AND created_at < $${params.size}"
+        }
+        if (from != null) {
+            params.add(from)
+            pageBound += " AND created_at >= $${params.size}"
+            openingBounds.add("created_at < $${params.size}")
+        }
+        if (keysetCursor != null) {
+            pageBound += keysetCursor.appendPredicate("movement_id", "", params)
+            openingBounds.add("(created_at, movement_id) <= ($${params.size - 1}, $${params.size})")
+        }
+        val pageClause = pageClause(params, size + 1, 0)
+
+        val opening = if (openingBounds.isEmpty()) {
+            "0"
+        } else {
+            "(SELECT COALESCE(SUM(change), 0) FROM (${ledgerEntries(" AND (${openingBounds.joinToString(" OR ")})")}) before_page)"
+        }
+        val query = statement("inventoryMovement.ledger", to != null, from != null, keysetCursor != null) {
+            """
+            SELECT page.movement_id, page.created_at, page.change,
+                   $opening + SUM(page.change) OVER (ORDER BY page.created_at, page.movement_id ROWS UNBOUNDED PRECEDING) AS balance,
+                   m.movement_type, m.reference_type, m.reference_id, m.from_location_id, m.to_location_id,
+                   m.quantity, m.notes, m.created_by
+            FROM (
+                SELECT movement_id, created_at, change
+                FROM (${ledgerEntries(pageBound)}) entries
+                ORDER BY created_at, movement_id
+                $pageClause
+            ) page
+            JOIN inventory_movement m ON m.movement_id = page.movement_id
+            ORDER BY page.created_at, page.movement_id
+            """.trimIndent()
+        }
+
+        return execute(readPool(readPrimary), "order.movements.ledger", query, Tuple.from(params))
+            .map { result ->
+                val rows = result.map { it }
+                JsonObject()
+                    .put("data", rows.take(size).map { row -> mapInventoryMovementRow(row) })
+                    .put(
+                        "pagination",
+                        paginationInfo(0, size, UNKNOWN_TOTAL, rows.size > size)
+                            .put("nextCursor", KeysetCursor.nextCursor(rows, size, "created_at", "ASC", "movement_id"))
+                    )
+            }
+    }
+
+    // Signed ledger entries for product $1 at location $2; bound is appended to both directions so it can use
+    // their (product_id, location, created_at, movement_id) indexes.
+    private fun ledgerEntries(bound: String): String {
+        return "SELECT movement_id, created_at, quantity AS change FROM inventory_movement " +
+            "WHERE product_id = $1 AND to_location_id = $2 AND movement_type IN ('IN', 'ADJUSTMENT', 'TRANSFER')$bound " +
+            "UNION ALL " +
+            "SELECT movement_id, created_at, -quantity FROM inventory_movement " +
+            "WHERE product_id = $1 AND from_location_id = $2 AND movement_type IN ('TRANSFER', 'OUT')$bound"
     }
 
     private fun stockQuantity(productId: String, locationId: String, quantity: BigDecimal, quantityType: String): JsonObject {
@@ -236,32 +321,9 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
             .put("quantityType", quantityType)
     }
 
-    private fun getAvailableStockQuantity(connection: SqlConnection, productId: String, locationId: String): Single<BigDecimal> {
-        val query = """
-            WITH current_stock AS (
-                SELECT COALESCE(SUM(
-                    CASE
-                        WHEN movement_type IN ('IN', 'ADJUSTMENT') AND to_location_id = $2 THEN quantity
-                        WHEN movement_type = 'TRANSFER' AND to_location_id = $2 THEN quantity
-                        WHEN movement_type = 'TRANSFER' AND from_location_id = $2 THEN -quantity
-                        WHEN movement_type = 'OUT' AND from_location_id = $2 THEN -quantity
-                        ELSE 0
-                    END
-                ), 0) AS quantity
-                FROM inventory_movement
-                WHERE product_id = $1 AND (to_location_id = $2 OR from_location_id = $2)
-            ), active_reservations AS (
-                SELECT COALESCE(SUM(quantity), 0) AS quantity
-                FROM inventory_reservation
-                WHERE product_id = $1 AND location_id = $2 AND status = 'RESERVED'
-            )
-            SELECT current_stock.quantity - active_reservations.quantity AS quantity
-            FROM current_stock, active_reservations
-        """.trimIndent()
-
-        return connection.preparedQuery(query)
-            .rxExecute(Tuple.of(productId, locationId))
-            .map { result -> result.first().getBigDecimal("quantity") }
+    private fun balanceQuantity(result: RowSet<Row>): BigDecimal {
+        // A missing balance row means the product never had stock movements at the location.
+        return if (result.size() == 0) BigDecimal.ZERO else result.first().getBigDecimal("quantity")
     }
 
     fun addSalesOrderLine(
@@ -291,6 +353,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
         return inTransaction { connection ->
             connection.preparedQuery(orderQuery)
                 .rxExecute(Tuple.of(orderId))
+                .compose(timedQuery("order.addLine.lockOrder"))
                 .flatMap { orderResult ->
                     if (orderResult.size() == 0) {
                         Single.error(Exception("Sales order not found"))
@@ -301,6 +364,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                         } else {
                             connection.preparedQuery(productQuery)
                                 .rxExecute(Tuple.of(productId))
+                                .compose(timedQuery("order.addLine.selectProduct"))
                                 .flatMap { productResult ->
                                     if (productResult.size() == 0) {
                                         Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -319,9 +383,11 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                                     .addValue(unitPrice)
                                                     .addValue(lineTotal)
                                             )
+                                            .compose(timedQuery("order.addLine.insertLine"))
                                             .flatMap { insertedLine ->
                                                 connection.preparedQuery(recalcTotalQuery)
                                                     .rxExecute(Tuple.of(orderId))
+                                                    .compose(timedQuery("order.addLine.recalculateTotal"))
                                                     .map { mapSalesOrderLineRow(insertedLine.first()) }
                                             }
                                     }
@@ -336,20 +402,29 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
         val idempotencyKeyValue = idempotencyKey.trim()
         val commandName = "confirmSalesOrder"
         val requestFingerprint = commandName
-        val orderQuery = "SELECT sales_order_id, status, location_id FROM sales_order WHERE sales_order_id = $1"
-        val linesQuery = """
-            SELECT line_id, product_id, sku, quantity_ordered, quantity_fulfilled
-            FROM sales_order_line
-            WHERE sales_order_id = $1
+        val orderQuery = "SELECT sales_order_id, status, location_id FROM sales_order WHERE sales_order_id = $1 FOR UPDATE"
+        val availabilityQuery = """
+            SELECT
+                l.product_id,
+                COUNT(*) AS line_count,
+                SUM(GREATEST(l.quantity_ordered - l.quantity_fulfilled, 0)) AS requested_quantity,
+                COALESCE(MAX(b.on_hand_quantity - b.reserved_quantity), 0) AS available_quantity
+            FROM sales_order_line l
+            LEFT JOIN inventory_balance b ON b.product_id = l.product_id AND b.location_id = $2
+            WHERE l.sales_order_id = $1
+            GROUP BY l.product_id
+            ORDER BY l.product_id
         """.trimIndent()
-        val insertReservationQuery = """
+        val insertReservationsQuery = """
             INSERT INTO inventory_reservation (reservation_id, sales_order_id, sales_order_line_id, product_id, sku, location_id, quantity, status, created_at, updated_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, 'RESERVED', NOW(), NOW())
+            SELECT gen_random_uuid()::text, l.sales_order_id, l.line_id, l.product_id, l.sku, $2, l.quantity_ordered - l.quantity_fulfilled, 'RESERVED', NOW(), NOW()
+            FROM sales_order_line l
+            WHERE l.sales_order_id = $1 AND l.quantity_ordered > l.quantity_fulfilled
         """.trimIndent()
         val updateLineStatusQuery = """
             UPDATE sales_order_line
             SET status = 'RESERVED', updated_at = NOW()
-            WHERE line_id = $1 AND status = 'PENDING'
+            WHERE sales_order_id = $1 AND status = 'PENDING'
         """.trimIndent()
         val updateOrderQuery = """
             UPDATE sales_order
@@ -368,6 +443,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                         Single.just(storedResponse)
                     } ?: connection.preparedQuery(orderQuery)
                         .rxExecute(Tuple.of(orderId))
+                        .compose(timedQuery("order.confirm.lockOrder"))
                         .flatMap { orderResult ->
                             if (orderResult.size() == 0) {
                                 Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -378,55 +454,41 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                 if (orderStatus != "DRAFT") {
                                     Single.error(Exception("Only DRAFT orders can be confirmed"))
                                 } else {
-                                    connection.preparedQuery(linesQuery)
-                                        .rxExecute(Tuple.of(orderId))
-                                        .flatMap { lineResult ->
-                                            if (lineResult.size() == 0) {
+                                    lockInventoryBalances(connection, orderId, locationId)
+                                        .andThen(
+                                            connection.preparedQuery(availabilityQuery)
+                                                .rxExecute(Tuple.of(orderId, locationId))
+                                                .compose(timedQuery("order.confirm.checkAvailability"))
+                                        )
+                                        .flatMap { availabilityResult ->
+                                            val lineCount = availabilityResult.sumOf { it.getLong("line_count") }
+                                            // Lines of the same product are checked together, matching the
+                                            // former per-line check that saw earlier lines' reservations.
+                                            val insufficient = availabilityResult.firstOrNull { product ->
+                                                val requestedQty = product.getBigDecimal("requested_quantity")
+                                                requestedQty > BigDecimal.ZERO && product.getBigDecimal("available_quantity") < requestedQty
+                                            }
+                                            if (lineCount == 0L) {
                                                 Single.error(Exception("Cannot confirm order without lines"))
+                                            } else if (insufficient != null) {
+                                                Single.error(
+                                                    Exception("Insufficient available stock for product ${insufficient.getString("product_id")} at location $locationId")
+                                                )
                                             } else {
-                                                val lines = lineResult.map { it }
-                                                Observable.fromIterable(lines)
-                                                    .concatMapCompletable { line ->
-                                                        val quantityOrdered = line.getBigDecimal("quantity_ordered")
-                                                        val quantityFulfilled = line.getBigDecimal("quantity_fulfilled")
-                                                        val reserveQty = quantityOrdered.subtract(quantityFulfilled)
-                                                        if (reserveQty <= BigDecimal.ZERO) {
-                                                            connection.preparedQuery(updateLineStatusQuery)
-                                                                .rxExecute(Tuple.of(line.getString("line_id")))
-                                                                .ignoreElement()
-                                                        } else {
-                                                            val productId = line.getString("product_id")
-                                                            getAvailableStockQuantity(connection, productId, locationId)
-                                                                .flatMapCompletable { availableQty ->
-                                                                    if (availableQty < reserveQty) {
-                                                                        io.reactivex.rxjava3.core.Completable.error(
-                                                                            Exception("Insufficient available stock for product $productId at location $locationId")
-                                                                        )
-                                                                    } else {
-                                                                        connection.preparedQuery(insertReservationQuery)
-                                                                            .rxExecute(
-                                                                                Tuple.tuple()
-                                                                                    .addString(UUID.randomUUID().toString())
-                                                                                    .addString(orderId)
-                                                                                    .addString(line.getString("line_id"))
-                                                                                    .addString(productId)
-                                                                                    .addString(line.getString("sku"))
-                                                                                    .addString(locationId)
-                                                                                    .addValue(reserveQty)
-                                                                            )
-                                                                            .ignoreElement()
-                                                                            .andThen(
-                                                                                connection.preparedQuery(updateLineStatusQuery)
-                                                                                    .rxExecute(Tuple.of(line.getString("line_id")))
-                                                                                    .ignoreElement()
-                                                                            )
-                                                                    }
-                                                                }
-                                                        }
-                                                    }
+                                                connection.preparedQuery(insertReservationsQuery)
+                                                    .rxExecute(Tuple.of(orderId, locationId))
+                                                    .compose(timedQuery("order.confirm.insertReservations"))
+                                                    .ignoreElement()
+                                                    .andThen(
+                                                        connection.preparedQuery(updateLineStatusQuery)
+                                                            .rxExecute(Tuple.of(orderId))
+                                                            .compose(timedQuery("order.confirm.updateLineStatus"))
+                                                            .ignoreElement()
+                                                    )
                                                     .andThen(
                                                         connection.preparedQuery(updateOrderQuery)
                                                             .rxExecute(Tuple.of(orderId))
+                                                            .compose(timedQuery("order.confirm.updateOrder"))
                                                             .ignoreElement()
                                                     )
                                                     .andThen(
@@ -447,7 +509,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                                             val response = JsonObject()
                                                                 .put("salesOrderId", orderId)
                                                                 .put("status", "CONFIRMED")
-                                                                .put("reservedLineCount", lineResult.size())
+                                                                .put("reservedLineCount", lineCount.toInt())
                                                             storeCommandIdempotency(
                                                                 connection,
                                                                 orderId,
@@ -514,6 +576,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                         Single.just(storedResponse)
                     } ?: connection.preparedQuery(orderQuery)
                         .rxExecute(Tuple.of(orderId))
+                        .compose(timedQuery("order.capturePayment.lockOrder"))
                         .flatMap { orderResult ->
                             if (orderResult.size() == 0) {
                                 Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -534,9 +597,11 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                                 normalizedTransactionRef
                                             )
                                         )
+                                        .compose(timedQuery("order.capturePayment.insertPayment"))
                                         .flatMap { paymentInsertResult ->
                                             connection.preparedQuery(capturedTotalQuery)
                                                 .rxExecute(Tuple.of(orderId))
+                                                .compose(timedQuery("order.capturePayment.capturedTotal"))
                                                 .flatMap { capturedResult ->
                                                     val totalCaptured = capturedResult.first().getBigDecimal("total_captured")
                                                     val response = JsonObject()
@@ -572,6 +637,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
             SELECT sales_order_id, status, location_id, total_amount
             FROM sales_order
             WHERE sales_order_id = $1
+            FOR UPDATE
         """.trimIndent()
         val capturedTotalQuery = """
             SELECT COALESCE(SUM(amount), 0) AS total_captured
@@ -587,15 +653,15 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
             INSERT INTO inventory_movement (movement_id, product_id, sku, movement_type, from_location_id, to_location_id, quantity, reference_type, reference_id, notes, created_by, created_at)
             VALUES ($1, $2, $3, 'OUT', $4, $5, $6, 'SALES_ORDER', $7, $8, $9, NOW())
         """.trimIndent()
-        val updateLineQuery = """
+        val updateLinesQuery = """
             UPDATE sales_order_line
             SET quantity_fulfilled = quantity_ordered, status = 'FULFILLED', updated_at = NOW()
-            WHERE line_id = $1
+            WHERE line_id = ANY($1)
         """.trimIndent()
-        val fulfillReservationQuery = """
+        val fulfillReservationsQuery = """
             UPDATE inventory_reservation
             SET status = 'FULFILLED', updated_at = NOW()
-            WHERE sales_order_line_id = $1 AND status = 'RESERVED'
+            WHERE sales_order_line_id = ANY($1) AND status = 'RESERVED'
         """.trimIndent()
         val updateOrderQuery = """
             UPDATE sales_order
@@ -614,6 +680,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                         Single.just(storedResponse)
                     } ?: connection.preparedQuery(orderQuery)
                         .rxExecute(Tuple.of(orderId))
+                        .compose(timedQuery("order.fulfill.lockOrder"))
                         .flatMap { orderResult ->
                             if (orderResult.size() == 0) {
                                 Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -628,6 +695,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                 } else {
                                     connection.preparedQuery(capturedTotalQuery)
                                         .rxExecute(Tuple.of(orderId))
+                                        .compose(timedQuery("order.fulfill.capturedTotal"))
                                         .flatMap { capturedResult ->
                                             val totalCaptured = capturedResult.first().getBigDecimal("total_captured")
                                             if (totalCaptured < totalAmount) {
@@ -635,50 +703,54 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                             } else {
                                                 connection.preparedQuery(linesQuery)
                                                     .rxExecute(Tuple.of(orderId))
+                                                    .compose(timedQuery("order.fulfill.selectLines"))
                                                     .flatMap { linesResult ->
                                                         if (linesResult.size() == 0) {
                                                             Single.error(Exception("No fulfillable order lines found"))
                                                         } else {
                                                             val lines = linesResult.map { it }
-                                                            Observable.fromIterable(lines)
-                                                                .concatMapCompletable { line ->
-                                                                    val ordered = line.getBigDecimal("quantity_ordered")
-                                                                    val fulfilled = line.getBigDecimal("quantity_fulfilled")
-                                                                    val remaining = ordered.subtract(fulfilled)
-                                                                    if (remaining <= BigDecimal.ZERO) {
-                                                                        connection.preparedQuery(updateLineQuery)
-                                                                            .rxExecute(Tuple.of(line.getString("line_id")))
-                                                                            .ignoreElement()
-                                                                    } else {
-                                                                        connection.preparedQuery(movementInsertQuery)
-                                                                            .rxExecute(
-                                                                                Tuple.tuple()
-                                                                                    .addString(UUID.randomUUID().toString())
-                                                                                    .addString(line.getString("product_id"))
-                                                                                    .addString(line.getString("sku"))
-                                                                                    .addString(locationId)
-                                                                                    .addValue(null)
-                                                                                    .addValue(remaining)
-                                                                                    .addString(orderId)
-                                                                                    .addValue(notesValue)
-                                                                                    .addValue(createdByValue)
-                                                                            )
-                                                                            .ignoreElement()
-                                                                            .andThen(
-                                                                                connection.preparedQuery(updateLineQuery)
-                                                                                    .rxExecute(Tuple.of(line.getString("line_id")))
-                                                                                    .ignoreElement()
-                                                                            )
-                                                                            .andThen(
-                                                                                connection.preparedQuery(fulfillReservationQuery)
-                                                                                    .rxExecute(Tuple.of(line.getString("line_id")))
-                                                                                    .ignoreElement()
-                                                                            )
-                                                                    }
-                                                                }
+                                                            val fulfillableLines = lines.filter { line ->
+                                                                line.getBigDecimal("quantity_ordered") > line.getBigDecimal("quantity_fulfilled")
+                                                            }
+                                                            val movementTuples = fulfillableLines.map { line ->
+                                                                Tuple.tuple()
+                                                                    .addString(UUID.randomUUID().toString())
+                                                                    .addString(line.getString("product_id"))
+                                                                    .addString(line.getString("sku"))
+                                                                    .addString(locationId)
+                                                                    .addValue(null)
+                                                                    .addValue(line.getBigDecimal("quantity_ordered").subtract(line.getBigDecimal("quantity_fulfilled")))
+                                                                    .addString(orderId)
+                                                                    .addValue(notesValue)
+                                                                    .addValue(createdByValue)
+                                                            }
+                                                            val insertMovements = if (movementTuples.isEmpty()) {
+                                                                Completable.complete()
+                                                            } else {
+                                                                connection.preparedQuery(movementInsertQuery)
+                                                                    .rxExecuteBatch(movementTuples)
+                                                                    .compose(timedQuery("order.fulfill.insertMovements"))
+                                                                    .ignoreElement()
+                                                            }
+
+                                                            lockInventoryBalances(connection, orderId, locationId)
+                                                                .andThen(insertMovements)
+                                                                .andThen(
+                                                                    connection.preparedQuery(updateLinesQuery)
+                                                                        .rxExecute(Tuple.tuple().addArrayOfString(lines.map { it.getString("line_id") }.toTypedArray()))
+                                                                        .compose(timedQuery("order.fulfill.updateLines"))
+                                                                        .ignoreElement()
+                                                                )
+                                                                .andThen(
+                                                                    connection.preparedQuery(fulfillReservationsQuery)
+                                                                        .rxExecute(Tuple.tuple().addArrayOfString(fulfillableLines.map { it.getString("line_id") }.toTypedArray()))
+                                                                        .compose(timedQuery("order.fulfill.fulfillReservations"))
+                                                                        .ignoreElement()
+                                                                )
                                                                 .andThen(
                                                                     connection.preparedQuery(updateOrderQuery)
                                                                         .rxExecute(Tuple.of(orderId))
+                                                                        .compose(timedQuery("order.fulfill.updateOrder"))
                                                                         .ignoreElement()
                                                                 )
                                                                 .andThen(
@@ -728,9 +800,10 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
         val commandName = "cancelSalesOrder"
         val requestFingerprint = reasonValue ?: ""
         val orderQuery = """
-            SELECT sales_order_id, status
+            SELECT sales_order_id, status, location_id
             FROM sales_order
             WHERE sales_order_id = $1
+            FOR UPDATE
         """.trimIndent()
         val capturedQuery = """
             SELECT COALESCE(SUM(amount), 0) AS total_captured
@@ -764,11 +837,13 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                         Single.just(storedResponse)
                     } ?: connection.preparedQuery(orderQuery)
                         .rxExecute(Tuple.of(orderId))
+                        .compose(timedQuery("order.cancel.lockOrder"))
                         .flatMap { orderResult ->
                             if (orderResult.size() == 0) {
                                 Single.error(Exception(ErrorCodes.fromStatus(404)))
                             } else {
                                 val status = orderResult.first().getString("status")
+                                val locationId = orderResult.first().getString("location_id")
                                 when (status) {
                                     "FULFILLED" -> Single.error(Exception("Cannot cancel a fulfilled order"))
                                     "CANCELLED" -> {
@@ -788,20 +863,27 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                     }
                                     else -> connection.preparedQuery(capturedQuery)
                                         .rxExecute(Tuple.of(orderId))
+                                        .compose(timedQuery("order.cancel.capturedTotal"))
                                         .flatMap { capturedResult ->
                                             val totalCaptured = capturedResult.first().getBigDecimal("total_captured")
                                             if (totalCaptured > BigDecimal.ZERO) {
                                                 Single.error(Exception("Cannot cancel order with captured payment"))
                                             } else {
                                                 val nextNotes = reasonValue?.let { "[CANCEL] $it" }
-                                                connection.preparedQuery(updateOrderQuery)
-                                                    .rxExecute(Tuple.of(orderId, nextNotes))
+                                                lockInventoryBalances(connection, orderId, locationId)
+                                                    .andThen(
+                                                        connection.preparedQuery(updateOrderQuery)
+                                                            .rxExecute(Tuple.of(orderId, nextNotes))
+                                                            .compose(timedQuery("order.cancel.updateOrder"))
+                                                    )
                                                     .flatMap {
                                                         connection.preparedQuery(updateLineQuery)
                                                             .rxExecute(Tuple.of(orderId))
+                                                            .compose(timedQuery("order.cancel.updateLines"))
                                                             .flatMap {
                                                                 connection.preparedQuery(updateReservationQuery)
                                                                     .rxExecute(Tuple.of(orderId))
+                                                                    .compose(timedQuery("order.cancel.releaseReservations"))
                                                                     .ignoreElement()
                                                                     .andThen(
                                                                         insertSalesOrderEvent(
@@ -900,6 +982,22 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
             .put("updatedAt", row.getLocalDateTime("updated_at")?.toString())
     }
 
+    private fun mapInventoryMovementRow(row: Row): JsonObject {
+        return JsonObject()
+            .put("movementId", row.getString("movement_id"))
+            .put("movementType", row.getString("movement_type"))
+            .put("referenceType", row.getString("reference_type"))
+            .put("referenceId", row.getString("reference_id"))
+            .put("fromLocationId", row.getString("from_location_id"))
+            .put("toLocationId", row.getString("to_location_id"))
+            .put("quantity", row.getBigDecimal("quantity"))
+            .put("change", row.getBigDecimal("change"))
+            .put("balance", row.getBigDecimal("balance"))
+            .put("notes", row.getString("notes"))
+            .put("createdBy", row.getString("created_by"))
+            .put("createdAt", row.getLocalDateTime("created_at")?.toString())
+    }
+
     private fun insertSalesOrderEvent(
         connection: SqlConnection,
         orderId: String,
@@ -939,6 +1037,26 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                 .addString(notes)
                 .addString(createdBy)
         )
+        .compose(timedQuery("order.event.insert"))
+        .ignoreElement()
+
+    // Locks in product_id order so concurrent commands sharing products queue instead of deadlocking.
+    private fun lockInventoryBalances(
+        connection: SqlConnection,
+        orderId: String,
+        locationId: String
+    ) = connection.preparedQuery(
+        """
+        SELECT b.product_id
+        FROM inventory_balance b
+        WHERE b.location_id = $2
+            AND b.product_id IN (SELECT l.product_id FROM sales_order_line l WHERE l.sales_order_id = $1)
+        ORDER BY b.product_id
+        FOR UPDATE OF b
+        """.trimIndent()
+    )
+        .rxExecute(Tuple.of(orderId, locationId))
+        .compose(timedQuery("order.inventory.lockBalances"))
         .ignoreElement()
 
     private data class CommandIdempotencyState(
@@ -976,6 +1094,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
 
         return connection.preparedQuery(selectQuery)
             .rxExecute(Tuple.of(orderId, commandName, idempotencyKey))
+            .compose(timedQuery("order.idempotency.select"))
             .flatMap { result ->
                 if (result.size() > 0) {
                     val row = result.first()
@@ -1000,12 +1119,14 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                                 .addString(idempotencyKey)
                                 .addString(requestFingerprint)
                         )
+                        .compose(timedQuery("order.idempotency.insert"))
                         .flatMap { insertResult ->
                             if (insertResult.size() > 0) {
                                 Single.just(CommandIdempotencyState(null))
                             } else {
                                 connection.preparedQuery(selectQuery)
                                     .rxExecute(Tuple.of(orderId, commandName, idempotencyKey))
+                                    .compose(timedQuery("order.idempotency.reselect"))
                                     .map { retryResult ->
                                         if (retryResult.size() == 0) {
                                             throw IllegalStateException("Failed to claim idempotency key")
@@ -1050,6 +1171,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
                     .addValue(responsePayload)
                     .addString(requestFingerprint)
             )
+            .compose(timedQuery("order.idempotency.store"))
             .flatMap { updateResult ->
                 if (updateResult.rowCount() == 0) {
                     Single.error(Exception("Idempotency key conflict"))
@@ -1061,8 +1183,7 @@ class OrderProcessRepository(pool: Pool) : BaseRepository(pool, OrderProcessRepo
 
     private fun generateOrderNumber(): Single<String> {
         val sequenceQuery = "SELECT nextval('sales_order_number_seq') AS sequence_value"
-        return pool.preparedQuery(sequenceQuery)
-            .rxExecute(Tuple.tuple())
+        return execute(pool, "order.number.next", sequenceQuery)
             .map { result ->
                 val sequenceValue = result.first().getLong("sequence_value")
                     ?: throw IllegalStateException("sales_order_number_seq did not return a value")
@@ -1,13 +1,22 @@
 package com.literp.repository
 
 import com.literp.common.ErrorCodes
+import com.literp.observability.DatabaseMetrics
 import io.reactivex.rxjava3.core.Single
+import io.vertx.core.json.JsonArray
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Row
+import io.vertx.rxjava3.sqlclient.SqlConnection
 import io.vertx.rxjava3.sqlclient.Tuple
+import java.time.LocalDateTime
 import java.util.*
 
-class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::class.java) {
+class ProductRepository(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, ProductRepository::class.java, replicaPool, databaseMetrics) {
 
     fun listProducts(
         page: Int,
@@ -15,9 +24,15 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
         sort: String,
         sku: String?,
         productType: String?,
-        activeOnly: Boolean
+        activeOnly: Boolean,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean = false,
+        q: String? = null
     ): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val offset = page * size
+        val search = q?.trim()?.takeIf { it.isNotEmpty() }
         val parts = sort.split(",")
         val rawField = parts.getOrNull(0)?.trim() ?: "sku"
         val rawOrder = parts.getOrNull(1)?.trim()?.uppercase() ?: "ASC"
@@ -52,26 +67,64 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             whereClause += " AND active = true"
         }
 
-        val query = "SELECT COUNT(*) as total FROM product $whereClause"
-        val dataQuery = """
+        // q also finds a product through a variant's SKU or name, e.g. a scanned variant barcode.
+        if (search != null) {
+            val term = "$${params.size + 1}"
+            whereClause += " AND (sku ILIKE $term OR name ILIKE $term OR EXISTS (" +
+                "SELECT 1 FROM product_variant WHERE product_variant.product_id = product.product_id " +
+                "AND (product_variant.sku ILIKE $term OR product_variant.name ILIKE $term)))"
+            params.add("%$search%")
+        }
+
+        val keysetCursor = try {
+            if (search != null && !cursor.isNullOrBlank()) {
+                throw Exception(SEARCH_CURSOR_MESSAGE)
+            }
+            KeysetCursor.decodeOrNull(cursor, sortField, sortOrder)
+        } catch (error: Exception) {
+            return Single.error(error)
+        }
+        val dataParams = params.toMutableList()
+        val dataWhereClause = keysetCursor?.appendPredicate("product_id", whereClause, dataParams) ?: whereClause
+        val dataOffset = if (keysetCursor == null) offset else 0
+
+        // With q, exact and prefix SKU hits rank first, then trigram similarity on SKU or name; products matched
+        // only through a variant rank last.
+        val orderClause = if (search != null) {
+            searchOrderClause(dataParams, search, listOf("sku", "name"), "product_id")
+        } else {
+            "$sortField $sortOrder, product_id $sortOrder"
+        }
+        val pageClause = pageClause(dataParams, size + 1, dataOffset)
+        val dataQuery = statement(
+            "product.list",
+            sortField,
+            sortOrder,
+            !sku.isNullOrEmpty(),
+            !productType.isNullOrEmpty(),
+            activeOnly,
+            keysetCursor != null,
+            search != null
+        ) {
+            """
             SELECT product_id, sku, name, product_type, base_uom, active, metadata, created_at, updated_at
             FROM product
-            $whereClause
-            ORDER BY $sortField $sortOrder
-            LIMIT $size OFFSET $offset
-        """.trimIndent()
+            $dataWhereClause
+            ORDER BY $orderClause
+            $pageClause
+            """.trimIndent()
+        }
 
         var total = 0
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.from(params))
-            .flatMap { countResult ->
-                total = countResult.first().getInteger("total")
-                pool.preparedQuery(dataQuery)
-                    .rxExecute(Tuple.from(params))
+        return countTotal("product", whereClause, params, totalMode, source)
+            .flatMap { countedTotal ->
+                total = countedTotal
+                execute(source, "product.list", dataQuery, Tuple.from(dataParams))
             }
             .map { result ->
-                val data = result.map { row ->
+                val rows = result.map { it }
+                val data = rows.take(size).map { row ->
                     val metadata = jsonObjectOrEmpty(row.getString("metadata"))
                     JsonObject()
                         .put("productId", row.getString("product_id"))
@@ -87,11 +140,8 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
 
                 JsonObject()
                     .put("data", data)
-                    .put("pagination", JsonObject()
-                        .put("page", page)
-                        .put("size", size)
-                        .put("totalElements", total)
-                        .put("totalPages", (total + size - 1) / size)
+                    .put("pagination", paginationInfo(page, size, total, rows.size > size)
+                        .put("nextCursor", if (search != null) null else KeysetCursor.nextCursor(rows, size, sortField, sortOrder, "product_id"))
                     )
             }
     }
@@ -110,17 +160,16 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             VALUES ($1, $2, $3, $4, $5, $6, $7, NOW(), NOW())
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(
-                Tuple.tuple()
-                    .addString(productId)
-                    .addString(sku)
-                    .addString(name)
-                    .addString(productType)
-                    .addString(baseUom)
-                    .addBoolean(active)
-                    .addValue(metadata?.encode())
-            )
+        return execute(pool, "product.create", query,
+            Tuple.tuple()
+                .addString(productId)
+                .addString(sku)
+                .addString(name)
+                .addString(productType)
+                .addString(baseUom)
+                .addBoolean(active)
+                .addValue(metadata?.encode())
+        )
             .map {
                 JsonObject()
                     .put("productId", productId)
@@ -140,7 +189,8 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             }
     }
 
-    fun getProduct(productId: String, includeVariants: Boolean): Single<JsonObject> {
+    fun getProduct(productId: String, includeVariants: Boolean, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val query = """
             SELECT product_id, sku, name, product_type, base_uom, active, metadata, created_at, updated_at
             FROM product
@@ -154,8 +204,7 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             ORDER BY sku ASC
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(productId))
+        return execute(source, "product.get", query, Tuple.of(productId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -176,8 +225,7 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
                     if (!includeVariants) {
                         Single.just(product)
                     } else {
-                        pool.preparedQuery(variantsQuery)
-                            .rxExecute(Tuple.of(productId))
+                        execute(source, "product.get.variants", variantsQuery, Tuple.of(productId))
                             .map { variantsResult ->
                                 val variants = variantsResult.map { variantRow ->
                                     val attributes = jsonObjectOrEmpty(variantRow.getString("attributes"))
@@ -214,8 +262,7 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             RETURNING product_id, sku, name, product_type, base_uom, active, metadata, created_at, updated_at
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(name, productType, baseUom, active, metadata?.encode(), productId))
+        return execute(pool, "product.update", query, Tuple.of(name, productType, baseUom, active, metadata?.encode(), productId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -251,8 +298,7 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             WHERE product_id = $1 AND active = true
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(productId))
+        return execute(pool, "product.delete", query, Tuple.of(productId))
             .flatMap { result ->
                 if (result.rowCount() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -262,13 +308,302 @@ class ProductRepository(pool: Pool) : BaseRepository(pool, ProductRepository::cl
             }
     }
 
+    fun getListVersion(readPrimary: Boolean = false): Single<JsonObject> {
+        return tableVersion("product", readPool(readPrimary))
+    }
+
     fun checkSkuExists(sku: String): Single<Boolean> {
         val query = "SELECT COUNT(*) as cnt FROM product WHERE sku = $1"
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(sku))
+        return execute(pool, "product.skuExists", query, Tuple.of(sku))
             .map { result ->
                 result.first().getInteger("cnt") > 0
             }
     }
+
+    // Rows for the in-memory SKU index: every active product and variant, the rows changed after changedAfter,
+    // or the rows carrying one SKU. Deltas and single-SKU reads keep inactive rows (active = false) so the index
+    // can drop them. A variant is active only while its product is, and counts as changed when either changes.
+    // Always reads the primary; loadedAt is where the next delta should start from.
+    fun findSkuEntries(changedAfter: LocalDateTime?, sku: String?): Single<JsonObject> {
+        return withConnection { connection ->
+            connection.preparedQuery("SELECT LOCALTIMESTAMP AS loaded_at")
+                .rxExecute()
+                .compose(timedQuery("product.skuIndex.snapshotTime"))
+                .flatMap { loadedAt ->
+                    // Variants first, so a product SKU that collides with a variant SKU is applied last and wins.
+                    skuRows(connection, true, changedAfter, sku)
+                        .flatMap { variants ->
+                            skuRows(connection, false, changedAfter, sku).map { products -> variants.addAll(products) }
+                        }
+                        .map { entries ->
+                            JsonObject()
+                                .put("entries", entries)
+                                .put("loadedAt", loadedAt.first().getLocalDateTime("loaded_at").toString())
+                        }
+                }
+        }
+    }
+
+    private fun skuRows(connection: SqlConnection, variants: Boolean, changedAfter: LocalDateTime?, sku: String?): Single<JsonArray> {
+        val query = statement("product.skuIndex", variants, changedAfter != null, sku != null) {
+            val condition = when {
+                sku != null && variants -> "v.sku = $1"
+                sku != null -> "p.sku = $1"
+                changedAfter != null && variants -> "(v.updated_at > $1 OR p.updated_at > $1)"
+                changedAfter != null -> "p.updated_at > $1"
+                variants -> "v.active = true AND p.active = true"
+                else -> "p.active = true"
+            }
+            if (variants) {
+                """
+                SELECT p.product_id, p.sku, p.name, p.product_type, p.base_uom, p.active, p.metadata, p.created_at, p.updated_at,
+                       v.variant_id, v.sku AS variant_sku, v.name AS variant_name, v.attributes, v.active AS variant_active,
+                       v.created_at AS variant_created_at, v.updated_at AS variant_updated_at
+                FROM product_variant v
+                JOIN product p ON p.product_id = v.product_id
+                WHERE $condition
+                """.trimIndent()
+            } else {
+                """
+                SELECT p.product_id, p.sku, p.name, p.product_type, p.base_uom, p.active, p.metadata, p.created_at, p.updated_at
+                FROM product p
+                WHERE $condition
+                """.trimIndent()
+            }
+        }
+        val params = when {
+            sku != null -> Tuple.of(sku)
+            changedAfter != null -> Tuple.of(changedAfter)
+            else -> Tuple.tuple()
+        }
+
+        return connection.preparedQuery(query)
+            .rxExecute(params)
+            .compose(timedQuery("product.skuIndex.rows"))
+            .map { result -> JsonArray(result.map { row -> skuEntry(row, variants) }) }
+    }
+
+    private fun skuEntry(row: Row, variant: Boolean): JsonObject {
+        val product = JsonObject()
+            .put("productId", row.getString("product_id"))
+            .put("sku", row.getString("sku"))
+            .put("name", row.getString("name"))
+            .put("productType", row.getString("product_type"))
+            .put("baseUom", row.getString("base_uom"))
+            .put("active", row.getBoolean("active"))
+            .put("metadata", jsonObjectOrEmpty(row.getString("metadata")))
+            .put("createdAt", row.getLocalDateTime("created_at").toString())
+            .put("updatedAt", row.getLocalDateTime("updated_at").toString())
+
+        if (!variant) {
+            return JsonObject()
+                .put("sku", row.getString("sku"))
+                .put("matchType", SKU_MATCH_PRODUCT)
+                .put("active", row.getBoolean("active"))
+                .put("product", product)
+                .putNull("variant")
+        }
+
+        return JsonObject()
+            .put("sku", row.getString("variant_sku"))
+            .put("matchType", SKU_MATCH_VARIANT)
+            .put("active", row.getBoolean("active") && row.getBoolean("variant_active"))
+            .put("product", product)
+            .put(
+                "variant",
+                JsonObject()
+                    .put("variantId", row.getString("variant_id"))
+                    .put("productId", row.getString("product_id"))
+                    .put("sku", row.getString("variant_sku"))
+                    .put("name", row.getString("variant_name"))
+                    .put("attributes", jsonObjectOrEmpty(row.getString("attributes")))
+                    .put("active", row.getBoolean("variant_active"))
+                    .put("createdAt", row.getLocalDateTime("variant_created_at").toString())
+                    .put("updatedAt", row.getLocalDateTime("variant_updated_at").toString())
+            )
+    }
+
+    // Upserts one chunk of catalog rows in a single transaction and returns one result per row, by index.
+    // Rows with productSku are variants of that active product, the others are products. Invalid rows are
+    // reported and skipped without failing the chunk. Products are written before variants, so a chunk may
+    // carry a product and its variants together. Each table takes one multi-row INSERT ... ON CONFLICT (sku).
+    fun bulkUpsertProducts(rows: JsonArray): Single<JsonObject> {
+        val results = arrayOfNulls<JsonObject>(rows.size())
+        val products = mutableListOf<BulkRow>()
+        val variants = mutableListOf<BulkRow>()
+        val seenSkus = mutableSetOf<String>()
+
+        for (index in 0 until rows.size()) {
+            val row = rows.getValue(index) as? JsonObject
+            val variant = row?.containsKey("productSku") == true
+            val sku = row?.getValue("sku") as? String
+            val error = when {
+                row == null -> "row must be a JSON object"
+                else -> bulkRowError(row, variant)
+                    ?: if (!seenSkus.add("$variant:$sku")) "sku appears more than once in the same chunk" else null
+            }
+
+            if (error != null) {
+                results[index] = bulkResult(index, sku, variant, BULK_FAILED, null, error)
+            } else if (variant) {
+                variants += BulkRow(index, row!!)
+            } else {
+                products += BulkRow(index, row!!)
+            }
+        }
+
+        return inTransaction { connection ->
+            existingIds(connection, "SELECT uom_id AS lookup_key, uom_id AS id FROM unit_of_measure WHERE uom_id = ANY($1)", products.map { it.row.getString("baseUom") })
+                .flatMap { uoms ->
+                    val (known, unknown) = products.partition { it.row.getString("baseUom") in uoms }
+                    unknown.forEach { failBulkRow(results, it, false, "baseUom must be an existing unit of measure") }
+                    upsertProductRows(connection, known, results)
+                }
+                .flatMap {
+                    existingIds(connection, "SELECT sku AS lookup_key, product_id AS id FROM product WHERE sku = ANY($1) AND active = true", variants.map { it.row.getString("productSku") })
+                }
+                .flatMap { parents ->
+                    val (known, unknown) = variants.partition { it.row.getString("productSku") in parents }
+                    unknown.forEach { failBulkRow(results, it, true, "productSku must be an active product") }
+                    upsertVariantRows(connection, known, parents, results)
+                }
+                .map { JsonObject().put("results", JsonArray(results.toList())) }
+        }
+    }
+
+    private class BulkRow(val index: Int, val row: JsonObject)
+
+    private fun bulkRowError(row: JsonObject, variant: Boolean): String? {
+        val required = if (variant) listOf("productSku", "sku", "name") else listOf("sku", "name", "productType", "baseUom")
+        val missing = required.filter { field -> (row.getValue(field) as? String).isNullOrBlank() }
+        val jsonField = if (variant) "attributes" else "metadata"
+
+        return when {
+            missing.isNotEmpty() -> "${missing.joinToString(", ")} must be non-empty strings"
+            required.any { field -> row.getString(field).length > MAX_TEXT_LENGTH } -> "text fields must be at most $MAX_TEXT_LENGTH characters"
+            !variant && row.getString("productType") !in PRODUCT_TYPES -> "productType must be one of ${PRODUCT_TYPES.joinToString(", ")}"
+            row.getValue("active") != null && row.getValue("active") !is Boolean -> "active must be true or false"
+            row.getValue(jsonField) != null && row.getValue(jsonField) !is JsonObject -> "$jsonField must be an object"
+            else -> null
+        }
+    }
+
+    // Maps each requested key that exists to its id; used for base UoMs and for the parents of variant rows.
+    private fun existingIds(connection: SqlConnection, query: String, keys: List<String>): Single<Map<String, String>> {
+        if (keys.isEmpty()) {
+            return Single.just(emptyMap())
+        }
+
+        return connection.preparedQuery(query)
+            .rxExecute(Tuple.tuple().addValue(keys.distinct().toTypedArray()))
+            .compose(timedQuery("product.bulkUpsert.existingIds"))
+            .map { result -> result.associate { row -> row.getString("lookup_key") to row.getString("id") } }
+    }
+
+    private fun upsertProductRows(connection: SqlConnection, rows: List<BulkRow>, results: Array<JsonObject?>): Single<Unit> {
+        if (rows.isEmpty()) {
+            return Single.just(Unit)
+        }
+
+        val query = """
+            INSERT INTO product (product_id, sku, name, product_type, base_uom, active, metadata, created_at, updated_at)
+            SELECT r.product_id, r.sku, r.name, r.product_type::product_type, r.base_uom, r.active, r.metadata::json, NOW(), NOW()
+            FROM UNNEST($1::varchar[], $2::varchar[], $3::varchar[], $4::varchar[], $5::varchar[], $6::boolean[], $7::text[])
+                AS r(product_id, sku, name, product_type, base_uom, active, metadata)
+            ON CONFLICT (sku) DO UPDATE
+            SET name = EXCLUDED.name, product_type = EXCLUDED.product_type, base_uom = EXCLUDED.base_uom,
+                active = EXCLUDED.active, metadata = EXCLUDED.metadata, updated_at = NOW()
+            RETURNING product_id, sku, (xmax = 0) AS inserted
+        """.trimIndent()
+        val params = Tuple.tuple()
+            .addValue(rows.map { UUID.randomUUID().toString() }.toTypedArray())
+            .addValue(rows.map { it.row.getString("sku") }.toTypedArray())
+            .addValue(rows.map { it.row.getString("name") }.toTypedArray())
+            .addValue(rows.map { it.row.getString("productType") }.toTypedArray())
+            .addValue(rows.map { it.row.getString("baseUom") }.toTypedArray())
+            .addValue(rows.map { it.row.getBoolean("active", true) }.toTypedArray())
+            .addValue(rows.map { it.row.getJsonObject("metadata")?.encode() }.toTypedArray())
+
+        return connection.preparedQuery(query)
+            .rxExecute(params)
+            .compose(timedQuery("product.bulkUpsert.products"))
+            .map { result ->
+                val bySku = rows.associateBy { it.row.getString("sku") }
+                result.forEach { row ->
+                    val bulkRow = bySku.getValue(row.getString("sku"))
+                    val status = if (row.getBoolean("inserted")) BULK_CREATED else BULK_UPDATED
+                    results[bulkRow.index] = bulkResult(bulkRow.index, row.getString("sku"), false, status, row.getString("product_id"), null)
+                }
+            }
+    }
+
+    private fun upsertVariantRows(
+        connection: SqlConnection,
+        rows: List<BulkRow>,
+        parents: Map<String, String>,
+        results: Array<JsonObject?>
+    ): Single<Unit> {
+        if (rows.isEmpty()) {
+            return Single.just(Unit)
+        }
+
+        // An existing variant SKU is only updated under the same product; moving it is reported instead.
+        val query = """
+            INSERT INTO product_variant (variant_id, product_id, sku, name, attributes, active, created_at, updated_at)
+            SELECT r.variant_id, r.product_id, r.sku, r.name, r.attributes::json, r.active, NOW(), NOW()
+            FROM UNNEST($1::varchar[], $2::varchar[], $3::varchar[], $4::varchar[], $5::text[], $6::boolean[])
+                AS r(variant_id, product_id, sku, name, attributes, active)
+            ON CONFLICT (sku) DO UPDATE
+            SET name = EXCLUDED.name, attributes = EXCLUDED.attributes, active = EXCLUDED.active, updated_at = NOW()
+            WHERE product_variant.product_id = EXCLUDED.product_id
+            RETURNING variant_id, sku, (xmax = 0) AS inserted
+        """.trimIndent()
+        val params = Tuple.tuple()
+            .addValue(rows.map { UUID.randomUUID().toString() }.toTypedArray())
+            .addValue(rows.map { parents.getValue(it.row.getString("productSku")) }.toTypedArray())
+            .addValue(rows.map { it.row.getString("sku") }.toTypedArray())
+            .addValue(rows.map { it.row.getString("name") }.toTypedArray())
+            .addValue(rows.map { it.row.getJsonObject("attributes")?.encode() }.toTypedArray())
+            .addValue(rows.map { it.row.getBoolean("active", true) }.toTypedArray())
+
+        return connection.preparedQuery(query)
+            .rxExecute(params)
+            .compose(timedQuery("product.bulkUpsert.variants"))
+            .map { result ->
+                val bySku = rows.associateBy { it.row.getString("sku") }.toMutableMap()
+                result.forEach { row ->
+                    val bulkRow = bySku.remove(row.getString("sku")) ?: return@forEach
+                    val status = if (row.getBoolean("inserted")) BULK_CREATED else BULK_UPDATED
+                    results[bulkRow.index] = bulkResult(bulkRow.index, row.getString("sku"), true, status, row.getString("variant_id"), null)
+                }
+                bySku.values.forEach { failBulkRow(results, it, true, "sku belongs to a variant of another product") }
+            }
+    }
+
+    private fun failBulkRow(results: Array<JsonObject?>, bulkRow: BulkRow, variant: Boolean, error: String) {
+        results[bulkRow.index] = bulkResult(bulkRow.index, bulkRow.row.getString("sku"), variant, BULK_FAILED, null, error)
+    }
+
+    private fun bulkResult(index: Int, sku: String?, variant: Boolean, status: String, id: String?, error: String?): JsonObject {
+        return JsonObject()
+            .put("index", index)
+            .put("sku", sku)
+            .put("type", if (variant) SKU_MATCH_VARIANT else SKU_MATCH_PRODUCT)
+            .put("status", status)
+            .put("id", id)
+            .put("error", error)
+    }
+
+    companion object {
+        const val SKU_MATCH_PRODUCT = "PRODUCT"
+        const val SKU_MATCH_VARIANT = "VARIANT"
+
+        const val BULK_CREATED = "CREATED"
+        const val BULK_UPDATED = "UPDATED"
+        const val BULK_FAILED = "FAILED"
+
+        private const val MAX_TEXT_LENGTH = 255
+        private val PRODUCT_TYPES = listOf("STOCK", "SERVICE")
+    }
 }
@@ -1,21 +1,30 @@
 package com.literp.repository
 
 import com.literp.common.ErrorCodes
+import com.literp.observability.DatabaseMetrics
 import io.reactivex.rxjava3.core.Single
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.sqlclient.Pool
 import io.vertx.rxjava3.sqlclient.Tuple
 import java.util.*
 
-class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariantRepository::class.java) {
+class ProductVariantRepository(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, ProductVariantRepository::class.java, replicaPool, databaseMetrics) {
 
     fun listProductVariants(
         productId: String,
         page: Int,
         size: Int,
         sort: String,
-        activeOnly: Boolean
+        activeOnly: Boolean,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean = false
     ): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val offset = page * size
         val parts = sort.split(",")
         val rawField = parts.getOrNull(0)?.trim() ?: "sku"
@@ -33,35 +42,47 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
         val sortOrder = if (rawOrder == "ASC" || rawOrder == "DESC") rawOrder else "ASC"
 
         val activeFilter = if (activeOnly) " AND active = true" else ""
+        val whereClause = "WHERE product_id = $1$activeFilter"
+        val params = mutableListOf<Any?>(productId)
+
+        val keysetCursor = try {
+            KeysetCursor.decodeOrNull(cursor, sortField, sortOrder)
+        } catch (error: Exception) {
+            return Single.error(error)
+        }
+        val dataParams = params.toMutableList()
+        val dataWhereClause = keysetCursor?.appendPredicate("variant_id", whereClause, dataParams) ?: whereClause
+        val dataOffset = if (keysetCursor == null) offset else 0
+
         val productQuery = "SELECT COUNT(*) as cnt FROM product WHERE product_id = $1 AND active = true"
-        val query = "SELECT COUNT(*) as total FROM product_variant WHERE product_id = $1$activeFilter"
-        val dataQuery = """
+        val pageClause = pageClause(dataParams, size + 1, dataOffset)
+        val dataQuery = statement("variant.list", sortField, sortOrder, activeOnly, keysetCursor != null) {
+            """
             SELECT variant_id, product_id, sku, name, attributes, active, created_at, updated_at
             FROM product_variant
-            WHERE product_id = $1$activeFilter
-            ORDER BY $sortField $sortOrder
-            LIMIT $size OFFSET $offset
-        """.trimIndent()
+            $dataWhereClause
+            ORDER BY $sortField $sortOrder, variant_id $sortOrder
+            $pageClause
+            """.trimIndent()
+        }
 
         var total = 0
 
-        return pool.preparedQuery(productQuery)
-            .rxExecute(Tuple.of(productId))
+        return execute(source, "variant.list.product", productQuery, Tuple.of(productId))
             .flatMap { productResult ->
                 if (productResult.first().getInteger("cnt") == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
                 } else {
-                    pool.preparedQuery(query)
-                        .rxExecute(Tuple.of(productId))
+                    countTotal("product_variant", whereClause, params, totalMode, source)
                 }
             }
-            .flatMap { countResult ->
-                total = countResult.first().getInteger("total")
-                pool.preparedQuery(dataQuery)
-                    .rxExecute(Tuple.of(productId))
+            .flatMap { countedTotal ->
+                total = countedTotal
+                execute(source, "variant.list", dataQuery, Tuple.from(dataParams))
             }
             .map { result ->
-                val data = result.map { row ->
+                val rows = result.map { it }
+                val data = rows.take(size).map { row ->
                     val attributes = jsonObjectOrEmpty(row.getString("attributes"))
                     JsonObject()
                         .put("variantId", row.getString("variant_id"))
@@ -76,11 +97,8 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
 
                 JsonObject()
                     .put("data", data)
-                    .put("pagination", JsonObject()
-                        .put("page", page)
-                        .put("size", size)
-                        .put("totalElements", total)
-                        .put("totalPages", (total + size - 1) / size)
+                    .put("pagination", paginationInfo(page, size, total, rows.size > size)
+                        .put("nextCursor", KeysetCursor.nextCursor(rows, size, sortField, sortOrder, "variant_id"))
                     )
             }
     }
@@ -98,15 +116,14 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
             VALUES ($1, $2, $3, $4, $5, $6, NOW(), NOW())
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(
-                variantId,
-                productId,
-                sku,
-                name,
-                attributes?.encode(),
-                active
-            ))
+        return execute(pool, "variant.create", query,Tuple.of(
+            variantId,
+            productId,
+            sku,
+            name,
+            attributes?.encode(),
+            active
+        ))
             .map {
                 JsonObject()
                     .put("variantId", variantId)
@@ -125,15 +142,15 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
             }
     }
 
-    fun getProductVariant(productId: String, variantId: String): Single<JsonObject> {
+    fun getProductVariant(productId: String, variantId: String, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val query = """
             SELECT variant_id, product_id, sku, name, attributes, active, created_at, updated_at
             FROM product_variant
             WHERE variant_id = $1 AND product_id = $2 AND active = true
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(variantId, productId))
+        return execute(source, "variant.get", query, Tuple.of(variantId, productId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -168,8 +185,7 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
             RETURNING variant_id, product_id, sku, name, attributes, active, created_at, updated_at
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(name, active, attributes?.encode(), productId, variantId))
+        return execute(pool, "variant.update", query, Tuple.of(name, active, attributes?.encode(), productId, variantId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -197,8 +213,7 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
             WHERE product_id = $1 AND variant_id = $2 AND active = true
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(productId, variantId))
+        return execute(pool, "variant.delete", query, Tuple.of(productId, variantId))
             .flatMap { result ->
                 if (result.rowCount() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -208,11 +223,18 @@ class ProductVariantRepository(pool: Pool) : BaseRepository(pool, ProductVariant
             }
     }
 
+    // Variant lists also depend on their product, so product changes move the version too.
+    fun getListVersion(readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
+        return Single.zip(tableVersion("product_variant", source), tableVersion("product", source)) { variants, products ->
+            JsonObject().put("version", "${variants.getString("version")}/${products.getString("version")}")
+        }
+    }
+
     fun checkSkuExists(sku: String): Single<Boolean> {
         val query = "SELECT COUNT(*) as cnt FROM product_variant WHERE sku = $1"
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(sku))
+        return execute(pool, "variant.skuExists", query, Tuple.of(sku))
             .map { result ->
                 result.first().getInteger("cnt") > 0
             }
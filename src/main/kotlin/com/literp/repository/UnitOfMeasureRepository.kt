@@ -1,15 +1,21 @@
 package com.literp.repository
 
 import com.literp.common.ErrorCodes
+import com.literp.observability.DatabaseMetrics
 import io.reactivex.rxjava3.core.Single
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.sqlclient.Pool
 import io.vertx.rxjava3.sqlclient.Tuple
 import java.util.*
 
-class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRepository::class.java) {
+class UnitOfMeasureRepository(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    databaseMetrics: DatabaseMetrics = DatabaseMetrics()
+) : BaseRepository(pool, UnitOfMeasureRepository::class.java, replicaPool, databaseMetrics) {
 
-    fun listUnitOfMeasures(page: Int, size: Int, sort: String): Single<JsonObject> {
+    fun listUnitOfMeasures(page: Int, size: Int, sort: String, totalMode: String, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val offset = page * size
         val parts = sort.split(",")
         val rawField = parts.getOrNull(0)?.trim() ?: "code"
@@ -25,25 +31,27 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
 
         val sortOrder = if (rawOrder == "ASC" || rawOrder == "DESC") rawOrder else "ASC"
 
-        val query = "SELECT COUNT(*) as total FROM unit_of_measure WHERE true"
-        val dataQuery = """
+        val dataParams = mutableListOf<Any?>()
+        val pageClause = pageClause(dataParams, size + 1, offset)
+        val dataQuery = statement("uom.list", sortField, sortOrder) {
+            """
             SELECT uom_id, code, name, base_unit, created_at, updated_at
             FROM unit_of_measure
             ORDER BY $sortField $sortOrder
-            LIMIT $size OFFSET $offset
-        """.trimIndent()
+            $pageClause
+            """.trimIndent()
+        }
 
         var total = 0
 
-        return pool.preparedQuery(query)
-            .rxExecute()
-            .flatMap { countResult ->
-                total = countResult.first().getInteger("total")
-                pool.preparedQuery(dataQuery)
-                    .rxExecute()
+        return countTotal("unit_of_measure", "WHERE true", emptyList(), totalMode, source)
+            .flatMap { countedTotal ->
+                total = countedTotal
+                execute(source, "uom.list", dataQuery, Tuple.from(dataParams))
             }
             .map { result ->
-                val data = result.map { row ->
+                val rows = result.map { it }
+                val data = rows.take(size).map { row ->
                     JsonObject()
                         .put("uomId", row.getString("uom_id"))
                         .put("code", row.getString("code"))
@@ -55,12 +63,7 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
 
                 JsonObject()
                     .put("data", data)
-                    .put("pagination", JsonObject()
-                        .put("page", page)
-                        .put("size", size)
-                        .put("totalElements", total)
-                        .put("totalPages", (total + size - 1) / size)
-                    )
+                    .put("pagination", paginationInfo(page, size, total, rows.size > size))
             }
     }
 
@@ -71,8 +74,7 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
             VALUES ($1, $2, $3, $4, NOW(), NOW())
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(uomId, code, name, baseUnit))
+        return execute(pool, "uom.create", query, Tuple.of(uomId, code, name, baseUnit))
             .map {
                 JsonObject()
                     .put("uomId", uomId)
@@ -82,15 +84,15 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
             }
     }
 
-    fun getUnitOfMeasure(uomId: String): Single<JsonObject> {
+    fun getUnitOfMeasure(uomId: String, readPrimary: Boolean = false): Single<JsonObject> {
+        val source = readPool(readPrimary)
         val query = """
             SELECT uom_id, code, name, base_unit, created_at, updated_at
             FROM unit_of_measure
             WHERE uom_id = $1
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(uomId))
+        return execute(source, "uom.get", query, Tuple.of(uomId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -116,8 +118,7 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
             RETURNING uom_id, code, name, base_unit, created_at, updated_at
         """.trimIndent()
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(name, baseUnit, uomId))
+        return execute(pool, "uom.update", query, Tuple.of(name, baseUnit, uomId))
             .flatMap { result ->
                 if (result.size() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -138,8 +139,7 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
     fun deleteUnitOfMeasure(uomId: String): Single<Unit> {
         val query = "DELETE FROM unit_of_measure WHERE uom_id = $1"
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(uomId))
+        return execute(pool, "uom.delete", query, Tuple.of(uomId))
             .flatMap { result ->
                 if (result.rowCount() == 0) {
                     Single.error(Exception(ErrorCodes.fromStatus(404)))
@@ -156,11 +156,14 @@ class UnitOfMeasureRepository(pool: Pool) : BaseRepository(pool, UnitOfMeasureRe
             }
     }
 
+    fun getListVersion(readPrimary: Boolean = false): Single<JsonObject> {
+        return tableVersion("unit_of_measure", readPool(readPrimary))
+    }
+
     fun checkCodeExists(code: String): Single<Boolean> {
         val query = "SELECT COUNT(*) as cnt FROM unit_of_measure WHERE code = $1"
 
-        return pool.preparedQuery(query)
-            .rxExecute(Tuple.of(code))
+        return execute(pool, "uom.codeExists", query, Tuple.of(code))
             .map { result ->
                 result.first().getInteger("cnt") > 0
             }
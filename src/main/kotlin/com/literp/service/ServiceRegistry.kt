@@ -0,0 +1,66 @@
+package com.literp.service
+
+import com.literp.cache.MasterDataCache
+import com.literp.cache.SkuIndex
+import com.literp.observability.DatabaseMetrics
+import com.literp.observability.EventBusTracing
+import com.literp.observability.Tracer
+import com.literp.repository.CatalogSyncRepository
+import com.literp.repository.LocationRepository
+import com.literp.repository.OrderProcessRepository
+import com.literp.repository.ProductRepository
+import com.literp.repository.ProductVariantRepository
+import com.literp.repository.UnitOfMeasureRepository
+import com.literp.service.master.CatalogSyncService
+import com.literp.service.master.LocationService
+import com.literp.service.master.ProductService
+import com.literp.service.master.ProductVariantService
+import com.literp.service.master.UnitOfMeasureService
+import com.literp.service.master.impl.CatalogSyncServiceImpl
+import com.literp.service.master.impl.LocationServiceImpl
+import com.literp.service.master.impl.ProductServiceImpl
+import com.literp.service.master.impl.ProductVariantServiceImpl
+import com.literp.service.master.impl.UnitOfMeasureServiceImpl
+import com.literp.service.order.OrderProcessService
+import com.literp.service.order.impl.OrderProcessServiceImpl
+import io.vertx.core.Vertx
+import io.vertx.serviceproxy.ServiceBinder
+import io.vertx.rxjava3.sqlclient.Pool
+
+// One set of repositories and service implementations per process, shared by every HTTP server instance.
+// The master-data services share one cache, so a write through any of them is visible to all instances.
+// The SKU index follows the same cache's invalidations and is loaded when the services are registered.
+// Every repository records into the same databaseMetrics. Each service consumer continues traces that
+// arrive over the event bus, so proxy-mode calls show up under the HTTP request that made them.
+class ServiceRegistry(
+    pool: Pool,
+    replicaPool: Pool = pool,
+    val masterDataCache: MasterDataCache = MasterDataCache.disabled(),
+    val databaseMetrics: DatabaseMetrics = DatabaseMetrics(),
+    val tracer: Tracer = Tracer.disabled()
+) {
+    val uomService: UnitOfMeasureService =
+        UnitOfMeasureServiceImpl(UnitOfMeasureRepository(pool, replicaPool, databaseMetrics), masterDataCache)
+    private val productRepository = ProductRepository(pool, replicaPool, databaseMetrics)
+    val skuIndex = SkuIndex(productRepository::findSkuEntries)
+    val productService: ProductService = ProductServiceImpl(productRepository, masterDataCache, skuIndex)
+    val variantService: ProductVariantService =
+        ProductVariantServiceImpl(ProductVariantRepository(pool, replicaPool, databaseMetrics), masterDataCache)
+    val locationService: LocationService = LocationServiceImpl(LocationRepository(pool, replicaPool, databaseMetrics), masterDataCache)
+    val orderProcessService: OrderProcessService = OrderProcessServiceImpl(OrderProcessRepository(pool, replicaPool, databaseMetrics))
+    val catalogSyncService: CatalogSyncService = CatalogSyncServiceImpl(CatalogSyncRepository(pool, databaseMetrics))
+
+    fun register(vertx: Vertx) {
+        masterDataCache.bind(vertx)
+        skuIndex.bind(masterDataCache)
+        skuIndex.refresh()
+        val interceptor = EventBusTracing.serviceInterceptor(tracer)
+        fun binder(address: String) = ServiceBinder(vertx).setAddress(address).addInterceptor(interceptor)
+        binder(UnitOfMeasureService.ADDRESS).register(UnitOfMeasureService::class.java, uomService)
+        binder(ProductService.ADDRESS).register(ProductService::class.java, productService)
+        binder(ProductVariantService.ADDRESS).register(ProductVariantService::class.java, variantService)
+        binder(LocationService.ADDRESS).register(LocationService::class.java, locationService)
+        binder(OrderProcessService.ADDRESS).register(OrderProcessService::class.java, orderProcessService)
+        binder(CatalogSyncService.ADDRESS).register(CatalogSyncService::class.java, catalogSyncService)
+    }
+}
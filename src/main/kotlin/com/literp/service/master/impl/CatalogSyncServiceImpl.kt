@@ -0,0 +1,16 @@
+package com.literp.service.master.impl
+
+import com.literp.repository.CatalogSyncRepository
+import com.literp.service.master.CatalogSyncService
+import com.literp.service.toVertxFuture
+import io.vertx.core.Future
+import io.vertx.core.json.JsonObject
+
+class CatalogSyncServiceImpl(
+    private val repository: CatalogSyncRepository
+) : CatalogSyncService {
+
+    override fun syncCatalog(since: String?): Future<JsonObject> {
+        return repository.syncCatalog(since).toVertxFuture()
+    }
+}
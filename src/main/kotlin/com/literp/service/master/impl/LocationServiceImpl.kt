@@ -1,5 +1,6 @@
 package com.literp.service.master.impl
 
+import com.literp.cache.MasterDataCache
 import com.literp.repository.LocationRepository
 import com.literp.service.master.LocationService
 import com.literp.service.toVertxFuture
@@ -8,7 +9,8 @@ import io.vertx.core.Future
 import io.vertx.core.json.JsonObject
 
 class LocationServiceImpl(
-    private val repository: LocationRepository
+    private val repository: LocationRepository,
+    private val cache: MasterDataCache = MasterDataCache.disabled()
 ) : LocationService {
 
     override fun listLocations(
@@ -18,9 +20,16 @@ class LocationServiceImpl(
         code: String?,
         name: String?,
         locationType: String?,
-        activeOnly: Boolean
+        q: String?,
+        activeOnly: Boolean,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean
     ): Future<JsonObject> {
-        return repository.listLocations(page, size, sort, code, name, locationType, activeOnly).toVertxFuture()
+        val key = "list:$page:$size:$sort:$code:$name:$locationType:$q:$activeOnly:$cursor:$totalMode"
+        return cache.getOrLoad(MasterDataCache.LOCATION, key, readPrimary) { primary ->
+            repository.listLocations(page, size, sort, code, name, locationType, activeOnly, cursor, totalMode, primary, q)
+        }.toVertxFuture()
     }
 
     override fun createLocation(
@@ -30,15 +39,21 @@ class LocationServiceImpl(
         isActive: Boolean,
         address: JsonObject?
     ): Future<JsonObject> {
-        return repository.createLocation(code, name, locationType, isActive, address).toVertxFuture()
+        return repository.createLocation(code, name, locationType, isActive, address)
+            .doOnSuccess { cache.invalidate(MasterDataCache.LOCATION) }
+            .toVertxFuture()
     }
 
-    override fun getLocation(locationId: String): Future<JsonObject> {
-        return repository.getLocation(locationId).toVertxFuture()
+    override fun getLocation(locationId: String, readPrimary: Boolean): Future<JsonObject> {
+        return cache.getOrLoad(MasterDataCache.LOCATION, "get:$locationId", readPrimary) { primary ->
+            repository.getLocation(locationId, primary)
+        }.toVertxFuture()
     }
 
-    override fun getLocationByCode(code: String): Future<JsonObject> {
-        return repository.getLocationByCode(code).toVertxFuture()
+    override fun getLocationByCode(code: String, readPrimary: Boolean): Future<JsonObject> {
+        return cache.getOrLoad(MasterDataCache.LOCATION, "code:$code", readPrimary) { primary ->
+            repository.getLocationByCode(code, primary)
+        }.toVertxFuture()
     }
 
     override fun updateLocation(
@@ -48,11 +63,21 @@ class LocationServiceImpl(
         isActive: Boolean?,
         address: JsonObject?
     ): Future<JsonObject> {
-        return repository.updateLocation(locationId, name, locationType, isActive, address).toVertxFuture()
+        return repository.updateLocation(locationId, name, locationType, isActive, address)
+            .doOnSuccess { cache.invalidate(MasterDataCache.LOCATION) }
+            .toVertxFuture()
     }
 
     override fun deleteLocation(locationId: String): Future<Void> {
-        return repository.deleteLocation(locationId).toVertxVoidFuture()
+        return repository.deleteLocation(locationId)
+            .doOnSuccess { cache.invalidate(MasterDataCache.LOCATION) }
+            .toVertxVoidFuture()
+    }
+
+    override fun getLocationListVersion(readPrimary: Boolean): Future<String> {
+        return cache.getOrLoad(MasterDataCache.LOCATION, "version", readPrimary) { primary -> repository.getListVersion(primary) }
+            .map { it.getString("version") }
+            .toVertxFuture()
     }
 
     override fun checkCodeExists(code: String): Future<Boolean> {
@@ -1,14 +1,20 @@
 package com.literp.service.master.impl
 
+import com.literp.cache.MasterDataCache
+import com.literp.cache.SkuIndex
 import com.literp.repository.ProductRepository
 import com.literp.service.master.ProductService
 import com.literp.service.toVertxFuture
 import com.literp.service.toVertxVoidFuture
 import io.vertx.core.Future
+import io.vertx.core.json.JsonArray
 import io.vertx.core.json.JsonObject
 
 class ProductServiceImpl(
-    private val repository: ProductRepository
+    private val repository: ProductRepository,
+    private val cache: MasterDataCache = MasterDataCache.disabled(),
+    // An index that is never bound or refreshed answers every lookup from the database.
+    private val skuIndex: SkuIndex = SkuIndex(repository::findSkuEntries)
 ) : ProductService {
 
     override fun listProducts(
@@ -17,9 +23,16 @@ class ProductServiceImpl(
         sort: String,
         sku: String?,
         productType: String?,
-        activeOnly: Boolean
+        q: String?,
+        activeOnly: Boolean,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean
     ): Future<JsonObject> {
-        return repository.listProducts(page, size, sort, sku, productType, activeOnly).toVertxFuture()
+        val key = "list:$page:$size:$sort:$sku:$productType:$q:$activeOnly:$cursor:$totalMode"
+        return cache.getOrLoad(MasterDataCache.PRODUCT, key, readPrimary) { primary ->
+            repository.listProducts(page, size, sort, sku, productType, activeOnly, cursor, totalMode, primary, q)
+        }.toVertxFuture()
     }
 
     override fun createProduct(
@@ -30,11 +43,19 @@ class ProductServiceImpl(
         active: Boolean,
         metadata: JsonObject?
     ): Future<JsonObject> {
-        return repository.createProduct(sku, name, productType, baseUom, active, metadata).toVertxFuture()
+        return repository.createProduct(sku, name, productType, baseUom, active, metadata)
+            .doOnSuccess { cache.invalidate(MasterDataCache.PRODUCT) }
+            .toVertxFuture()
     }
 
-    override fun getProduct(productId: String, includeVariants: Boolean): Future<JsonObject> {
-        return repository.getProduct(productId, includeVariants).toVertxFuture()
+    override fun getProduct(productId: String, includeVariants: Boolean, readPrimary: Boolean): Future<JsonObject> {
+        return cache.getOrLoad(MasterDataCache.PRODUCT, "get:$productId:$includeVariants", readPrimary) { primary ->
+            repository.getProduct(productId, includeVariants, primary)
+        }.toVertxFuture()
+    }
+
+    override fun getProductBySku(sku: String): Future<JsonObject> {
+        return skuIndex.lookup(sku).toVertxFuture()
     }
 
     override fun updateProduct(
@@ -45,11 +66,27 @@ class ProductServiceImpl(
         active: Boolean?,
         metadata: JsonObject?
     ): Future<JsonObject> {
-        return repository.updateProduct(productId, name, productType, baseUom, active, metadata).toVertxFuture()
+        return repository.updateProduct(productId, name, productType, baseUom, active, metadata)
+            .doOnSuccess { cache.invalidate(MasterDataCache.PRODUCT, MasterDataCache.VARIANT) }
+            .toVertxFuture()
     }
 
     override fun deleteProduct(productId: String): Future<Void> {
-        return repository.deleteProduct(productId).toVertxVoidFuture()
+        return repository.deleteProduct(productId)
+            .doOnSuccess { cache.invalidate(MasterDataCache.PRODUCT, MasterDataCache.VARIANT) }
+            .toVertxVoidFuture()
+    }
+
+    override fun bulkUpsertProducts(rows: JsonArray): Future<JsonObject> {
+        return repository.bulkUpsertProducts(rows)
+            .doOnSuccess { cache.invalidate(MasterDataCache.PRODUCT, MasterDataCache.VARIANT) }
+            .toVertxFuture()
+    }
+
+    override fun getProductListVersion(readPrimary: Boolean): Future<String> {
+        return cache.getOrLoad(MasterDataCache.PRODUCT, "version", readPrimary) { primary -> repository.getListVersion(primary) }
+            .map { it.getString("version") }
+            .toVertxFuture()
     }
 
     override fun checkSkuExists(sku: String): Future<Boolean> {
@@ -1,5 +1,6 @@
 package com.literp.service.master.impl
 
+import com.literp.cache.MasterDataCache
 import com.literp.repository.ProductVariantRepository
 import com.literp.service.master.ProductVariantService
 import com.literp.service.toVertxFuture
@@ -8,7 +9,8 @@ import io.vertx.core.Future
 import io.vertx.core.json.JsonObject
 
 class ProductVariantServiceImpl(
-    private val repository: ProductVariantRepository
+    private val repository: ProductVariantRepository,
+    private val cache: MasterDataCache = MasterDataCache.disabled()
 ) : ProductVariantService {
 
     override fun listProductVariants(
@@ -16,9 +18,15 @@ class ProductVariantServiceImpl(
         page: Int,
         size: Int,
         sort: String,
-        activeOnly: Boolean
+        activeOnly: Boolean,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean
     ): Future<JsonObject> {
-        return repository.listProductVariants(productId, page, size, sort, activeOnly).toVertxFuture()
+        val key = "list:$productId:$page:$size:$sort:$activeOnly:$cursor:$totalMode"
+        return cache.getOrLoad(MasterDataCache.VARIANT, key, readPrimary) { primary ->
+            repository.listProductVariants(productId, page, size, sort, activeOnly, cursor, totalMode, primary)
+        }.toVertxFuture()
     }
 
     override fun createProductVariant(
@@ -28,11 +36,15 @@ class ProductVariantServiceImpl(
         active: Boolean,
         attributes: JsonObject?
     ): Future<JsonObject> {
-        return repository.createProductVariant(productId, sku, name, active, attributes).toVertxFuture()
+        return repository.createProductVariant(productId, sku, name, active, attributes)
+            .doOnSuccess { cache.invalidate(MasterDataCache.VARIANT, MasterDataCache.PRODUCT) }
+            .toVertxFuture()
     }
 
-    override fun getProductVariant(productId: String, variantId: String): Future<JsonObject> {
-        return repository.getProductVariant(productId, variantId).toVertxFuture()
+    override fun getProductVariant(productId: String, variantId: String, readPrimary: Boolean): Future<JsonObject> {
+        return cache.getOrLoad(MasterDataCache.VARIANT, "get:$productId:$variantId", readPrimary) { primary ->
+            repository.getProductVariant(productId, variantId, primary)
+        }.toVertxFuture()
     }
 
     override fun updateProductVariant(
@@ -42,11 +54,21 @@ class ProductVariantServiceImpl(
         active: Boolean?,
         attributes: JsonObject?
     ): Future<JsonObject> {
-        return repository.updateProductVariant(productId, variantId, name, active, attributes).toVertxFuture()
+        return repository.updateProductVariant(productId, variantId, name, active, attributes)
+            .doOnSuccess { cache.invalidate(MasterDataCache.VARIANT, MasterDataCache.PRODUCT) }
+            .toVertxFuture()
     }
 
     override fun deleteProductVariant(productId: String, variantId: String): Future<Void> {
-        return repository.deleteProductVariant(productId, variantId).toVertxVoidFuture()
+        return repository.deleteProductVariant(productId, variantId)
+            .doOnSuccess { cache.invalidate(MasterDataCache.VARIANT, MasterDataCache.PRODUCT) }
+            .toVertxVoidFuture()
+    }
+
+    override fun getProductVariantListVersion(readPrimary: Boolean): Future<String> {
+        return cache.getOrLoad(MasterDataCache.VARIANT, "version", readPrimary) { primary -> repository.getListVersion(primary) }
+            .map { it.getString("version") }
+            .toVertxFuture()
     }
 
     override fun checkSkuExists(sku: String): Future<Boolean> {
@@ -1,5 +1,6 @@
 package com.literp.service.master.impl
 
+import com.literp.cache.MasterDataCache
 import com.literp.repository.UnitOfMeasureRepository
 import com.literp.service.master.UnitOfMeasureService
 import com.literp.service.toVertxFuture
@@ -8,27 +9,44 @@ import io.vertx.core.Future
 import io.vertx.core.json.JsonObject
 
 class UnitOfMeasureServiceImpl(
-    private val repository: UnitOfMeasureRepository
+    private val repository: UnitOfMeasureRepository,
+    private val cache: MasterDataCache = MasterDataCache.disabled()
 ) : UnitOfMeasureService {
 
-    override fun listUnitOfMeasures(page: Int, size: Int, sort: String): Future<JsonObject> {
-        return repository.listUnitOfMeasures(page, size, sort).toVertxFuture()
+    override fun listUnitOfMeasures(page: Int, size: Int, sort: String, totalMode: String, readPrimary: Boolean): Future<JsonObject> {
+        return cache.getOrLoad(MasterDataCache.UOM, "list:$page:$size:$sort:$totalMode", readPrimary) { primary ->
+            repository.listUnitOfMeasures(page, size, sort, totalMode, primary)
+        }.toVertxFuture()
     }
 
     override fun createUnitOfMeasure(code: String, name: String, baseUnit: String?): Future<JsonObject> {
-        return repository.createUnitOfMeasure(code, name, baseUnit).toVertxFuture()
+        return repository.createUnitOfMeasure(code, name, baseUnit)
+            .doOnSuccess { cache.invalidate(MasterDataCache.UOM) }
+            .toVertxFuture()
     }
 
-    override fun getUnitOfMeasure(uomId: String): Future<JsonObject> {
-        return repository.getUnitOfMeasure(uomId).toVertxFuture()
+    override fun getUnitOfMeasure(uomId: String, readPrimary: Boolean): Future<JsonObject> {
+        return cache.getOrLoad(MasterDataCache.UOM, "get:$uomId", readPrimary) { primary ->
+            repository.getUnitOfMeasure(uomId, primary)
+        }.toVertxFuture()
     }
 
     override fun updateUnitOfMeasure(uomId: String, name: String, baseUnit: String?): Future<JsonObject> {
-        return repository.updateUnitOfMeasure(uomId, name, baseUnit).toVertxFuture()
+        return repository.updateUnitOfMeasure(uomId, name, baseUnit)
+            .doOnSuccess { cache.invalidate(MasterDataCache.UOM) }
+            .toVertxFuture()
     }
 
     override fun deleteUnitOfMeasure(uomId: String): Future<Void> {
-        return repository.deleteUnitOfMeasure(uomId).toVertxVoidFuture()
+        return repository.deleteUnitOfMeasure(uomId)
+            .doOnSuccess { cache.invalidate(MasterDataCache.UOM) }
+            .toVertxVoidFuture()
+    }
+
+    override fun getUnitOfMeasureListVersion(readPrimary: Boolean): Future<String> {
+        return cache.getOrLoad(MasterDataCache.UOM, "version", readPrimary) { primary -> repository.getListVersion(primary) }
+            .map { it.getString("version") }
+            .toVertxFuture()
     }
 
     override fun checkCodeExists(code: String): Future<Boolean> {
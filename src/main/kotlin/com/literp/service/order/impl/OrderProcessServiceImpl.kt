@@ -6,6 +6,7 @@ import com.literp.service.toVertxFuture
 import io.vertx.core.Future
 import io.vertx.core.json.JsonObject
 import java.math.BigDecimal
+import java.time.LocalDateTime
 
 class OrderProcessServiceImpl(
     private val repository: OrderProcessRepository
@@ -17,9 +18,12 @@ class OrderProcessServiceImpl(
         sort: String,
         status: String?,
         salesChannel: String?,
-        locationId: String?
+        locationId: String?,
+        cursor: String?,
+        totalMode: String,
+        readPrimary: Boolean
     ): Future<JsonObject> {
-        return repository.listSalesOrders(page, size, sort, status, salesChannel, locationId).toVertxFuture()
+        return repository.listSalesOrders(page, size, sort, status, salesChannel, locationId, cursor, totalMode, readPrimary).toVertxFuture()
     }
 
     override fun createSalesOrderDraft(
@@ -34,8 +38,8 @@ class OrderProcessServiceImpl(
             .toVertxFuture()
     }
 
-    override fun getSalesOrder(salesOrderId: String): Future<JsonObject> {
-        return repository.getSalesOrder(salesOrderId).toVertxFuture()
+    override fun getSalesOrder(salesOrderId: String, readPrimary: Boolean): Future<JsonObject> {
+        return repository.getSalesOrder(salesOrderId, readPrimary).toVertxFuture()
     }
 
     override fun addSalesOrderLine(
@@ -56,12 +60,35 @@ class OrderProcessServiceImpl(
             .toVertxFuture()
     }
 
-    override fun getCurrentStock(productId: String, locationId: String): Future<JsonObject> {
-        return repository.getCurrentStock(productId, locationId).toVertxFuture()
+    override fun getCurrentStock(productId: String, locationId: String, readPrimary: Boolean): Future<JsonObject> {
+        return repository.getCurrentStock(productId, locationId, readPrimary).toVertxFuture()
     }
 
-    override fun getAvailableStock(productId: String, locationId: String): Future<JsonObject> {
-        return repository.getAvailableStock(productId, locationId).toVertxFuture()
+    override fun getAvailableStock(productId: String, locationId: String, readPrimary: Boolean): Future<JsonObject> {
+        return repository.getAvailableStock(productId, locationId, readPrimary).toVertxFuture()
+    }
+
+    // from and to arrive as ISO local date-times; the handler has already validated them.
+    override fun listInventoryMovements(
+        productId: String,
+        locationId: String,
+        from: String?,
+        to: String?,
+        size: Int,
+        cursor: String?,
+        readPrimary: Boolean
+    ): Future<JsonObject> {
+        return repository
+            .listInventoryMovements(
+                productId,
+                locationId,
+                from?.let(LocalDateTime::parse),
+                to?.let(LocalDateTime::parse),
+                size,
+                cursor,
+                readPrimary
+            )
+            .toVertxFuture()
     }
 
     override fun confirmSalesOrder(salesOrderId: String, idempotencyKey: String): Future<JsonObject> {
@@ -1,24 +1,25 @@
 package com.literp.verticle
 
-import com.literp.config.Config
+import com.literp.cache.MasterDataCache
 import com.literp.common.ErrorCodes
+import com.literp.observability.AccessLog
+import com.literp.observability.DatabaseMetrics
 import com.literp.observability.HttpMetrics
-import com.literp.db.DatabaseConnection
-import com.literp.repository.LocationRepository
-import com.literp.repository.OrderProcessRepository
-import com.literp.repository.ProductRepository
-import com.literp.repository.ProductVariantRepository
-import com.literp.repository.UnitOfMeasureRepository
+import com.literp.observability.RequestIds
+import com.literp.observability.RingBufferSpanExporter
+import com.literp.observability.Tracer
+import com.literp.db.StatementCatalog
+import com.literp.repository.ExportRepository
+import com.literp.service.ServiceRegistry
+import com.literp.service.master.CatalogSyncService
 import com.literp.service.master.LocationService
 import com.literp.service.master.ProductService
 import com.literp.service.master.ProductVariantService
 import com.literp.service.master.UnitOfMeasureService
-import com.literp.service.master.impl.LocationServiceImpl
-import com.literp.service.master.impl.ProductServiceImpl
-import com.literp.service.master.impl.ProductVariantServiceImpl
-import com.literp.service.master.impl.UnitOfMeasureServiceImpl
 import com.literp.service.order.OrderProcessService
-import com.literp.service.order.impl.OrderProcessServiceImpl
+import com.literp.verticle.handler.CatalogSyncHandler
+import com.literp.verticle.handler.BaseHandler
+import com.literp.verticle.handler.ExportHandler
 import com.literp.verticle.handler.LocationHandler
 import com.literp.verticle.handler.OrderProcessHandler
 import com.literp.verticle.handler.ProductHandler
@@ -38,64 +39,73 @@ import io.vertx.ext.web.handler.HttpException
 import io.vertx.rxjava3.ext.web.handler.HSTSHandler
 import io.vertx.rxjava3.ext.web.openapi.router.RouterBuilder
 import io.vertx.rxjava3.openapi.contract.OpenAPIContract
-import java.util.UUID
 import java.util.concurrent.TimeUnit
 
+// Deployed once per event-loop instance; the pool, metrics and service registration are shared by all instances.
+// With localServices the handlers call the implementations directly; without it they use event-bus proxies.
+// Exports always read through exportRepository, since a proxy cannot stream.
 class HttpServerVerticle(
-    private val vertx: Vertx
+    private val vertx: Vertx,
+    private val dbPool: Pool,
+    private val localServices: ServiceRegistry?,
+    private val metrics: HttpMetrics,
+    private val databaseMetrics: DatabaseMetrics,
+    private val tracer: Tracer,
+    private val accessLog: AccessLog,
+    private val masterDataCache: MasterDataCache,
+    private val exportRepository: ExportRepository,
+    private val httpPort: Int,
+    private val preparedStatementCacheSize: Int
 ) : CoroutineVerticle() {
 
     private val logger = LoggerFactory.getLogger(this@HttpServerVerticle.javaClass)
-    private lateinit var dbPool: Pool
-
-    private lateinit var uomRepository: UnitOfMeasureRepository
-    private lateinit var productRepository: ProductRepository
-    private lateinit var variantRepository: ProductVariantRepository
-    private lateinit var locationRepository: LocationRepository
-    private lateinit var orderProcessRepository: OrderProcessRepository
 
     private lateinit var uomService: UnitOfMeasureService
     private lateinit var productService: ProductService
     private lateinit var variantService: ProductVariantService
     private lateinit var locationService: LocationService
     private lateinit var orderProcessService: OrderProcessService
+    private lateinit var catalogSyncService: CatalogSyncService
 
     private lateinit var productHandler: ProductHandler
     private lateinit var locationHandler: LocationHandler
     private lateinit var uomHandler: UnitOfMeasureHandler
     private lateinit var orderProcessHandler: OrderProcessHandler
-    private val metrics = HttpMetrics()
+    private lateinit var catalogSyncHandler: CatalogSyncHandler
+    private lateinit var exportHandler: ExportHandler
 
     private companion object {
-        const val METRICS_START_NANOS_KEY = "metricsStartNanos"
+        const val METRICS_ROUTE_KEY = "metricsRoute"
+        const val NDJSON_CONTENT_TYPE = "application/x-ndjson"
+        const val DEFAULT_TRACE_LIMIT = 20
+        const val MAX_TRACE_LIMIT = 100
     }
 
     override fun start(startFuture: Promise<Void>?) {
         val coreVertx = vertx.delegate
-        val pool = DatabaseConnection.createPool(vertx)
-        dbPool = pool
-        uomRepository = UnitOfMeasureRepository(pool)
-        productRepository = ProductRepository(pool)
-        variantRepository = ProductVariantRepository(pool)
-        locationRepository = LocationRepository(pool)
-        orderProcessRepository = OrderProcessRepository(pool)
-
-        UnitOfMeasureService.register(coreVertx, UnitOfMeasureServiceImpl(uomRepository))
-        ProductService.register(coreVertx, ProductServiceImpl(productRepository))
-        ProductVariantService.register(coreVertx, ProductVariantServiceImpl(variantRepository))
-        LocationService.register(coreVertx, LocationServiceImpl(locationRepository))
-        OrderProcessService.register(coreVertx, OrderProcessServiceImpl(orderProcessRepository))
-
-        uomService = UnitOfMeasureService.createProxy(coreVertx)
-        productService = ProductService.createProxy(coreVertx)
-        variantService = ProductVariantService.createProxy(coreVertx)
-        locationService = LocationService.createProxy(coreVertx)
-        orderProcessService = OrderProcessService.createProxy(coreVertx)
+
+        if (localServices != null) {
+            uomService = localServices.uomService
+            productService = localServices.productService
+            variantService = localServices.variantService
+            locationService = localServices.locationService
+            orderProcessService = localServices.orderProcessService
+            catalogSyncService = localServices.catalogSyncService
+        } else {
+            uomService = UnitOfMeasureService.createProxy(coreVertx)
+            productService = ProductService.createProxy(coreVertx)
+            variantService = ProductVariantService.createProxy(coreVertx)
+            locationService = LocationService.createProxy(coreVertx)
+            orderProcessService = OrderProcessService.createProxy(coreVertx)
+            catalogSyncService = CatalogSyncService.createProxy(coreVertx)
+        }
 
         productHandler = ProductHandler(productService, variantService)
         locationHandler = LocationHandler(locationService)
         uomHandler = UnitOfMeasureHandler(uomService)
         orderProcessHandler = OrderProcessHandler(orderProcessService)
+        catalogSyncHandler = CatalogSyncHandler(catalogSyncService)
+        exportHandler = ExportHandler(exportRepository)
 
         loadApiContracts(startFuture)
     }
@@ -125,6 +135,7 @@ class HttpServerVerticle(
 
                     val (productRouterBuilder, locationRouterBuilder, orderProcessRouterBuilder) = routers
 
+                    listOf(productRouterBuilder, locationRouterBuilder, orderProcessRouterBuilder).forEach(::tagOperationRoutes)
                     registerProductCatalogHandlers(productRouterBuilder)
                     registerLocationHandlers(locationRouterBuilder)
                     registerOrderProcessHandlers(orderProcessRouterBuilder)
@@ -140,26 +151,31 @@ class HttpServerVerticle(
 
                         get("/").handler(this@HttpServerVerticle::getIndex)
                         get("/metrics").handler(this@HttpServerVerticle::getMetrics)
+                        get("/debug/traces").handler(this@HttpServerVerticle::getTraces)
                         get("/health/live").handler(this@HttpServerVerticle::getLiveness)
                         get("/health/ready").handler(this@HttpServerVerticle::getReadiness)
                         get("/health/db").handler(this@HttpServerVerticle::getDatabaseHealth)
 
+                        // The contract validator has no NDJSON support, so streamed bulk upserts bypass it here;
+                        // JSON array bodies fall through to the validated bulkUpsertProducts route.
+                        post("/api/v1/products/bulk-upsert")
+                            .consumes(NDJSON_CONTENT_TYPE)
+                            .handler(productHandler::bulkUpsertProductsNdjson)
+
                         route("/api/v1/*").subRouter(productRouter)
                         route("/api/v1/*").subRouter(locationRouter)
                         route("/api/v1/*").subRouter(orderProcessRouter)
                     }
 
-                    val config = Config()
-
                     val httpOptions = HttpServerOptions()
-                        .setPort(config.httpPort)
+                        .setPort(httpPort)
 
                     vertx.createHttpServer(httpOptions)
                         .requestHandler(router)
                         .rxListen()
                         .subscribe(
                             {
-                                logger.info("Deployed HttpServerVerticle: listening at http://localhost:${config.httpPort}")
+                                logger.info("Deployed HttpServerVerticle: listening at http://localhost:$httpPort")
                                 startFuture?.complete()
                             },
                             { failure ->
@@ -176,6 +192,17 @@ class HttpServerVerticle(
             })
     }
 
+    // Runs ahead of each operation's handler and names the request by operationId for the latency metrics.
+    private fun tagOperationRoutes(routerBuilder: RouterBuilder) {
+        routerBuilder.routes.forEach { route ->
+            val operationId = route.operation.operationId
+            route.addHandler { context ->
+                context.put(METRICS_ROUTE_KEY, operationId)
+                context.next()
+            }
+        }
+    }
+
     private fun registerProductCatalogHandlers(routerBuilder: RouterBuilder) {
         // Unit of Measure handlers (delegated)
         routerBuilder.getRoute("listUnitOfMeasures").addHandler(uomHandler::listUnitOfMeasures)
@@ -188,8 +215,10 @@ class HttpServerVerticle(
         routerBuilder.getRoute("listProducts").addHandler(productHandler::listProducts)
         routerBuilder.getRoute("createProduct").addHandler(productHandler::createProduct)
         routerBuilder.getRoute("getProduct").addHandler(productHandler::getProduct)
+        routerBuilder.getRoute("getProductBySku").addHandler(productHandler::getProductBySku)
         routerBuilder.getRoute("updateProduct").addHandler(productHandler::updateProduct)
         routerBuilder.getRoute("deleteProduct").addHandler(productHandler::deleteProduct)
+        routerBuilder.getRoute("bulkUpsertProducts").addHandler(productHandler::bulkUpsertProducts)
 
         // Product Variant handlers (delegated)
         routerBuilder.getRoute("listProductVariants").addHandler(productHandler::listProductVariants)
@@ -197,6 +226,12 @@ class HttpServerVerticle(
         routerBuilder.getRoute("getProductVariant").addHandler(productHandler::getProductVariant)
         routerBuilder.getRoute("updateProductVariant").addHandler(productHandler::updateProductVariant)
         routerBuilder.getRoute("deleteProductVariant").addHandler(productHandler::deleteProductVariant)
+
+        // Catalog delta sync for POS terminals
+        routerBuilder.getRoute("syncCatalog").addHandler(catalogSyncHandler::syncCatalog)
+
+        // Streaming exports
+        routerBuilder.getRoute("exportProducts").addHandler(exportHandler::exportProducts)
     }
 
     private fun registerLocationHandlers(routerBuilder: RouterBuilder) {
@@ -214,16 +249,16 @@ class HttpServerVerticle(
         routerBuilder.getRoute("getSalesOrder").addHandler(orderProcessHandler::getSalesOrder)
         routerBuilder.getRoute("getCurrentStock").addHandler(orderProcessHandler::getCurrentStock)
         routerBuilder.getRoute("getAvailableStock").addHandler(orderProcessHandler::getAvailableStock)
+        routerBuilder.getRoute("listInventoryMovements").addHandler(orderProcessHandler::listInventoryMovements)
         routerBuilder.getRoute("addSalesOrderLine").addHandler(orderProcessHandler::addSalesOrderLine)
         routerBuilder.getRoute("confirmSalesOrder").addHandler(orderProcessHandler::confirmSalesOrder)
         routerBuilder.getRoute("capturePayment").addHandler(orderProcessHandler::capturePayment)
         routerBuilder.getRoute("fulfillSalesOrder").addHandler(orderProcessHandler::fulfillSalesOrder)
         routerBuilder.getRoute("cancelSalesOrder").addHandler(orderProcessHandler::cancelSalesOrder)
+        routerBuilder.getRoute("exportSalesOrders").addHandler(exportHandler::exportSalesOrders)
     }
 
     private fun getIndex(context: RoutingContext) {
-        logger.info("Calling getIndex")
-
         val response = JsonObject().apply {
             put("success", true)
             put("message", "Literp API Server")
@@ -233,14 +268,41 @@ class HttpServerVerticle(
         putResponse(context, 200, response)
     }
 
+    // The start time stays in the end handler's closure rather than the context map, so no Long is boxed per
+    // request, and recording into an existing histogram allocates nothing. A sampled request also gets its root
+    // span here, keyed by its request id; it is renamed to the route once routing has tagged the request. The
+    // access-log entry is built only when the access log keeps it.
     private fun captureRequestMetrics(context: RoutingContext) {
         val startedAt = System.nanoTime()
         try {
-            context.put(METRICS_START_NANOS_KEY, startedAt)
+            val span = if (tracer.sampled()) {
+                tracer.startTrace(BaseHandler.resolveRequestId(context), "${context.request().method()} ${context.request().path()}")
+            } else {
+                null
+            }
             context.response().endHandler {
-                val resolvedStartedAt = context.get<Long>(METRICS_START_NANOS_KEY) ?: startedAt
                 try {
-                    metrics.recordRequest(context.response().statusCode, System.nanoTime() - resolvedStartedAt)
+                    val route = metricsRoute(context)
+                    val statusCode = context.response().statusCode
+                    val durationNanos = System.nanoTime() - startedAt
+                    metrics.recordRequest(route, statusCode, durationNanos)
+                    span?.rename(route)
+                        ?.attribute("http.method", context.request().method().name())
+                        ?.attribute("http.status", statusCode)
+                        ?.end()
+                    if (accessLog.sampled(statusCode)) {
+                        accessLog.record(
+                            AccessLog.Entry(
+                                context.request().method().name(),
+                                context.request().path(),
+                                route,
+                                statusCode,
+                                durationNanos,
+                                BaseHandler.resolveRequestId(context),
+                                context.get(AccessLog.ERROR_CONTEXT_KEY)
+                            )
+                        )
+                    }
                 } catch (error: Throwable) {
                     logger.warn("Failed to record request metrics: ${error.message}", error)
                 }
@@ -252,13 +314,63 @@ class HttpServerVerticle(
         }
     }
 
+    // Contract routes are tagged with their operationId; plain routes fall back to their path template, so
+    // unknown URLs never become route names of their own.
+    private fun metricsRoute(context: RoutingContext): String {
+        return context.get<String>(METRICS_ROUTE_KEY)
+            ?: context.currentRoute()?.path
+            ?: HttpMetrics.UNMATCHED_ROUTE
+    }
+
+    // JSON by default; Prometheus text for scrapers, which ask for text/plain or OpenMetrics.
     private fun getMetrics(context: RoutingContext) {
-        putResponse(context, 200, metrics.snapshot())
+        val accept = context.request().getHeader("Accept").orEmpty()
+        if (accept.contains("text/plain") || accept.contains("application/openmetrics-text")) {
+            context.response().statusCode = 200
+            context.response().putHeader("Content-Type", HttpMetrics.PROMETHEUS_CONTENT_TYPE)
+            context.response().end(metrics.prometheus() + databaseMetrics.prometheus() + accessLog.prometheus())
+            return
+        }
+
+        putResponse(
+            context,
+            200,
+            metrics.snapshot()
+                .put("sqlTextCache", StatementCatalog.snapshot())
+                .put("preparedStatementCacheMaxSize", preparedStatementCacheSize)
+                .put("masterDataCache", masterDataCache.snapshot())
+                .put("database", databaseMetrics.snapshot())
+                .put("accessLog", accessLog.snapshot())
+        )
     }
 
-    private fun getLiveness(context: RoutingContext) {
-        logger.info("Calling getLiveness")
+    // Recent sampled traces, newest first; traceId (a request's X-Request-ID) narrows the result to one trace.
+    // Only the in-memory ring exporter keeps spans to show.
+    private fun getTraces(context: RoutingContext) {
+        val exporter = tracer.exporter as? RingBufferSpanExporter
+        if (exporter == null) {
+            putErrorResponse(context, 404, "Trace buffer is not enabled; set tracing.exporter=ring")
+            return
+        }
+
+        val limitParam = context.request().getParam("limit")
+        val limit = if (limitParam == null) DEFAULT_TRACE_LIMIT else limitParam.toIntOrNull()
+        if (limit == null || limit < 1 || limit > MAX_TRACE_LIMIT) {
+            putErrorResponse(context, 400, "limit must be between 1 and $MAX_TRACE_LIMIT")
+            return
+        }
 
+        putResponse(
+            context,
+            200,
+            JsonObject()
+                .put("sampleRate", tracer.sampleRate)
+                .put("bufferSize", exporter.capacity)
+                .put("traces", exporter.traces(context.request().getParam("traceId"), limit))
+        )
+    }
+
+    private fun getLiveness(context: RoutingContext) {
         putResponse(
             context,
             200,
@@ -313,6 +425,8 @@ class HttpServerVerticle(
             else -> 500
         }
         val message = failure?.message ?: if (statusCode == 400) "Bad request" else "Internal server error"
+        val errorId = RequestIds.next()
+        context.put(AccessLog.ERROR_CONTEXT_KEY, AccessLog.ErrorDetail(errorId, ErrorCodes.fromStatus(statusCode), message))
 
         putResponse(
             context,
@@ -321,7 +435,7 @@ class HttpServerVerticle(
                 .put("error", message)
                 .put("errorCode", ErrorCodes.fromStatus(statusCode))
                 .put("status", statusCode)
-                .put("errorId", UUID.randomUUID().toString())
+                .put("errorId", errorId)
         )
     }
 
@@ -1,5 +1,18 @@
 package com.literp.verticle
 
+import com.literp.cache.MasterDataCache
+import com.literp.config.Config
+import com.literp.db.DatabaseConnection
+import com.literp.observability.AccessLog
+import com.literp.observability.DatabaseMetrics
+import com.literp.observability.EventBusTracing
+import com.literp.observability.HttpMetrics
+import com.literp.observability.RingBufferSpanExporter
+import com.literp.observability.SpanExporter
+import com.literp.observability.Tracer
+import com.literp.repository.ExportRepository
+import com.literp.service.ServiceRegistry
+import io.reactivex.rxjava3.core.Flowable
 import io.vertx.core.Promise
 import io.vertx.core.internal.logging.LoggerFactory
 import io.vertx.kotlin.coroutines.CoroutineVerticle
@@ -12,12 +25,66 @@ class MainVerticle : CoroutineVerticle() {
 
     override fun start(startFuture: Promise<Void>?) {
         val rxVertx = Vertx.newInstance(this.vertx)
+        val config = Config()
+        val pool = DatabaseConnection.createPool(rxVertx, config)
+        val replicaPool = DatabaseConnection.createReplicaPool(rxVertx, config) ?: pool
+        val metrics = HttpMetrics()
+        val databaseMetrics = DatabaseMetrics(config.dbSlowQueryThresholdMs)
+        databaseMetrics.registerPool(DatabaseMetrics.PRIMARY_POOL, config.pgPoolSize, pool::size)
+        if (replicaPool !== pool) {
+            databaseMetrics.registerPool(DatabaseMetrics.REPLICA_POOL, config.pgReplicaPoolSize, replicaPool::size)
+        }
 
-        RxHelper
-            .deployVerticle(rxVertx, HttpServerVerticle(rxVertx))
+        val tracer = Tracer(
+            when (config.tracingExporter) {
+                Config.TRACING_EXPORTER_RING -> RingBufferSpanExporter(config.tracingBufferSize)
+                Config.TRACING_EXPORTER_LOG -> SpanExporter.logging()
+                else -> SpanExporter.NONE
+            },
+            config.tracingSampleRate
+        )
+        if (tracer.sampleRate > 0.0) {
+            EventBusTracing.installOutbound(this.vertx.eventBus())
+        }
+
+        val accessLog = AccessLog(config.accessLogSampleRate, config.accessLogQueueSize)
+
+        val masterDataCache = MasterDataCache(config.masterDataCacheMaxEntries, config.masterDataCacheTtlSeconds * 1000L)
+
+        val services = ServiceRegistry(pool, replicaPool, masterDataCache, databaseMetrics, tracer)
+        val localServices = if (config.serviceMode == Config.SERVICE_MODE_LOCAL) services else null
+        val exportRepository = ExportRepository(pool, replicaPool, databaseMetrics)
+
+        // The event-bus registration stays in both modes so other verticles or nodes can still use the proxies.
+        services.register(this.vertx)
+
+        // Each instance gets its own event-loop context; Vert.x round-robins connections on the shared port.
+        Flowable.range(0, config.httpInstances)
+            .concatMapSingle {
+                RxHelper.deployVerticle(
+                    rxVertx,
+                    HttpServerVerticle(
+                        rxVertx,
+                        pool,
+                        localServices,
+                        metrics,
+                        databaseMetrics,
+                        tracer,
+                        accessLog,
+                        masterDataCache,
+                        exportRepository,
+                        config.httpPort,
+                        config.pgPreparedStatementCacheSize
+                    )
+                )
+            }
+            .ignoreElements()
             .subscribe(
                 {
-                    logger.info("Deployed MainVerticle")
+                    logger.info(
+                        "Deployed MainVerticle with ${config.httpInstances} HttpServerVerticle instances " +
+                            "in ${config.serviceMode} service mode"
+                    )
                     startFuture?.complete()
                 },
                 { failure ->
@@ -26,4 +93,4 @@ class MainVerticle : CoroutineVerticle() {
                 }
             )
     }
-}
\ No newline at end of file
+}
@@ -1,72 +1,130 @@
 package com.literp.verticle.handler
 
 import com.literp.common.ErrorCodes
+import com.literp.observability.AccessLog
+import com.literp.observability.RequestIds
+import io.vertx.core.Future
 import io.vertx.core.internal.logging.LoggerFactory
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.ext.web.RoutingContext
-import java.util.UUID
+import java.security.MessageDigest
+import java.time.LocalDate
+import java.time.LocalDateTime
 
 open class BaseHandler(clazz: Class<*>) {
 
     protected val logger = LoggerFactory.getLogger(clazz)
 
-    private companion object {
-        const val REQUEST_ID_HEADER = "X-Request-ID"
-        const val REQUEST_ID_CONTEXT_KEY = "requestId"
+    companion object {
+        private const val REQUEST_ID_HEADER = "X-Request-ID"
+        private const val REQUEST_ID_CONTEXT_KEY = "requestId"
+        private val TOTAL_MODES = listOf("exact", "estimated", "none")
+        private const val READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+        private const val READ_CONSISTENCY_PRIMARY = "primary"
+        private const val ETAG_HEADER = "ETag"
+        private const val IF_NONE_MATCH_HEADER = "If-None-Match"
+        private const val CACHE_CONTROL_HEADER = "Cache-Control"
+        private const val CACHE_CONTROL_REVALIDATE = "no-cache"
+        private const val ETAG_CONTEXT_KEY = "etag"
+
+        // The request's X-Request-ID, or a generated one, fixed for the rest of the request. It also serves as
+        // the trace id, so the HTTP server resolves it up front for sampled requests.
+        fun resolveRequestId(context: RoutingContext): String {
+            val existingRequestId = context.get<String>(REQUEST_ID_CONTEXT_KEY)
+            if (!existingRequestId.isNullOrBlank()) {
+                return existingRequestId
+            }
+
+            val requestId = context.request()?.getHeader(REQUEST_ID_HEADER)?.trim().orEmpty().ifBlank {
+                RequestIds.next()
+            }
+            context.put(REQUEST_ID_CONTEXT_KEY, requestId)
+            return requestId
+        }
     }
 
-    protected data class ListQueryParams(val page: Int, val size: Int, val sort: String)
+    protected data class ListQueryParams(
+        val page: Int,
+        val size: Int,
+        val sort: String,
+        val cursor: String?,
+        val totalMode: String
+    )
 
     protected fun putResponse(context: RoutingContext, statusCode: Int, response: JsonObject) {
         val requestId = resolveRequestId(context)
         context.response().statusCode = statusCode
         context.response().putHeader("Content-Type", "application/json")
         context.response().putHeader(REQUEST_ID_HEADER, requestId)
+        val etag = context.get<String>(ETAG_CONTEXT_KEY)
+        if (statusCode == 200 && etag != null) {
+            context.response().putHeader(ETAG_HEADER, etag)
+            context.response().putHeader(CACHE_CONTROL_HEADER, CACHE_CONTROL_REVALIDATE)
+        }
         context.response().end(response.encode())
     }
 
-    private fun resolveRequestId(context: RoutingContext): String {
-        val existingRequestId = context.get<String>(REQUEST_ID_CONTEXT_KEY)
-        if (!existingRequestId.isNullOrBlank()) {
-            return existingRequestId
-        }
+    // Conditional GET for read handlers that can name a data version. The ETag covers that version and
+    // the request path and query, so a matching If-None-Match is answered with 304 before any rows are
+    // read. When the version lookup fails the request is served normally, just without an ETag.
+    protected fun withConditionalGet(context: RoutingContext, version: Future<String>, onModified: () -> Unit) {
+        version
+            .onSuccess { value ->
+                val etag = entityTag(context, value)
+                if (ifNoneMatch(context, etag)) {
+                    context.response().statusCode = 304
+                    context.response().putHeader(REQUEST_ID_HEADER, resolveRequestId(context))
+                    context.response().putHeader(ETAG_HEADER, etag)
+                    context.response().putHeader(CACHE_CONTROL_HEADER, CACHE_CONTROL_REVALIDATE)
+                    context.response().end()
+                } else {
+                    context.put(ETAG_CONTEXT_KEY, etag)
+                    onModified()
+                }
+            }
+            .onFailure { error ->
+                logger.warn("Serving without ETag, version lookup failed: ${error.message}")
+                onModified()
+            }
+    }
 
-        val requestId = context.request()?.getHeader(REQUEST_ID_HEADER)?.trim().orEmpty().ifBlank {
-            UUID.randomUUID().toString()
-        }
-        context.put(REQUEST_ID_CONTEXT_KEY, requestId)
-        return requestId
+    private fun entityTag(context: RoutingContext, version: String): String {
+        val request = context.request()
+        val shape = "$version|${request.path()}|${request.query().orEmpty()}"
+        val digest = MessageDigest.getInstance("SHA-256").digest(shape.toByteArray(Charsets.UTF_8))
+        return "\"" + digest.take(16).joinToString("") { "%02x".format(it) } + "\""
     }
 
+    private fun ifNoneMatch(context: RoutingContext, etag: String): Boolean {
+        val header = context.request().getHeader(IF_NONE_MATCH_HEADER) ?: return false
+        return header.split(",")
+            .map { it.trim().removePrefix("W/") }
+            .any { it == etag || it == "*" }
+    }
+
+    // For handlers that stream their own body instead of going through putResponse.
+    protected fun putRequestIdHeader(context: RoutingContext) {
+        context.response().putHeader(REQUEST_ID_HEADER, resolveRequestId(context))
+    }
+
+    // Requests are logged once, when the response ends, by the HTTP server's access log; handlers only leave
+    // the error details of an error response on the context for it.
     protected fun putSuccessResponse(context: RoutingContext, statusCode: Int, data: JsonObject) {
-        logSuccess(context, statusCode)
         putResponse(context, statusCode, JsonObject().put("data", data))
     }
 
     protected fun putSuccessEnvelopeResponse(context: RoutingContext, statusCode: Int, response: JsonObject) {
-        logSuccess(context, statusCode)
         putResponse(context, statusCode, response)
     }
 
-    private fun logSuccess(context: RoutingContext, statusCode: Int) {
-        val id = UUID.randomUUID().toString()
-        val method = context.request()?.method()?.name() ?: "-"
-        val path = context.request()?.path() ?: "-"
-        val requestId = resolveRequestId(context)
-        logger.info("Handling id=$id status=$statusCode method=$method path=$path requestId=$requestId")
-    }
-
     protected fun putErrorResponse(
         context: RoutingContext,
         statusCode: Int,
         message: String?,
         errorCode: String = ErrorCodes.fromStatus(statusCode)
     ) {
-        val errorId = UUID.randomUUID().toString()
-        val method = context.request()?.method()?.name() ?: "-"
-        val path = context.request()?.path() ?: "-"
-        val requestId = resolveRequestId(context)
-        logger.warn("Handling errorId=$errorId errorCode=$errorCode status=$statusCode method=$method path=$path requestId=$requestId message=${message ?: "-"}")
+        val errorId = RequestIds.next()
+        context.put(AccessLog.ERROR_CONTEXT_KEY, AccessLog.ErrorDetail(errorId, errorCode, message))
 
         val errorResponse = JsonObject()
             .put("error", message)
@@ -77,6 +135,7 @@ open class BaseHandler(clazz: Class<*>) {
         putResponse(context, statusCode, errorResponse)
     }
 
+    // Unexpected failures still log their stack trace here; the access log only carries the summary.
     protected fun putErrorResponse(
         context: RoutingContext,
         statusCode: Int,
@@ -84,13 +143,11 @@ open class BaseHandler(clazz: Class<*>) {
         throwable: Throwable,
         errorCode: String = ErrorCodes.fromStatus(statusCode)
     ) {
-        val errorId = UUID.randomUUID().toString()
-        val method = context.request()?.method()?.name() ?: "-"
-        val path = context.request()?.path() ?: "-"
-        val requestId = resolveRequestId(context)
-        logger.error("Unhandled exception errorId=$errorId errorCode=$errorCode status=$statusCode method=$method path=$path requestId=$requestId message=${message ?: "-"}", throwable)
-
+        val errorId = RequestIds.next()
         val resolvedMessage = message ?: throwable.message ?: "Internal server error"
+        context.put(AccessLog.ERROR_CONTEXT_KEY, AccessLog.ErrorDetail(errorId, errorCode, resolvedMessage))
+        logger.error("Unhandled exception errorId=$errorId errorCode=$errorCode requestId=${resolveRequestId(context)}", throwable)
+
         val errorResponse = JsonObject()
             .put("error", resolvedMessage)
             .put("errorCode", errorCode)
@@ -156,8 +213,25 @@ open class BaseHandler(clazz: Class<*>) {
         val page = parseBoundedIntQueryParam(context, "page", 0, 0, null) ?: return null
         val size = parseBoundedIntQueryParam(context, "size", 20, 1, 100) ?: return null
         val sort = parseSortQueryParam(context, defaultSort, allowedSortFields) ?: return null
+        val cursor = context.queryParam("cursor").firstOrNull()?.trim()?.takeIf { it.isNotEmpty() }
+        val totalMode = parseTotalModeQueryParam(context) ?: return null
+
+        return ListQueryParams(page, size, sort, cursor, totalMode)
+    }
+
+    protected fun parseTotalModeQueryParam(context: RoutingContext): String? {
+        val rawValue = context.queryParam("totalMode").firstOrNull()?.trim()?.lowercase() ?: return TOTAL_MODES.first()
+        if (rawValue !in TOTAL_MODES) {
+            putErrorResponse(context, 400, "totalMode must be one of: ${TOTAL_MODES.joinToString(", ")}")
+            return null
+        }
+
+        return rawValue
+    }
 
-        return ListQueryParams(page, size, sort)
+    // Clients send X-Read-Consistency: primary right after a command to read their own writes.
+    protected fun readPrimary(context: RoutingContext): Boolean {
+        return context.request().getHeader(READ_CONSISTENCY_HEADER)?.trim().equals(READ_CONSISTENCY_PRIMARY, ignoreCase = true)
     }
 
     protected fun parseBooleanQueryParam(
@@ -176,7 +250,35 @@ open class BaseHandler(clazz: Class<*>) {
         }
     }
 
-    private fun parseBoundedIntQueryParam(
+    // from/to query parameters as ISO-8601 dates (start of day) or local date-times, with from before to.
+    // Either may be absent; null means the 400 response has already been sent.
+    protected fun parseDateRangeQueryParams(context: RoutingContext): Pair<LocalDateTime?, LocalDateTime?>? {
+        val from = parseDateTimeQueryParam(context, "from") ?: return null
+        val to = parseDateTimeQueryParam(context, "to") ?: return null
+        if (from.value != null && to.value != null && !from.value.isBefore(to.value)) {
+            putErrorResponse(context, 400, "from must be before to")
+            return null
+        }
+
+        return from.value to to.value
+    }
+
+    private class OptionalDateTime(val value: LocalDateTime?)
+
+    private fun parseDateTimeQueryParam(context: RoutingContext, name: String): OptionalDateTime? {
+        val rawValue = context.queryParam(name).firstOrNull()?.trim()?.takeIf { it.isNotEmpty() } ?: return OptionalDateTime(null)
+        val parsed = runCatching { LocalDateTime.parse(rawValue) }
+            .recoverCatching { LocalDate.parse(rawValue).atStartOfDay() }
+            .getOrNull()
+        if (parsed == null) {
+            putErrorResponse(context, 400, "$name must be an ISO-8601 date or date-time")
+            return null
+        }
+
+        return OptionalDateTime(parsed)
+    }
+
+    protected fun parseBoundedIntQueryParam(
         context: RoutingContext,
         name: String,
         defaultValue: Int,
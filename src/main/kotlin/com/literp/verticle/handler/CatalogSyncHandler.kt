@@ -0,0 +1,21 @@
+package com.literp.verticle.handler
+
+import com.literp.service.master.CatalogSyncService
+import io.vertx.rxjava3.ext.web.RoutingContext
+
+class CatalogSyncHandler(private val syncService: CatalogSyncService) : BaseHandler(CatalogSyncHandler::class.java) {
+
+    fun syncCatalog(context: RoutingContext) {
+        val since = context.queryParam("since").firstOrNull()?.trim()?.takeIf { it.isNotEmpty() }
+
+        syncService.syncCatalog(since)
+            .onSuccess { result -> putSuccessResponse(context, 200, result) }
+            .onFailure { error ->
+                putMappedErrorResponse(
+                    context = context,
+                    error = error,
+                    internalErrorMessage = "Failed to sync catalog"
+                )
+            }
+    }
+}
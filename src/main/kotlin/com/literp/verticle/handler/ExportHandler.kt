@@ -0,0 +1,153 @@
+package com.literp.verticle.handler
+
+import com.literp.repository.ExportRepository
+import io.reactivex.rxjava3.core.Flowable
+import io.reactivex.rxjava3.core.FlowableSubscriber
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import io.vertx.rxjava3.ext.web.RoutingContext
+import org.reactivestreams.Subscription
+
+// Streaming exports for warehouse loads. These read the repository directly rather than through a service:
+// the event-bus proxies can only return a whole JsonObject, which is exactly what an export must not build.
+class ExportHandler(private val exportRepository: ExportRepository) : BaseHandler(ExportHandler::class.java) {
+
+    private companion object {
+        val FORMATS = listOf("ndjson", "csv")
+        const val NDJSON_CONTENT_TYPE = "application/x-ndjson"
+        const val CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+
+        // Rows joined into one response write; the cursor itself fetches STREAM_FETCH_SIZE rows at a time.
+        const val WRITE_BATCH_SIZE = 100
+    }
+
+    fun exportSalesOrders(context: RoutingContext) {
+        val format = parseFormatQueryParam(context) ?: return
+        val (from, to) = parseDateRangeQueryParams(context) ?: return
+
+        stream(
+            context = context,
+            rows = exportRepository.streamSalesOrders(from, to, readPrimary(context)),
+            format = format,
+            columns = ExportRepository.SALES_ORDER_COLUMNS,
+            fileName = "sales-orders",
+            internalErrorMessage = "Failed to export sales orders"
+        )
+    }
+
+    fun exportProducts(context: RoutingContext) {
+        val format = parseFormatQueryParam(context) ?: return
+
+        stream(
+            context = context,
+            rows = exportRepository.streamProducts(readPrimary(context)),
+            format = format,
+            columns = ExportRepository.PRODUCT_COLUMNS,
+            fileName = "products",
+            internalErrorMessage = "Failed to export products"
+        )
+    }
+
+    // Pulls one batch at a time and only asks for the next once the previous write is accepted; when the
+    // socket falls behind, the next request waits for drainHandler. Memory stays at one fetch plus one
+    // batch however large the export is. Headers go out with the first write, so a query that fails up
+    // front still gets a normal JSON error; a failure mid-stream can only reset the response.
+    private fun stream(
+        context: RoutingContext,
+        rows: Flowable<JsonObject>,
+        format: String,
+        columns: List<String>,
+        fileName: String,
+        internalErrorMessage: String
+    ) {
+        val response = context.response()
+        val startedAt = System.nanoTime()
+        var started = false
+        var rowCount = 0L
+
+        fun start() {
+            if (started) {
+                return
+            }
+            started = true
+            response.setChunked(true)
+            response.putHeader("Content-Type", if (format == "csv") CSV_CONTENT_TYPE else NDJSON_CONTENT_TYPE)
+            response.putHeader("Content-Disposition", "attachment; filename=\"$fileName.$format\"")
+            putRequestIdHeader(context)
+            if (format == "csv") {
+                response.write(csvLine(columns))
+            }
+        }
+
+        rows
+            .map { row ->
+                rowCount++
+                if (format == "csv") csvLine(columns.map { row.getValue(it) }) else row.encode() + "\n"
+            }
+            .buffer(WRITE_BATCH_SIZE)
+            .map { lines -> lines.joinToString("") }
+            .subscribe(object : FlowableSubscriber<String> {
+                private lateinit var subscription: Subscription
+
+                override fun onSubscribe(subscription: Subscription) {
+                    this.subscription = subscription
+                    response.closeHandler { subscription.cancel() }
+                    subscription.request(1)
+                }
+
+                override fun onNext(chunk: String) {
+                    start()
+                    response.write(chunk)
+                    if (response.writeQueueFull()) {
+                        response.drainHandler { subscription.request(1) }
+                    } else {
+                        subscription.request(1)
+                    }
+                }
+
+                override fun onError(error: Throwable) {
+                    if (!started) {
+                        putMappedErrorResponse(context, error, internalErrorMessage)
+                    } else {
+                        logger.error("$internalErrorMessage after $rowCount rows, resetting the response", error)
+                        response.reset()
+                    }
+                }
+
+                override fun onComplete() {
+                    start()
+                    response.end()
+                    val elapsedMillis = (System.nanoTime() - startedAt) / 1_000_000
+                    logger.info("Exported rows=$rowCount format=$format file=$fileName elapsedMillis=$elapsedMillis")
+                }
+            })
+    }
+
+    private fun parseFormatQueryParam(context: RoutingContext): String? {
+        val rawValue = context.queryParam("format").firstOrNull()?.trim()?.lowercase() ?: return FORMATS.first()
+        if (rawValue !in FORMATS) {
+            putErrorResponse(context, 400, "format must be one of: ${FORMATS.joinToString(", ")}")
+            return null
+        }
+
+        return rawValue
+    }
+
+    // RFC 4180: fields holding a comma, quote or line break are quoted with inner quotes doubled; nulls are empty
+    // and nested JSON is written as its encoded text.
+    private fun csvLine(values: List<Any?>): String {
+        return values.joinToString(",", postfix = "\r\n") { value ->
+            val text = when (value) {
+                null -> ""
+                is JsonObject -> value.encode()
+                is JsonArray -> value.encode()
+                else -> value.toString()
+            }
+            if (text.any { it == ',' || it == '"' || it == '\n' || it == '\r' }) {
+                "\"" + text.replace("\"", "\"\"") + "\""
+            } else {
+                text
+            }
+        }
+    }
+}
@@ -14,11 +14,20 @@ class LocationHandler(private val locationService: LocationService) : BaseHandle
         val code = context.queryParam("code").firstOrNull()
         val name = context.queryParam("name").firstOrNull()
         val locationType = context.queryParam("locationType").firstOrNull()
+        val q = context.queryParam("q").firstOrNull()
         val activeOnly = parseBooleanQueryParam(context, "activeOnly", true) ?: return
 
-        locationService.listLocations(query.page, query.size, query.sort, code, name, locationType, activeOnly)
-            .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
-            .onFailure { error -> putErrorResponse(context, 500, "Failed to list locations: ${error.message}", error) }
+        withConditionalGet(context, locationService.getLocationListVersion(readPrimary(context))) {
+            locationService.listLocations(query.page, query.size, query.sort, code, name, locationType, q, activeOnly, query.cursor, query.totalMode, readPrimary(context))
+                .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
+                .onFailure { error ->
+                    putMappedErrorResponse(
+                        context = context,
+                        error = error,
+                        internalErrorMessage = "Failed to list locations"
+                    )
+                }
+        }
     }
 
     fun createLocation(context: RoutingContext) {
@@ -58,7 +67,7 @@ class LocationHandler(private val locationService: LocationService) : BaseHandle
     fun getLocation(context: RoutingContext) {
         val locationId = context.pathParam("locationId")
 
-        locationService.getLocation(locationId)
+        locationService.getLocation(locationId, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -73,7 +82,7 @@ class LocationHandler(private val locationService: LocationService) : BaseHandle
     fun getLocationByCode(context: RoutingContext) {
         val code = context.pathParam("code")
 
-        locationService.getLocationByCode(code)
+        locationService.getLocationByCode(code, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -16,8 +16,10 @@ class OrderProcessHandler(
         val status = context.queryParam("status").firstOrNull()
         val salesChannel = context.queryParam("salesChannel").firstOrNull()
         val locationId = context.queryParam("locationId").firstOrNull()
+        val cursor = context.queryParam("cursor").firstOrNull()
+        val totalMode = parseTotalModeQueryParam(context) ?: return
 
-        orderService.listSalesOrders(page, size, sort, status, salesChannel, locationId)
+        orderService.listSalesOrders(page, size, sort, status, salesChannel, locationId, cursor, totalMode, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -56,7 +58,7 @@ class OrderProcessHandler(
 
     fun getSalesOrder(context: RoutingContext) {
         val orderId = context.pathParam("salesOrderId")
-        orderService.getSalesOrder(orderId)
+        orderService.getSalesOrder(orderId, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -77,7 +79,7 @@ class OrderProcessHandler(
             return
         }
 
-        orderService.getCurrentStock(productId, locationId)
+        orderService.getCurrentStock(productId, locationId, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -97,7 +99,7 @@ class OrderProcessHandler(
             return
         }
 
-        orderService.getAvailableStock(productId, locationId)
+        orderService.getAvailableStock(productId, locationId, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -108,6 +110,30 @@ class OrderProcessHandler(
             }
     }
 
+    fun listInventoryMovements(context: RoutingContext) {
+        val productId = context.queryParam("productId").firstOrNull()?.trim()
+        val locationId = context.queryParam("locationId").firstOrNull()?.trim()
+
+        if (productId.isNullOrBlank() || locationId.isNullOrBlank()) {
+            putErrorResponse(context, 400, "productId and locationId are required")
+            return
+        }
+
+        val (from, to) = parseDateRangeQueryParams(context) ?: return
+        val size = parseBoundedIntQueryParam(context, "size", 100, 1, 500) ?: return
+        val cursor = context.queryParam("cursor").firstOrNull()?.trim()?.takeIf { it.isNotEmpty() }
+
+        orderService.listInventoryMovements(productId, locationId, from?.toString(), to?.toString(), size, cursor, readPrimary(context))
+            .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
+            .onFailure { error ->
+                putMappedErrorResponse(
+                    context = context,
+                    error = error,
+                    internalErrorMessage = "Failed to list inventory movements"
+                )
+            }
+    }
+
     fun addSalesOrderLine(context: RoutingContext) {
         val orderId = context.pathParam("salesOrderId")
         val validatedRequest: ValidatedRequest = context.get(RouterBuilder.KEY_META_DATA_VALIDATED_REQUEST)
@@ -4,7 +4,10 @@ import com.literp.common.ErrorCodes
 import com.literp.service.master.ProductService
 import com.literp.service.master.ProductVariantService
 import io.vertx.core.Future
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
 import io.vertx.openapi.validation.ValidatedRequest
+import io.vertx.rxjava3.core.parsetools.RecordParser
 import io.vertx.rxjava3.ext.web.RoutingContext
 import io.vertx.rxjava3.ext.web.openapi.router.RouterBuilder
 
@@ -17,11 +20,20 @@ class ProductHandler(
         val query = parseListQuery(context, "sku,asc", PRODUCT_SORT_FIELDS) ?: return
         val sku = context.queryParam("sku").firstOrNull()
         val productType = context.queryParam("productType").firstOrNull()
+        val q = context.queryParam("q").firstOrNull()
         val activeOnly = parseBooleanQueryParam(context, "activeOnly", true) ?: return
 
-        productService.listProducts(query.page, query.size, query.sort, sku, productType, activeOnly)
-            .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
-            .onFailure { error -> putErrorResponse(context, 500, "Failed to list products: ${error.message}", error) }
+        withConditionalGet(context, productService.getProductListVersion(readPrimary(context))) {
+            productService.listProducts(query.page, query.size, query.sort, sku, productType, q, activeOnly, query.cursor, query.totalMode, readPrimary(context))
+                .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
+                .onFailure { error ->
+                    putMappedErrorResponse(
+                        context = context,
+                        error = error,
+                        internalErrorMessage = "Failed to list products"
+                    )
+                }
+        }
     }
 
     fun createProduct(context: RoutingContext) {
@@ -62,7 +74,7 @@ class ProductHandler(
         val productId = context.pathParam("productId")
         val includeVariants = parseBooleanQueryParam(context, "includeVariants", false) ?: return
 
-        productService.getProduct(productId, includeVariants)
+        productService.getProduct(productId, includeVariants, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -74,6 +86,21 @@ class ProductHandler(
             }
     }
 
+    fun getProductBySku(context: RoutingContext) {
+        val sku = context.pathParam("sku")
+
+        productService.getProductBySku(sku)
+            .onSuccess { result -> putSuccessResponse(context, 200, result) }
+            .onFailure { error ->
+                putMappedErrorResponse(
+                    context = context,
+                    error = error,
+                    internalErrorMessage = "Failed to look up SKU",
+                    notFoundMessage = "No active product or variant has this SKU"
+                )
+            }
+    }
+
     fun updateProduct(context: RoutingContext) {
         val productId = context.pathParam("productId")
         val validatedRequest: ValidatedRequest = context.get(RouterBuilder.KEY_META_DATA_VALIDATED_REQUEST)
@@ -116,21 +143,186 @@ class ProductHandler(
             }
     }
 
-    fun listProductVariants(context: RoutingContext) {
-        val productId = context.pathParam("productId")
-        val query = parseListQuery(context, "sku,asc", VARIANT_SORT_FIELDS) ?: return
-        val activeOnly = parseBooleanQueryParam(context, "activeOnly", true) ?: return
+    fun bulkUpsertProducts(context: RoutingContext) {
+        val validatedRequest: ValidatedRequest = context.get(RouterBuilder.KEY_META_DATA_VALIDATED_REQUEST)
+        val rows = validatedRequest.body.jsonArray
+        val upsert = BulkUpsert()
 
-        variantService.listProductVariants(productId, query.page, query.size, query.sort, activeOnly)
-            .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
+        (0 until rows.size()).map { index -> rows.getValue(index) }
+            .chunked(BULK_UPSERT_CHUNK_SIZE)
+            .fold(Future.succeededFuture<Void>()) { previous, chunk -> previous.compose { upsert.write(JsonArray(chunk)) } }
+            .onSuccess { putSuccessResponse(context, 200, upsert.result()) }
             .onFailure { error ->
                 putMappedErrorResponse(
                     context = context,
                     error = error,
-                    internalErrorMessage = "Failed to list product variants",
-                    notFoundMessage = "Product or variant not found"
+                    internalErrorMessage = "Failed to bulk upsert products"
+                )
+            }
+    }
+
+    // NDJSON bodies are parsed line by line as they arrive. The request is paused while each chunk is written,
+    // so an upload of any size holds one chunk in memory instead of the whole body. Blank lines are skipped.
+    // If the body fails to read, chunks not yet written are dropped and the request is answered with the error;
+    // chunks that already committed stay written.
+    fun bulkUpsertProductsNdjson(context: RoutingContext) {
+        val upsert = BulkUpsert()
+        val pending = mutableListOf<Any>()
+        var writes = Future.succeededFuture<Void>()
+        var readError: Throwable? = null
+        val parser = RecordParser.newDelimited("\n", context.request())
+
+        fun flush() {
+            if (pending.isNotEmpty()) {
+                val chunk = JsonArray(pending.toMutableList())
+                pending.clear()
+                writes = writes.compose { readError?.let { Future.failedFuture<Void>(it) } ?: upsert.write(chunk) }
+            }
+        }
+
+        parser.handler { line ->
+            val text = line.toString().trim()
+            if (text.isEmpty() || readError != null) {
+                return@handler
+            }
+            // A line that is not a JSON object stays in the chunk and is reported as a failed row.
+            pending += try {
+                JsonObject(text)
+            } catch (_: Exception) {
+                text
+            }
+            if (pending.size >= BULK_UPSERT_CHUNK_SIZE) {
+                parser.pause()
+                flush()
+                writes.onComplete {
+                    if (readError == null) {
+                        parser.resume()
+                    }
+                }
+            }
+        }
+        parser.exceptionHandler { error ->
+            if (readError != null) {
+                return@exceptionHandler
+            }
+            readError = error
+            pending.clear()
+            writes.onComplete {
+                if (!context.response().ended() && !context.response().closed()) {
+                    putMappedErrorResponse(
+                        context = context,
+                        error = error,
+                        internalErrorMessage = "Failed to read NDJSON bulk upsert body"
+                    )
+                }
+            }
+        }
+        parser.endHandler {
+            if (readError != null) {
+                return@endHandler
+            }
+            flush()
+            writes
+                .onSuccess { putSuccessResponse(context, 200, upsert.result()) }
+                .onFailure { error ->
+                    putMappedErrorResponse(
+                        context = context,
+                        error = error,
+                        internalErrorMessage = "Failed to bulk upsert products"
+                    )
+                }
+        }
+    }
+
+    // Collects per-row results across chunks, with each chunk's indexes shifted to positions in the whole request.
+    // Chunks commit one by one, so once a chunk fails after others committed, its rows and every later row are
+    // reported FAILED without being written and the committed rows keep their results. A failure before anything
+    // committed fails the request instead.
+    private inner class BulkUpsert {
+        private val startedAt = System.nanoTime()
+        private val results = JsonArray()
+        private val counts = mutableMapOf<String, Int>()
+        private var failed = false
+
+        fun write(chunk: JsonArray): Future<Void> {
+            if (failed) {
+                addFailed(chunk, "not written because an earlier chunk failed")
+                return Future.succeededFuture()
+            }
+            val offset = results.size()
+            return productService.bulkUpsertProducts(chunk)
+                .map { response ->
+                    response.getJsonArray("results").filterIsInstance<JsonObject>().forEach { result ->
+                        result.put("index", offset + result.getInteger("index"))
+                        add(result)
+                    }
+                    response
+                }
+                .mapEmpty<Void>()
+                .recover { error ->
+                    if (results.isEmpty) {
+                        Future.failedFuture(error)
+                    } else {
+                        failed = true
+                        addFailed(chunk, "chunk rolled back: ${error.message}")
+                        Future.succeededFuture()
+                    }
+                }
+        }
+
+        private fun addFailed(chunk: JsonArray, error: String) {
+            val offset = results.size()
+            for (index in 0 until chunk.size()) {
+                val row = chunk.getValue(index) as? JsonObject
+                add(
+                    JsonObject()
+                        .put("index", offset + index)
+                        .put("sku", row?.getValue("sku") as? String)
+                        .put("type", if (row?.containsKey("productSku") == true) "VARIANT" else "PRODUCT")
+                        .put("status", "FAILED")
+                        .putNull("id")
+                        .put("error", error)
                 )
             }
+        }
+
+        private fun add(result: JsonObject) {
+            counts.merge(result.getString("status"), 1, Int::plus)
+            results.add(result)
+        }
+
+        fun result(): JsonObject {
+            val elapsedNanos = maxOf(System.nanoTime() - startedAt, 1L)
+            val summary = JsonObject()
+                .put("received", results.size())
+                .put("created", counts["CREATED"] ?: 0)
+                .put("updated", counts["UPDATED"] ?: 0)
+                .put("failed", counts["FAILED"] ?: 0)
+                .put("elapsedMillis", elapsedNanos / 1_000_000)
+                .put("rowsPerSecond", results.size() * 1_000_000_000L / elapsedNanos)
+            return JsonObject()
+                .put("summary", summary)
+                .put("results", results)
+        }
+    }
+
+    fun listProductVariants(context: RoutingContext) {
+        val productId = context.pathParam("productId")
+        val query = parseListQuery(context, "sku,asc", VARIANT_SORT_FIELDS) ?: return
+        val activeOnly = parseBooleanQueryParam(context, "activeOnly", true) ?: return
+
+        withConditionalGet(context, variantService.getProductVariantListVersion(readPrimary(context))) {
+            variantService.listProductVariants(productId, query.page, query.size, query.sort, activeOnly, query.cursor, query.totalMode, readPrimary(context))
+                .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
+                .onFailure { error ->
+                    putMappedErrorResponse(
+                        context = context,
+                        error = error,
+                        internalErrorMessage = "Failed to list product variants",
+                        notFoundMessage = "Product or variant not found"
+                    )
+                }
+        }
     }
 
     fun createProductVariant(context: RoutingContext) {
@@ -171,7 +363,7 @@ class ProductHandler(
         val productId = context.pathParam("productId")
         val variantId = context.pathParam("variantId")
 
-        variantService.getProductVariant(productId, variantId)
+        variantService.getProductVariant(productId, variantId, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
@@ -226,6 +418,9 @@ class ProductHandler(
     }
 
     private companion object {
+        // Rows per transaction and per multi-row INSERT; also the NDJSON read-ahead before the request is paused.
+        private const val BULK_UPSERT_CHUNK_SIZE = 500
+
         private val PRODUCT_SORT_FIELDS = setOf(
             "sku",
             "name",
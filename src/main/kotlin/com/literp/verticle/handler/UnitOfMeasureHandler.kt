@@ -12,9 +12,11 @@ class UnitOfMeasureHandler(private val uomService: UnitOfMeasureService) : BaseH
     fun listUnitOfMeasures(context: RoutingContext) {
         val query = parseListQuery(context, "code,asc", SORT_FIELDS) ?: return
 
-        uomService.listUnitOfMeasures(query.page, query.size, query.sort)
-            .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
-            .onFailure { error -> putErrorResponse(context, 500, "Failed to list UOM: ${error.message}", error) }
+        withConditionalGet(context, uomService.getUnitOfMeasureListVersion(readPrimary(context))) {
+            uomService.listUnitOfMeasures(query.page, query.size, query.sort, query.totalMode, readPrimary(context))
+                .onSuccess { result -> putSuccessEnvelopeResponse(context, 200, result) }
+                .onFailure { error -> putErrorResponse(context, 500, "Failed to list UOM: ${error.message}", error) }
+        }
     }
 
     fun createUnitOfMeasure(context: RoutingContext) {
@@ -51,7 +53,7 @@ class UnitOfMeasureHandler(private val uomService: UnitOfMeasureService) : BaseH
     fun getUnitOfMeasure(context: RoutingContext) {
         val uomId = context.pathParam("uomId")
 
-        uomService.getUnitOfMeasure(uomId)
+        uomService.getUnitOfMeasure(uomId, readPrimary(context))
             .onSuccess { result -> putSuccessResponse(context, 200, result) }
             .onFailure { error ->
                 putMappedErrorResponse(
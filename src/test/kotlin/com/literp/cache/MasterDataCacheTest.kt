@@ -0,0 +1,114 @@
+package com.literp.cache
+
+import io.reactivex.rxjava3.core.Single
+import io.reactivex.rxjava3.subjects.SingleSubject
+import io.vertx.core.Vertx
+import io.vertx.core.json.JsonObject
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertTrue
+
+class MasterDataCacheTest {
+    @Test
+    fun repeatedReadsHitAndReturnCopies() {
+        val cache = MasterDataCache(maxEntries = 10, ttlMillis = 60_000)
+        var loads = 0
+        val loader = { _: Boolean ->
+            loads++
+            Single.just(JsonObject().put("sku", "SKU-1"))
+        }
+
+        cache.getOrLoad(MasterDataCache.PRODUCT, "get:1", false, loader).blockingGet()
+        val cached = cache.getOrLoad(MasterDataCache.PRODUCT, "get:1", false, loader).blockingGet()
+        cached.put("sku", "changed")
+
+        assertEquals("SKU-1", cache.getOrLoad(MasterDataCache.PRODUCT, "get:1", false, loader).blockingGet().getString("sku"))
+        assertEquals(1, loads)
+        val snapshot = cache.snapshot()
+        assertEquals(2L, snapshot.getLong("hits"))
+        assertEquals(1L, snapshot.getLong("misses"))
+    }
+
+    @Test
+    fun leastRecentlyUsedEntryIsEvictedAndExpiredEntriesReload() {
+        var now = 0L
+        val cache = MasterDataCache(maxEntries = 2, ttlMillis = 1_000, clock = { now })
+        var loads = 0
+        val loader = { _: Boolean ->
+            loads++
+            Single.just(JsonObject())
+        }
+
+        cache.getOrLoad(MasterDataCache.UOM, "a", false, loader).blockingGet()
+        cache.getOrLoad(MasterDataCache.UOM, "b", false, loader).blockingGet()
+        cache.getOrLoad(MasterDataCache.UOM, "a", false, loader).blockingGet()
+        cache.getOrLoad(MasterDataCache.UOM, "c", false, loader).blockingGet()
+        cache.getOrLoad(MasterDataCache.UOM, "a", false, loader).blockingGet()
+        assertEquals(3, loads)
+        assertEquals(1L, cache.snapshot().getLong("evictions"))
+
+        now = 1_000
+        cache.getOrLoad(MasterDataCache.UOM, "a", false, loader).blockingGet()
+        assertEquals(4, loads)
+        assertEquals(1L, cache.snapshot().getLong("expirations"))
+    }
+
+    @Test
+    fun writesDropTheirRegionAndDiscardLoadsStartedBefore() {
+        val cache = MasterDataCache(maxEntries = 10, ttlMillis = 60_000)
+        cache.getOrLoad(MasterDataCache.LOCATION, "get:1", false) { Single.just(JsonObject()) }.blockingGet()
+        cache.getOrLoad(MasterDataCache.UOM, "get:1", false) { Single.just(JsonObject()) }.blockingGet()
+
+        val inFlight = SingleSubject.create<JsonObject>()
+        val pending = cache.getOrLoad(MasterDataCache.LOCATION, "get:2", false) { inFlight }.test()
+        cache.invalidate(MasterDataCache.LOCATION)
+        inFlight.onSuccess(JsonObject().put("name", "stale"))
+        pending.assertValueCount(1)
+
+        assertEquals(1, cache.snapshot().getInteger("size"))
+        var reloaded = false
+        cache.getOrLoad(MasterDataCache.LOCATION, "get:2", false) {
+            reloaded = true
+            Single.just(JsonObject())
+        }.blockingGet()
+        assertTrue(reloaded)
+    }
+
+    @Test
+    fun missesLoadFromThePrimaryOnlyWhileCaching() {
+        val cache = MasterDataCache(maxEntries = 10, ttlMillis = 60_000)
+        val requested = mutableListOf<Boolean>()
+        val loader = { readPrimary: Boolean ->
+            requested += readPrimary
+            Single.just(JsonObject())
+        }
+
+        cache.getOrLoad(MasterDataCache.PRODUCT, "get:1", false, loader).blockingGet()
+        MasterDataCache.disabled().getOrLoad(MasterDataCache.PRODUCT, "get:1", false, loader).blockingGet()
+
+        assertEquals(listOf(true, false), requested)
+    }
+
+    @Test
+    fun invalidationsPublishedByOneCacheReachTheOthers() {
+        val vertx = Vertx.vertx()
+        try {
+            val writer = MasterDataCache(maxEntries = 10, ttlMillis = 60_000)
+            val reader = MasterDataCache(maxEntries = 10, ttlMillis = 60_000)
+            writer.bind(vertx)
+            reader.bind(vertx)
+            reader.getOrLoad(MasterDataCache.PRODUCT, "get:1", false) { Single.just(JsonObject()) }.blockingGet()
+
+            writer.invalidate(MasterDataCache.PRODUCT)
+
+            val deadline = System.currentTimeMillis() + 5_000
+            while (reader.snapshot().getInteger("size") != 0 && System.currentTimeMillis() < deadline) {
+                Thread.sleep(10)
+            }
+            assertEquals(0, reader.snapshot().getInteger("size"))
+            assertEquals(1L, reader.snapshot().getLong("invalidations"))
+        } finally {
+            vertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+}
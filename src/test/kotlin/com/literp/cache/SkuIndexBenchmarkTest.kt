@@ -0,0 +1,66 @@
+package com.literp.cache
+
+import io.reactivex.rxjava3.core.Single
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import java.time.LocalDateTime
+import kotlin.test.Test
+import kotlin.test.assertTrue
+import org.junit.jupiter.api.Tag
+
+// SKU lookups per second from a refreshed index against the database fallback of an index that was never
+// loaded. The loader is in memory, so the fallback figure is the index's own overhead, not a real round trip.
+// Report-only: run with ./gradlew benchmark.
+@Tag("benchmark")
+class SkuIndexBenchmarkTest {
+    @Test
+    fun indexedLookupsOutpaceDatabaseFallbacks() {
+        val rows = (0 until CATALOG_SIZE).associate { number -> "SKU-$number" to entry("SKU-$number", number % 2 == 0) }
+        val load = { _: LocalDateTime?, sku: String? ->
+            val entries = if (sku != null) listOfNotNull(rows[sku]) else rows.values.toList()
+            Single.just(
+                JsonObject()
+                    .put("entries", JsonArray(entries.map { it.copy() }))
+                    .put("loadedAt", LocalDateTime.of(2026, 1, 1, 0, 0).toString())
+            )
+        }
+        val indexed = SkuIndex(load).also { it.refresh() }
+        val unindexed = SkuIndex(load)
+
+        repeat(WARMUP_LOOKUPS) { number ->
+            indexed.lookup("SKU-${number % CATALOG_SIZE}").blockingGet()
+            unindexed.lookup("SKU-${number % CATALOG_SIZE}").blockingGet()
+        }
+        val indexedPerSecond = lookupsPerSecond(indexed)
+        val fallbackPerSecond = lookupsPerSecond(unindexed)
+
+        println(
+            "SKU lookup benchmark: catalog=$CATALOG_SIZE lookups=$MEASURED_LOOKUPS " +
+                "indexedPerSecond=$indexedPerSecond fallbackPerSecond=$fallbackPerSecond"
+        )
+        assertTrue(indexedPerSecond > 0 && fallbackPerSecond > 0)
+    }
+
+    private fun lookupsPerSecond(index: SkuIndex): Long {
+        val startedAt = System.nanoTime()
+        repeat(MEASURED_LOOKUPS) { number -> index.lookup("SKU-${(number * 7919) % CATALOG_SIZE}").blockingGet() }
+        val elapsedNanos = maxOf(System.nanoTime() - startedAt, 1L)
+        return MEASURED_LOOKUPS * 1_000_000_000L / elapsedNanos
+    }
+
+    private companion object {
+        const val CATALOG_SIZE = 10_000
+        const val WARMUP_LOOKUPS = 20_000
+        const val MEASURED_LOOKUPS = 200_000
+
+        fun entry(sku: String, variant: Boolean): JsonObject {
+            val product = JsonObject().put("productId", "product-$sku").put("sku", sku).put("active", true)
+            return JsonObject()
+                .put("sku", sku)
+                .put("matchType", if (variant) "VARIANT" else "PRODUCT")
+                .put("active", true)
+                .put("product", product)
+                .put("variant", if (variant) JsonObject().put("variantId", "variant-$sku").put("sku", sku).put("active", true) else null)
+        }
+    }
+}
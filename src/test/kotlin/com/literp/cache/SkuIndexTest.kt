@@ -0,0 +1,142 @@
+package com.literp.cache
+
+import com.literp.common.ErrorCodes
+import io.reactivex.rxjava3.core.Single
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import java.time.LocalDateTime
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFailsWith
+import kotlin.test.assertFalse
+import kotlin.test.assertNull
+import kotlin.test.assertTrue
+
+class SkuIndexTest {
+    // Stands in for ProductRepository.findSkuEntries over an in-memory catalog.
+    private class FakeCatalog {
+        val rows = linkedMapOf<String, JsonObject>()
+        val changed = mutableSetOf<String>()
+        var fullLoads = 0
+        var deltaLoads = 0
+        var skuReads = 0
+
+        fun load(changedAfter: LocalDateTime?, sku: String?): Single<JsonObject> {
+            val entries = when {
+                sku != null -> {
+                    skuReads++
+                    listOfNotNull(rows[sku])
+                }
+                changedAfter != null -> {
+                    deltaLoads++
+                    changed.mapNotNull { rows[it] }.also { changed.clear() }
+                }
+                else -> {
+                    fullLoads++
+                    rows.values.filter { it.getBoolean("active") }
+                }
+            }
+            return Single.just(
+                JsonObject()
+                    .put("entries", JsonArray(entries.map { it.copy() }))
+                    .put("loadedAt", LocalDateTime.of(2026, 1, 1, 0, 0).toString())
+            )
+        }
+
+        fun put(sku: String, active: Boolean = true, variantId: String? = null) {
+            rows[sku] = entry(sku, active, variantId)
+            changed += sku
+        }
+    }
+
+    @Test
+    fun loadedIndexAnswersWithoutTheDatabase() {
+        val catalog = FakeCatalog()
+        catalog.put("LATTE")
+        catalog.put("LATTE-HOT-M", variantId = "variant-1")
+        val index = SkuIndex(catalog::load)
+
+        index.refresh()
+
+        assertTrue(index.ready)
+        val variant = index.lookup("LATTE-HOT-M").blockingGet()
+        assertEquals("VARIANT", variant.getString("matchType"))
+        assertEquals("variant-1", variant.getJsonObject("variant").getString("variantId"))
+        assertFalse(variant.containsKey("active"))
+        assertNull(index.lookup("LATTE").blockingGet().getJsonObject("variant"))
+        assertEquals(0, catalog.skuReads)
+        assertEquals(2L, index.snapshot().getLong("hits"))
+    }
+
+    @Test
+    fun invalidationRefreshesChangedRowsAndDropsDeactivatedOnes() {
+        val catalog = FakeCatalog()
+        catalog.put("LATTE")
+        catalog.put("MOCHA")
+        val cache = MasterDataCache(maxEntries = 0, ttlMillis = 0)
+        val index = SkuIndex(catalog::load)
+        index.bind(cache)
+        index.refresh()
+
+        catalog.put("MOCHA", active = false)
+        catalog.put("FLAT-WHITE")
+        cache.invalidate(MasterDataCache.UOM)
+        assertEquals(0, catalog.deltaLoads)
+        cache.invalidate(MasterDataCache.PRODUCT)
+
+        assertEquals(1, catalog.fullLoads)
+        assertEquals(1, catalog.deltaLoads)
+        assertEquals("FLAT-WHITE", index.lookup("FLAT-WHITE").blockingGet().getString("sku"))
+        val error = assertFailsWith<Exception> { index.lookup("MOCHA").blockingGet() }
+        assertTrue(error.message.orEmpty().contains(ErrorCodes.fromStatus(404)))
+        assertEquals(2, index.snapshot().getInteger("size"))
+    }
+
+    @Test
+    fun staleOrMissingEntriesFallBackToTheDatabase() {
+        val catalog = FakeCatalog()
+        catalog.put("LATTE")
+        val index = SkuIndex(catalog::load)
+
+        // Never refreshed: every lookup is read from the database and nothing is kept.
+        assertEquals("LATTE", index.lookup("LATTE").blockingGet().getString("sku"))
+        assertEquals(1, catalog.skuReads)
+        assertEquals(0, index.snapshot().getInteger("size"))
+
+        index.refresh()
+        catalog.rows["ESPRESSO"] = entry("ESPRESSO", true, null)
+        assertEquals("ESPRESSO", index.lookup("ESPRESSO").blockingGet().getString("sku"))
+        index.lookup("ESPRESSO").blockingGet()
+        assertEquals(2, catalog.skuReads)
+        assertEquals(1L, index.snapshot().getLong("hits"))
+    }
+
+    @Test
+    fun refreshedIndexServesTheWholeCatalogWithoutSkuReads() {
+        val catalog = FakeCatalog()
+        repeat(CATALOG_SIZE) { number -> catalog.put("SKU-$number", variantId = if (number % 2 == 0) "variant-$number" else null) }
+        val indexed = SkuIndex(catalog::load).also { it.refresh() }
+        val unindexed = SkuIndex(catalog::load)
+
+        repeat(CATALOG_SIZE) { number -> indexed.lookup("SKU-$number").blockingGet() }
+        assertEquals(0, catalog.skuReads)
+        assertEquals(CATALOG_SIZE.toLong(), indexed.snapshot().getLong("hits"))
+
+        repeat(CATALOG_SIZE) { number -> unindexed.lookup("SKU-$number").blockingGet() }
+        assertEquals(CATALOG_SIZE, catalog.skuReads)
+    }
+
+    private companion object {
+        const val CATALOG_SIZE = 1_000
+
+        fun entry(sku: String, active: Boolean, variantId: String?): JsonObject {
+            val product = JsonObject().put("productId", "product-$sku").put("sku", sku).put("active", active)
+            return JsonObject()
+                .put("sku", sku)
+                .put("matchType", if (variantId == null) "PRODUCT" else "VARIANT")
+                .put("active", active)
+                .put("product", product)
+                .put("variant", variantId?.let { JsonObject().put("variantId", it).put("sku", sku).put("active", active) })
+        }
+    }
+}
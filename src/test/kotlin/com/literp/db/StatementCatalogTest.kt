@@ -0,0 +1,31 @@
+package com.literp.db
+
+import java.util.UUID
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertSame
+
+class StatementCatalogTest {
+    @Test
+    fun sqlBuildsEachShapeOnceAndCountsReuses() {
+        val key = "test.list:${UUID.randomUUID()}"
+        val before = StatementCatalog.snapshot()
+        var builds = 0
+
+        val first = StatementCatalog.sql(key) {
+            builds++
+            "SELECT 1 LIMIT $1 OFFSET $2"
+        }
+        val second = StatementCatalog.sql(key) {
+            builds++
+            "SELECT 2"
+        }
+
+        val after = StatementCatalog.snapshot()
+        assertSame(first, second)
+        assertEquals(1, builds)
+        assertEquals(before.getLong("textBuilds") + 1, after.getLong("textBuilds"))
+        assertEquals(before.getLong("textReuses") + 1, after.getLong("textReuses"))
+        assertEquals(before.getInteger("statements") + 1, after.getInteger("statements"))
+    }
+}
@@ -0,0 +1,65 @@
+package com.literp.observability
+
+import java.util.UUID
+import java.util.concurrent.atomic.LongAdder
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import org.junit.jupiter.api.Tag
+
+// Per-request cost that logging adds on the handler thread, in nanoseconds. The sinks discard their lines,
+// so this measures what the event loop pays, not the log I/O. "inline" is the previous scheme: a fresh
+// UUID.randomUUID() and an interpolated line built on the request thread for every response.
+// Report-only: run with ./gradlew benchmark.
+@Tag("benchmark")
+class AccessLogBenchmarkTest {
+    @Test
+    fun handlerOverheadWithLoggingOnAndOff() {
+        val off = AccessLog(successSampleRate = 0.0, queueCapacity = QUEUE_CAPACITY) { _, _ -> }
+        val on = AccessLog(successSampleRate = 1.0, queueCapacity = QUEUE_CAPACITY) { _, _ -> }
+        val inlineLines = LongAdder()
+
+        try {
+            val results = linkedMapOf(
+                "off" to measure { index -> complete(off, index) },
+                "on" to measure { index -> complete(on, index) },
+                "inline" to measure { index ->
+                    val id = UUID.randomUUID().toString()
+                    val requestId = UUID.randomUUID().toString()
+                    val line = "Handling id=$id status=200 method=GET path=${PATHS[index % PATHS.size]} requestId=$requestId"
+                    inlineLines.add(line.length.toLong())
+                }
+            )
+
+            println(
+                "Access log handler overhead: requests=$MEASURED_REQUESTS " +
+                    results.entries.joinToString(" ") { (mode, nanos) -> "$mode=${"%.1f".format(nanos)}ns" } +
+                    " dropped=${on.snapshot().getLong("dropped")} inlineChars=${inlineLines.sum()}"
+            )
+            assertEquals(0L, off.snapshot().getLong("written") + off.snapshot().getLong("dropped"))
+        } finally {
+            off.close()
+            on.close()
+        }
+    }
+
+    // Mirrors the HTTP server's end handler for a successful response.
+    private fun complete(accessLog: AccessLog, index: Int) {
+        if (accessLog.sampled(200)) {
+            accessLog.record(AccessLog.Entry("GET", PATHS[index % PATHS.size], "listProducts", 200, 1_000L, RequestIds.next()))
+        }
+    }
+
+    private fun measure(request: (Int) -> Unit): Double {
+        repeat(WARMUP_REQUESTS) { index -> request(index) }
+        val startedAt = System.nanoTime()
+        repeat(MEASURED_REQUESTS) { index -> request(index) }
+        return (System.nanoTime() - startedAt).toDouble() / MEASURED_REQUESTS
+    }
+
+    private companion object {
+        const val QUEUE_CAPACITY = 8192
+        const val WARMUP_REQUESTS = 200_000
+        const val MEASURED_REQUESTS = 1_000_000
+        val PATHS = listOf("/api/v1/uom", "/api/v1/products", "/api/v1/locations")
+    }
+}
@@ -0,0 +1,107 @@
+package com.literp.observability
+
+import java.util.UUID
+import java.util.concurrent.CopyOnWriteArrayList
+import java.util.concurrent.CountDownLatch
+import java.util.concurrent.TimeUnit
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFalse
+import kotlin.test.assertTrue
+
+class AccessLogTest {
+    @Test
+    fun errorsAreAlwaysKeptAndSuccessesFollowTheSampleRate() {
+        val off = AccessLog(successSampleRate = 0.0, queueCapacity = 16)
+        val on = AccessLog(successSampleRate = 1.0, queueCapacity = 16)
+        try {
+            assertFalse(off.sampled(200))
+            assertFalse(off.sampled(304))
+            assertTrue(off.sampled(404))
+            assertTrue(off.sampled(500))
+            assertTrue(on.sampled(200))
+        } finally {
+            off.close()
+            on.close()
+        }
+    }
+
+    @Test
+    fun entriesAreWrittenAsKeyValueLines() {
+        val lines = CopyOnWriteArrayList<Pair<Int, String>>()
+        val accessLog = AccessLog(1.0, 16) { statusCode, line -> lines.add(statusCode to line) }
+        try {
+            accessLog.record(AccessLog.Entry("GET", "/api/v1/uom", "listUnitOfMeasures", 200, 1_500_000L, "req-1"))
+            accessLog.record(
+                AccessLog.Entry(
+                    "GET",
+                    "/api/v1/uom/missing",
+                    "getUnitOfMeasure",
+                    404,
+                    2_000L,
+                    "req-2",
+                    AccessLog.ErrorDetail("err-1", "RESOURCE_NOT_FOUND", "Unit of measure \"missing\" not found")
+                )
+            )
+            awaitWritten(accessLog, 2)
+        } finally {
+            accessLog.close()
+        }
+
+        assertEquals(
+            200 to "status=200 method=GET path=/api/v1/uom route=listUnitOfMeasures durationMicros=1500 requestId=req-1",
+            lines[0]
+        )
+        assertEquals(
+            404 to "status=404 method=GET path=/api/v1/uom/missing route=getUnitOfMeasure durationMicros=2 requestId=req-2 " +
+                "errorId=err-1 errorCode=RESOURCE_NOT_FOUND message=\"Unit of measure \\\"missing\\\" not found\"",
+            lines[1]
+        )
+    }
+
+    @Test
+    fun aFullQueueDropsEntriesInsteadOfBlocking() {
+        val writing = CountDownLatch(1)
+        val release = CountDownLatch(1)
+        val accessLog = AccessLog(1.0, 2) { _, _ ->
+            writing.countDown()
+            release.await(10, TimeUnit.SECONDS)
+        }
+        try {
+            accessLog.record(entry())
+            assertTrue(writing.await(10, TimeUnit.SECONDS))
+
+            repeat(5) { accessLog.record(entry()) }
+            assertEquals(3L, accessLog.snapshot().getLong("dropped"))
+            assertEquals(2, accessLog.snapshot().getInteger("queued"))
+
+            release.countDown()
+            awaitWritten(accessLog, 3)
+        } finally {
+            release.countDown()
+            accessLog.close()
+        }
+    }
+
+    @Test
+    fun requestIdsAreVersionFourUuids() {
+        val ids = (1..1000).map { RequestIds.next() }
+
+        assertEquals(1000, ids.toSet().size)
+        ids.forEach { id ->
+            val uuid = UUID.fromString(id)
+            assertEquals(4, uuid.version())
+            assertEquals(2, uuid.variant())
+        }
+    }
+
+    private fun entry() = AccessLog.Entry("GET", "/api/v1/products", "listProducts", 200, 1_000L, RequestIds.next())
+
+    private fun awaitWritten(accessLog: AccessLog, expected: Long) {
+        val deadline = System.nanoTime() + TimeUnit.SECONDS.toNanos(10)
+        while (accessLog.snapshot().getLong("written") < expected && System.nanoTime() < deadline) {
+            Thread.sleep(5)
+        }
+        assertEquals(expected, accessLog.snapshot().getLong("written"))
+    }
+}
@@ -0,0 +1,86 @@
+package com.literp.observability
+
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertTrue
+
+class DatabaseMetricsTest {
+    @Test
+    fun queriesAreTrackedByNameWithRowsErrorsAndSlowCount() {
+        val metrics = DatabaseMetrics(slowQueryThresholdMillis = 50)
+
+        metrics.recordQuery("order.confirm.insertReservations", 2_000_000L, 3, failed = false)
+        metrics.recordQuery("order.confirm.insertReservations", 80_000_000L, 2, failed = false)
+        metrics.recordQuery("order.confirm.lockOrder", 1_000_000L, 0, failed = true)
+
+        val snapshot = metrics.snapshot()
+        assertEquals(50, snapshot.getInteger("slowQueryThresholdMillis"))
+        assertEquals(1L, snapshot.getLong("slowQueryCount"))
+
+        val reservations = snapshot.getJsonObject("queries").getJsonObject("order.confirm.insertReservations")
+        assertEquals(2L, reservations.getLong("count"))
+        assertEquals(5L, reservations.getLong("rows"))
+        assertEquals(0L, reservations.getLong("errorCount"))
+        assertEquals(80_000_000L, reservations.getLong("maxNanos"))
+        assertEquals(1L, snapshot.getJsonObject("queries").getJsonObject("order.confirm.lockOrder").getLong("errorCount"))
+    }
+
+    @Test
+    fun zeroThresholdDisablesTheSlowQueryLog() {
+        val metrics = DatabaseMetrics()
+
+        metrics.recordQuery("product.list", 10_000_000_000L, 20, failed = false)
+
+        assertEquals(0L, metrics.snapshot().getLong("slowQueryCount"))
+    }
+
+    @Test
+    fun leasesTrackWaitingInUseAndIdleConnections() {
+        val metrics = DatabaseMetrics()
+        metrics.registerPool(DatabaseMetrics.PRIMARY_POOL, 4) { 3 }
+        val pool = metrics.pool(DatabaseMetrics.PRIMARY_POOL)
+
+        val first = pool.lease()
+        val second = pool.lease()
+        val abandoned = pool.lease()
+        assertEquals(3, pool.waiting)
+
+        first.acquired()
+        second.acquired()
+        assertEquals(1, pool.waiting)
+        assertEquals(2, pool.inUse)
+        assertEquals(1, pool.idle)
+
+        abandoned.failed()
+        abandoned.release()
+        first.release()
+        first.release()
+
+        val snapshot = metrics.snapshot().getJsonObject("pools").getJsonObject(DatabaseMetrics.PRIMARY_POOL)
+        assertEquals(4, snapshot.getInteger("maxSize"))
+        assertEquals(3, snapshot.getInteger("size"))
+        assertEquals(1, snapshot.getInteger("inUse"))
+        assertEquals(2, snapshot.getInteger("idle"))
+        assertEquals(0, snapshot.getInteger("waiting"))
+        assertEquals(1L, snapshot.getLong("acquireFailures"))
+        assertEquals(2L, snapshot.getJsonObject("acquireWait").getLong("count"))
+    }
+
+    @Test
+    fun prometheusTextLabelsQueriesAndPools() {
+        val metrics = DatabaseMetrics()
+        metrics.registerPool(DatabaseMetrics.PRIMARY_POOL, 16) { 2 }
+        metrics.recordQuery("uom.get", 1_000_000L, 1, failed = false)
+        metrics.pool(DatabaseMetrics.PRIMARY_POOL).lease().acquired()
+
+        val lines = metrics.prometheus().lines()
+        assertTrue("# TYPE literp_db_query_duration_seconds summary" in lines)
+        assertTrue("literp_db_query_duration_seconds_count{query=\"uom.get\"} 1" in lines)
+        assertTrue("literp_db_query_duration_seconds_max{query=\"uom.get\"} 0.001000000" in lines)
+        assertTrue("literp_db_query_rows_total{query=\"uom.get\"} 1" in lines)
+        assertTrue("literp_db_pool_connections{pool=\"primary\",state=\"in_use\"} 1" in lines)
+        assertTrue("literp_db_pool_connections{pool=\"primary\",state=\"idle\"} 1" in lines)
+        assertTrue("literp_db_pool_max_connections{pool=\"primary\"} 16" in lines)
+        assertTrue("literp_db_pool_waiting{pool=\"primary\"} 0" in lines)
+    }
+}
@@ -2,14 +2,15 @@ package com.literp.observability
 
 import kotlin.test.Test
 import kotlin.test.assertEquals
+import kotlin.test.assertTrue
 
 class HttpMetricsTest {
     @Test
     fun snapshotTracksRequestsErrorsAndDatabaseFailures() {
         val metrics = HttpMetrics()
 
-        metrics.recordRequest(200, 100)
-        metrics.recordRequest(503, 250)
+        metrics.recordRequest("getProduct", 200, 100)
+        metrics.recordRequest("getProduct", 503, 250)
         metrics.recordDatabaseFailure()
 
         val snapshot = metrics.snapshot()
@@ -19,4 +20,59 @@ class HttpMetricsTest {
         assertEquals(350L, snapshot.getLong("totalLatencyNanos"))
         assertEquals(175L, snapshot.getLong("averageLatencyNanos"))
     }
+
+    @Test
+    fun routesReportPercentilesPerStatusClass() {
+        val metrics = HttpMetrics()
+
+        (1..1000).forEach { millis -> metrics.recordRequest("listProducts", 200, millis * 1_000_000L) }
+        metrics.recordRequest("listProducts", 404, 2_000_000L)
+        metrics.recordRequest("listProducts", 404, 3_000_000L)
+
+        val routes = metrics.snapshot().getJsonObject("routes")
+        val success = routes.getJsonObject("listProducts").getJsonObject("2xx")
+        assertEquals(1000L, success.getLong("count"))
+        assertWithin(500_000_000L, success.getLong("p50Nanos"))
+        assertWithin(900_000_000L, success.getLong("p90Nanos"))
+        assertWithin(990_000_000L, success.getLong("p99Nanos"))
+        assertWithin(999_000_000L, success.getLong("p999Nanos"))
+        assertEquals(1_000_000_000L, success.getLong("maxNanos"))
+        assertTrue(success.getDouble("averageRequestsPerSecond") > 0)
+
+        val notFound = routes.getJsonObject("listProducts").getJsonObject("4xx")
+        assertEquals(2L, notFound.getLong("count"))
+        assertEquals(3_000_000L, notFound.getLong("maxNanos"))
+        assertEquals(1002L, metrics.snapshot().getJsonObject("latency").getLong("count"))
+    }
+
+    @Test
+    fun prometheusTextExposesCountersAndLatencySummaries() {
+        val metrics = HttpMetrics()
+        metrics.recordRequest("getProduct", 200, 2_000_000L)
+        metrics.recordRequest("/health/live", 200, 1_000_000L)
+
+        val lines = metrics.prometheus().lines()
+        assertTrue("literp_http_requests_total 2" in lines)
+        assertTrue("# TYPE literp_http_request_duration_seconds summary" in lines)
+        assertTrue(lines.any { it.startsWith("literp_http_request_duration_seconds{route=\"getProduct\",status=\"2xx\",quantile=\"0.99\"} 0.00") })
+        assertTrue(lines.any { it.startsWith("literp_http_request_duration_seconds{route=\"getProduct\",status=\"2xx\",quantile=\"0.999\"} 0.00") })
+        assertTrue(lines.none { "quantile=\"0.999000" in it || "quantile=\"0.9990000" in it })
+        assertTrue("literp_http_request_duration_seconds_count{route=\"getProduct\",status=\"2xx\"} 1" in lines)
+        assertTrue("literp_http_request_duration_seconds_max{route=\"/health/live\",status=\"2xx\"} 0.001000000" in lines)
+    }
+
+    @Test
+    fun routeNamesAreCapped() {
+        val metrics = HttpMetrics()
+
+        repeat(HttpMetrics.MAX_ROUTES + 10) { number -> metrics.recordRequest("route-$number", 200, 1_000L) }
+
+        val routes = metrics.snapshot().getJsonObject("routes")
+        assertEquals(HttpMetrics.MAX_ROUTES + 1, routes.size())
+        assertEquals(10L, routes.getJsonObject(HttpMetrics.OTHER_ROUTE).getJsonObject("2xx").getLong("count"))
+    }
+
+    private fun assertWithin(expected: Long, actual: Long) {
+        assertTrue(actual >= expected && actual <= expected + expected / 16, "Expected about $expected but was $actual")
+    }
 }
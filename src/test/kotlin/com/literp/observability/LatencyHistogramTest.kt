@@ -0,0 +1,68 @@
+package com.literp.observability
+
+import java.lang.management.ManagementFactory
+import java.util.concurrent.Executors
+import java.util.concurrent.TimeUnit
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertTrue
+import org.junit.jupiter.api.Assumptions.assumeTrue
+
+class LatencyHistogramTest {
+    @Test
+    fun bucketsKeepValuesWithinTheirRelativePrecision() {
+        val samples = (0L..4_096L) + generateSequence(4_097L) { it * 3 / 2 }.takeWhile { it < LatencyHistogram.MAX_TRACKABLE_NANOS }
+        var previousIndex = -1
+        samples.forEach { value ->
+            val index = LatencyHistogram.bucketIndex(value)
+            val highest = LatencyHistogram.highestValueInBucket(index)
+            assertTrue(index in previousIndex until LatencyHistogram.BUCKET_COUNT, "Index $index out of order for $value")
+            assertTrue(highest >= value && highest - value <= value / 32, "Bucket ceiling $highest too far from $value")
+            previousIndex = index
+        }
+        assertEquals(LatencyHistogram.BUCKET_COUNT - 1, LatencyHistogram.bucketIndex(LatencyHistogram.MAX_TRACKABLE_NANOS))
+    }
+
+    @Test
+    fun concurrentRecordsAreAllCounted() {
+        val histogram = LatencyHistogram()
+        val executor = Executors.newFixedThreadPool(THREADS)
+        repeat(THREADS) { thread ->
+            executor.execute { repeat(RECORDS_PER_THREAD) { number -> histogram.record((thread * RECORDS_PER_THREAD + number).toLong()) } }
+        }
+        executor.shutdown()
+        assertTrue(executor.awaitTermination(30, TimeUnit.SECONDS))
+
+        val snapshot = histogram.snapshot()
+        assertEquals((THREADS * RECORDS_PER_THREAD).toLong(), snapshot.count)
+        assertEquals((THREADS * RECORDS_PER_THREAD - 1).toLong(), snapshot.maxNanos)
+
+        val empty = LatencyHistogram()
+        assertEquals(listOf(0L, 0L, 0L, 0L), empty.snapshot().percentileNanos)
+        empty.record(-5)
+        assertEquals(0L, empty.snapshot().maxNanos)
+    }
+
+    @Test
+    fun recordingDoesNotAllocate() {
+        val threads = ManagementFactory.getThreadMXBean() as? com.sun.management.ThreadMXBean
+        assumeTrue(threads != null && threads.isThreadAllocatedMemorySupported)
+        val histogram = LatencyHistogram()
+        repeat(WARMUP_RECORDS) { number -> histogram.record(number * 1_000L) }
+
+        val threadId = Thread.currentThread().threadId()
+        val before = threads!!.getThreadAllocatedBytes(threadId)
+        repeat(MEASURED_RECORDS) { number -> histogram.record(number * 1_000L) }
+        val allocated = threads.getThreadAllocatedBytes(threadId) - before
+
+        println("Latency histogram allocation check: records=$MEASURED_RECORDS allocatedBytes=$allocated")
+        assertTrue(allocated < MEASURED_RECORDS, "Expected no per-record allocation but saw $allocated bytes")
+    }
+
+    private companion object {
+        const val THREADS = 8
+        const val RECORDS_PER_THREAD = 50_000
+        const val WARMUP_RECORDS = 100_000
+        const val MEASURED_RECORDS = 1_000_000
+    }
+}
@@ -0,0 +1,128 @@
+package com.literp.observability
+
+import io.vertx.core.Vertx
+import io.vertx.core.eventbus.Message
+import io.vertx.core.json.JsonObject
+import java.util.concurrent.CompletableFuture
+import java.util.concurrent.TimeUnit
+import kotlin.test.AfterTest
+import kotlin.test.BeforeTest
+import kotlin.test.Test
+import kotlin.test.assertEquals
+import kotlin.test.assertFalse
+import kotlin.test.assertNull
+import kotlin.test.assertTrue
+
+class TracerTest {
+    private lateinit var vertx: Vertx
+
+    @BeforeTest
+    fun setUp() {
+        vertx = Vertx.vertx()
+    }
+
+    @AfterTest
+    fun tearDown() {
+        vertx.close().toCompletionStage().toCompletableFuture().get(10, TimeUnit.SECONDS)
+    }
+
+    @Test
+    fun zeroSampleRateNeverTracesAndLeavesNoCurrentSpan() {
+        val tracer = Tracer(RingBufferSpanExporter(16), 0.0)
+
+        val result = onContext {
+            assertFalse(tracer.sampled())
+            Tracer.startSpan("uom.list")
+        }
+
+        assertNull(result)
+    }
+
+    @Test
+    fun nestedSpansShareTheTraceAndRestoreTheirParent() {
+        val exporter = RingBufferSpanExporter(16)
+        val tracer = Tracer(exporter, 1.0)
+
+        onContext {
+            assertTrue(tracer.sampled())
+            val root = tracer.startTrace("req-1", "listUnitOfMeasures")
+            val transaction = Tracer.startSpan("db.transaction")!!.activate()
+            Tracer.startSpan("uom.list")!!.attribute("rows", 3L).end()
+            transaction.end()
+            assertTrue(Tracer.current() === root)
+            root.end()
+            assertNull(Tracer.current())
+        }
+
+        val trace = exporter.traces("req-1").getJsonObject(0)
+        assertEquals("listUnitOfMeasures", trace.getString("name"))
+        assertEquals(3, trace.getInteger("spanCount"))
+
+        val spans = trace.getJsonArray("spans").map { it as JsonObject }.associateBy { it.getString("name") }
+        val rootId = spans.getValue("listUnitOfMeasures").getString("spanId")
+        assertNull(spans.getValue("listUnitOfMeasures").getString("parentSpanId"))
+        assertEquals(rootId, spans.getValue("db.transaction").getString("parentSpanId"))
+        assertEquals(spans.getValue("db.transaction").getString("spanId"), spans.getValue("uom.list").getString("parentSpanId"))
+        assertEquals(3L, spans.getValue("uom.list").getJsonObject("attributes").getLong("rows"))
+    }
+
+    @Test
+    fun ringBufferKeepsOnlyTheNewestSpans() {
+        val exporter = RingBufferSpanExporter(3)
+        val tracer = Tracer(exporter, 1.0)
+
+        onContext {
+            (1..5).forEach { index -> tracer.startTrace("req-$index", "getProduct").end() }
+        }
+
+        val traces = exporter.traces(limit = 10)
+        assertEquals(listOf("req-5", "req-4", "req-3"), traces.map { (it as JsonObject).getString("traceId") })
+        assertEquals(2, exporter.traces(limit = 2).size())
+    }
+
+    @Test
+    fun eventBusCallsContinueTheCallersTrace() {
+        val exporter = RingBufferSpanExporter(16)
+        val tracer = Tracer(exporter, 1.0)
+        EventBusTracing.installOutbound(vertx.eventBus())
+        val interceptor = EventBusTracing.serviceInterceptor(tracer)
+        vertx.eventBus().consumer<JsonObject>("test.traced") { message ->
+            interceptor.intercept(vertx, mutableMapOf(), message).onSuccess { traced: Message<JsonObject> ->
+                Tracer.startSpan("uom.get")!!.end()
+                traced.reply(JsonObject())
+            }
+        }
+
+        val reply = CompletableFuture<Unit>()
+        vertx.runOnContext {
+            val root = tracer.startTrace("req-bus", "getUnitOfMeasure")
+            vertx.eventBus().request<JsonObject>(
+                "test.traced",
+                JsonObject(),
+                io.vertx.core.eventbus.DeliveryOptions().addHeader("action", "getUnitOfMeasure")
+            ).onComplete { result ->
+                root.end()
+                if (result.succeeded()) reply.complete(Unit) else reply.completeExceptionally(result.cause())
+            }
+        }
+        reply.get(10, TimeUnit.SECONDS)
+
+        val spans = exporter.traces("req-bus").getJsonObject(0).getJsonArray("spans").map { it as JsonObject }
+            .associateBy { it.getString("name") }
+        val service = spans.getValue("test.traced getUnitOfMeasure")
+        assertEquals(spans.getValue("getUnitOfMeasure").getString("spanId"), service.getString("parentSpanId"))
+        assertEquals(service.getString("spanId"), spans.getValue("uom.get").getString("parentSpanId"))
+    }
+
+    private fun <T> onContext(block: () -> T): T {
+        val result = CompletableFuture<T>()
+        vertx.runOnContext {
+            try {
+                result.complete(block())
+            } catch (error: Throwable) {
+                result.completeExceptionally(error)
+            }
+        }
+        return result.get(10, TimeUnit.SECONDS)
+    }
+}
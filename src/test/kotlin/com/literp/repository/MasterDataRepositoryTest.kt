@@ -1,19 +1,26 @@
 package com.literp.repository
 
 import com.literp.common.ErrorCodes
+import com.literp.db.StatementCatalog
+import com.literp.observability.DatabaseMetrics
 import com.literp.test.TestDatabase
 import io.vertx.core.Vertx
+import io.vertx.core.json.JsonArray
 import io.vertx.core.json.JsonObject
 import io.vertx.rxjava3.core.Vertx as RxVertx
 import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
 import kotlin.test.assertEquals
+import kotlin.test.assertFailsWith
 import kotlin.test.assertFalse
+import kotlin.test.assertNull
 import kotlin.test.assertTrue
 import kotlin.test.fail
 import org.junit.jupiter.api.AfterAll
 import org.junit.jupiter.api.BeforeAll
 import org.junit.jupiter.api.Test
 import org.junit.jupiter.api.TestInstance
+import java.time.LocalDateTime
 import java.util.UUID
 
 @TestInstance(TestInstance.Lifecycle.PER_CLASS)
@@ -25,6 +32,8 @@ class MasterDataRepositoryTest {
     private lateinit var productRepository: ProductRepository
     private lateinit var variantRepository: ProductVariantRepository
     private lateinit var locationRepository: LocationRepository
+    private lateinit var syncRepository: CatalogSyncRepository
+    private lateinit var exportRepository: ExportRepository
 
     @BeforeAll
     fun setUp() {
@@ -37,6 +46,8 @@ class MasterDataRepositoryTest {
         productRepository = ProductRepository(pool)
         variantRepository = ProductVariantRepository(pool)
         locationRepository = LocationRepository(pool)
+        syncRepository = CatalogSyncRepository(pool)
+        exportRepository = ExportRepository(pool)
     }
 
     @AfterAll
@@ -188,28 +199,28 @@ class MasterDataRepositoryTest {
             locationIds += inactiveLocation.getString("locationId")
 
             val productsPage = productRepository
-                .listProducts(0, 1, "sku,desc", "LQP-$suffix", "STOCK", true)
+                .listProducts(0, 1, "sku,desc", "LQP-$suffix", "STOCK", true, null, "exact")
                 .blockingGet()
             assertPagination(productsPage, page = 0, size = 1, totalElements = 2, totalPages = 2)
             assertEquals(1, fieldValues(productsPage, "sku").size)
 
             val productsWithFallbackSort = productRepository
-                .listProducts(0, 10, "unknown,sideways", "LQP-$suffix", "STOCK", true)
+                .listProducts(0, 10, "unknown,sideways", "LQP-$suffix", "STOCK", true, null, "exact")
                 .blockingGet()
             assertEquals(listOf("LQP-$suffix-A", "LQP-$suffix-B"), fieldValues(productsWithFallbackSort, "sku").sorted())
 
             val variantsPage = variantRepository
-                .listProductVariants(productA.getString("productId"), 0, 1, "sku,desc", true)
+                .listProductVariants(productA.getString("productId"), 0, 1, "sku,desc", true, null, "exact")
                 .blockingGet()
             assertPagination(variantsPage, page = 0, size = 1, totalElements = 2, totalPages = 2)
 
             val activeLocations = locationRepository
-                .listLocations(0, 10, "unknown,sideways", "LQL-$suffix", null, "WAREHOUSE", true)
+                .listLocations(0, 10, "unknown,sideways", "LQL-$suffix", null, "WAREHOUSE", true, null, "exact")
                 .blockingGet()
             assertEquals(listOf("LQL-$suffix-A"), fieldValues(activeLocations, "code"))
 
             val allLocations = locationRepository
-                .listLocations(0, 10, "code,asc", "LQL-$suffix", null, "WAREHOUSE", false)
+                .listLocations(0, 10, "code,asc", "LQL-$suffix", null, "WAREHOUSE", false, null, "exact")
                 .blockingGet()
             assertEquals(listOf("LQL-$suffix-A", "LQL-$suffix-B"), fieldValues(allLocations, "code").sorted())
         } finally {
@@ -219,6 +230,167 @@ class MasterDataRepositoryTest {
         }
     }
 
+    @Test
+    fun listPagesReuseOneCatalogStatementPerShape() {
+        productRepository.listProducts(0, 5, "updatedAt,desc", "LPS", "STOCK", false, null, "exact").blockingGet()
+        locationRepository.listLocations(0, 5, "name,desc", null, "LPS", null, false, null, "exact").blockingGet()
+        val before = StatementCatalog.snapshot()
+
+        (1..3).forEach { page ->
+            productRepository.listProducts(page, 5, "updatedAt,desc", "LPS-$page", "STOCK", false, null, "exact").blockingGet()
+            locationRepository.listLocations(page, 5 + page, "name,desc", null, "LPS-$page", null, false, null, "exact").blockingGet()
+        }
+
+        val after = StatementCatalog.snapshot()
+        assertEquals(before.getLong("textBuilds"), after.getLong("textBuilds"))
+        assertTrue(after.getLong("textReuses") >= before.getLong("textReuses") + 12)
+    }
+
+    @Test
+    fun replicaReadsFallBackToPrimaryOnlyWhenAsked() {
+        // A closed replica pool makes every query routed to it fail, so routing is observable.
+        val replicaPool = TestDatabase.createPool(rxVertx, maxSize = 1)
+        replicaPool.rxClose().blockingAwait()
+        val routedRepository = UnitOfMeasureRepository(pool, replicaPool)
+        val suffix = suffix()
+
+        val created = routedRepository.createUnitOfMeasure("RR-$suffix", "Replica Routing $suffix", null).blockingGet()
+        val uomId = created.getString("uomId")
+        try {
+            assertEquals("RR-$suffix", routedRepository.getUnitOfMeasure(uomId, readPrimary = true).blockingGet().getString("code"))
+            routedRepository.listUnitOfMeasures(0, 5, "code,asc", "exact", readPrimary = true).blockingGet()
+            assertFailsWith<Throwable> { routedRepository.getUnitOfMeasure(uomId).blockingGet() }
+            assertFailsWith<Throwable> { routedRepository.listUnitOfMeasures(0, 5, "code,asc", "exact").blockingGet() }
+        } finally {
+            uomRepository.deleteUnitOfMeasure(uomId).blockingGet()
+        }
+    }
+
+    @Test
+    fun databaseMetricsTimeStatementsByNameAndReleaseLeases() {
+        val databaseMetrics = DatabaseMetrics()
+        val timedUoms = UnitOfMeasureRepository(pool, databaseMetrics = databaseMetrics)
+        val timedSync = CatalogSyncRepository(pool, databaseMetrics)
+        val suffix = suffix()
+
+        val uomId = timedUoms.createUnitOfMeasure("DM$suffix", "Database Metrics $suffix", null).blockingGet().getString("uomId")
+        try {
+            timedUoms.listUnitOfMeasures(0, 5, "code,asc", "exact").blockingGet()
+            timedSync.syncCatalog(null).blockingGet()
+        } finally {
+            uomRepository.deleteUnitOfMeasure(uomId).blockingGet()
+        }
+
+        val snapshot = databaseMetrics.snapshot()
+        val queries = snapshot.getJsonObject("queries")
+        assertEquals(1L, queries.getJsonObject("uom.create").getLong("count"))
+        assertEquals(1L, queries.getJsonObject("uom.create").getLong("rows"))
+        assertEquals(1L, queries.getJsonObject("unit_of_measure.count").getLong("count"))
+        assertTrue(queries.getJsonObject("uom.list").getLong("rows") >= 1)
+        assertEquals(1L, queries.getJsonObject("catalogSync.sync.product").getLong("count"))
+        assertEquals(0L, queries.getJsonObject("catalogSync.sync.product").getLong("errorCount"))
+
+        // Each single statement (create, count, list) leased its own connection, like the sync scope.
+        val primary = snapshot.getJsonObject("pools").getJsonObject(DatabaseMetrics.PRIMARY_POOL)
+        assertEquals(4L, primary.getJsonObject("acquireWait").getLong("count"))
+        assertEquals(0, primary.getInteger("inUse"))
+        assertEquals(0, primary.getInteger("waiting"))
+    }
+
+    @Test
+    fun cursorPaginationWalksPagesInSortOrder() {
+        val suffix = suffix()
+        val productIds = mutableListOf<String>()
+        val locationIds = mutableListOf<String>()
+
+        try {
+            listOf("A", "B", "C").forEach { key ->
+                productIds += productRepository
+                    .createProduct("LCP-$suffix-$key", "Cursor Product $key $suffix", "STOCK", TestDatabase.SEED_UOM_UNIT, true, JsonObject())
+                    .blockingGet()
+                    .getString("productId")
+                locationIds += locationRepository
+                    .createLocation("LCL-$suffix-$key", "Cursor Location $key $suffix", "WAREHOUSE", true, JsonObject())
+                    .blockingGet()
+                    .getString("locationId")
+            }
+
+            val productSkus = mutableListOf<String>()
+            var productCursor: String? = null
+            do {
+                val productsPage = productRepository
+                    .listProducts(0, 2, "sku,desc", "LCP-$suffix", null, true, productCursor, "exact")
+                    .blockingGet()
+                productSkus += fieldValues(productsPage, "sku")
+                productCursor = productsPage.getJsonObject("pagination").getString("nextCursor")
+            } while (productCursor != null)
+            assertEquals(listOf("LCP-$suffix-C", "LCP-$suffix-B", "LCP-$suffix-A"), productSkus)
+
+            val firstLocations = locationRepository
+                .listLocations(0, 2, "createdAt,asc", "LCL-$suffix", null, null, true, null, "exact")
+                .blockingGet()
+            val nextLocations = locationRepository
+                .listLocations(0, 2, "createdAt,asc", "LCL-$suffix", null, null, true, firstLocations.getJsonObject("pagination").getString("nextCursor"), "exact")
+                .blockingGet()
+            assertEquals(
+                listOf("LCL-$suffix-A", "LCL-$suffix-B", "LCL-$suffix-C"),
+                (fieldValues(firstLocations, "code") + fieldValues(nextLocations, "code")).sorted()
+            )
+            assertEquals(3, (fieldValues(firstLocations, "code") + fieldValues(nextLocations, "code")).toSet().size)
+            assertNull(nextLocations.getJsonObject("pagination").getString("nextCursor"))
+
+            val cursorForOtherSort = firstLocations.getJsonObject("pagination").getString("nextCursor")
+            val error = assertFailsWith<Exception> {
+                locationRepository.listLocations(0, 2, "code,asc", "LCL-$suffix", null, null, true, cursorForOtherSort, "exact").blockingGet()
+            }
+            assertTrue(error.message.orEmpty().contains("cursor must be"))
+        } finally {
+            productIds.forEach { productId -> deleteProductIfPresent(productId) }
+            locationIds.forEach { locationId -> deleteLocationIfPresent(locationId) }
+        }
+    }
+
+    @Test
+    fun listTotalModesSkipOrEstimateTheCount() {
+        val suffix = suffix()
+        val productIds = mutableListOf<String>()
+
+        try {
+            listOf("A", "B", "C").forEach { key ->
+                productIds += productRepository
+                    .createProduct("LTP-$suffix-$key", "Total Product $key $suffix", "STOCK", TestDatabase.SEED_UOM_UNIT, true, JsonObject())
+                    .blockingGet()
+                    .getString("productId")
+            }
+
+            val firstPage = productRepository
+                .listProducts(0, 2, "sku,asc", "LTP-$suffix", null, true, null, "none")
+                .blockingGet()
+                .getJsonObject("pagination")
+            assertNull(firstPage.getValue("totalElements"))
+            assertNull(firstPage.getValue("totalPages"))
+            assertEquals(true, firstPage.getBoolean("hasNext"))
+
+            val lastPage = productRepository
+                .listProducts(1, 2, "sku,asc", "LTP-$suffix", null, true, null, "none")
+                .blockingGet()
+            assertEquals(listOf("LTP-$suffix-C"), fieldValues(lastPage, "sku"))
+            assertEquals(false, lastPage.getJsonObject("pagination").getBoolean("hasNext"))
+
+            val estimated = productRepository
+                .listProducts(0, 2, "sku,asc", "LTP-$suffix", null, true, null, "estimated")
+                .blockingGet()
+            assertEquals(2, fieldValues(estimated, "sku").size)
+            assertTrue(estimated.getJsonObject("pagination").getInteger("totalElements") >= 0)
+            assertFalse(estimated.getJsonObject("pagination").containsKey("hasNext"))
+
+            val uomEstimate = uomRepository.listUnitOfMeasures(0, 1, "code,asc", "estimated").blockingGet()
+            assertTrue(uomEstimate.getJsonObject("pagination").getInteger("totalPages") >= 0)
+        } finally {
+            productIds.forEach { productId -> deleteProductIfPresent(productId) }
+        }
+    }
+
     private fun assertPagination(response: JsonObject, page: Int, size: Int, totalElements: Int, totalPages: Int) {
         val pagination = response.getJsonObject("pagination")
         assertEquals(page, pagination.getInteger("page"))
@@ -267,5 +439,201 @@ class MasterDataRepositoryTest {
         }
     }
 
+    @Test
+    fun searchRanksExactAndPrefixMatchesFirst() {
+        val suffix = suffix()
+        val term = "QS$suffix"
+        val productIds = listOf(
+            productRepository.createProduct("X-$term-TAIL", "Contains $term", "STOCK", TestDatabase.SEED_UOM_UNIT, true, null).blockingGet(),
+            productRepository.createProduct("$term-2", "Prefix item", "STOCK", TestDatabase.SEED_UOM_UNIT, true, null).blockingGet(),
+            productRepository.createProduct(term, "Exact item", "STOCK", TestDatabase.SEED_UOM_UNIT, true, null).blockingGet()
+        ).map { it.getString("productId") }
+        val locationId = locationRepository.createLocation("LS-$term", "Search $term", "STORE", true, null).blockingGet().getString("locationId")
+
+        try {
+            val products = productRepository
+                .listProducts(0, 10, "name,desc", null, null, true, null, "exact", q = term.lowercase())
+                .blockingGet()
+            assertEquals(listOf(term, "$term-2", "X-$term-TAIL"), fieldValues(products, "sku"))
+            assertNull(products.getJsonObject("pagination").getString("nextCursor"))
+
+            val variantTerm = "QV$suffix"
+            val variant = variantRepository
+                .createProductVariant(productIds.first(), "V-$variantTerm", "Variant search $suffix", true, null)
+                .blockingGet()
+            try {
+                val byVariant = productRepository
+                    .listProducts(0, 10, "sku,asc", null, null, true, null, "exact", q = variantTerm.lowercase())
+                    .blockingGet()
+                assertEquals(listOf("X-$term-TAIL"), fieldValues(byVariant, "sku"))
+            } finally {
+                variantRepository.deleteProductVariant(productIds.first(), variant.getString("variantId")).blockingGet()
+            }
+
+            val locations = locationRepository
+                .listLocations(0, 10, "code,asc", null, null, null, true, null, "exact", q = term)
+                .blockingGet()
+            assertEquals(listOf("LS-$term"), fieldValues(locations, "code"))
+
+            val error = assertFailsWith<Exception> {
+                productRepository.listProducts(0, 10, "sku,asc", null, null, true, "cursor", "exact", q = term).blockingGet()
+            }
+            assertTrue(error.message.orEmpty().contains("cursor must be omitted"))
+        } finally {
+            productIds.forEach { productId -> deleteProductIfPresent(productId) }
+            deleteLocationIfPresent(locationId)
+        }
+    }
+
+    @Test
+    fun catalogSyncReturnsChangesAndTombstonesSinceTheCursor() {
+        val suffix = suffix()
+        val full = syncRepository.syncCatalog(null).blockingGet()
+        assertTrue(full.getBoolean("full"))
+        assertTrue(syncedValues(full, "unitOfMeasures", "uomId").contains(TestDatabase.SEED_UOM_UNIT))
+
+        val productId = productRepository
+            .createProduct("SYNC-$suffix", "Sync Product $suffix", "STOCK", TestDatabase.SEED_UOM_UNIT, true, null)
+            .blockingGet()
+            .getString("productId")
+        val locationId = locationRepository
+            .createLocation("SYNC-$suffix", "Sync Location $suffix", "STORE", true, null)
+            .blockingGet()
+            .getString("locationId")
+
+        try {
+            val delta = syncRepository.syncCatalog(full.getString("cursor")).blockingGet()
+            assertFalse(delta.getBoolean("full"))
+            assertTrue(syncedValues(delta, "products", "productId").contains(productId))
+            assertTrue(syncedValues(delta, "locations", "locationId").contains(locationId))
+            assertFalse(syncedValues(delta, "unitOfMeasures", "uomId").contains(TestDatabase.SEED_UOM_UNIT))
+
+            // Products are soft-deleted and come back as updates; locations are removed and leave a tombstone.
+            productRepository.deleteProduct(productId).blockingGet()
+            locationRepository.deleteLocation(locationId).blockingGet()
+            val afterDelete = syncRepository.syncCatalog(delta.getString("cursor")).blockingGet()
+            val product = afterDelete.getJsonArray("products").filterIsInstance<JsonObject>().first { it.getString("productId") == productId }
+            assertFalse(product.getBoolean("active"))
+            assertTrue(afterDelete.getJsonObject("deleted").getJsonArray("locations").contains(locationId))
+            assertFalse(syncedValues(afterDelete, "locations", "locationId").contains(locationId))
+
+            val error = assertFailsWith<Exception> { syncRepository.syncCatalog("not-a-cursor").blockingGet() }
+            assertTrue(error.message.orEmpty().contains("since must be"))
+        } finally {
+            deleteProductIfPresent(productId)
+            deleteLocationIfPresent(locationId)
+        }
+    }
+
+    @Test
+    fun skuEntriesResolveProductsAndVariantsAndReportDeactivations() {
+        val suffix = suffix()
+        val productId = productRepository
+            .createProduct("SKU-$suffix", "Sku Product $suffix", "STOCK", TestDatabase.SEED_UOM_UNIT, true, null)
+            .blockingGet()
+            .getString("productId")
+        val variantId = variantRepository
+            .createProductVariant(productId, "SKU-$suffix-V", "Sku Variant $suffix", true, null)
+            .blockingGet()
+            .getString("variantId")
+
+        try {
+            val full = productRepository.findSkuEntries(null, null).blockingGet()
+            val variant = full.getJsonArray("entries").filterIsInstance<JsonObject>().first { it.getString("sku") == "SKU-$suffix-V" }
+            assertEquals(ProductRepository.SKU_MATCH_VARIANT, variant.getString("matchType"))
+            assertEquals(productId, variant.getJsonObject("product").getString("productId"))
+            assertEquals(variantId, variant.getJsonObject("variant").getString("variantId"))
+
+            val single = productRepository.findSkuEntries(null, "SKU-$suffix").blockingGet().getJsonArray("entries")
+            assertEquals(1, single.size())
+            assertEquals(ProductRepository.SKU_MATCH_PRODUCT, single.getJsonObject(0).getString("matchType"))
+
+            // Deactivating the product shows up in the delta for the product and its variant.
+            val loadedAt = LocalDateTime.parse(full.getString("loadedAt"))
+            productRepository.deleteProduct(productId).blockingGet()
+            val delta = productRepository.findSkuEntries(loadedAt.minusSeconds(1), null).blockingGet()
+            val changed = delta.getJsonArray("entries").filterIsInstance<JsonObject>().filter { it.getString("sku").startsWith("SKU-$suffix") }
+            assertEquals(setOf("SKU-$suffix", "SKU-$suffix-V"), changed.map { it.getString("sku") }.toSet())
+            assertTrue(changed.none { it.getBoolean("active") })
+        } finally {
+            deleteProductVariantIfPresent(productId, variantId)
+            deleteProductIfPresent(productId)
+        }
+    }
+
+    @Test
+    fun bulkUpsertWritesValidRowsAndReportsTheRest() {
+        val suffix = suffix()
+        val product = JsonObject()
+            .put("sku", "BULK-$suffix")
+            .put("name", "Bulk Product $suffix")
+            .put("productType", "STOCK")
+            .put("baseUom", TestDatabase.SEED_UOM_UNIT)
+        val variant = JsonObject().put("productSku", "BULK-$suffix").put("sku", "BULK-$suffix-V").put("name", "Bulk Variant $suffix")
+        val rows = JsonArray()
+            .add(product)
+            .add(variant)
+            .add(JsonObject().put("sku", "BULK-$suffix-X").put("name", "Missing type"))
+            .add(product.copy().put("sku", "BULK-$suffix-U").put("baseUom", UUID.randomUUID().toString()))
+            .add(JsonObject().put("productSku", "BULK-$suffix-NONE").put("sku", "BULK-$suffix-W").put("name", "Orphan"))
+            .add(variant.copy())
+            .add("not an object")
+
+        val first = productRepository.bulkUpsertProducts(rows).blockingGet().getJsonArray("results")
+        val productId = first.getJsonObject(0).getString("id")
+        try {
+            assertEquals(
+                listOf("CREATED", "CREATED", "FAILED", "FAILED", "FAILED", "FAILED", "FAILED"),
+                first.filterIsInstance<JsonObject>().map { it.getString("status") }
+            )
+            assertEquals((0 until rows.size()).toList(), first.filterIsInstance<JsonObject>().map { it.getInteger("index") })
+            assertEquals("baseUom must be an existing unit of measure", first.getJsonObject(3).getString("error"))
+            assertEquals("productSku must be an active product", first.getJsonObject(4).getString("error"))
+
+            val second = productRepository
+                .bulkUpsertProducts(JsonArray().add(product.copy().put("name", "Renamed $suffix")).add(variant))
+                .blockingGet()
+                .getJsonArray("results")
+            assertEquals(listOf("UPDATED", "UPDATED"), second.filterIsInstance<JsonObject>().map { it.getString("status") })
+            assertEquals(productId, second.getJsonObject(0).getString("id"))
+            assertEquals("Renamed $suffix", productRepository.getProduct(productId, false).blockingGet().getString("name"))
+        } finally {
+            pool.preparedQuery("DELETE FROM product WHERE product_id = $1").rxExecute(Tuple.of(productId)).blockingGet()
+        }
+    }
+
+    @Test
+    fun productExportStreamsEveryProductInSkuOrder() {
+        val suffix = suffix()
+        val second = productRepository
+            .createProduct("EXP-$suffix-B", "Export B $suffix", "STOCK", TestDatabase.SEED_UOM_UNIT, true, JsonObject())
+            .blockingGet()
+        val first = productRepository
+            .createProduct("EXP-$suffix-A", "Export A $suffix", "SERVICE", TestDatabase.SEED_UOM_UNIT, true, JsonObject().put("batch", suffix))
+            .blockingGet()
+        try {
+            productRepository.deleteProduct(second.getString("productId")).blockingGet()
+
+            val exported = exportRepository.streamProducts().toList().blockingGet()
+                .filter { it.getString("sku").startsWith("EXP-$suffix-") }
+            assertEquals(listOf("EXP-$suffix-A", "EXP-$suffix-B"), exported.map { it.getString("sku") })
+            assertEquals(listOf(true, false), exported.map { it.getBoolean("active") })
+            assertEquals(suffix, exported.first().getJsonObject("metadata").getString("batch"))
+            assertEquals(ExportRepository.PRODUCT_COLUMNS.toSet(), exported.first().fieldNames())
+
+            // Cancelling part way closes the cursor and hands the connection back to the pool.
+            assertEquals(1, exportRepository.streamProducts().take(1).toList().blockingGet().size)
+            assertTrue(productRepository.checkSkuExists("EXP-$suffix-A").blockingGet())
+        } finally {
+            pool.preparedQuery("DELETE FROM product WHERE product_id = ANY($1)")
+                .rxExecute(Tuple.of(arrayOf(first.getString("productId"), second.getString("productId"))))
+                .blockingGet()
+        }
+    }
+
+    private fun syncedValues(sync: JsonObject, key: String, field: String): List<String> {
+        return sync.getJsonArray(key).filterIsInstance<JsonObject>().map { it.getString(field) }
+    }
+
     private fun suffix(): String = UUID.randomUUID().toString().replace("-", "").take(8).uppercase()
 }
@@ -0,0 +1,124 @@
+package com.literp.repository
+
+import com.literp.test.TestDatabase
+import io.reactivex.rxjava3.core.Flowable
+import io.vertx.core.Vertx
+import io.vertx.core.json.JsonObject
+import io.vertx.rxjava3.core.Vertx as RxVertx
+import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
+import java.util.UUID
+import kotlin.test.assertEquals
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Tag
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+// Confirms per second when ORDER_COUNT two-line orders for the same two products confirm in parallel, so every
+// confirm contends for the same inventory_balance rows. Stock covers every order, so none is rejected.
+// Report-only: run with ./gradlew benchmark. Overselling is covered by OrderProcessConcurrencyTest.
+@Tag("benchmark")
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class OrderConfirmBenchmarkTest {
+    private lateinit var coreVertx: Vertx
+    private lateinit var rxVertx: RxVertx
+    private lateinit var pool: Pool
+    private lateinit var orderRepository: OrderProcessRepository
+    private lateinit var productRepository: ProductRepository
+
+    @BeforeAll
+    fun setUp() {
+        coreVertx = Vertx.vertx()
+        rxVertx = RxVertx.newInstance(coreVertx)
+        pool = TestDatabase.createPool(rxVertx, POOL_SIZE)
+        TestDatabase.assumeAvailable(pool)
+
+        orderRepository = OrderProcessRepository(pool)
+        productRepository = ProductRepository(pool)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        if (::pool.isInitialized) {
+            pool.rxClose().blockingAwait()
+        }
+        if (::coreVertx.isInitialized) {
+            coreVertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun parallelConfirmsOnSharedStock() {
+        val suffix = UUID.randomUUID().toString().replace("-", "").take(8).uppercase()
+        val locationId = TestDatabase.SEED_LOCATION_STORE
+        val referenceId = "CONFIRMBENCH-$suffix"
+        val products = listOf(createProduct("CONFIRMBENCH-A-$suffix"), createProduct("CONFIRMBENCH-B-$suffix"))
+        val orderIds = mutableListOf<String>()
+
+        try {
+            products.forEach { product -> insertInboundMovement(product, locationId, ORDER_COUNT.toBigDecimal(), referenceId) }
+            repeat(ORDER_COUNT) { index ->
+                val orderId = orderRepository.createSalesOrderDraft("POS", locationId, null, "USD", null).blockingGet()
+                    .getString("salesOrderId")
+                orderIds.add(orderId)
+                (if (index % 2 == 0) products else products.reversed()).forEach { product ->
+                    orderRepository.addSalesOrderLine(orderId, product.getString("productId"), null, 1.toBigDecimal(), 10.toBigDecimal())
+                        .blockingGet()
+                }
+            }
+
+            val startedAt = System.nanoTime()
+            val confirmed = Flowable.fromIterable(orderIds)
+                .flatMapSingle({ orderId -> orderRepository.confirmSalesOrder(orderId, "CONFIRM-$orderId") }, false, ORDER_COUNT)
+                .count()
+                .blockingGet()
+            val elapsedNanos = System.nanoTime() - startedAt
+
+            println(
+                "Parallel confirm benchmark: orders=$ORDER_COUNT pool=$POOL_SIZE elapsedMs=${elapsedNanos / 1_000_000} " +
+                    "confirmsPerSecond=${"%.1f".format(ORDER_COUNT * 1_000_000_000.0 / elapsedNanos)}"
+            )
+            assertEquals(ORDER_COUNT.toLong(), confirmed)
+        } finally {
+            orderIds.forEach { orderId -> execSql("DELETE FROM sales_order WHERE sales_order_id = $1", orderId) }
+            execSql("DELETE FROM inventory_movement WHERE reference_id = $1", referenceId)
+            products.forEach { product ->
+                val productId = product.getString("productId")
+                execSql("DELETE FROM product WHERE product_id = $1", productId)
+                execSql("DELETE FROM catalog_tombstone WHERE entity_type = 'product' AND entity_id = $1", productId)
+            }
+        }
+    }
+
+    private fun createProduct(sku: String): JsonObject {
+        return productRepository.createProduct(sku, "Benchmark Product $sku", "STOCK", TestDatabase.SEED_UOM_UNIT, true, JsonObject())
+            .blockingGet()
+    }
+
+    private fun insertInboundMovement(product: JsonObject, locationId: String, quantity: java.math.BigDecimal, referenceId: String) {
+        pool.preparedQuery(
+            """
+            INSERT INTO inventory_movement (movement_id, product_id, sku, movement_type, from_location_id, to_location_id, quantity, reference_type, reference_id, notes, created_by, created_at)
+            VALUES ($1, $2, $3, 'IN', NULL, $4, $5, 'ADJUSTMENT', $6, 'confirm benchmark', 'test', NOW())
+            """.trimIndent()
+        ).rxExecute(
+            Tuple.tuple()
+                .addString(UUID.randomUUID().toString())
+                .addString(product.getString("productId"))
+                .addString(product.getString("sku"))
+                .addString(locationId)
+                .addValue(quantity)
+                .addString(referenceId)
+        ).blockingGet()
+    }
+
+    private fun execSql(sql: String, id: String) {
+        pool.preparedQuery(sql).rxExecute(Tuple.of(id)).blockingGet()
+    }
+
+    private companion object {
+        const val POOL_SIZE = 16
+        const val ORDER_COUNT = 300
+    }
+}
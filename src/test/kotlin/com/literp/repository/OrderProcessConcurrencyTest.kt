@@ -0,0 +1,140 @@
+package com.literp.repository
+
+import com.literp.test.TestDatabase
+import io.reactivex.rxjava3.core.Flowable
+import io.reactivex.rxjava3.core.Single
+import io.vertx.core.Vertx
+import io.vertx.core.json.JsonObject
+import io.vertx.rxjava3.core.Vertx as RxVertx
+import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
+import java.util.UUID
+import kotlin.test.assertEquals
+import kotlin.test.assertTrue
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class OrderProcessConcurrencyTest {
+    private lateinit var coreVertx: Vertx
+    private lateinit var rxVertx: RxVertx
+    private lateinit var pool: Pool
+    private lateinit var orderRepository: OrderProcessRepository
+    private lateinit var productRepository: ProductRepository
+
+    @BeforeAll
+    fun setUp() {
+        coreVertx = Vertx.vertx()
+        rxVertx = RxVertx.newInstance(coreVertx)
+        pool = TestDatabase.createPool(rxVertx, POOL_SIZE)
+        TestDatabase.assumeAvailable(pool)
+
+        orderRepository = OrderProcessRepository(pool)
+        productRepository = ProductRepository(pool)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        if (::pool.isInitialized) {
+            pool.rxClose().blockingAwait()
+        }
+        if (::coreVertx.isInitialized) {
+            coreVertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun parallelConfirmsNeverOversellSharedStock() {
+        val suffix = UUID.randomUUID().toString().replace("-", "").take(8).uppercase()
+        val locationId = TestDatabase.SEED_LOCATION_STORE
+        val referenceId = "CONCUR-$suffix"
+        val product1 = createProduct("CONCUR-A-$suffix")
+        val product2 = createProduct("CONCUR-B-$suffix")
+        val orderIds = mutableListOf<String>()
+
+        try {
+            insertInboundMovement(product1, locationId, STOCK_QUANTITY.toBigDecimal(), referenceId)
+            insertInboundMovement(product2, locationId, STOCK_QUANTITY.toBigDecimal(), referenceId)
+
+            repeat(ORDER_COUNT) { index ->
+                // Alternate line order so lock acquisition order cannot follow line insertion order.
+                val products = if (index % 2 == 0) listOf(product1, product2) else listOf(product2, product1)
+                val order = orderRepository.createSalesOrderDraft("POS", locationId, null, "USD", null).blockingGet()
+                val orderId = order.getString("salesOrderId")
+                orderIds.add(orderId)
+                products.forEach { product ->
+                    orderRepository.addSalesOrderLine(orderId, product.getString("productId"), null, 1.toBigDecimal(), 10.toBigDecimal())
+                        .blockingGet()
+                }
+            }
+
+            val outcomes = Flowable.fromIterable(orderIds)
+                .flatMapSingle({ orderId ->
+                    orderRepository.confirmSalesOrder(orderId, "CONFIRM-$orderId")
+                        .map { true }
+                        .onErrorResumeNext { error ->
+                            if (error.message?.contains("Insufficient available stock") == true) {
+                                Single.just(false)
+                            } else {
+                                Single.error(error)
+                            }
+                        }
+                }, false, ORDER_COUNT)
+                .toList()
+                .blockingGet()
+
+            assertEquals(STOCK_QUANTITY, outcomes.count { it })
+            listOf(product1, product2).forEach { product ->
+                val productId = product.getString("productId")
+                val available = orderRepository.getAvailableStock(productId, locationId).blockingGet()
+                    .getValue("quantity").toString().toBigDecimal()
+                assertTrue(available.signum() == 0, "Expected no available stock for $productId but was $available")
+            }
+        } finally {
+            orderIds.forEach { orderId ->
+                execSql("DELETE FROM sales_order WHERE sales_order_id = $1", orderId)
+            }
+            execSql("DELETE FROM inventory_movement WHERE reference_id = $1", referenceId)
+            // deleteProduct only deactivates; hard-delete so repeated runs leave no CONCUR-* products or tombstones.
+            listOf(product1, product2).forEach { product ->
+                val productId = product.getString("productId")
+                execSql("DELETE FROM product WHERE product_id = $1", productId)
+                execSql("DELETE FROM catalog_tombstone WHERE entity_type = 'product' AND entity_id = $1", productId)
+            }
+        }
+    }
+
+    private fun createProduct(sku: String): JsonObject {
+        return productRepository.createProduct(sku, "Test Product $sku", "STOCK", TestDatabase.SEED_UOM_UNIT, true, JsonObject())
+            .blockingGet()
+    }
+
+    private fun insertInboundMovement(product: JsonObject, locationId: String, quantity: java.math.BigDecimal, referenceId: String) {
+        pool.preparedQuery(
+            """
+            INSERT INTO inventory_movement (movement_id, product_id, sku, movement_type, from_location_id, to_location_id, quantity, reference_type, reference_id, notes, created_by, created_at)
+            VALUES ($1, $2, $3, 'IN', NULL, $4, $5, 'ADJUSTMENT', $6, 'concurrency test', 'test', NOW())
+            """.trimIndent()
+        ).rxExecute(
+            Tuple.tuple()
+                .addString(UUID.randomUUID().toString())
+                .addString(product.getString("productId"))
+                .addString(product.getString("sku"))
+                .addString(locationId)
+                .addValue(quantity)
+                .addString(referenceId)
+        ).blockingGet()
+    }
+
+    private fun execSql(sql: String, id: String) {
+        pool.preparedQuery(sql).rxExecute(Tuple.of(id)).blockingGet()
+    }
+
+    private companion object {
+        const val POOL_SIZE = 16
+        const val ORDER_COUNT = 300
+        const val STOCK_QUANTITY = 100
+    }
+}
@@ -1,5 +1,6 @@
 package com.literp.repository
 
+import com.literp.common.ErrorCodes
 import com.literp.test.TestDatabase
 import io.vertx.core.Vertx
 import io.vertx.core.json.JsonObject
@@ -166,6 +167,68 @@ class OrderProcessRepositoryTransactionTest {
         }
     }
 
+    @Test
+    fun fulfillWritesOneOutMovementPerLineInSingleBatch() {
+        val seed = createSeedOrder("FULBATCH")
+        orderRepository.addSalesOrderLine(seed.orderId, seed.product1Id, null, 3.toBigDecimal(), 5.toBigDecimal()).blockingGet()
+        orderRepository.confirmSalesOrder(seed.orderId, "CONFIRM-${seed.suffix}").blockingGet()
+        orderRepository.capturePayment(seed.orderId, "CARD", 45.toBigDecimal(), "TXN-${seed.suffix}", "PAY-${seed.suffix}").blockingGet()
+
+        try {
+            val result = orderRepository.fulfillSalesOrder(seed.orderId, "tester", "batch ship", "FULBATCH-${seed.suffix}").blockingGet()
+
+            val expectedRows = pool.preparedQuery(
+                """
+                SELECT l.product_id, l.sku, l.quantity_ordered AS quantity, so.location_id
+                FROM sales_order_line l
+                JOIN sales_order so ON so.sales_order_id = l.sales_order_id
+                WHERE l.sales_order_id = $1
+                ORDER BY l.product_id, l.quantity_ordered
+                """.trimIndent()
+            ).rxExecute(Tuple.of(seed.orderId)).blockingGet().map { row ->
+                listOf(
+                    row.getString("product_id"),
+                    row.getString("sku"),
+                    row.getBigDecimal("quantity").stripTrailingZeros().toPlainString(),
+                    row.getString("location_id"),
+                    null,
+                    "batch ship",
+                    "tester"
+                )
+            }
+            val movementRows = pool.preparedQuery(
+                """
+                SELECT product_id, sku, quantity, from_location_id, to_location_id, notes, created_by
+                FROM inventory_movement
+                WHERE reference_type = 'SALES_ORDER' AND reference_id = $1 AND movement_type = 'OUT'
+                ORDER BY product_id, quantity
+                """.trimIndent()
+            ).rxExecute(Tuple.of(seed.orderId)).blockingGet().map { row ->
+                listOf(
+                    row.getString("product_id"),
+                    row.getString("sku"),
+                    row.getBigDecimal("quantity").stripTrailingZeros().toPlainString(),
+                    row.getString("from_location_id"),
+                    row.getString("to_location_id"),
+                    row.getString("notes"),
+                    row.getString("created_by")
+                )
+            }
+
+            assertEquals(3, result.getInteger("fulfilledLineCount"))
+            assertEquals(expectedRows, movementRows)
+            assertLineStatuses(seed.orderId, listOf("FULFILLED", "FULFILLED", "FULFILLED"))
+            assertEquals(3L, countLong("SELECT COUNT(*) AS cnt FROM inventory_reservation WHERE sales_order_id = $1 AND status = 'FULFILLED'", seed.orderId))
+            assertStockQuantity(orderRepository.getCurrentStock(seed.product1Id, seed.locationId).blockingGet(), seed.product1Id, seed.locationId, "CURRENT", 96.toBigDecimal())
+            assertStockQuantity(orderRepository.getCurrentStock(seed.product2Id, seed.locationId).blockingGet(), seed.product2Id, seed.locationId, "CURRENT", 99.toBigDecimal())
+        } finally {
+            cleanupOrderGraph(seed.orderId)
+            deleteProduct(seed.product1Id)
+            deleteProduct(seed.product2Id)
+            deleteLocation(seed.locationId)
+        }
+    }
+
     @Test
     fun draftSalesOrderCanBeCancelledWithoutReservationsOrMovements() {
         val seed = createSeedOrder("DRAFTCAN")
@@ -503,6 +566,50 @@ class OrderProcessRepositoryTransactionTest {
         }
     }
 
+    @Test
+    fun inventoryMovementBalancesContinueAcrossCursorPages() {
+        val suffix = suffix()
+        val referenceId = "LEDGERPAGE-$suffix"
+        val sourceLocation = createLocation("LDG-A-$suffix")
+        val targetLocation = createLocation("LDG-B-$suffix")
+        val sku = "LDG-$suffix"
+        val productId = createProduct(sku).getString("productId")
+        val sourceLocationId = sourceLocation.getString("locationId")
+        val targetLocationId = targetLocation.getString("locationId")
+
+        try {
+            insertInventoryMovement(productId, sku, "IN", null, sourceLocationId, 10.toBigDecimal(), referenceId)
+            insertInventoryMovement(productId, sku, "OUT", sourceLocationId, null, 2.toBigDecimal(), referenceId)
+            insertInventoryMovement(productId, sku, "TRANSFER", sourceLocationId, targetLocationId, 3.toBigDecimal(), referenceId)
+            insertInventoryMovement(productId, sku, "ADJUSTMENT", null, sourceLocationId, 1.toBigDecimal(), referenceId)
+
+            val pages = mutableListOf<JsonObject>()
+            var cursor: String? = null
+            do {
+                val page = orderRepository.listInventoryMovements(productId, sourceLocationId, null, null, 1, cursor, readPrimary = true).blockingGet()
+                pages.add(page)
+                cursor = page.getJsonObject("pagination").getString("nextCursor")
+            } while (cursor != null)
+            val rows = pages.flatMap { page -> page.getJsonArray("data").filterIsInstance<JsonObject>() }
+
+            assertEquals(4, pages.size)
+            assertEquals(listOf("10", "8", "5", "6"), rows.map { balanceText(it) })
+
+            // A from bound starting mid-ledger opens at the balance before it, and its cursor pages on from there.
+            val from = java.time.LocalDateTime.parse(rows[1].getString("createdAt"))
+            val fromPage = orderRepository.listInventoryMovements(productId, sourceLocationId, from, null, 1, null, readPrimary = true).blockingGet()
+            assertEquals(listOf("8"), fromPage.getJsonArray("data").filterIsInstance<JsonObject>().map { balanceText(it) })
+            val nextCursor = fromPage.getJsonObject("pagination").getString("nextCursor")
+            val nextPage = orderRepository.listInventoryMovements(productId, sourceLocationId, from, null, 2, nextCursor, readPrimary = true).blockingGet()
+            assertEquals(listOf("5", "6"), nextPage.getJsonArray("data").filterIsInstance<JsonObject>().map { balanceText(it) })
+        } finally {
+            cleanupInventoryMovements(referenceId)
+            deleteProduct(productId)
+            deleteLocation(sourceLocationId)
+            deleteLocation(targetLocationId)
+        }
+    }
+
     @Test
     fun availableStockSubtractsReservedQuantity() {
         val seed = createSeedOrder("STOCKAVL", seedStock = false)
@@ -527,6 +634,51 @@ class OrderProcessRepositoryTransactionTest {
         }
     }
 
+    @Test
+    fun inventoryBalanceTracksReservationsThroughConfirmAndCancel() {
+        val seed = createSeedOrder("BALANCE")
+
+        try {
+            orderRepository.confirmSalesOrder(seed.orderId, "CONFIRM-${seed.suffix}").blockingGet()
+
+            assertStockQuantity(orderRepository.getCurrentStock(seed.product1Id, seed.locationId).blockingGet(), seed.product1Id, seed.locationId, "CURRENT", 100.toBigDecimal())
+            assertStockQuantity(orderRepository.getAvailableStock(seed.product1Id, seed.locationId).blockingGet(), seed.product1Id, seed.locationId, "AVAILABLE", 99.toBigDecimal())
+
+            orderRepository.cancelSalesOrder(seed.orderId, "release stock", "CANCEL-${seed.suffix}").blockingGet()
+
+            assertStockQuantity(orderRepository.getAvailableStock(seed.product1Id, seed.locationId).blockingGet(), seed.product1Id, seed.locationId, "AVAILABLE", 100.toBigDecimal())
+            assertTrue(
+                queryDecimal(
+                    "SELECT reserved_quantity FROM inventory_balance WHERE product_id = $1 AND location_id = '${seed.locationId}'",
+                    seed.product1Id,
+                    "reserved_quantity"
+                ).compareTo(java.math.BigDecimal.ZERO) == 0
+            )
+        } finally {
+            cleanupOrderGraph(seed.orderId)
+            deleteProduct(seed.product1Id)
+            deleteProduct(seed.product2Id)
+            deleteLocation(seed.locationId)
+        }
+    }
+
+    @Test
+    fun availableStockIsZeroWithoutBalanceRow() {
+        val suffix = suffix()
+        val location = createLocation("NOBAL-$suffix")
+        val product = createProduct("NOBAL-$suffix")
+        val productId = product.getString("productId")
+        val locationId = location.getString("locationId")
+
+        try {
+            assertStockQuantity(orderRepository.getCurrentStock(productId, locationId).blockingGet(), productId, locationId, "CURRENT", java.math.BigDecimal.ZERO)
+            assertStockQuantity(orderRepository.getAvailableStock(productId, locationId).blockingGet(), productId, locationId, "AVAILABLE", java.math.BigDecimal.ZERO)
+        } finally {
+            deleteProduct(productId)
+            deleteLocation(locationId)
+        }
+    }
+
     @Test
     fun confirmRejectsWhenAvailableStockIsInsufficient() {
         val seed = createSeedOrder("STOCKLOW", seedStock = false)
@@ -552,6 +704,52 @@ class OrderProcessRepositoryTransactionTest {
         }
     }
 
+    @Test
+    fun getSalesOrderReturnsTheOrderWithAllItsChildRows() {
+        val orderId = TestDatabase.SEED_SALES_ORDER_POS
+        val order = orderRepository.getSalesOrder(orderId).blockingGet()
+
+        assertEquals(orderId, order.getString("salesOrderId"))
+        assertEquals(countLong("SELECT COUNT(*) AS cnt FROM sales_order_line WHERE sales_order_id = $1", orderId), order.getJsonArray("lines").size().toLong())
+        assertEquals(countLong("SELECT COUNT(*) AS cnt FROM inventory_reservation WHERE sales_order_id = $1", orderId), order.getJsonArray("reservations").size().toLong())
+        assertEquals(countLong("SELECT COUNT(*) AS cnt FROM payment WHERE sales_order_id = $1", orderId), order.getJsonArray("payments").size().toLong())
+    }
+
+    @Test
+    fun getSalesOrderReportsMissingOrder() {
+        assertFailsWithMessage(ErrorCodes.fromStatus(404)) {
+            orderRepository.getSalesOrder("00000000-0000-0000-0000-000000000000").blockingGet()
+        }
+    }
+
+    @Test
+    fun confirmChecksCombinedQuantityOfLinesForTheSameProduct() {
+        val seed = createSeedOrder("STOCKSUM", seedStock = false)
+        val referenceId = "STOCKSUM-${seed.suffix}"
+        val sku1 = queryString("SELECT sku FROM product WHERE product_id = $1", seed.product1Id, "sku")
+        val sku2 = queryString("SELECT sku FROM product WHERE product_id = $1", seed.product2Id, "sku")
+
+        try {
+            insertInventoryMovement(seed.product1Id, sku1, "IN", null, seed.locationId, 1.toBigDecimal(), referenceId)
+            insertInventoryMovement(seed.product2Id, sku2, "IN", null, seed.locationId, 5.toBigDecimal(), referenceId)
+            orderRepository.addSalesOrderLine(seed.orderId, seed.product1Id, null, 1.toBigDecimal(), 10.toBigDecimal()).blockingGet()
+
+            assertFailsWithMessage("Insufficient available stock for product ${seed.product1Id}") {
+                orderRepository.confirmSalesOrder(seed.orderId, "CONFIRM-${seed.suffix}").blockingGet()
+            }
+
+            assertEquals("DRAFT", queryString("SELECT status FROM sales_order WHERE sales_order_id = $1", seed.orderId, "status"))
+            assertLineStatuses(seed.orderId, listOf("PENDING", "PENDING", "PENDING"))
+            assertEquals(0L, countLong("SELECT COUNT(*) AS cnt FROM inventory_reservation WHERE sales_order_id = $1", seed.orderId))
+        } finally {
+            cleanupInventoryMovements(referenceId)
+            cleanupOrderGraph(seed.orderId)
+            deleteProduct(seed.product1Id)
+            deleteProduct(seed.product2Id)
+            deleteLocation(seed.locationId)
+        }
+    }
+
     private fun createSeedOrder(prefix: String, seedStock: Boolean = true): SeedOrder {
         val suffix = suffix()
         val location = createLocation("$prefix-$suffix")
@@ -732,6 +930,10 @@ class OrderProcessRepositoryTransactionTest {
             .blockingGet()
     }
 
+    private fun balanceText(movement: JsonObject): String {
+        return movement.getValue("balance").toString().toBigDecimal().stripTrailingZeros().toPlainString()
+    }
+
     private fun assertStockQuantity(
         stock: JsonObject,
         productId: String,
@@ -0,0 +1,106 @@
+package com.literp.repository
+
+import com.literp.test.TestDatabase
+import io.vertx.core.Vertx
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import io.vertx.rxjava3.core.Vertx as RxVertx
+import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
+import java.util.UUID
+import kotlin.test.assertEquals
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Tag
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+// Report-only: run with ./gradlew benchmark. Bulk upsert behaviour is covered by MasterDataRepositoryTest.
+@Tag("benchmark")
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class ProductBulkUpsertBenchmarkTest {
+    private lateinit var coreVertx: Vertx
+    private lateinit var rxVertx: RxVertx
+    private lateinit var pool: Pool
+    private lateinit var productRepository: ProductRepository
+
+    @BeforeAll
+    fun setUp() {
+        coreVertx = Vertx.vertx()
+        rxVertx = RxVertx.newInstance(coreVertx)
+        pool = TestDatabase.createPool(rxVertx)
+        TestDatabase.assumeAvailable(pool)
+
+        productRepository = ProductRepository(pool)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        if (::pool.isInitialized) {
+            pool.rxClose().blockingAwait()
+        }
+        if (::coreVertx.isInitialized) {
+            coreVertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun chunkedBulkUpsertOutpacesOneCreatePerRow() {
+        val prefix = "BENCH-${UUID.randomUUID().toString().take(8).uppercase()}"
+        try {
+            // Baseline: what a client does today, an existence check then one INSERT per product.
+            val singleNanos = measure {
+                repeat(ROWS) { number ->
+                    val sku = "$prefix-S-$number"
+                    if (!productRepository.checkSkuExists(sku).blockingGet()) {
+                        productRepository.createProduct(sku, "Single $number", "STOCK", TestDatabase.SEED_UOM_UNIT, true, null).blockingGet()
+                    }
+                }
+            }
+
+            val rows = (0 until ROWS).map { number ->
+                JsonObject()
+                    .put("sku", "$prefix-B-$number")
+                    .put("name", "Bulk $number")
+                    .put("productType", "STOCK")
+                    .put("baseUom", TestDatabase.SEED_UOM_UNIT)
+            }
+            var created = 0
+            val bulkNanos = measure {
+                rows.chunked(CHUNK_SIZE).forEach { chunk ->
+                    created += productRepository.bulkUpsertProducts(JsonArray(chunk)).blockingGet()
+                        .getJsonArray("results")
+                        .filterIsInstance<JsonObject>()
+                        .count { it.getString("status") == ProductRepository.BULK_CREATED }
+                }
+            }
+
+            println(
+                "Product bulk upsert benchmark: rows=$ROWS chunkSize=$CHUNK_SIZE " +
+                    "singleRowsPerSecond=${ROWS * 1_000_000_000L / singleNanos} " +
+                    "bulkRowsPerSecond=${ROWS * 1_000_000_000L / bulkNanos}"
+            )
+            assertEquals(ROWS, created)
+        } finally {
+            // Deleting fires the catalog tombstone trigger; drop those rows too so repeated runs leave nothing behind.
+            val productIds = pool.preparedQuery("DELETE FROM product WHERE sku LIKE $1 RETURNING product_id")
+                .rxExecute(Tuple.of("$prefix-%"))
+                .blockingGet()
+                .map { it.getString("product_id") }
+            pool.preparedQuery("DELETE FROM catalog_tombstone WHERE entity_type = 'product' AND entity_id = ANY($1)")
+                .rxExecute(Tuple.tuple().addArrayOfString(productIds.toTypedArray()))
+                .blockingGet()
+        }
+    }
+
+    private fun measure(action: () -> Unit): Long {
+        val startedAt = System.nanoTime()
+        action()
+        return maxOf(System.nanoTime() - startedAt, 1L)
+    }
+
+    private companion object {
+        const val ROWS = 2_000
+        const val CHUNK_SIZE = 500
+    }
+}
@@ -0,0 +1,96 @@
+package com.literp.repository
+
+import com.literp.test.TestDatabase
+import io.vertx.core.Vertx
+import io.vertx.rxjava3.core.Vertx as RxVertx
+import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
+import kotlin.test.assertEquals
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Tag
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+// Report-only: run with ./gradlew benchmark. getSalesOrder behaviour is covered by OrderProcessRepositoryTransactionTest.
+@Tag("benchmark")
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class SalesOrderReadBenchmarkTest {
+    private lateinit var coreVertx: Vertx
+    private lateinit var rxVertx: RxVertx
+    private lateinit var pool: Pool
+    private lateinit var orderRepository: OrderProcessRepository
+
+    @BeforeAll
+    fun setUp() {
+        coreVertx = Vertx.vertx()
+        rxVertx = RxVertx.newInstance(coreVertx)
+        pool = TestDatabase.createPool(rxVertx)
+        TestDatabase.assumeAvailable(pool)
+
+        orderRepository = OrderProcessRepository(pool)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        if (::pool.isInitialized) {
+            pool.rxClose().blockingAwait()
+        }
+        if (::coreVertx.isInitialized) {
+            coreVertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun pipelinedGetSalesOrderMatchesSequentialReads() {
+        val orderId = TestDatabase.SEED_SALES_ORDER_POS
+        val order = orderRepository.getSalesOrder(orderId).blockingGet()
+        val sequentialCounts = readSequentially(orderId)
+
+        assertEquals(orderId, order.getString("salesOrderId"))
+        assertEquals(sequentialCounts[0], order.getJsonArray("lines").size())
+        assertEquals(sequentialCounts[1], order.getJsonArray("reservations").size())
+        assertEquals(sequentialCounts[2], order.getJsonArray("payments").size())
+
+        repeat(WARMUP_ITERATIONS) {
+            readSequentially(orderId)
+            orderRepository.getSalesOrder(orderId).blockingGet()
+        }
+        val sequentialNanos = measure { readSequentially(orderId) }
+        val pipelinedNanos = measure { orderRepository.getSalesOrder(orderId).blockingGet() }
+
+        println(
+            "getSalesOrder benchmark: iterations=$MEASURED_ITERATIONS " +
+                "sequentialAvgMicros=${sequentialNanos / MEASURED_ITERATIONS / 1_000} " +
+                "pipelinedAvgMicros=${pipelinedNanos / MEASURED_ITERATIONS / 1_000}"
+        )
+    }
+
+    // Baseline: the order, lines, reservations and payments read one after another.
+    private fun readSequentially(orderId: String): List<Int> {
+        pool.preparedQuery(
+            "SELECT sales_order_id, order_number, order_date, sales_channel, customer_id, location_id, status, total_amount, currency, notes, created_at, updated_at FROM sales_order WHERE sales_order_id = $1"
+        ).rxExecute(Tuple.of(orderId)).blockingGet()
+        val lines = pool.preparedQuery(
+            "SELECT line_id, sales_order_id, product_id, sku, quantity_ordered, quantity_fulfilled, unit_price, line_total, status, created_at, updated_at FROM sales_order_line WHERE sales_order_id = $1 ORDER BY created_at ASC"
+        ).rxExecute(Tuple.of(orderId)).blockingGet()
+        val reservations = pool.preparedQuery(
+            "SELECT reservation_id, sales_order_id, sales_order_line_id, product_id, sku, location_id, quantity, status, created_at, updated_at FROM inventory_reservation WHERE sales_order_id = $1 ORDER BY created_at ASC"
+        ).rxExecute(Tuple.of(orderId)).blockingGet()
+        val payments = pool.preparedQuery(
+            "SELECT payment_id, sales_order_id, payment_method, amount, status, transaction_ref, created_at, updated_at FROM payment WHERE sales_order_id = $1 ORDER BY created_at ASC"
+        ).rxExecute(Tuple.of(orderId)).blockingGet()
+        return listOf(lines.size(), reservations.size(), payments.size())
+    }
+
+    private fun measure(action: () -> Unit): Long {
+        val startedAt = System.nanoTime()
+        repeat(MEASURED_ITERATIONS) { action() }
+        return System.nanoTime() - startedAt
+    }
+
+    private companion object {
+        const val WARMUP_ITERATIONS = 50
+        const val MEASURED_ITERATIONS = 500
+    }
+}
@@ -0,0 +1,81 @@
+package com.literp.service
+
+import com.literp.cache.MasterDataCache
+import com.literp.repository.UnitOfMeasureRepository
+import com.literp.service.master.impl.UnitOfMeasureServiceImpl
+import com.literp.test.TestDatabase
+import io.vertx.core.Future
+import io.vertx.core.Vertx
+import io.vertx.rxjava3.core.Vertx as RxVertx
+import io.vertx.rxjava3.sqlclient.Pool
+import java.util.UUID
+import kotlin.test.assertEquals
+import kotlin.test.assertFailsWith
+import kotlin.test.assertNotEquals
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class MasterDataCacheReplicaTest {
+    private lateinit var coreVertx: Vertx
+    private lateinit var rxVertx: RxVertx
+    private lateinit var pool: Pool
+    private lateinit var replicaPool: Pool
+    private lateinit var routedRepository: UnitOfMeasureRepository
+
+    @BeforeAll
+    fun setUp() {
+        coreVertx = Vertx.vertx()
+        rxVertx = RxVertx.newInstance(coreVertx)
+        pool = TestDatabase.createPool(rxVertx)
+        TestDatabase.assumeAvailable(pool)
+
+        // A closed replica pool fails every query routed to it, standing in for a replica that never catches
+        // up: anything the cache serves must have come from the primary.
+        replicaPool = TestDatabase.createPool(rxVertx, maxSize = 1)
+        replicaPool.rxClose().blockingAwait()
+        routedRepository = UnitOfMeasureRepository(pool, replicaPool)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        if (::pool.isInitialized) {
+            pool.rxClose().blockingAwait()
+        }
+        if (::coreVertx.isInitialized) {
+            coreVertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun cacheMissesLoadFromThePrimaryAndSeeWritesImmediately() {
+        val suffix = UUID.randomUUID().toString().replace("-", "").take(8).uppercase()
+        val service = UnitOfMeasureServiceImpl(routedRepository, MasterDataCache(maxEntries = 100, ttlMillis = 300_000))
+        val uncached = UnitOfMeasureServiceImpl(routedRepository)
+
+        val uomId = await(service.createUnitOfMeasure("CR$suffix", "Cache Replica $suffix", null)).getString("uomId")
+        try {
+            assertFailsWith<Throwable> { await(uncached.getUnitOfMeasure(uomId, false)) }
+
+            assertEquals("Cache Replica $suffix", await(service.getUnitOfMeasure(uomId, false)).getString("name"))
+            val versionBefore = await(service.getUnitOfMeasureListVersion(false))
+
+            await(service.updateUnitOfMeasure(uomId, "Cache Replica Renamed $suffix", null))
+
+            assertEquals("Cache Replica Renamed $suffix", await(service.getUnitOfMeasure(uomId, false)).getString("name"))
+            assertEquals(
+                await(service.getUnitOfMeasureListVersion(true)),
+                await(service.getUnitOfMeasureListVersion(false))
+            )
+            assertNotEquals(versionBefore, await(service.getUnitOfMeasureListVersion(false)))
+        } finally {
+            routedRepository.deleteUnitOfMeasure(uomId).blockingGet()
+        }
+    }
+
+    private fun <T> await(future: Future<T>): T {
+        return future.toCompletionStage().toCompletableFuture().get()
+    }
+}
@@ -0,0 +1,124 @@
+package com.literp.service
+
+import com.literp.service.master.UnitOfMeasureService
+import com.literp.service.master.UnitOfMeasureServiceVertxEBProxy
+import io.vertx.core.Future
+import io.vertx.core.Vertx
+import io.vertx.core.json.JsonArray
+import io.vertx.core.json.JsonObject
+import io.vertx.serviceproxy.ServiceBinder
+import kotlin.test.assertEquals
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Tag
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+// Report-only: run with ./gradlew benchmark. It only asserts that both call paths return the same page.
+@Tag("benchmark")
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class ServiceCallPathBenchmarkTest {
+    private lateinit var vertx: Vertx
+    private lateinit var localService: UnitOfMeasureService
+    private lateinit var proxyService: UnitOfMeasureService
+
+    @BeforeAll
+    fun setUp() {
+        vertx = Vertx.vertx()
+        localService = CannedUnitOfMeasureService(cannedPage())
+        ServiceBinder(vertx).setAddress(BENCHMARK_ADDRESS).register(UnitOfMeasureService::class.java, localService)
+        proxyService = UnitOfMeasureServiceVertxEBProxy(vertx, BENCHMARK_ADDRESS)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        if (::vertx.isInitialized) {
+            vertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun localCallsSkipEventBusMarshalling() {
+        assertEquals(
+            await(localService.listUnitOfMeasures(0, 20, "code,asc", "exact", false)),
+            await(proxyService.listUnitOfMeasures(0, 20, "code,asc", "exact", false))
+        )
+
+        repeat(WARMUP_ITERATIONS) {
+            await(proxyService.listUnitOfMeasures(0, 20, "code,asc", "exact", false))
+            await(localService.listUnitOfMeasures(0, 20, "code,asc", "exact", false))
+        }
+        val proxyNanos = measure { await(proxyService.listUnitOfMeasures(0, 20, "code,asc", "exact", false)) }
+        val localNanos = measure { await(localService.listUnitOfMeasures(0, 20, "code,asc", "exact", false)) }
+
+        println(
+            "Service call path benchmark: iterations=$MEASURED_ITERATIONS " +
+                "proxyAvgNanos=${proxyNanos / MEASURED_ITERATIONS} localAvgNanos=${localNanos / MEASURED_ITERATIONS}"
+        )
+    }
+
+    private fun <T> await(future: Future<T>): T {
+        return future.toCompletionStage().toCompletableFuture().get()
+    }
+
+    private fun measure(action: () -> Unit): Long {
+        val startedAt = System.nanoTime()
+        repeat(MEASURED_ITERATIONS) { action() }
+        return System.nanoTime() - startedAt
+    }
+
+    // A list page shaped like the repository output, so both paths carry a realistic payload.
+    private fun cannedPage(): JsonObject {
+        val data = JsonArray()
+        repeat(20) { index ->
+            data.add(
+                JsonObject()
+                    .put("uomId", "00000000-0000-0000-0000-0000000000${"%02d".format(index)}")
+                    .put("code", "U$index")
+                    .put("name", "Unit $index")
+                    .putNull("baseUnit")
+                    .put("createdAt", "2026-01-01T00:00")
+                    .put("updatedAt", "2026-01-01T00:00")
+            )
+        }
+        return JsonObject()
+            .put("data", data)
+            .put("pagination", JsonObject().put("page", 0).put("size", 20).put("totalElements", 20).put("totalPages", 1))
+    }
+
+    private class CannedUnitOfMeasureService(private val page: JsonObject) : UnitOfMeasureService {
+        override fun listUnitOfMeasures(page: Int, size: Int, sort: String, totalMode: String, readPrimary: Boolean): Future<JsonObject> {
+            return Future.succeededFuture(this.page)
+        }
+
+        override fun createUnitOfMeasure(code: String, name: String, baseUnit: String?): Future<JsonObject> {
+            return Future.failedFuture("not used")
+        }
+
+        override fun getUnitOfMeasure(uomId: String, readPrimary: Boolean): Future<JsonObject> {
+            return Future.failedFuture("not used")
+        }
+
+        override fun updateUnitOfMeasure(uomId: String, name: String, baseUnit: String?): Future<JsonObject> {
+            return Future.failedFuture("not used")
+        }
+
+        override fun deleteUnitOfMeasure(uomId: String): Future<Void> {
+            return Future.failedFuture("not used")
+        }
+
+        override fun getUnitOfMeasureListVersion(readPrimary: Boolean): Future<String> {
+            return Future.failedFuture("not used")
+        }
+
+        override fun checkCodeExists(code: String): Future<Boolean> {
+            return Future.failedFuture("not used")
+        }
+    }
+
+    private companion object {
+        const val BENCHMARK_ADDRESS = "service.master.uom.benchmark"
+        const val WARMUP_ITERATIONS = 2_000
+        const val MEASURED_ITERATIONS = 20_000
+    }
+}
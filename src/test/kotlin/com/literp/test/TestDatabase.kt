@@ -8,16 +8,19 @@ import org.junit.jupiter.api.Assumptions.assumeTrue
 
 object TestDatabase {
     const val SEED_UOM_UNIT = "e6d51210-c046-4d7b-afce-2f33b5846dd1"
+    const val SEED_LOCATION_STORE = "5e5965f0-3bd2-4da5-8831-b8387d08b64f"
+    const val SEED_SALES_ORDER_POS = "56689f0a-346b-4fdd-a3eb-cf7beaf4fe5f"
 
-    fun createPool(vertx: Vertx): Pool {
+    fun createPool(vertx: Vertx, maxSize: Int = 4): Pool {
         val connectOptions = PgConnectOptions()
             .setHost(env("LITERP_TEST_PG_HOST", "127.0.0.1"))
             .setPort(env("LITERP_TEST_PG_PORT", "55432").toInt())
             .setUser(env("LITERP_TEST_PG_USER", "root"))
             .setPassword(env("LITERP_TEST_PG_PASSWORD", "pgdevpassword"))
             .setDatabase(env("LITERP_TEST_PG_DATABASE", "literp_test"))
+            .setCachePreparedStatements(true)
 
-        val pool = io.vertx.sqlclient.Pool.pool(vertx.delegate, connectOptions, PoolOptions().setMaxSize(4))
+        val pool = io.vertx.sqlclient.Pool.pool(vertx.delegate, connectOptions, PoolOptions().setMaxSize(maxSize))
         return Pool.newInstance(pool)
     }
 
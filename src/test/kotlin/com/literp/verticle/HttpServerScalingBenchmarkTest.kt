@@ -0,0 +1,119 @@
+package com.literp.verticle
+
+import com.literp.observability.AccessLog
+import com.literp.observability.HttpMetrics
+import com.literp.repository.ExportRepository
+import com.literp.service.ServiceRegistry
+import com.literp.test.TestDatabase
+import io.vertx.core.Vertx
+import io.vertx.rxjava3.core.RxHelper
+import io.vertx.rxjava3.core.Vertx as RxVertx
+import io.vertx.rxjava3.sqlclient.Pool
+import java.net.ServerSocket
+import java.net.URI
+import java.net.http.HttpClient
+import java.net.http.HttpRequest
+import java.net.http.HttpResponse
+import java.util.concurrent.Callable
+import java.util.concurrent.Executors
+import kotlin.test.assertEquals
+import org.junit.jupiter.api.AfterAll
+import org.junit.jupiter.api.BeforeAll
+import org.junit.jupiter.api.Tag
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.TestInstance
+
+// Report-only: run with ./gradlew benchmark. It only asserts that every request succeeds.
+@Tag("benchmark")
+@TestInstance(TestInstance.Lifecycle.PER_CLASS)
+class HttpServerScalingBenchmarkTest {
+    private lateinit var coreVertx: Vertx
+    private lateinit var rxVertx: RxVertx
+    private lateinit var pool: Pool
+    private lateinit var services: ServiceRegistry
+    private val client: HttpClient = HttpClient.newHttpClient()
+    private val accessLog = AccessLog(successSampleRate = 0.0, queueCapacity = 1024)
+
+    @BeforeAll
+    fun setUp() {
+        coreVertx = Vertx.vertx()
+        rxVertx = RxVertx.newInstance(coreVertx)
+        pool = TestDatabase.createPool(rxVertx, POOL_SIZE)
+        TestDatabase.assumeAvailable(pool)
+
+        services = ServiceRegistry(pool)
+        services.register(coreVertx)
+    }
+
+    @AfterAll
+    fun tearDown() {
+        accessLog.close()
+        if (::pool.isInitialized) {
+            pool.rxClose().blockingAwait()
+        }
+        if (::coreVertx.isInitialized) {
+            coreVertx.close().toCompletionStage().toCompletableFuture().get()
+        }
+    }
+
+    @Test
+    fun readThroughputScalesWithServerInstances() {
+        val maxInstances = Runtime.getRuntime().availableProcessors().coerceAtLeast(2)
+        val results = listOf(1, maxInstances).associateWith { instances -> measureRequestsPerSecond(instances) }
+
+        println(
+            "HttpServerVerticle scaling benchmark: requests=$MEASURED_REQUESTS concurrency=$CONCURRENCY " +
+                results.entries.joinToString(" ") { (instances, rps) -> "instances=$instances rps=${"%.1f".format(rps)}" }
+        )
+    }
+
+    private fun measureRequestsPerSecond(instances: Int): Double {
+        val port = ServerSocket(0).use { it.localPort }
+        val metrics = HttpMetrics()
+        val deploymentIds = (1..instances).map {
+            RxHelper.deployVerticle(rxVertx, HttpServerVerticle(rxVertx, pool, services, metrics, services.databaseMetrics, services.tracer, accessLog, services.masterDataCache, ExportRepository(pool), port, PREPARED_CACHE_SIZE))
+                .blockingGet()
+        }
+
+        try {
+            runRequests(port, WARMUP_REQUESTS)
+            val startedAt = System.nanoTime()
+            val failures = runRequests(port, MEASURED_REQUESTS)
+            val elapsedNanos = System.nanoTime() - startedAt
+
+            assertEquals(0, failures, "Expected every read request to succeed with $instances instances")
+            return MEASURED_REQUESTS * 1_000_000_000.0 / elapsedNanos
+        } finally {
+            deploymentIds.forEach { id -> rxVertx.rxUndeploy(id).blockingAwait() }
+        }
+    }
+
+    // Returns the number of non-200 responses across all workers.
+    private fun runRequests(port: Int, total: Int): Int {
+        val executor = Executors.newFixedThreadPool(CONCURRENCY)
+        try {
+            val perWorker = total / CONCURRENCY
+            val workers = (0 until CONCURRENCY).map { worker ->
+                Callable {
+                    (0 until perWorker).count { index ->
+                        val path = READ_PATHS[(worker + index) % READ_PATHS.size]
+                        val request = HttpRequest.newBuilder(URI.create("http://127.0.0.1:$port$path")).GET().build()
+                        client.send(request, HttpResponse.BodyHandlers.discarding()).statusCode() != 200
+                    }
+                }
+            }
+            return executor.invokeAll(workers).sumOf { it.get() }
+        } finally {
+            executor.shutdownNow()
+        }
+    }
+
+    private companion object {
+        const val POOL_SIZE = 16
+        const val PREPARED_CACHE_SIZE = 512
+        const val CONCURRENCY = 32
+        const val WARMUP_REQUESTS = 640
+        const val MEASURED_REQUESTS = 3200
+        val READ_PATHS = listOf("/api/v1/uom?size=20", "/api/v1/products?size=20", "/api/v1/locations?size=20")
+    }
+}
@@ -1,10 +1,13 @@
 package com.literp.verticle
 
 import com.literp.common.ErrorCodes
+import com.literp.repository.CatalogSyncRepository
+import com.literp.repository.ExportRepository
 import com.literp.repository.LocationRepository
 import com.literp.repository.ProductRepository
 import com.literp.repository.ProductVariantRepository
 import com.literp.repository.UnitOfMeasureRepository
+import com.literp.service.master.impl.CatalogSyncServiceImpl
 import com.literp.service.master.impl.LocationServiceImpl
 import com.literp.service.master.impl.ProductServiceImpl
 import com.literp.service.master.impl.ProductVariantServiceImpl
@@ -13,10 +16,13 @@ import com.literp.observability.HttpMetrics
 import com.literp.test.HttpResult
 import com.literp.test.HttpTestSupport
 import com.literp.test.TestDatabase
+import com.literp.verticle.handler.CatalogSyncHandler
+import com.literp.verticle.handler.ExportHandler
 import com.literp.verticle.handler.LocationHandler
 import com.literp.verticle.handler.ProductHandler
 import com.literp.verticle.handler.UnitOfMeasureHandler
 import io.vertx.core.Vertx
+import io.vertx.core.json.JsonArray
 import io.vertx.core.json.JsonObject
 import io.vertx.ext.web.handler.HttpException
 import io.vertx.rxjava3.core.http.HttpServer
@@ -24,6 +30,7 @@ import io.vertx.rxjava3.ext.web.Router
 import io.vertx.rxjava3.ext.web.openapi.router.RouterBuilder
 import io.vertx.rxjava3.openapi.contract.OpenAPIContract
 import io.vertx.rxjava3.sqlclient.Pool
+import io.vertx.rxjava3.sqlclient.Tuple
 import org.junit.jupiter.api.AfterAll
 import org.junit.jupiter.api.BeforeAll
 import org.junit.jupiter.api.Test
@@ -283,6 +290,19 @@ class MasterDataHttpIntegrationTest {
         expect("GET", "/products?activeOnly=maybe", 400)
         expect("GET", "/products/$missingId?includeVariants=maybe", 400)
         expect("GET", "/locations?activeOnly=maybe", 400)
+        expect("GET", "/products?totalMode=sometimes", 400)
+        expect("GET", "/products?cursor=not-a-cursor", 400)
+        expect("GET", "/products?q=sku&size=5", 200)
+        expect("GET", "/products?q=sku&cursor=not-a-cursor", 400)
+        expect("GET", "/products/by-sku/LIT-COF-LATTE-HOT-M", 200)
+        expect("GET", "/products/by-sku/NO-SUCH-SKU", 404)
+        expect("GET", "/locations?q=store", 200)
+        expect("GET", "/locations?totalMode=none&size=1", 200)
+        expect("GET", "/uom?totalMode=estimated", 200)
+        expect("GET", "/locations?size=1", 200, headers = mapOf("X-Read-Consistency" to "primary"))
+        val cursor = expect("GET", "/sync/catalog", 200).json!!.getJsonObject("data").getString("cursor")
+        expect("GET", "/sync/catalog?since=$cursor", 200)
+        expect("GET", "/sync/catalog?since=not-a-cursor", 400)
 
         val createdUom = expect("GET", "/uom?sort=code,asc&size=100", 200).json!!
             .getJsonArray("data")
@@ -291,6 +311,95 @@ class MasterDataHttpIntegrationTest {
         expect("DELETE", "/uom/${createdUom.getString("uomId")}", 204)
     }
 
+    @Test
+    fun bulkUpsertReportsEveryRowForJsonAndNdjsonBodies() {
+        val suffix = suffix()
+        val skus = listOf("HB-$suffix-1", "HB-$suffix-2", "HB-$suffix-3")
+        try {
+            val array = JsonArray()
+                .add(bulkRow(skus[0], "Bulk One $suffix"))
+                .add(bulkRow(skus[1], "Bulk Two $suffix").put("productType", "BOGUS"))
+                .add(bulkRow(skus[1], "Bulk Two $suffix"))
+            val arrayResult = bulkResult(http.requestText("POST", "/products/bulk-upsert", array.encode(), "application/json"))
+            assertBulkSummary(arrayResult, received = 3, created = 2, updated = 0, failed = 1)
+            assertBulkStatuses(arrayResult, "CREATED", "FAILED", "CREATED")
+            check(arrayResult.getJsonArray("results").getJsonObject(1).getString("error").contains("productType")) {
+                "Expected the failed row to name productType"
+            }
+
+            // Blank lines are skipped and do not count as rows; a line that is not JSON fails on its own.
+            val ndjson = listOf(
+                bulkRow(skus[0], "Bulk One Renamed $suffix").encode(),
+                "",
+                "not json",
+                bulkRow(skus[2], "Bulk Three $suffix").encode()
+            ).joinToString("\n", postfix = "\n")
+            val ndjsonResult = bulkResult(http.requestText("POST", "/products/bulk-upsert", ndjson, "application/x-ndjson"))
+            assertBulkSummary(ndjsonResult, received = 3, created = 1, updated = 1, failed = 1)
+            assertBulkStatuses(ndjsonResult, "UPDATED", "FAILED", "CREATED")
+            check(ndjsonResult.getJsonArray("results").getJsonObject(1).getString("error") == "row must be a JSON object")
+
+            val renamed = expect("GET", "/products?sku=${skus[0]}&size=1", 200).json!!.getJsonArray("data").getJsonObject(0)
+            check(renamed.getString("name") == "Bulk One Renamed $suffix")
+        } finally {
+            pool.preparedQuery("DELETE FROM product WHERE sku = ANY($1)")
+                .rxExecute(Tuple.tuple().addArrayOfString(skus.toTypedArray()))
+                .blockingGet()
+        }
+    }
+
+    @Test
+    fun listEndpointsAnswerMatchingIfNoneMatchWith304() {
+        val suffix = suffix()
+        val first = expect("GET", "/uom?size=5&sort=code,asc", 200)
+        val etag = requireNotNull(first.header("ETag")) { "Expected ETag on GET /uom" }
+        check(first.header("Cache-Control") == "no-cache")
+
+        val notModified = http.request("GET", "/uom?size=5&sort=code,asc", headers = mapOf("If-None-Match" to etag))
+        check(notModified.status == 304) { "Unexpected status ${notModified.status} for a matching If-None-Match" }
+        check(notModified.header("ETag") == etag)
+        check(notModified.rawBody.isEmpty())
+
+        val otherShape = expect("GET", "/uom?size=6&sort=code,asc", 200, headers = mapOf("If-None-Match" to etag))
+        check(otherShape.header("ETag") != etag) { "Expected a different ETag for a different query" }
+
+        val created = expect("POST", "/uom", 201, JsonObject().put("code", "E$suffix").put("name", "ETag UOM $suffix"))
+        val changed = expect("GET", "/uom?size=5&sort=code,asc", 200, headers = mapOf("If-None-Match" to etag))
+        check(changed.header("ETag") != etag) { "Expected the ETag to change after a write" }
+        expect("DELETE", "/uom/${created.json!!.getJsonObject("data").getString("uomId")}", 204)
+
+        val locations = expect("GET", "/locations?size=1", 200)
+        val locationsNotModified = http.request("GET", "/locations?size=1", headers = mapOf("If-None-Match" to locations.header("ETag")!!))
+        check(locationsNotModified.status == 304)
+    }
+
+    private fun bulkRow(sku: String, name: String): JsonObject {
+        return JsonObject()
+            .put("sku", sku)
+            .put("name", name)
+            .put("productType", "STOCK")
+            .put("baseUom", TestDatabase.SEED_UOM_UNIT)
+    }
+
+    private fun bulkResult(response: HttpResult): JsonObject {
+        check(response.status == 200) { "Unexpected status for POST /products/bulk-upsert with body ${response.rawBody}" }
+        return requireNotNull(response.json).getJsonObject("data")
+    }
+
+    private fun assertBulkSummary(result: JsonObject, received: Int, created: Int, updated: Int, failed: Int) {
+        val summary = result.getJsonObject("summary")
+        check(summary.getInteger("received") == received) { "Unexpected bulk summary $summary" }
+        check(summary.getInteger("created") == created) { "Unexpected bulk summary $summary" }
+        check(summary.getInteger("updated") == updated) { "Unexpected bulk summary $summary" }
+        check(summary.getInteger("failed") == failed) { "Unexpected bulk summary $summary" }
+    }
+
+    private fun assertBulkStatuses(result: JsonObject, vararg statuses: String) {
+        val results = result.getJsonArray("results").filterIsInstance<JsonObject>().sortedBy { it.getInteger("index") }
+        check(results.map { it.getInteger("index") } == statuses.indices.toList()) { "Unexpected bulk row indexes $results" }
+        check(results.map { it.getString("status") } == statuses.toList()) { "Unexpected bulk row statuses $results" }
+    }
+
     private fun metricsSnapshot(): JsonObject {
         val response = healthHttp.request("GET", "/metrics")
         check(response.status == 200) { "Unexpected status for GET /metrics with body ${response.rawBody}" }
@@ -309,6 +418,8 @@ class MasterDataHttpIntegrationTest {
         val uomHandler = UnitOfMeasureHandler(UnitOfMeasureServiceImpl(uomRepository))
         val productHandler = ProductHandler(ProductServiceImpl(productRepository), ProductVariantServiceImpl(variantRepository))
         val locationHandler = LocationHandler(LocationServiceImpl(locationRepository))
+        val syncHandler = CatalogSyncHandler(CatalogSyncServiceImpl(CatalogSyncRepository(pool)))
+        val exportHandler = ExportHandler(ExportRepository(pool))
 
         val productContract = OpenAPIContract.rxFrom(rxVertx, "api_collections/open_api_spec/product-catalog.yaml").blockingGet()
         val locationContract = OpenAPIContract.rxFrom(rxVertx, "api_collections/open_api_spec/locations.yaml").blockingGet()
@@ -324,6 +435,8 @@ class MasterDataHttpIntegrationTest {
         productRouterBuilder.getRoute("listProducts").addHandler(productHandler::listProducts)
         productRouterBuilder.getRoute("createProduct").addHandler(productHandler::createProduct)
         productRouterBuilder.getRoute("getProduct").addHandler(productHandler::getProduct)
+        productRouterBuilder.getRoute("getProductBySku").addHandler(productHandler::getProductBySku)
+        productRouterBuilder.getRoute("bulkUpsertProducts").addHandler(productHandler::bulkUpsertProducts)
         productRouterBuilder.getRoute("updateProduct").addHandler(productHandler::updateProduct)
         productRouterBuilder.getRoute("deleteProduct").addHandler(productHandler::deleteProduct)
         productRouterBuilder.getRoute("listProductVariants").addHandler(productHandler::listProductVariants)
@@ -331,6 +444,8 @@ class MasterDataHttpIntegrationTest {
         productRouterBuilder.getRoute("getProductVariant").addHandler(productHandler::getProductVariant)
         productRouterBuilder.getRoute("updateProductVariant").addHandler(productHandler::updateProductVariant)
         productRouterBuilder.getRoute("deleteProductVariant").addHandler(productHandler::deleteProductVariant)
+        productRouterBuilder.getRoute("syncCatalog").addHandler(syncHandler::syncCatalog)
+        productRouterBuilder.getRoute("exportProducts").addHandler(exportHandler::exportProducts)
 
         locationRouterBuilder.getRoute("listLocations").addHandler(locationHandler::listLocations)
         locationRouterBuilder.getRoute("createLocation").addHandler(locationHandler::createLocation)
@@ -346,7 +461,7 @@ class MasterDataHttpIntegrationTest {
                 val startedAt = System.nanoTime()
                 context.response().endHandler {
                     try {
-                        metrics.recordRequest(context.response().statusCode, System.nanoTime() - startedAt)
+                        metrics.recordRequest(HttpMetrics.UNMATCHED_ROUTE, context.response().statusCode, System.nanoTime() - startedAt)
                     } catch (_: Throwable) {
                     }
                 }
@@ -457,6 +572,9 @@ class MasterDataHttpIntegrationTest {
                         }
                     )
             }
+            post("/api/v1/products/bulk-upsert")
+                .consumes("application/x-ndjson")
+                .handler(productHandler::bulkUpsertProductsNdjson)
             route("/api/v1/*").subRouter(productRouterBuilder.createRouter())
             route("/api/v1/*").subRouter(locationRouterBuilder.createRouter())
         }
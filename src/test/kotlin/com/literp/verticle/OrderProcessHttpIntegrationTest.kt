@@ -1,6 +1,7 @@
 package com.literp.verticle
 
 import com.literp.common.ErrorCodes
+import com.literp.repository.ExportRepository
 import com.literp.repository.LocationRepository
 import com.literp.repository.OrderProcessRepository
 import com.literp.repository.ProductRepository
@@ -8,6 +9,7 @@ import com.literp.service.order.impl.OrderProcessServiceImpl
 import com.literp.test.HttpResult
 import com.literp.test.HttpTestSupport
 import com.literp.test.TestDatabase
+import com.literp.verticle.handler.ExportHandler
 import com.literp.verticle.handler.OrderProcessHandler
 import io.vertx.core.Vertx
 import io.vertx.core.json.JsonObject
@@ -23,10 +25,16 @@ import org.junit.jupiter.api.BeforeAll
 import org.junit.jupiter.api.Test
 import org.junit.jupiter.api.TestInstance
 import java.math.BigDecimal
+import java.net.URI
+import java.net.http.HttpClient
+import java.net.http.HttpRequest
+import java.net.http.HttpResponse
+import java.time.LocalDate
 import java.util.UUID
 import java.util.concurrent.TimeoutException
 import kotlin.test.assertEquals
 import kotlin.test.assertNotNull
+import kotlin.test.assertNull
 import kotlin.test.assertTrue
 import io.vertx.rxjava3.core.Vertx as RxVertx
 
@@ -310,8 +318,82 @@ class OrderProcessHttpIntegrationTest {
         }
     }
 
+    @Test
+    fun inventoryMovementLedgerReportsRunningBalancesAcrossCursorPages() {
+        val seed = createCatalogSeed("LEDGER")
+
+        try {
+            insertLedgerMovement(seed, "OUT", fromLocationId = seed.locationId, toLocationId = null, quantity = "4", secondsLater = 1)
+            insertLedgerMovement(seed, "ADJUSTMENT", fromLocationId = null, toLocationId = seed.locationId, quantity = "1", secondsLater = 2)
+            val ledgerPath = "/inventory/movements?productId=${seed.productId}&locationId=${seed.locationId}"
+
+            val firstPage = expect("GET", "$ledgerPath&size=2", 200).json!!
+            val firstRows = firstPage.getJsonArray("data").filterIsInstance<JsonObject>()
+            assertEquals(listOf("IN", "OUT"), firstRows.map { it.getString("movementType") })
+            assertDecimal("-4", firstRows[1].getValue("change"))
+            assertDecimal("6", firstRows[1].getValue("balance"))
+            val cursor = assertNotNull(firstPage.getJsonObject("pagination").getString("nextCursor"))
+
+            val secondPage = expect("GET", "$ledgerPath&size=2&cursor=$cursor", 200).json!!
+            val lastRow = secondPage.getJsonArray("data").getJsonObject(0)
+            assertEquals(1, secondPage.getJsonArray("data").size())
+            assertDecimal("7", lastRow.getValue("balance"))
+            assertNull(secondPage.getJsonObject("pagination").getString("nextCursor"))
+
+            // A from bound hides earlier rows but the balance still counts them.
+            val fromSecond = expect("GET", "$ledgerPath&from=${firstRows[1].getString("createdAt")}", 200).json!!
+                .getJsonArray("data").filterIsInstance<JsonObject>()
+            assertEquals(listOf("6", "7"), fromSecond.map { it.getValue("balance").toString().toBigDecimal().stripTrailingZeros().toPlainString() })
+
+            val currentStock = expect("GET", "/stock/current?productId=${seed.productId}&locationId=${seed.locationId}", 200)
+                .json!!.getJsonObject("data")
+            assertStock(currentStock, seed.productId, seed.locationId, "CURRENT", "7")
+
+            expect("GET", "/inventory/movements?productId=${seed.productId}", 400)
+            expect("GET", "$ledgerPath&cursor=not-a-cursor", 400)
+        } finally {
+            cleanup(seed, null)
+        }
+    }
+
+    @Test
+    fun salesOrderExportStreamsNdjsonAndCsvWithinTheDateRange() {
+        val seed = createCatalogSeed("EXPORT")
+        var orderId: String? = null
+
+        try {
+            orderId = createDraftOrder(seed, "export, \"quoted\"").getString("salesOrderId")
+            val today = LocalDate.now()
+            val range = "from=${today.minusDays(1)}&to=${today.plusDays(2)}"
+
+            val ndjson = download("/exports/sales-orders?$range")
+            assertEquals(200, ndjson.statusCode())
+            assertTrue(ndjson.headers().firstValue("Content-Type").orElse("").startsWith("application/x-ndjson"))
+            val orders = ndjson.body().lines().filter { it.isNotBlank() }.map { JsonObject(it) }
+            val exported = orders.single { it.getString("salesOrderId") == orderId }
+            assertEquals("DRAFT", exported.getString("status"))
+            assertEquals("export, \"quoted\"", exported.getString("notes"))
+            assertEquals(orders.map { it.getString("orderDate") }.sorted(), orders.map { it.getString("orderDate") })
+
+            val csv = download("/exports/sales-orders?$range&format=csv")
+            assertEquals(200, csv.statusCode())
+            val lines = csv.body().split("\r\n")
+            assertEquals(ExportRepository.SALES_ORDER_COLUMNS.joinToString(","), lines.first())
+            assertTrue(lines.any { it.startsWith("$orderId,") && it.contains(",\"export, \"\"quoted\"\"\",") })
+
+            val empty = download("/exports/sales-orders?from=${today.plusDays(2)}&to=${today.plusDays(3)}&format=csv")
+            assertEquals(ExportRepository.SALES_ORDER_COLUMNS.joinToString(",") + "\r\n", empty.body())
+
+            expect("GET", "/exports/sales-orders?from=yesterday", 400)
+            expect("GET", "/exports/sales-orders?from=${today.plusDays(1)}&to=$today", 400)
+        } finally {
+            cleanup(seed, orderId)
+        }
+    }
+
     private fun createRouter(): Router {
         val orderHandler = OrderProcessHandler(OrderProcessServiceImpl(orderRepository))
+        val exportHandler = ExportHandler(ExportRepository(pool))
         val orderContract = OpenAPIContract.rxFrom(rxVertx, "api_collections/open_api_spec/order-process.yaml").blockingGet()
         val orderRouterBuilder = RouterBuilder.create(rxVertx, orderContract)
 
@@ -320,11 +402,13 @@ class OrderProcessHttpIntegrationTest {
         orderRouterBuilder.getRoute("getSalesOrder").addHandler(orderHandler::getSalesOrder)
         orderRouterBuilder.getRoute("getCurrentStock").addHandler(orderHandler::getCurrentStock)
         orderRouterBuilder.getRoute("getAvailableStock").addHandler(orderHandler::getAvailableStock)
+        orderRouterBuilder.getRoute("listInventoryMovements").addHandler(orderHandler::listInventoryMovements)
         orderRouterBuilder.getRoute("addSalesOrderLine").addHandler(orderHandler::addSalesOrderLine)
         orderRouterBuilder.getRoute("confirmSalesOrder").addHandler(orderHandler::confirmSalesOrder)
         orderRouterBuilder.getRoute("capturePayment").addHandler(orderHandler::capturePayment)
         orderRouterBuilder.getRoute("fulfillSalesOrder").addHandler(orderHandler::fulfillSalesOrder)
         orderRouterBuilder.getRoute("cancelSalesOrder").addHandler(orderHandler::cancelSalesOrder)
+        orderRouterBuilder.getRoute("exportSalesOrders").addHandler(exportHandler::exportSalesOrders)
 
         return Router.router(rxVertx).apply {
             route().failureHandler { context ->
@@ -430,6 +514,33 @@ class OrderProcessHttpIntegrationTest {
         ).blockingGet()
     }
 
+    private fun insertLedgerMovement(
+        seed: CatalogSeed,
+        movementType: String,
+        fromLocationId: String?,
+        toLocationId: String?,
+        quantity: String,
+        secondsLater: Int
+    ) {
+        pool.preparedQuery(
+            """
+            INSERT INTO inventory_movement (movement_id, product_id, sku, movement_type, from_location_id, to_location_id, quantity, reference_type, reference_id, notes, created_by, created_at)
+            VALUES ($1, $2, $3, $4::movement_type, $5, $6, $7, 'ADJUSTMENT', $8, 'order HTTP ledger seed', 'test', NOW() + $9 * INTERVAL '1 second')
+            """.trimIndent()
+        ).rxExecute(
+            Tuple.tuple()
+                .addString(UUID.randomUUID().toString())
+                .addString(seed.productId)
+                .addString(seed.sku)
+                .addString(movementType)
+                .addString(fromLocationId)
+                .addString(toLocationId)
+                .addValue(BigDecimal(quantity))
+                .addString(seed.stockReference)
+                .addInteger(secondsLater)
+        ).blockingGet()
+    }
+
     private fun cleanup(seed: CatalogSeed, orderId: String?) {
         if (orderId != null) {
             runCatching { cleanupOrderGraph(orderId) }
@@ -463,6 +574,12 @@ class OrderProcessHttpIntegrationTest {
         pool.preparedQuery(sql).rxExecute().blockingGet()
     }
 
+    // Export bodies are NDJSON or CSV, not a JSON envelope, so they are read as plain text.
+    private fun download(path: String): HttpResponse<String> {
+        val request = HttpRequest.newBuilder(URI.create("$baseUrl$path")).GET().build()
+        return HttpClient.newHttpClient().send(request, HttpResponse.BodyHandlers.ofString())
+    }
+
     private fun expect(
         method: String,
         path: String,